@@ -0,0 +1,8 @@
+# backtest/__init__.py
+
+# 저장된 캔들로 실시간 판단 경로를 재생하는 백테스트 모듈
+from .exchange import SimulatedExchange
+from .features import FeatureSet, precompute_features
+from .providers import LLMProvider, RecordedProvider, RuleBasedProvider
+from .engine import BacktestResult, compute_metrics, run_backtest
+from .sweep import SharedCandles, expand_grid, run_sweep, summarize_sweep
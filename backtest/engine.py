@@ -0,0 +1,128 @@
+# backtest/engine.py
+import logging
+import time
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from backtest.exchange import SimulatedExchange
+from backtest.features import FeatureSet
+from gpt_interface.data_formatter import format_input
+from gpt_interface.decision_logic import make_decision
+from gpt_interface.feasibility import check_feasibility
+
+# 저장된 캔들을 실시간 경로와 같은 format_input / make_decision 으로 재생하는 백테스트 엔진 모듈
+# 특징은 precompute_features 로 미리 계산하고, 시점마다 판단 -> 검증 -> 모의 체결만 수행합니다.
+
+
+class BacktestResult:
+    """
+    백테스트 결과.
+    - equity: 판단 시점별 평가 금액 (KRW)
+    - actions: 판단 시점별 실행된 행동 ('buy', 'sell', 'hold')
+    """
+
+    __slots__ = ("market", "timestamps", "prices", "equity", "actions", "fills", "metrics")
+
+    def __init__(self, market: str, timestamps: pd.DatetimeIndex, prices: np.ndarray, equity: np.ndarray,
+                 actions: List[str], fills: List[Dict], metrics: Dict):
+        self.market = market
+        self.timestamps = timestamps
+        self.prices = prices
+        self.equity = equity
+        self.actions = actions
+        self.fills = fills
+        self.metrics = metrics
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        시점별 가격, 평가 금액, 행동을 DataFrame 으로 반환합니다.
+        """
+        return pd.DataFrame(
+            {"price": self.prices, "equity": self.equity, "action": self.actions}, index=self.timestamps
+        )
+
+
+def compute_metrics(equity: np.ndarray, initial_equity: float, turnover: float, fees: float, trades: int) -> Dict:
+    """
+    평가 금액 곡선에서 손익, 수익률, 최대 낙폭, 회전율을 계산합니다.
+    :param equity: ndarray - 시점별 평가 금액.
+    :param initial_equity: float - 초기 평가 금액.
+    :param turnover: float - 누적 체결 금액 (KRW).
+    :param fees: float - 누적 수수료 (KRW).
+    :param trades: int - 체결 횟수.
+    :return: Dict - final_equity, pnl, return_rate(%), max_drawdown(%), turnover(초기 금액 대비 배수), fees, trades.
+    """
+    if len(equity) == 0:
+        equity = np.array([initial_equity])
+    peak = np.maximum.accumulate(np.concatenate([[initial_equity], equity]))[1:]
+    drawdown = (peak - equity) / peak
+    final_equity = float(equity[-1])
+    return {
+        "final_equity": final_equity,
+        "pnl": final_equity - initial_equity,
+        "return_rate": (final_equity / initial_equity - 1) * 100 if initial_equity else 0.0,
+        "max_drawdown": float(drawdown.max()) * 100,
+        "turnover": turnover / initial_equity if initial_equity else 0.0,
+        "fees": fees,
+        "trades": trades,
+    }
+
+
+def run_backtest(features: FeatureSet, provider, exchange: SimulatedExchange = None, quiet: bool = True) -> BacktestResult:
+    """
+    미리 계산된 특징으로 모든 판단 시점을 차례로 재생합니다.
+    시점마다 실시간 경로와 같이 check_feasibility -> (필요 시 format_input) -> 제공자 판단 -> make_decision
+    순서로 처리하고, 승인된 주문을 모의 거래소에서 그 시점 가격으로 체결합니다.
+    :param features: FeatureSet - precompute_features 결과.
+    :param provider: 판단 제공자 (decide(snapshot, portfolio, prompt) 와 needs_prompt 를 가진 객체).
+    :param exchange: SimulatedExchange - 모의 거래소, None 이면 기본 설정으로 생성.
+    :param quiet: bool - 시점마다 남는 INFO/WARNING 로그를 끌지 여부.
+    :return: BacktestResult - 백테스트 결과.
+    """
+    market = features.market
+    if exchange is None:
+        exchange = SimulatedExchange(currency=market.split("-")[1])
+    initial_equity = exchange.equity(float(features.prices[0])) if len(features) else exchange.cash
+
+    equity = np.empty(len(features))
+    actions = []
+    started = time.perf_counter()
+    previous_disable = logging.root.manager.disable
+    if quiet:
+        logging.disable(logging.WARNING)
+    try:
+        for i in range(len(features)):
+            snapshot = features.snapshot(i)
+            portfolio = exchange.portfolio()
+            price = snapshot.current_price
+
+            constraints = check_feasibility(portfolio, price, market, exchange.fee_rate, exchange.min_order_amount)
+            if constraints.only_hold:
+                action = "hold"
+            else:
+                prompt = None
+                if provider.needs_prompt:
+                    prompt = format_input({"portfolio": portfolio, "market_data": snapshot, "constraints": constraints})
+                response = provider.decide(snapshot, portfolio, prompt)
+                action, amount = make_decision(
+                    response, portfolio, price, market, exchange.fee_rate, exchange.min_order_amount
+                )
+                fill = None
+                if action == "buy":
+                    fill = exchange.buy(amount, price, snapshot.timestamp)
+                elif action == "sell":
+                    fill = exchange.sell(amount, price, snapshot.timestamp)
+                if fill is None:
+                    action = "hold"
+
+            actions.append(action)
+            equity[i] = exchange.equity(price)
+    finally:
+        logging.disable(previous_disable)
+
+    metrics = compute_metrics(equity, initial_equity, exchange.turnover, exchange.fees, len(exchange.fills))
+    logging.info(
+        f"백테스트 완료 ({market}, {len(features)}개 시점, {time.perf_counter() - started:.2f}초): "
+        f"수익률 {metrics['return_rate']:.2f}%, 최대 낙폭 {metrics['max_drawdown']:.2f}%, 체결 {metrics['trades']}회"
+    )
+    return BacktestResult(market, features.timestamps, features.prices, equity, actions, exchange.fills, metrics)
@@ -0,0 +1,108 @@
+# backtest/exchange.py
+import logging
+from typing import Dict, List, Optional
+from data_collection.snapshot import PortfolioSnapshot
+from gpt_interface.feasibility import FEE_RATE, MIN_ORDER_AMOUNT
+
+# 백테스트용 모의 거래소 모듈
+# 수수료, 최소 주문 금액, 슬리피지를 반영해 시장가 주문을 즉시 체결합니다.
+
+
+class SimulatedExchange:
+    """
+    현금(KRW)과 한 종류의 코인을 보유하는 모의 계좌.
+    - 매수 체결가: 기준가 * (1 + 슬리피지), 매도 체결가: 기준가 * (1 - 슬리피지)
+    - 수수료는 체결 금액에 fee_rate 를 곱해 현금에서 차감
+    """
+
+    def __init__(self, cash: float = 1_000_000.0, currency: str = "BTC", fee_rate: float = FEE_RATE,
+                 min_order_amount: float = MIN_ORDER_AMOUNT, slippage_bps: float = 5.0):
+        """
+        :param cash: float - 초기 현금 (KRW).
+        :param currency: str - 거래 대상 코인.
+        :param fee_rate: float - 거래 수수료율.
+        :param min_order_amount: float - 최소 주문 금액 (KRW).
+        :param slippage_bps: float - 슬리피지 (bp, 1bp = 0.01%).
+        """
+        self.initial_cash = cash
+        self.cash = cash
+        self.currency = currency
+        self.fee_rate = fee_rate
+        self.min_order_amount = min_order_amount
+        self.slippage = slippage_bps / 10_000
+        self.balance = 0.0
+        self.avg_buy_price = 0.0
+        self.fees = 0.0
+        self.turnover = 0.0  # 누적 체결 금액 (KRW)
+        self.fills: List[Dict] = []
+
+    def portfolio(self) -> PortfolioSnapshot:
+        """
+        현재 계좌 상태를 실시간 경로와 같은 PortfolioSnapshot 으로 반환합니다.
+        """
+        invested = self.balance * self.avg_buy_price
+        return PortfolioSnapshot(
+            cash_balance=self.cash,
+            total_investment=invested,
+            currency=self.currency,
+            balance=self.balance,
+            avg_buy_price=self.avg_buy_price,
+            asset_investment=invested,
+        )
+
+    def equity(self, price: float) -> float:
+        """
+        현재가 기준 평가 금액 (현금 + 코인 평가액)을 반환합니다.
+        """
+        return self.cash + self.balance * price
+
+    def buy(self, krw_amount: float, price: float, timestamp=None) -> Optional[Dict]:
+        """
+        KRW 금액만큼 시장가 매수합니다.
+        :param krw_amount: float - 매수 금액 (수수료 제외).
+        :param price: float - 기준가.
+        :param timestamp: 체결 시각.
+        :return: Dict - 체결 정보 또는 주문이 거부되면 None.
+        """
+        fee = krw_amount * self.fee_rate
+        if krw_amount < self.min_order_amount or krw_amount + fee > self.cash + 1e-9:
+            logging.debug(f"모의 매수 거부: {krw_amount:.2f} KRW (현금 {self.cash:.2f} KRW)")
+            return None
+
+        fill_price = price * (1 + self.slippage)
+        volume = krw_amount / fill_price
+        self.avg_buy_price = (self.balance * self.avg_buy_price + krw_amount) / (self.balance + volume)
+        self.balance += volume
+        # 전액 매수 시 부동소수점 오차로 현금이 음수가 되지 않도록 0 에서 멈춤
+        self.cash = max(self.cash - (krw_amount + fee), 0.0)
+        return self._fill("buy", timestamp, fill_price, volume, krw_amount, fee)
+
+    def sell(self, volume: float, price: float, timestamp=None) -> Optional[Dict]:
+        """
+        코인 수량만큼 시장가 매도합니다.
+        :param volume: float - 매도 수량.
+        :param price: float - 기준가.
+        :param timestamp: 체결 시각.
+        :return: Dict - 체결 정보 또는 주문이 거부되면 None.
+        """
+        fill_price = price * (1 - self.slippage)
+        value = volume * fill_price
+        if value < self.min_order_amount or volume > self.balance * (1 + 1e-9):
+            logging.debug(f"모의 매도 거부: {volume:.8f} {self.currency} (보유 {self.balance:.8f})")
+            return None
+
+        volume = min(volume, self.balance)
+        value = volume * fill_price
+        fee = value * self.fee_rate
+        self.balance -= volume
+        if self.balance <= 1e-12:
+            self.balance, self.avg_buy_price = 0.0, 0.0
+        self.cash += value - fee
+        return self._fill("sell", timestamp, fill_price, volume, value, fee)
+
+    def _fill(self, side: str, timestamp, price: float, volume: float, value: float, fee: float) -> Dict:
+        self.fees += fee
+        self.turnover += value
+        fill = {"timestamp": timestamp, "side": side, "price": price, "volume": volume, "value": value, "fee": fee}
+        self.fills.append(fill)
+        return fill
@@ -0,0 +1,214 @@
+# backtest/features.py
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from data_collection.candle_store import CANDLE_COLUMNS, CANDLE_DTYPE
+from data_collection.indicators import IndicatorEngine
+from data_collection.preprocess import bucket_label, compute_segment_stats
+from data_collection.snapshot import SEGMENT_FIELDS, MarketSnapshot
+
+# 백테스트 전체 기간의 시장 특징을 한 번에 계산하는 모듈
+# 실시간 경로의 preprocess_15min_data / extract_relevant_data 와 같은 값을 모든 판단 시점에 대해
+# (시점 수, 구간 수) 배열로 미리 만들어 두고, 시점마다 MarketSnapshot 만 조립합니다.
+
+DAY_NS = 86_400 * 10**9
+
+
+def regularize_records(records: np.ndarray, candle_seconds: int = 300) -> np.ndarray:
+    """
+    빠진 봉(거래가 없던 시간)을 직전 종가, 거래량 0 으로 채워 일정한 간격의 레코드로 만듭니다.
+    :param records: ndarray - CANDLE_DTYPE 레코드 배열 (시각 오름차순).
+    :param candle_seconds: int - 봉 길이(초).
+    :return: ndarray - 빠진 봉이 채워진 레코드 배열.
+    """
+    if len(records) == 0:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    step = candle_seconds * 10**9
+    timestamps = np.asarray(records["timestamp"], dtype=np.int64)
+    slots = (timestamps - timestamps[0]) // step
+    if slots[-1] + 1 == len(records):
+        return np.asarray(records)
+
+    filled = np.empty(int(slots[-1]) + 1, dtype=CANDLE_DTYPE)
+    filled["timestamp"] = timestamps[0] + np.arange(len(filled)) * step
+    source = np.zeros(len(filled), dtype=np.int64)
+    source[slots] = np.arange(len(records))
+    present = np.zeros(len(filled), dtype=bool)
+    present[slots] = True
+    source = np.maximum.accumulate(np.where(present, source, 0))  # 빠진 봉은 직전 봉 위치
+
+    close = np.asarray(records["close"])[source]
+    for column in CANDLE_COLUMNS:
+        filled[column] = np.where(present, np.asarray(records[column])[source], close)
+    filled["volume"] = np.where(present, filled["volume"], 0.0)
+    filled["value"] = np.where(present, filled["value"], 0.0)
+    return filled
+
+
+def _windows(values: np.ndarray, ends: np.ndarray, window: int) -> np.ndarray:
+    # (시점 수, window) 형태로 각 시점의 최근 window 개 값을 모음
+    return sliding_window_view(values, window)[ends - window + 1]
+
+
+class FeatureSet:
+    """
+    한 시장의 모든 판단 시점에 대한 미리 계산된 특징.
+    - buckets: (시점 수, 구간 수, 6) 배열, 열 순서는 BUCKET_FIELDS
+    - segments: (일봉 창 수, 구간 수, 4) 배열, 열 순서는 SEGMENT_FIELDS (segment_index 로 시점과 연결)
+    """
+
+    __slots__ = (
+        "market", "timestamps", "prices", "volume_24h",
+        "bucket_prefix", "bucket_ids", "buckets", "trend_up", "close_std", "outlier_count",
+        "segment_index", "segment_ranges", "segments",
+        "indicator_names", "indicators",
+    )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def snapshot(self, i: int) -> MarketSnapshot:
+        """
+        i 번째 판단 시점의 MarketSnapshot 을 만듭니다 (실시간 경로의 build_market_snapshot 과 같은 형식).
+        """
+        snapshot = MarketSnapshot(
+            self.market, timestamp=self.timestamps[i],
+            current_price=float(self.prices[i]), volume_24h=float(self.volume_24h[i]),
+        )
+        snapshot.bucket_prefix = self.bucket_prefix
+        snapshot.bucket_ids = self.bucket_ids
+        snapshot.buckets = self.buckets[i]
+        snapshot.trend = "up" if self.trend_up[i] else "down"
+        snapshot.max_volatility = round(float(self.close_std[i]), 2)
+        snapshot.outlier_count = int(self.outlier_count[i])
+
+        segment = self.segment_index[i]
+        if segment < 0:
+            snapshot.errors["summary_30d"] = "30일 봉 데이터가 부족합니다."
+        else:
+            snapshot.segment_ranges = self.segment_ranges[segment]
+            snapshot.segments = self.segments[segment]
+
+        if self.indicators is not None:
+            snapshot.indicators = {
+                name: (None if np.isnan(value) else float(value))
+                for name, value in zip(self.indicator_names, self.indicators[i])
+            }
+        return snapshot
+
+
+def compute_window_buckets(close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray,
+                           per_bucket: int) -> dict:
+    """
+    (시점 수, window) 배열을 (시점 수, 구간 수, per_bucket) 로 재구성해 compute_bucket_stats 와 같은
+    구간 통계와 전체 통계를 모든 시점에 대해 한 번에 계산합니다.
+    :return: dict - buckets (시점 수, 구간 수, 6), trend_up, close_std, outlier_count.
+    """
+    shape = close.shape[:-1] + (close.shape[-1] // per_bucket, per_bucket)
+    c, h, l, v = close.reshape(shape), high.reshape(shape), low.reshape(shape), volume.reshape(shape)
+
+    total_vol = v.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = np.where(total_vol > 0, (c * v).sum(axis=-1) / total_vol, 0)
+        std = c.std(axis=-1, ddof=1) if per_bucket > 1 else np.full(shape[:-1], np.nan)
+    buckets = np.stack([c.mean(axis=-1), h.max(axis=-1), l.min(axis=-1), std, vwap, total_vol], axis=-1)
+
+    close_mean = close.mean(axis=-1, keepdims=True)
+    close_std = close.std(axis=-1, ddof=1)
+    outliers = np.count_nonzero(np.abs(close - close_mean) > 2 * close_std[..., np.newaxis], axis=-1)
+    return {
+        "buckets": buckets,
+        "trend_up": close[..., -1] > close[..., 0],
+        "close_std": close_std,
+        "outlier_count": outliers,
+    }
+
+
+def precompute_features(market: str, minute_records: np.ndarray, daily_records: np.ndarray = None,
+                        window: int = 36, bucket_seconds: int = 900, candle_seconds: int = 300, step: int = 3,
+                        interval: int = 10, daily_count: int = 30, partial: str = "drop",
+                        with_indicators: bool = True, start=None) -> FeatureSet:
+    """
+    저장된 캔들로 모든 판단 시점의 특징을 미리 계산합니다.
+    판단 시점은 분봉 step 개마다 한 번이며, 각 시점에는 그 시점까지 마감된 데이터만 사용합니다.
+    :param market: str - 시장 식별자.
+    :param minute_records: ndarray - 분봉 CANDLE_DTYPE 레코드 (CandleStore.read_records).
+    :param daily_records: ndarray - 일봉 CANDLE_DTYPE 레코드, None 이면 일봉 요약 없이 진행.
+    :param window: int - 시점마다 사용할 최근 분봉 수 (실시간 경로의 fetch_5min_data count).
+    :param bucket_seconds: int - 분봉 요약 구간 폭(초).
+    :param candle_seconds: int - 분봉 길이(초).
+    :param step: int - 판단 간격 (분봉 수, 5분 봉 3개 = 15분).
+    :param interval: int - 일봉 요약 구간 길이 (extract_relevant_data 의 interval).
+    :param daily_count: int - 시점마다 사용할 최근 마감 일봉 수.
+    :param partial: str - 일봉 요약의 남는 구간 처리 방식 ('drop' 또는 'keep').
+    :param with_indicators: bool - 기술적 지표 계산 여부.
+    :param start: 첫 판단 시각, None 이면 분봉 window 개가 모인 첫 시점 (그 이전 분봉은 24시간 거래량과 지표 준비에만 사용).
+    :return: FeatureSet - 시점별 특징.
+    """
+    if bucket_seconds % candle_seconds or window % (bucket_seconds // candle_seconds):
+        raise ValueError(f"window({window})는 구간당 봉 수({bucket_seconds // candle_seconds})의 배수여야 합니다.")
+
+    minute = regularize_records(minute_records, candle_seconds)
+    if len(minute) < window:
+        raise ValueError(f"분봉 데이터가 부족합니다: {len(minute)}개 (필요 {window}개)")
+    columns = {column: np.asarray(minute[column], dtype=float) for column in ("open", "high", "low", "close", "volume")}
+    timestamps = np.asarray(minute["timestamp"], dtype=np.int64)
+    first = window - 1
+    if start is not None:
+        # 판단 시각(봉 마감 시각)이 start 이상인 첫 봉부터 판단
+        first = max(first, int(np.searchsorted(timestamps, pd.Timestamp(start).value - candle_seconds * 10**9)))
+    ends = np.arange(first, len(minute), step)
+
+    features = FeatureSet()
+    features.market = market
+    decision_ns = timestamps[ends] + candle_seconds * 10**9  # 봉이 마감된 시각에 판단
+    features.timestamps = pd.to_datetime(decision_ns)
+    features.prices = columns["close"][ends]
+
+    # 24시간 거래량 (분봉 거래량의 이동 합)
+    day_candles = 86_400 // candle_seconds
+    cumulative = np.concatenate([[0.0], np.cumsum(columns["volume"])])
+    features.volume_24h = cumulative[ends + 1] - cumulative[np.maximum(ends + 1 - day_candles, 0)]
+
+    # 분봉 구간 통계
+    stats = compute_window_buckets(
+        *(_windows(columns[name], ends, window) for name in ("close", "high", "low", "volume")),
+        per_bucket=bucket_seconds // candle_seconds,
+    )
+    features.bucket_prefix = bucket_label(bucket_seconds)
+    features.bucket_ids = np.arange(stats["buckets"].shape[1], dtype=np.int64)
+    features.buckets = stats["buckets"]
+    features.trend_up = stats["trend_up"]
+    features.close_std = stats["close_std"]
+    features.outlier_count = stats["outlier_count"]
+
+    # 일봉 구간 요약 (판단 시각 이전에 마감된 일봉만 사용, 같은 일봉 창은 한 번만 계산)
+    features.segment_index = np.full(len(ends), -1, dtype=np.int64)
+    features.segment_ranges, features.segments = [], np.empty((0, 0, len(SEGMENT_FIELDS)))
+    if daily_records is not None and len(daily_records) >= daily_count:
+        day_start = np.asarray(daily_records["timestamp"], dtype=np.int64)
+        completed = np.searchsorted(day_start + DAY_NS, decision_ns, side="right")
+        valid = completed >= daily_count
+        day_ends, inverse = np.unique(completed[valid] - 1, return_inverse=True)
+        if len(day_ends):
+            daily_close = np.asarray(daily_records["close"], dtype=float)
+            segment_stats = compute_segment_stats(_windows(daily_close, day_ends, daily_count), interval, partial)
+            features.segments = np.stack([segment_stats[field] for field in SEGMENT_FIELDS], axis=-1)
+            day_index = pd.to_datetime(day_start)
+            features.segment_ranges = [
+                [
+                    f"{day_index[end - daily_count + 1 + start]} to {day_index[end - daily_count + 1 + stop]}"
+                    for start, stop in zip(segment_stats["start"], segment_stats["end"])
+                ]
+                for end in day_ends
+            ]
+            features.segment_index[valid] = inverse
+
+    # 기술적 지표 (전체 기간을 한 번 순회하며 기록한 값 중 판단 시점의 값)
+    features.indicator_names, features.indicators = (), None
+    if with_indicators:
+        frame = pd.DataFrame(columns, index=pd.to_datetime(timestamps))
+        values = IndicatorEngine().run_frame(market, f"minute{candle_seconds // 60}", frame)
+        features.indicator_names = tuple(values.columns)
+        features.indicators = values.to_numpy(dtype=float)[ends]
+    return features
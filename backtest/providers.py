@@ -0,0 +1,108 @@
+# backtest/providers.py
+import json
+import logging
+from typing import Dict
+import pandas as pd
+from data_collection.snapshot import MarketSnapshot, PortfolioSnapshot
+from gpt_interface.async_client import send_request_with_deadline
+from gpt_interface.request_handler import prepare_request
+
+# 백테스트에서 GPT 대신 판단을 내리는 제공자 모듈
+# 모든 제공자는 decide(snapshot, portfolio, prompt) 로 GPT 응답과 같은 형식의 dict 를 반환하며,
+# needs_prompt 가 True 인 제공자에게만 format_input 으로 만든 프롬프트를 전달합니다.
+
+HOLD_RESPONSE = {"action": "hold", "amount": 0, "reason": "No signal."}
+
+
+class RuleBasedProvider:
+    """
+    RSI 와 15분 구간 추세로 판단하는 규칙 기반 제공자 (네트워크 없이 동작).
+    - RSI 가 buy_below 이하이고 추세가 상승이면 현금의 buy_fraction 만큼 매수 (현금이 없으면 매수하지 않음)
+    - RSI 가 sell_above 이상이면 보유 수량의 sell_fraction 만큼 매도
+    """
+
+    needs_prompt = False
+
+    def __init__(self, buy_below: float = 35.0, sell_above: float = 65.0, buy_fraction: float = 0.5,
+                 sell_fraction: float = 1.0):
+        self.buy_below = buy_below
+        self.sell_above = sell_above
+        self.buy_fraction = buy_fraction
+        self.sell_fraction = sell_fraction
+
+    def decide(self, snapshot: MarketSnapshot, portfolio: PortfolioSnapshot, prompt: str = None) -> Dict:
+        rsi = snapshot.indicators.get("rsi_14")
+        if rsi is None:
+            return dict(HOLD_RESPONSE, reason="RSI is warming up.")
+        if rsi <= self.buy_below and snapshot.trend == "up" and portfolio.cash_balance > 0:
+            return {
+                "action": "buy",
+                "amount": portfolio.cash_balance * self.buy_fraction,
+                "reason": f"RSI {rsi:.1f} is oversold and the short-term trend is up.",
+            }
+        if rsi >= self.sell_above and portfolio.balance > 0:
+            return {
+                "action": "sell",
+                "amount": f"{portfolio.balance * self.sell_fraction} {snapshot.currency}",
+                "reason": f"RSI {rsi:.1f} is overbought.",
+            }
+        return dict(HOLD_RESPONSE)
+
+
+class RecordedProvider:
+    """
+    기록된 GPT 응답을 판단 시각으로 찾아 재생하는 제공자. 기록이 없는 시점은 hold 로 처리합니다.
+    """
+
+    needs_prompt = False
+
+    def __init__(self, responses: Dict, tolerance_seconds: float = 0):
+        """
+        :param responses: Dict - {판단 시각: GPT 응답 dict}.
+        :param tolerance_seconds: float - 판단 시각과 이 시간 이내로 차이나는 기록도 사용 (실시간 실행 시각 오차 허용).
+        """
+        self.responses = {pd.Timestamp(timestamp).tz_localize(None): response for timestamp, response in responses.items()}
+        self.index = pd.DatetimeIndex(sorted(self.responses))
+        self.tolerance = pd.Timedelta(seconds=tolerance_seconds)
+        self.misses = 0
+
+    @classmethod
+    def from_jsonl(cls, path: str, tolerance_seconds: float = 0):
+        """
+        {"timestamp": ..., "response": {...}} 형식의 JSON Lines 파일에서 기록을 불러옵니다.
+        """
+        responses = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    responses[entry["timestamp"]] = entry["response"]
+        return cls(responses, tolerance_seconds)
+
+    def decide(self, snapshot: MarketSnapshot, portfolio: PortfolioSnapshot, prompt: str = None) -> Dict:
+        timestamp = pd.Timestamp(snapshot.timestamp).tz_localize(None)
+        position = -1
+        if len(self.index):
+            position = self.index.get_indexer([timestamp], method="nearest", tolerance=self.tolerance)[0]
+        if position >= 0:
+            return self.responses[self.index[position]]
+        self.misses += 1
+        return dict(HOLD_RESPONSE, reason="No recorded decision.")
+
+
+class LLMProvider:
+    """
+    실시간 경로와 같은 prepare_request / send_request_with_deadline 으로 GPT 에 묻는 제공자 (네트워크 필요).
+    """
+
+    needs_prompt = True
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+
+    def decide(self, snapshot: MarketSnapshot, portfolio: PortfolioSnapshot, prompt: str = None) -> Dict:
+        try:
+            return send_request_with_deadline(prepare_request(prompt), self.timeout)
+        except Exception as e:
+            logging.error(f"백테스트 GPT 요청 중 오류 발생: {e}")
+            return dict(HOLD_RESPONSE, reason="The decision request failed.")
@@ -0,0 +1,259 @@
+# backtest/sweep.py
+import itertools
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterable, List, Tuple
+import numpy as np
+import pandas as pd
+from backtest.engine import run_backtest
+from backtest.exchange import SimulatedExchange
+from backtest.features import precompute_features
+from backtest.providers import RuleBasedProvider
+from data_collection.candle_store import CANDLE_DTYPE
+
+# 여러 (파라미터 조합 x 시장 x 기간) 백테스트를 프로세스 풀에 나눠 실행하는 모듈
+# 캔들 레코드는 공유 메모리(또는 캔들 저장소 파일 memmap)에 한 번만 두고, 워커에는 이름만 전달합니다.
+
+FEATURE_PARAMS = ("window", "bucket_seconds", "candle_seconds", "step", "interval", "daily_count", "partial")
+EXCHANGE_PARAMS = ("cash", "fee_rate", "min_order_amount", "slippage_bps")
+METRIC_COLUMNS = ("return_rate", "pnl", "max_drawdown", "turnover", "fees", "trades")
+FEATURE_CACHE_SIZE = 4  # 워커별로 보관하는 특징 수 (같은 특징을 쓰는 조합이 이어서 실행되도록 정렬)
+INDICATOR_WARMUP = 260  # 기간별 작업의 지표 준비 분봉 수 (가장 긴 EMA 26 의 10배, 이후 시드 영향은 무시할 수준)
+
+
+class SharedCandles:
+    """
+    (시장, 봉 간격)별 캔들 레코드를 워커가 복사 없이 읽을 수 있게 공유합니다.
+    - 캔들 저장소 파일은 경로만 넘겨 워커가 memmap 으로 엽니다.
+    - 메모리에 있는 레코드는 공유 메모리 블록에 한 번 복사합니다.
+    """
+
+    def __init__(self):
+        self.descriptors: Dict[Tuple[str, str], Tuple] = {}
+        self._blocks: List[SharedMemory] = []
+
+    @classmethod
+    def from_store(cls, store, markets: Iterable[str], intervals: Iterable[str] = ("minute5", "day")):
+        """
+        캔들 저장소 파일을 공유합니다.
+        :param store: CandleStore - 캔들 저장소.
+        :param markets: Iterable[str] - 시장 목록.
+        :param intervals: Iterable[str] - 봉 간격 목록.
+        """
+        shared = cls()
+        for market, interval in itertools.product(markets, intervals):
+            records = store.read_records(market, interval)
+            if isinstance(records, np.memmap):
+                shared.descriptors[(market, interval)] = ("file", records.filename, len(records))
+        return shared
+
+    def add(self, market: str, interval: str, records: np.ndarray) -> None:
+        """
+        레코드 배열을 공유 메모리에 올립니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param records: ndarray - CANDLE_DTYPE 레코드 배열.
+        """
+        records = np.asarray(records, dtype=CANDLE_DTYPE)
+        block = SharedMemory(create=True, size=max(records.nbytes, 1))
+        np.ndarray(records.shape, dtype=CANDLE_DTYPE, buffer=block.buf)[:] = records
+        self._blocks.append(block)
+        self.descriptors[(market, interval)] = ("shm", block.name, len(records))
+
+    def close(self) -> None:
+        """
+        이 객체가 만든 공유 메모리 블록을 해제합니다.
+        """
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 워커 프로세스 상태 (initializer 에서 설정)
+_DESCRIPTORS: Dict[Tuple[str, str], Tuple] = {}
+_ATTACHED: Dict[Tuple[str, str], Tuple] = {}
+_FEATURES = OrderedDict()
+
+
+def _init_worker(descriptors: Dict[Tuple[str, str], Tuple]) -> None:
+    global _DESCRIPTORS
+    _DESCRIPTORS = descriptors
+    _ATTACHED.clear()
+    _FEATURES.clear()
+    logging.disable(logging.WARNING)
+
+
+def attach_records(market: str, interval: str) -> np.ndarray:
+    """
+    워커에서 공유된 레코드를 복사 없이 엽니다 (같은 프로세스에서는 한 번만 연결).
+    :return: ndarray - CANDLE_DTYPE 레코드 배열 또는 공유되지 않았으면 None.
+    """
+    key = (market, interval)
+    if key not in _ATTACHED:
+        descriptor = _DESCRIPTORS.get(key)
+        if descriptor is None:
+            return None
+        kind, name, length = descriptor
+        if kind == "file":
+            _ATTACHED[key] = (np.memmap(name, dtype=CANDLE_DTYPE, mode="r", shape=(length,)), None)
+        else:
+            block = SharedMemory(name=name)
+            _ATTACHED[key] = (np.ndarray((length,), dtype=CANDLE_DTYPE, buffer=block.buf), block)
+    return _ATTACHED[key][0]
+
+
+def job_lookback_ns(feature_params: Dict) -> int:
+    """
+    기간별 작업에서 시작 시각 이전에 포함할 분봉 길이 (ns).
+    분봉 창과 24시간 거래량 중 긴 쪽에 지표 준비 구간을 더해, 첫 판단부터 전체 기간 실행과 같은 값이 나오게 합니다.
+    """
+    candle_seconds = feature_params.get("candle_seconds", 300)
+    candles = max(feature_params.get("window", 36), 86_400 // candle_seconds) + INDICATOR_WARMUP
+    return candles * candle_seconds * 10**9
+
+
+def _slice(records: np.ndarray, start, end, lookback_ns: int = 0) -> np.ndarray:
+    # 기간에 해당하는 레코드 뷰 (지표/구간 계산을 위해 시작 전 lookback 만큼 포함)
+    timestamps = records["timestamp"]
+    lo = 0 if start is None else int(np.searchsorted(timestamps, pd.Timestamp(start).value - lookback_ns))
+    hi = len(records) if end is None else int(np.searchsorted(timestamps, pd.Timestamp(end).value, side="right"))
+    return records[lo:hi]
+
+
+def expand_grid(grid: Dict[str, list], markets: Iterable[str], date_ranges: Iterable[Tuple] = ((None, None),)) -> List[Dict]:
+    """
+    파라미터 그리드와 시장, 기간의 모든 조합으로 작업 목록을 만듭니다.
+    :param grid: Dict[str, list] - {파라미터 이름: 값 목록} (예: {"fee_rate": [0.0005, 0.001], "buy_below": [30, 35]}).
+    :param markets: Iterable[str] - 시장 목록.
+    :param date_ranges: Iterable[Tuple] - (시작, 끝) 기간 목록, None 이면 전체.
+    :return: List[Dict] - {"params", "market", "start", "end"} 작업 목록.
+    """
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    return [
+        {"params": params, "market": market, "start": start, "end": end}
+        for params, market, (start, end) in itertools.product(combos, markets, date_ranges)
+    ]
+
+
+def _feature_key(job: Dict) -> Tuple:
+    params = job["params"]
+    return (job["market"], str(job["start"]), str(job["end"]),
+            tuple((name, params[name]) for name in FEATURE_PARAMS if name in params))
+
+
+def run_job(job: Dict, provider_factory: Callable = RuleBasedProvider) -> Dict:
+    """
+    작업 하나를 실행하고 결과 행을 반환합니다 (워커 프로세스에서 호출).
+    :param job: Dict - expand_grid 의 작업.
+    :param provider_factory: Callable - 특징/거래소 파라미터를 뺀 나머지 파라미터로 판단 제공자를 만드는 함수.
+    :return: Dict - 파라미터, 시장, 기간과 손익/낙폭/회전율 등의 결과.
+    """
+    params, market = job["params"], job["market"]
+    row = {**params, "market": market, "start": job["start"], "end": job["end"]}
+    started = time.perf_counter()
+    try:
+        key = _feature_key(job)
+        features = _FEATURES.get(key)
+        if features is None:
+            feature_params = {name: params[name] for name in FEATURE_PARAMS if name in params}
+            candle_seconds = feature_params.get("candle_seconds", 300)
+            minute = attach_records(market, f"minute{candle_seconds // 60}")
+            if minute is None:
+                raise ValueError(f"{market} 분봉 데이터가 공유되지 않았습니다.")
+            minute = _slice(minute, job["start"], job["end"], job_lookback_ns(feature_params))
+            daily = attach_records(market, "day")
+            if daily is not None:
+                daily = _slice(daily, None, job["end"])
+            features = precompute_features(market, minute, daily, start=job["start"], **feature_params)
+            _FEATURES[key] = features
+            while len(_FEATURES) > FEATURE_CACHE_SIZE:
+                _FEATURES.popitem(last=False)
+        else:
+            _FEATURES.move_to_end(key)
+
+        exchange = SimulatedExchange(
+            currency=market.split("-")[1], **{name: params[name] for name in EXCHANGE_PARAMS if name in params}
+        )
+        provider = provider_factory(
+            **{name: value for name, value in params.items() if name not in FEATURE_PARAMS + EXCHANGE_PARAMS}
+        )
+        result = run_backtest(features, provider, exchange)
+        row.update({column: result.metrics[column] for column in METRIC_COLUMNS})
+        row["steps"] = len(features)
+    except Exception as e:
+        row["error"] = str(e)
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+
+def _run_chunk(jobs: List[Dict], provider_factory: Callable) -> List[Dict]:
+    return [run_job(job, provider_factory) for job in jobs]
+
+
+def run_sweep(jobs: List[Dict], shared: SharedCandles, max_workers: int = None,
+              provider_factory: Callable = RuleBasedProvider, chunk_size: int = None) -> pd.DataFrame:
+    """
+    작업들을 프로세스 풀에 나눠 실행하고 결과 표를 반환합니다.
+    같은 특징을 쓰는 작업끼리 묶어 한 워커에 보내므로 특징 계산은 묶음마다 한 번만 수행됩니다.
+    :param jobs: List[Dict] - expand_grid 로 만든 작업 목록.
+    :param shared: SharedCandles - 공유된 캔들 레코드.
+    :param max_workers: int - 워커 수, 기본값은 CPU 수.
+    :param provider_factory: Callable - 판단 제공자 생성 함수 (모듈 최상위 함수/클래스여야 함).
+    :param chunk_size: int - 워커에 한 번에 보낼 작업 수, 기본값은 작업 수 / (워커 수 * 4).
+    :return: DataFrame - 작업별 결과 (수익률 내림차순).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    ordered = sorted(jobs, key=lambda job: repr(_feature_key(job)))
+    chunk_size = chunk_size or max(1, len(ordered) // (max_workers * 4))
+    chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+
+    started = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(shared.descriptors,)) as executor:
+        for chunk_rows in executor.map(_run_chunk, chunks, itertools.repeat(provider_factory)):
+            rows.extend(chunk_rows)
+
+    results = pd.DataFrame(rows)
+    failed = int(results["error"].notna().sum()) if "error" in results else 0
+    logging.info(
+        f"백테스트 스윕 완료: {len(jobs)}개 작업, 워커 {max_workers}개, {time.perf_counter() - started:.1f}초"
+        + (f" (실패 {failed}개)" if failed else "")
+    )
+    if "return_rate" in results:
+        results = results.sort_values("return_rate", ascending=False, na_position="last").reset_index(drop=True)
+    return results
+
+
+def summarize_sweep(results: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """
+    파라미터 조합별로 시장/기간 결과를 모아 평균 수익률, 최악 낙폭, 평균 회전율 등을 계산합니다.
+    :param results: DataFrame - run_sweep 결과.
+    :param by: List[str] - 묶을 파라미터 이름 목록.
+    :return: DataFrame - 조합별 요약 (평균 수익률 내림차순).
+    """
+    if "error" in results:
+        results = results[results["error"].isna()]
+    summary = results.groupby(by, dropna=False).agg(
+        runs=("return_rate", "size"),
+        mean_return=("return_rate", "mean"),
+        min_return=("return_rate", "min"),
+        total_pnl=("pnl", "sum"),
+        worst_drawdown=("max_drawdown", "max"),
+        mean_turnover=("turnover", "mean"),
+        total_fees=("fees", "sum"),
+        trades=("trades", "sum"),
+    )
+    return summary.sort_values("mean_return", ascending=False).reset_index()
@@ -0,0 +1,190 @@
+# data_collection/candle_store.py
+import datetime
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytz
+
+# (시장, 봉 간격)별 캔들을 디스크에 누적 저장하고 새 캔들만 요청하는 모듈
+
+# 디스크에 저장되는 캔들 레코드 형식 (timestamp 는 KST 기준 datetime64[ns] 정수값)
+CANDLE_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("value", "<f8"),
+])
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume", "value"]
+
+# 증분 수집을 지원하는 봉 간격과 길이(초)
+INTERVAL_SECONDS = {
+    "minute1": 60,
+    "minute3": 180,
+    "minute5": 300,
+    "minute10": 600,
+    "minute15": 900,
+    "minute30": 1800,
+    "minute60": 3600,
+    "minute240": 14400,
+    "day": 86400,
+}
+
+
+def _now_kst() -> datetime.datetime:
+    # pyupbit 캔들 인덱스와 같은 KST 기준 naive datetime
+    return datetime.datetime.now(pytz.timezone("Asia/Seoul")).replace(tzinfo=None)
+
+
+class CandleStore:
+    """
+    (시장, 봉 간격)마다 하나의 고정 길이 레코드 파일을 두는 추가 전용 캔들 저장소.
+    파일은 memmap 으로 읽으며, 마지막(미완성) 캔들만 새로 받은 값으로 교체됩니다.
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._lock = threading.RLock()
+
+    def _path(self, market: str, interval: str) -> str:
+        return os.path.join(self.base_dir, market, f"{interval}.bin")
+
+    def _load(self, market: str, interval: str) -> np.ndarray:
+        path = self._path(market, interval)
+        if not os.path.exists(path) or os.path.getsize(path) < CANDLE_DTYPE.itemsize:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode="r")
+
+    def size(self, market: str, interval: str) -> int:
+        """
+        저장된 캔들 개수를 반환합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격 (예: 'day', 'minute5').
+        :return: int - 저장된 캔들 수.
+        """
+        path = self._path(market, interval)
+        return os.path.getsize(path) // CANDLE_DTYPE.itemsize if os.path.exists(path) else 0
+
+    def last_timestamp(self, market: str, interval: str):
+        """
+        저장된 마지막 캔들의 시각을 반환합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :return: Timestamp - 마지막 캔들 시각 또는 저장된 데이터가 없으면 None.
+        """
+        records = self._load(market, interval)
+        if len(records) == 0:
+            return None
+        return pd.Timestamp(int(records["timestamp"][-1]))
+
+    def read(self, market: str, interval: str, count: int = None) -> pd.DataFrame:
+        """
+        저장된 캔들 중 최근 count 개를 pyupbit.get_ohlcv 와 같은 형식으로 반환합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param count: int - 반환할 캔들 수, 기본값은 전체.
+        :return: DataFrame - 캔들 데이터 (열: open, high, low, close, volume, value).
+        """
+        with self._lock:
+            records = self._load(market, interval)
+            if count is not None:
+                records = records[-count:] if count > 0 else records[:0]
+            return self.to_dataframe(records)
+
+    def read_records(self, market: str, interval: str) -> np.ndarray:
+        """
+        저장된 전체 캔들을 복사 없이 memmap 레코드 배열로 반환합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :return: ndarray - CANDLE_DTYPE 레코드 배열.
+        """
+        return self._load(market, interval)
+
+    def write(self, market: str, interval: str, data: pd.DataFrame) -> int:
+        """
+        캔들 데이터를 저장소에 병합합니다. 새 데이터의 첫 시각 이후에 저장된 행은
+        새 값으로 교체되고, 나머지 새 행은 파일 끝에 추가됩니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param data: DataFrame - 시각 인덱스를 가진 캔들 데이터.
+        :return: int - 병합 후 저장된 캔들 수.
+        """
+        new_records = self.to_records(data)
+        path = self._path(market, interval)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if len(new_records) > 0:
+                stored = self._load(market, interval)
+                keep = int(np.searchsorted(stored["timestamp"], new_records["timestamp"][0], side="left"))
+                if keep + len(new_records) >= len(stored):
+                    # 파일을 줄이지 않고 그 자리에서 덮어쓰고 이어 씀 (열려 있는 memmap 이 잘린 영역을 읽지 않도록)
+                    del stored
+                    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                        f.seek(keep * CANDLE_DTYPE.itemsize)
+                        f.write(new_records.tobytes())
+                else:
+                    # 파일이 짧아지면 새 파일에 쓴 뒤 원자적으로 교체 (기존 memmap 은 이전 파일을 계속 읽음)
+                    merged = np.concatenate([np.array(stored[:keep]), new_records])
+                    del stored
+                    tmp_path = f"{path}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(merged.tobytes())
+                    os.replace(tmp_path, path)
+        return self.size(market, interval)
+
+    def fetch(self, market: str, interval: str, count: int, fetcher) -> pd.DataFrame:
+        """
+        마지막으로 저장된 캔들 이후의 데이터만 요청해 저장소를 갱신하고, 최근 count 개를
+        디스크에서 읽어 반환합니다. 지원하지 않는 봉 간격은 전체를 다시 요청합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param count: int - 반환할 캔들 수.
+        :param fetcher: callable - get_ohlcv(market, interval=..., count=...) 형식의 수집 함수.
+        :return: DataFrame - 최근 count 개 캔들 또는 실패 시 None.
+        """
+        if interval not in INTERVAL_SECONDS:
+            return fetcher(market, interval=interval, count=count)
+
+        fetch_count = count
+        last = self.last_timestamp(market, interval)
+        if last is not None and self.size(market, interval) >= count:
+            elapsed = (_now_kst() - last.to_pydatetime()).total_seconds()
+            # 마지막 캔들은 미완성이었을 수 있으므로 함께 다시 요청
+            missing = int(max(elapsed, 0) // INTERVAL_SECONDS[interval]) + 1
+            fetch_count = min(count, missing)
+
+        data = fetcher(market, interval=interval, count=fetch_count)
+        if data is None:
+            return None
+
+        self.write(market, interval, data)
+        logging.info(f"캔들 저장소 갱신: {market} {interval} (신규 요청 {fetch_count}/{count}개)")
+        return self.read(market, interval, count)
+
+    @staticmethod
+    def to_records(data: pd.DataFrame) -> np.ndarray:
+        """
+        get_ohlcv 형식의 DataFrame 을 저장용 레코드 배열로 변환합니다.
+        :param data: DataFrame - 캔들 데이터.
+        :return: ndarray - CANDLE_DTYPE 레코드 배열 (시각 오름차순).
+        """
+        data = data.sort_index()
+        records = np.empty(len(data), dtype=CANDLE_DTYPE)
+        records["timestamp"] = pd.DatetimeIndex(data.index).as_unit("ns").asi8
+        for column in CANDLE_COLUMNS:
+            records[column] = data[column].to_numpy(dtype="f8") if column in data else np.nan
+        return records
+
+    @staticmethod
+    def to_dataframe(records: np.ndarray) -> pd.DataFrame:
+        """
+        저장용 레코드 배열을 get_ohlcv 형식의 DataFrame 으로 변환합니다.
+        :param records: ndarray - CANDLE_DTYPE 레코드 배열.
+        :return: DataFrame - 캔들 데이터.
+        """
+        index = pd.to_datetime(np.asarray(records["timestamp"], dtype="i8"))
+        return pd.DataFrame({column: np.array(records[column]) for column in CANDLE_COLUMNS}, index=index)
@@ -1,7 +1,8 @@
 # data_collection/fetch_quantitative.py
 import pandas as pd
-from pyupbit import get_ohlcv, get_current_price
+from exchange.upbit_client import get_ohlcv, get_current_price
 from urllib.parse import urlencode
+from data_collection.candle_store import CandleStore
 
 
 # 업비트 API를 활용한 데이터 수집 모듈
@@ -33,28 +34,34 @@ def fetch_24h_volume(market: str = "KRW-BTC") -> float:
         print(f"24시간 거래량 데이터를 가져오는 중 오류 발생: {e}")
         return None
 
-def fetch_30d_candlestick(market: str = "KRW-BTC", count: int = 30) -> pd.DataFrame:
+def fetch_30d_candlestick(market: str = "KRW-BTC", count: int = 30, store: CandleStore = None) -> pd.DataFrame:
     """
     주어진 암호화폐 시장의 최근 30일 일봉 데이터를 가져옵니다.
     :param market: str - 시장 식별자, 기본값은 KRW-BTC.
     :param count: int - 가져올 일봉 데이터 개수, 기본값은 30.
+    :param store: CandleStore - 캔들 저장소, 지정하면 새 캔들만 요청하고 나머지는 디스크에서 읽습니다.
     :return: DataFrame - 일봉 데이터 또는 실패 시 None.
     """
     try:
+        if store is not None:
+            return store.fetch(market, "day", count, fetcher=get_ohlcv)
         data = get_ohlcv(market, interval="day", count=count)
         return data
     except Exception as e:
         print(f"30일 일봉 데이터를 가져오는 중 오류 발생: {e}")
         return None
     
-def fetch_5min_data(market: str = "KRW-BTC", count: int = 36) -> pd.DataFrame:
+def fetch_5min_data(market: str = "KRW-BTC", count: int = 36, store: CandleStore = None) -> pd.DataFrame:
     """
     지정된 암호화폐 시장의 5분 봉 데이터를 가져옵니다 (3시간).
     :param market: str - 시장 식별자, 기본값은 KRW-BTC.
     :param count: int - 가져올 봉 데이터의 개수, 기본값은 36개 (3시간).
+    :param store: CandleStore - 캔들 저장소, 지정하면 새 캔들만 요청하고 나머지는 디스크에서 읽습니다.
     :return: DataFrame - 5분 봉 데이터 또는 None.
     """
     try:
+        if store is not None:
+            return store.fetch(market, "minute5", count, fetcher=get_ohlcv)
         # 업비트 API 호출로 5분 봉 데이터 가져오기
         data = get_ohlcv(market, interval="minute5", count=count)
         return data
@@ -62,3 +69,16 @@ def fetch_5min_data(market: str = "KRW-BTC", count: int = 36) -> pd.DataFrame:
         print(f"5분 봉 데이터를 가져오는 중 오류 발생: {e}")
         return None
 
+
+def extract_24h_volume(daily_data: pd.DataFrame) -> float:
+    """
+    이미 수집한 일봉 데이터의 마지막 행에서 24시간 거래량을 추출합니다.
+    fetch_24h_volume 과 같은 값을 별도의 API 호출 없이 얻기 위해 사용합니다.
+    :param daily_data: DataFrame - 일봉 데이터.
+    :return: float - 24시간 거래량 또는 실패 시 None.
+    """
+    try:
+        return daily_data.iloc[-1]["volume"]
+    except Exception as e:
+        print(f"일봉 데이터에서 24시간 거래량을 추출하는 중 오류 발생: {e}")
+        return None
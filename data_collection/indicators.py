@@ -0,0 +1,452 @@
+# data_collection/indicators.py
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+import pandas as pd
+
+# 새 캔들이 들어올 때마다 상수 시간에 갱신되는 기술적 지표 모듈
+# 모든 지표는 to_dict/from_dict 로 상태를 저장하고 재시작 시 워밍업 없이 이어서 계산합니다.
+
+
+class EMA:
+    """
+    지수 이동 평균. 처음 period 개는 단순 평균으로 시드합니다.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = None
+
+    def update(self, x: float):
+        self.count += 1
+        if self.count < self.period:
+            self.seed_sum += x
+        elif self.count == self.period:
+            self.value = (self.seed_sum + x) / self.period
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "count": self.count, "seed_sum": self.seed_sum, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls(state["period"])
+        obj.count, obj.seed_sum, obj.value = state["count"], state["seed_sum"], state["value"]
+        return obj
+
+
+class WilderAverage:
+    """
+    Wilder 평활 이동 평균 (RSI, ATR 에 사용). 처음 period 개는 단순 평균으로 시드합니다.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = None
+
+    def update(self, x: float):
+        self.count += 1
+        if self.count < self.period:
+            self.seed_sum += x
+        elif self.count == self.period:
+            self.value = (self.seed_sum + x) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "count": self.count, "seed_sum": self.seed_sum, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls(state["period"])
+        obj.count, obj.seed_sum, obj.value = state["count"], state["seed_sum"], state["value"]
+        return obj
+
+
+class RSI:
+    """
+    상대 강도 지수 (Wilder 방식).
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.avg_gain = WilderAverage(period)
+        self.avg_loss = WilderAverage(period)
+
+    def update(self, close: float):
+        if self.prev_close is None:
+            self.prev_close = close
+            return None
+        change = close - self.prev_close
+        self.prev_close = close
+        self.avg_gain.update(max(change, 0.0))
+        self.avg_loss.update(max(-change, 0.0))
+        return self.value
+
+    @property
+    def value(self):
+        gain, loss = self.avg_gain.value, self.avg_loss.value
+        if gain is None:
+            return None
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def to_dict(self) -> dict:
+        return {
+            "period": self.period,
+            "prev_close": self.prev_close,
+            "avg_gain": self.avg_gain.to_dict(),
+            "avg_loss": self.avg_loss.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls(state["period"])
+        obj.prev_close = state["prev_close"]
+        obj.avg_gain = WilderAverage.from_dict(state["avg_gain"])
+        obj.avg_loss = WilderAverage.from_dict(state["avg_loss"])
+        return obj
+
+
+class MACD:
+    """
+    MACD 선, 시그널 선, 히스토그램.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.macd = None
+
+    def update(self, close: float):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is None or slow is None:
+            return self.value
+        self.macd = fast - slow
+        self.signal.update(self.macd)
+        return self.value
+
+    @property
+    def value(self) -> dict:
+        signal = self.signal.value
+        histogram = self.macd - signal if self.macd is not None and signal is not None else None
+        return {"macd": self.macd, "signal": signal, "histogram": histogram}
+
+    def to_dict(self) -> dict:
+        return {
+            "fast": self.fast.to_dict(),
+            "slow": self.slow.to_dict(),
+            "signal": self.signal.to_dict(),
+            "macd": self.macd,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls()
+        obj.fast = EMA.from_dict(state["fast"])
+        obj.slow = EMA.from_dict(state["slow"])
+        obj.signal = EMA.from_dict(state["signal"])
+        obj.macd = state["macd"]
+        return obj
+
+
+class BollingerBands:
+    """
+    볼린저 밴드. 고정 길이 창의 누적 합과 제곱합으로 평균과 표준편차를 갱신합니다.
+    """
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.period = period
+        self.num_std = num_std
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, close: float):
+        if len(self.window) == self.period:
+            old = self.window[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(close)
+        self.total += close
+        self.total_sq += close * close
+        return self.value
+
+    @property
+    def value(self) -> dict:
+        if len(self.window) < self.period:
+            return {"middle": None, "upper": None, "lower": None}
+        mean = self.total / self.period
+        std = math.sqrt(max(self.total_sq / self.period - mean * mean, 0.0))
+        return {"middle": mean, "upper": mean + self.num_std * std, "lower": mean - self.num_std * std}
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "num_std": self.num_std, "window": list(self.window)}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls(state["period"], state["num_std"])
+        for close in state["window"]:
+            obj.update(close)
+        return obj
+
+
+class ATR:
+    """
+    평균 실제 범위 (Wilder 방식).
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.average = WilderAverage(period)
+
+    def update(self, high: float, low: float, close: float):
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.average.update(true_range)
+
+    @property
+    def value(self):
+        return self.average.value
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "prev_close": self.prev_close, "average": self.average.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls(state["period"])
+        obj.prev_close = state["prev_close"]
+        obj.average = WilderAverage.from_dict(state["average"])
+        return obj
+
+
+class OBV:
+    """
+    거래량 균형 지표.
+    """
+
+    def __init__(self):
+        self.prev_close = None
+        self.value = 0.0
+
+    def update(self, close: float, volume: float):
+        if self.prev_close is not None:
+            if close > self.prev_close:
+                self.value += volume
+            elif close < self.prev_close:
+                self.value -= volume
+        self.prev_close = close
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"prev_close": self.prev_close, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls()
+        obj.prev_close, obj.value = state["prev_close"], state["value"]
+        return obj
+
+
+class IndicatorState:
+    """
+    하나의 (시장, 봉 간격)에 대한 모든 지표의 실행 상태.
+    EMA 12/26 은 MACD 가 이미 계산하므로 MACD 의 fast/slow 값을 그대로 보고합니다.
+    """
+
+    def __init__(self):
+        self.last_timestamp = None
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = BollingerBands(20, 2.0)
+        self.atr = ATR(14)
+        self.obv = OBV()
+
+    def update(self, timestamp, open_price: float, high: float, low: float, close: float, volume: float) -> bool:
+        """
+        마감된 캔들 하나로 모든 지표를 갱신합니다. 이미 반영한 시각의 캔들은 무시합니다.
+        :return: bool - 갱신 여부.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+        self.last_timestamp = timestamp
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+        self.obv.update(close, volume)
+        return True
+
+    def values(self) -> dict:
+        """
+        현재 지표 값을 반환합니다 (워밍업이 끝나지 않은 값은 None).
+        """
+        return {
+            "ema_12": self.macd.fast.value,
+            "ema_26": self.macd.slow.value,
+            "rsi_14": self.rsi.value,
+            **{f"macd_{key}": value for key, value in self.macd.value.items()},
+            **{f"bb_{key}": value for key, value in self.bollinger.value.items()},
+            "atr_14": self.atr.value,
+            "obv": self.obv.value,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            "rsi": self.rsi.to_dict(),
+            "macd": self.macd.to_dict(),
+            "bollinger": self.bollinger.to_dict(),
+            "atr": self.atr.to_dict(),
+            "obv": self.obv.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        obj = cls()
+        obj.last_timestamp = pd.Timestamp(state["last_timestamp"]) if state["last_timestamp"] else None
+        # 이전 상태 파일의 ema_fast/ema_slow 는 MACD 의 fast/slow 와 같으므로 읽지 않음
+        obj.rsi = RSI.from_dict(state["rsi"])
+        obj.macd = MACD.from_dict(state["macd"])
+        obj.bollinger = BollingerBands.from_dict(state["bollinger"])
+        obj.atr = ATR.from_dict(state["atr"])
+        obj.obv = OBV.from_dict(state["obv"])
+        return obj
+
+
+class IndicatorEngine:
+    """
+    (시장, 봉 간격)별 지표 상태를 관리하는 엔진.
+    실시간 수집(collect_market_data)과 백테스트에서 같은 방식으로 사용합니다.
+    """
+
+    def __init__(self):
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, market: str, interval: str) -> IndicatorState:
+        key = (market, interval)
+        if key not in self.states:
+            self.states[key] = IndicatorState()
+        return self.states[key]
+
+    def update(self, market: str, interval: str, timestamp, candle: dict) -> dict:
+        """
+        마감된 캔들 하나를 반영하고 현재 지표 값을 반환합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param timestamp: 캔들 시각.
+        :param candle: dict - open, high, low, close, volume 값을 가진 캔들.
+        :return: dict - 현재 지표 값.
+        """
+        with self._lock:
+            state = self._state(market, interval)
+            state.update(timestamp, candle["open"], candle["high"], candle["low"], candle["close"], candle["volume"])
+            return state.values()
+
+    def update_frame(self, market: str, interval: str, data: pd.DataFrame, include_last: bool = False) -> dict:
+        """
+        봉 데이터 중 아직 반영하지 않은 캔들만 순서대로 반영합니다.
+        get_ohlcv 의 마지막 행은 진행 중인 캔들이므로 기본적으로 제외합니다.
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param data: DataFrame - 시각 인덱스를 가진 봉 데이터.
+        :param include_last: bool - 마지막 행도 마감된 캔들로 보고 반영할지 여부.
+        :return: dict - 현재 지표 값.
+        """
+        if data is None or data.empty:
+            return self.values(market, interval)
+        if not include_last:
+            data = data.iloc[:-1]
+
+        with self._lock:
+            state = self._state(market, interval)
+            if state.last_timestamp is not None:
+                data = data[data.index > state.last_timestamp]
+            columns = [data[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume")]
+            for timestamp, o, h, l, c, v in zip(data.index, *columns):
+                state.update(timestamp, o, h, l, c, v)
+            return state.values()
+
+    def run_frame(self, market: str, interval: str, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        모든 캔들을 마감된 캔들로 보고 차례로 반영하면서 각 시점의 지표 값을 기록합니다 (백테스트용).
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격.
+        :param data: DataFrame - 시각 인덱스를 가진 봉 데이터.
+        :return: DataFrame - 캔들별 지표 값 (인덱스는 입력과 동일).
+        """
+        rows = []
+        with self._lock:
+            state = self._state(market, interval)
+            columns = [data[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume")]
+            for timestamp, o, h, l, c, v in zip(data.index, *columns):
+                state.update(timestamp, o, h, l, c, v)
+                rows.append(state.values())
+        return pd.DataFrame(rows, index=data.index, dtype=float)
+
+    def values(self, market: str, interval: str) -> dict:
+        """
+        현재 지표 값을 반환합니다.
+        """
+        with self._lock:
+            return self._state(market, interval).values()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {f"{market}|{interval}": state.to_dict() for (market, interval), state in self.states.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        engine = cls()
+        for key, state in data.items():
+            market, interval = key.split("|", 1)
+            engine.states[(market, interval)] = IndicatorState.from_dict(state)
+        return engine
+
+    def save(self, path: str) -> None:
+        """
+        지표 상태를 JSON 파일로 저장합니다 (임시 파일에 쓴 뒤 교체).
+        :param path: str - 저장 경로.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        저장된 지표 상태를 불러옵니다. 파일이 없거나 손상되었으면 빈 엔진을 반환합니다.
+        :param path: str - 저장 경로.
+        :return: IndicatorEngine - 지표 엔진.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            logging.error(f"지표 상태를 불러오는 중 오류 발생: {e}")
+            return cls()
@@ -0,0 +1,50 @@
+# data_collection/parallel_fetch.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Tuple
+
+# 여러 블로킹 API 호출을 스레드 풀에서 동시에 실행하는 모듈
+
+DEFAULT_CALL_TIMEOUT = 10.0  # 호출별 기본 타임아웃 (초)
+DEFAULT_MAX_WORKERS = 8  # 동시에 실행할 최대 호출 수
+
+
+def run_concurrently(
+    tasks: Dict[str, Tuple[Callable, tuple]],
+    timeout: float = DEFAULT_CALL_TIMEOUT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[str, Any]:
+    """
+    주어진 호출들을 제한된 스레드 풀에서 병렬로 실행하고 결과를 이름별로 병합합니다.
+    모든 호출은 동시에 시작되므로 각 호출의 타임아웃은 제출 시점부터 측정됩니다.
+    타임아웃되거나 예외가 발생한 호출의 결과는 None 입니다.
+    :param tasks: dict - {이름: (호출 함수, 인자 튜플)} 형식의 작업 목록.
+    :param timeout: float - 호출별 최대 대기 시간(초), 기본값은 10초.
+    :param max_workers: int - 최대 스레드 수, 기본값은 8.
+    :return: dict - {이름: 결과 또는 None}.
+    """
+    results = {name: None for name in tasks}
+    if not tasks:
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    try:
+        started = time.monotonic()
+        futures = {name: executor.submit(func, *args) for name, (func, args) in tasks.items()}
+
+        for name, future in futures.items():
+            remaining = max(0.0, timeout - (time.monotonic() - started))
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                logging.warning(f"병렬 수집 타임아웃: {name} ({timeout}초 초과)")
+            except Exception as e:
+                logging.error(f"병렬 수집 중 오류 발생: {name} - {e}")
+    finally:
+        # 응답이 없는 호출이 남아 있어도 사이클을 막지 않도록 기다리지 않고 종료
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logging.info(f"병렬 수집 완료: {len(tasks)}건, {time.monotonic() - started:.2f}초")
+    return results
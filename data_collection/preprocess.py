@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import json
 import datetime
@@ -31,35 +32,76 @@ def normalize_data(data: pd.DataFrame, columns_to_keep: list = None) -> pd.DataF
         columns_to_keep = ["close", "volume"]
     return data[columns_to_keep]
 
+# 마지막 구간이 interval 보다 짧을 때의 처리 방식
+# - "drop": 남는 행을 버림 (기존 동작)
+# - "keep": 남는 행을 짧은 마지막 구간으로 요약
+PARTIAL_SEGMENT_POLICIES = ("drop", "keep")
+
+def compute_segment_stats(values, interval: int = 10, partial: str = "drop") -> dict:
+    """
+    값 배열을 (구간 수, interval) 형태로 재구성해 모든 구간의 통계를 한 번에 계산합니다.
+    마지막 축을 시간 축으로 보므로 (시장 수, 시간) 형태의 2차원 배열도 한 번에 처리합니다.
+    :param values: array-like - 시간순 값 배열 (1차원 또는 (시장 수, 시간) 2차원).
+    :param interval: int - 구간 길이(행 수), 기본값은 10.
+    :param partial: str - 남는 마지막 구간 처리 방식 ('drop' 또는 'keep'), 기본값은 'drop'.
+    :return: dict - 구간 시작/끝 위치(start, end)와 구간별 average_price, high_price,
+             low_price, volatility 배열 (마지막 축이 구간 축).
+    """
+    if partial not in PARTIAL_SEGMENT_POLICIES:
+        raise ValueError(f"지원하지 않는 구간 처리 방식입니다: {partial}")
+    if interval < 1:
+        raise ValueError(f"구간 길이는 1 이상이어야 합니다: {interval}")
+
+    values = np.asarray(values, dtype=float)
+    length = values.shape[-1]
+    full = length // interval
+    body = values[..., :full * interval].reshape(values.shape[:-1] + (full, interval))
+    parts = [body]
+    if partial == "keep" and length > full * interval:
+        parts.append(values[..., np.newaxis, full * interval:])
+
+    stats = {"average_price": [], "high_price": [], "low_price": [], "volatility": []}
+    for part in parts:
+        stats["average_price"].append(part.mean(axis=-1))
+        stats["high_price"].append(part.max(axis=-1))
+        stats["low_price"].append(part.min(axis=-1))
+        if part.shape[-1] > 1:
+            stats["volatility"].append(part.std(axis=-1, ddof=1))
+        else:
+            stats["volatility"].append(np.full(part.shape[:-1], np.nan))
+
+    result = {key: np.concatenate(arrays, axis=-1) for key, arrays in stats.items()}
+    segments = result["average_price"].shape[-1]
+    result["start"] = np.arange(segments) * interval
+    result["end"] = np.minimum(result["start"] + interval, length) - 1
+    return result
+
 # 데이터 요약 추출 함수
-def extract_relevant_data(data: pd.DataFrame, interval: int = 10) -> dict:
+def extract_relevant_data(data: pd.DataFrame, interval: int = 10, partial: str = "drop") -> dict:
     """
     데이터를 구간별로 나눠 각 구간의 평균, 최고값, 최저값, 변동성을 계산하고 날짜 범위를 포함합니다.
     :param data: DataFrame - 정규화된 데이터.
     :param interval: int - 데이터를 나눌 구간(일수), 기본값은 10일.
+    :param partial: str - 남는 마지막 구간 처리 방식 ('drop' 또는 'keep'), 기본값은 'drop'.
     :return: dict - 구간별로 계산된 핵심 정보와 날짜 범위.
     """
-    summary = {}
-    num_intervals = len(data) // interval
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
 
-    for i in range(num_intervals):
-        start = i * interval
-        end = start + interval
-        segment = data.iloc[start:end]
+    stats = compute_segment_stats(data["close"].to_numpy(), interval, partial)
+    start_dates = data.index[stats["start"]]
+    end_dates = data.index[stats["end"]]
 
-        # 구간의 날짜 범위 계산
-        start_date = segment.index.min()
-        end_date = segment.index.max()
-
-        summary[f"segment_{i + 1}"] = {
-            "date_range": f"{start_date} to {end_date}",
-            "average_price": segment["close"].mean(),
-            "high_price": segment["close"].max(),
-            "low_price": segment["close"].min(),
-            "volatility": segment["close"].std(),
+    return {
+        f"segment_{i + 1}": {
+            "date_range": f"{start_dates[i]} to {end_dates[i]}",
+            "average_price": stats["average_price"][i],
+            "high_price": stats["high_price"][i],
+            "low_price": stats["low_price"][i],
+            "volatility": stats["volatility"][i],
         }
-
-    return summary
+        for i in range(len(stats["start"]))
+    }
 
 # JSON 변환 함수
 def convert_to_json(data: dict) -> str:
@@ -70,43 +112,106 @@ def convert_to_json(data: dict) -> str:
     """
     return json.dumps(data, indent=4, ensure_ascii=False)
 
-def preprocess_15min_data(data: pd.DataFrame) -> dict:
+def compute_bucket_stats(data: pd.DataFrame, bucket_seconds: int = 900, window_seconds: float = None) -> dict:
+    """
+    봉 데이터를 일정 시간 폭의 구간으로 나눠 구간별 통계를 한 번의 numpy 집계로 계산합니다.
+    구간은 첫 봉의 시각을 기준으로 bucket_seconds 단위로 나누며, 봉이 없는 구간은 생략됩니다.
+    :param data: DataFrame - 시각 인덱스와 close, high, low, volume 열을 가진 결측값 없는 봉 데이터.
+    :param bucket_seconds: int - 구간 폭(초), 기본값은 900초 (15분).
+    :param window_seconds: float - 마지막 봉 기준으로 사용할 기간(초), 기본값은 전체 데이터.
+    :return: dict - 구간 번호(bucket)와 구간별 avg_price, high_price, low_price, volatility,
+             vwap, total_vol 배열 및 전체 통계(close_mean, close_std, trend, outlier_count).
+    """
+    if window_seconds is not None:
+        data = data[data.index > data.index[-1] - pd.Timedelta(seconds=window_seconds)]
+
+    offsets = (data.index - data.index[0]).total_seconds().to_numpy()
+    bucket = (offsets // bucket_seconds).astype(np.int64)
+    close = data["close"].to_numpy(dtype=float)
+    high = data["high"].to_numpy(dtype=float)
+    low = data["low"].to_numpy(dtype=float)
+    volume = data["volume"].to_numpy(dtype=float)
+
+    # 시각순이 아니면 구간 번호 기준으로 안정 정렬해 같은 구간이 연속되도록 함
+    if np.any(bucket[1:] < bucket[:-1]):
+        order = np.argsort(bucket, kind="stable")
+        bucket, close, high, low, volume = bucket[order], close[order], high[order], low[order], volume[order]
+
+    n = len(close)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, n])
+
+    # 구간별 1차/2차 모멘트 (평균을 한 번만 구해 표준편차에 재사용)
+    mean = np.add.reduceat(close, starts) / counts
+    deviation = close - np.repeat(mean, counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.sqrt(np.add.reduceat(deviation * deviation, starts) / (counts - 1))
+        std[counts < 2] = np.nan
+        total_vol = np.add.reduceat(volume, starts)
+        vwap = np.where(total_vol > 0, np.add.reduceat(close * volume, starts) / total_vol, 0)
+
+    # 전체 통계 (평균과 표준편차를 한 번만 계산해 이상치 판별에 재사용)
+    close_mean = close.mean()
+    close_std = np.sqrt(((close - close_mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+    ordered_close = data["close"].to_numpy(dtype=float)
+    outlier_count = int(np.count_nonzero(np.abs(close - close_mean) > 2 * close_std))
+
+    return {
+        "bucket": bucket[starts],
+        "avg_price": mean,
+        "high_price": np.maximum.reduceat(high, starts),
+        "low_price": np.minimum.reduceat(low, starts),
+        "volatility": std,
+        "vwap": vwap,
+        "total_vol": total_vol,
+        "close_mean": close_mean,
+        "close_std": close_std,
+        "trend": "up" if ordered_close[-1] > ordered_close[0] else "down",
+        "outlier_count": outlier_count,
+    }
+
+def bucket_label(bucket_seconds: int = 900) -> str:
+    """
+    구간 폭에 맞는 요약 키 접두어를 반환합니다 (예: 900초 -> 'segment_15m').
+    :param bucket_seconds: int - 구간 폭(초).
+    :return: str - 요약 키 접두어.
+    """
+    if bucket_seconds % 60 == 0:
+        return f"segment_{bucket_seconds // 60}m"
+    return f"segment_{bucket_seconds}s"
+
+def preprocess_15min_data(data: pd.DataFrame, bucket_seconds: int = 900, window_seconds: float = None) -> dict:
     """
     15분 봉 데이터를 전처리하여 구간별 통계 및 변동성을 계산합니다.
     :param data: DataFrame - 15분 봉 데이터.
+    :param bucket_seconds: int - 구간 폭(초), 기본값은 900초 (15분).
+    :param window_seconds: float - 마지막 봉 기준으로 사용할 기간(초), 기본값은 전체 데이터.
     :return: dict - 전처리된 데이터 요약 정보.
     """
     if data is None or data.empty:
         return {"error": "No data available"}
 
-    # 데이터 복사 및 15분 단위 구간 계산
-    data = data.copy()
-    data["time_index"] = (data.index - data.index[0]).total_seconds() // 900  # 15분 단위 (900초)
+    stats = compute_bucket_stats(data, bucket_seconds, window_seconds)
+    prefix = bucket_label(bucket_seconds)
 
-    # 15분 단위 통계 계산
+    # 구간별 통계
     summary = {
-        f"segment_15m_{int(idx) + 1}": {
-            "avg_price": grp["close"].mean(),
-            "high_price": grp["high"].max(),
-            "low_price": grp["low"].min(),
-            "volatility": grp["close"].std(),
-            "vwap": (grp["close"] * grp["volume"]).sum() / grp["volume"].sum() if grp["volume"].sum() > 0 else 0,
-            "total_vol": grp["volume"].sum(),
+        f"{prefix}_{int(idx) + 1}": {
+            "avg_price": stats["avg_price"][i],
+            "high_price": stats["high_price"][i],
+            "low_price": stats["low_price"][i],
+            "volatility": stats["volatility"][i],
+            "vwap": stats["vwap"][i],
+            "total_vol": stats["total_vol"][i],
         }
-        for idx, grp in data.groupby("time_index")
+        for i, idx in enumerate(stats["bucket"])
     }
 
     # 전체 분석 정보 추가
     summary["overall"] = {
-        "trend": "up" if data["close"].iloc[-1] > data["close"].iloc[0] else "down",
-        "max_volatility": round(data["close"].std(), 2),
-        "outlier_count": len(
-            data[
-                (data["close"] > data["close"].mean() + 2 * data["close"].std()) |
-                (data["close"] < data["close"].mean() - 2 * data["close"].std())
-            ]
-        ),  # 이상치 수만 포함
+        "trend": stats["trend"],
+        "max_volatility": round(stats["close_std"], 2),
+        "outlier_count": stats["outlier_count"],  # 이상치 수만 포함
     }
 
     return summary
-
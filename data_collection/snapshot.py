@@ -0,0 +1,254 @@
+# data_collection/snapshot.py
+import numpy as np
+import pandas as pd
+from data_collection.fetch_quantitative import extract_24h_volume
+from data_collection.preprocess import (
+    handle_missing_values,
+    compute_segment_stats,
+    compute_bucket_stats,
+    bucket_label,
+)
+
+# 수집 단계에서 한 번 만들어 프롬프트 생성, 판단 로직, DB 저장에서 그대로 사용하는 스냅샷 모듈
+# DataFrame -> 중첩 dict -> JSON 문자열 -> dict 로 이어지던 변환 없이 배열을 그대로 전달합니다.
+
+SEGMENT_FIELDS = ("average_price", "high_price", "low_price", "volatility")
+BUCKET_FIELDS = ("avg_price", "high_price", "low_price", "volatility", "vwap", "total_vol")
+
+
+class MarketSnapshot:
+    """
+    한 시장의 한 사이클 시장 데이터.
+    - segments: (구간 수, 4) 배열, 열 순서는 SEGMENT_FIELDS (일봉 구간 요약)
+    - buckets: (구간 수, 6) 배열, 열 순서는 BUCKET_FIELDS (5분 봉의 15분 구간 요약)
+    """
+
+    __slots__ = (
+        "market", "timestamp", "current_price", "volume_24h",
+        "segment_ranges", "segments",
+        "bucket_prefix", "bucket_ids", "buckets",
+        "trend", "max_volatility", "outlier_count",
+        "indicators", "errors",
+    )
+
+    def __init__(self, market: str, timestamp=None, current_price: float = None, volume_24h: float = None):
+        self.market = market
+        self.timestamp = timestamp
+        self.current_price = current_price
+        self.volume_24h = volume_24h
+        self.segment_ranges = []
+        self.segments = np.empty((0, len(SEGMENT_FIELDS)))
+        self.bucket_prefix = bucket_label(900)
+        self.bucket_ids = np.empty(0, dtype=np.int64)
+        self.buckets = np.empty((0, len(BUCKET_FIELDS)))
+        self.trend = None
+        self.max_volatility = None
+        self.outlier_count = None
+        self.indicators = {}
+        self.errors = {}
+
+    @property
+    def currency(self) -> str:
+        return self.market.split("-")[1]
+
+    def set_daily_candles(self, data: pd.DataFrame, interval: int = 10, partial: str = "drop") -> None:
+        """
+        일봉 데이터로 구간 요약 배열을 채웁니다 (extract_relevant_data 와 같은 값).
+        """
+        data = handle_missing_values(data)
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        stats = compute_segment_stats(data["close"].to_numpy(), interval, partial)
+        starts, ends = data.index[stats["start"]], data.index[stats["end"]]
+        self.segment_ranges = [f"{start} to {end}" for start, end in zip(starts, ends)]
+        self.segments = np.column_stack([stats[field] for field in SEGMENT_FIELDS])
+
+    def set_minute_candles(self, data: pd.DataFrame, bucket_seconds: int = 900) -> None:
+        """
+        분봉 데이터로 구간 통계 배열과 전체 분석 정보를 채웁니다 (preprocess_15min_data 와 같은 값).
+        """
+        data = handle_missing_values(data)
+        stats = compute_bucket_stats(data, bucket_seconds)
+        self.bucket_prefix = bucket_label(bucket_seconds)
+        self.bucket_ids = stats["bucket"]
+        self.buckets = np.column_stack([stats[field] for field in BUCKET_FIELDS])
+        self.trend = stats["trend"]
+        self.max_volatility = round(stats["close_std"], 2)
+        self.outlier_count = stats["outlier_count"]
+
+    def summary_30d(self) -> dict:
+        """
+        extract_relevant_data 형식의 구간 요약 dict 를 반환합니다.
+        """
+        if "summary_30d" in self.errors:
+            return {"error": self.errors["summary_30d"]}
+        return {
+            f"segment_{i + 1}": {
+                "date_range": date_range,
+                **{field: float(value) for field, value in zip(SEGMENT_FIELDS, row)},
+            }
+            for i, (date_range, row) in enumerate(zip(self.segment_ranges, self.segments))
+        }
+
+    def processed_5min(self) -> dict:
+        """
+        preprocess_15min_data 형식의 구간 통계 dict 를 반환합니다.
+        """
+        if "processed_5min" in self.errors:
+            return {"error": self.errors["processed_5min"]}
+        summary = {
+            f"{self.bucket_prefix}_{int(idx) + 1}": {field: float(value) for field, value in zip(BUCKET_FIELDS, row)}
+            for idx, row in zip(self.bucket_ids, self.buckets)
+        }
+        summary["overall"] = {
+            "trend": self.trend,
+            "max_volatility": self.max_volatility,
+            "outlier_count": self.outlier_count,
+        }
+        return summary
+
+    def to_dict(self) -> dict:
+        """
+        기존 market_data dict 형식으로 변환합니다 (로그/JSON 출력용).
+        """
+        return {
+            "current_price": self.current_price,
+            "volume_24h": self.volume_24h,
+            "summary_30d": self.summary_30d(),
+            "processed_5min": self.processed_5min(),
+            "indicators": dict(self.indicators),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, market: str = "KRW-BTC"):
+        """
+        기존 market_data dict 를 스냅샷으로 변환합니다.
+        """
+        snapshot = cls(market, current_price=data.get("current_price"), volume_24h=data.get("volume_24h"))
+
+        summary_30d = data.get("summary_30d", {})
+        if "error" in summary_30d:
+            snapshot.errors["summary_30d"] = summary_30d["error"]
+        else:
+            snapshot.segment_ranges = [segment["date_range"] for segment in summary_30d.values()]
+            snapshot.segments = np.array(
+                [[segment[field] for field in SEGMENT_FIELDS] for segment in summary_30d.values()], dtype=float
+            ).reshape(-1, len(SEGMENT_FIELDS))
+
+        processed_5min = dict(data.get("processed_5min", {}))
+        if "error" in processed_5min:
+            snapshot.errors["processed_5min"] = processed_5min["error"]
+        else:
+            overall = processed_5min.pop("overall", {})
+            snapshot.trend = overall.get("trend")
+            snapshot.max_volatility = overall.get("max_volatility")
+            snapshot.outlier_count = overall.get("outlier_count")
+            if processed_5min:
+                first_key = next(iter(processed_5min))
+                snapshot.bucket_prefix = first_key.rsplit("_", 1)[0]
+            snapshot.bucket_ids = np.array([int(key.rsplit("_", 1)[1]) - 1 for key in processed_5min], dtype=np.int64)
+            snapshot.buckets = np.array(
+                [[segment[field] for field in BUCKET_FIELDS] for segment in processed_5min.values()], dtype=float
+            ).reshape(-1, len(BUCKET_FIELDS))
+
+        snapshot.indicators = dict(data.get("indicators", {}))
+        return snapshot
+
+
+class PortfolioSnapshot:
+    """
+    현금 잔고와 거래 대상 자산 하나의 보유 상태.
+    """
+
+    __slots__ = (
+        "cash_balance", "total_investment", "currency", "balance",
+        "avg_buy_price", "asset_investment", "error",
+    )
+
+    def __init__(self, cash_balance: float = 0.0, total_investment: float = 0.0, currency: str = None,
+                 balance: float = 0.0, avg_buy_price: float = 0.0, asset_investment: float = 0.0,
+                 error: str = None):
+        self.cash_balance = cash_balance
+        self.total_investment = total_investment
+        self.currency = currency
+        self.balance = balance
+        self.avg_buy_price = avg_buy_price
+        self.asset_investment = asset_investment
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, portfolio: dict, currency: str = None):
+        """
+        filter_bitcoin_portfolio 형식의 dict 를 스냅샷으로 변환합니다.
+        """
+        if isinstance(portfolio, cls):
+            return portfolio
+        if "error" in portfolio:
+            return cls(currency=currency, error=portfolio["error"])
+        asset = portfolio.get("target_asset") or {}
+        return cls(
+            cash_balance=portfolio.get("cash_balance", 0.0),
+            total_investment=portfolio.get("total_investment", 0.0),
+            currency=asset.get("currency", currency),
+            balance=asset.get("balance", 0.0),
+            avg_buy_price=asset.get("avg_buy_price", 0.0),
+            asset_investment=asset.get("total_investment", 0.0),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        filter_bitcoin_portfolio 형식의 dict 로 변환합니다 (로그/JSON 출력용).
+        """
+        if self.error:
+            return {"error": self.error}
+        return {
+            "cash_balance": self.cash_balance,
+            "total_investment": self.total_investment,
+            "target_asset": {
+                "currency": self.currency,
+                "balance": self.balance,
+                "avg_buy_price": self.avg_buy_price,
+                "total_investment": self.asset_investment,
+            },
+        }
+
+    def to_record(self, timestamp) -> dict:
+        """
+        Portfolio 테이블 행 데이터로 변환합니다.
+        """
+        return {
+            "timestamp": timestamp,
+            "cash_balance": self.cash_balance,
+            "total_investment": self.total_investment,
+            "currency": self.currency or "N/A",
+            "target_asset_balance": self.balance,
+            "avg_buy_price": self.avg_buy_price,
+        }
+
+
+def build_market_snapshot(market: str, raw_data: dict, indicators: dict = None, timestamp=None) -> MarketSnapshot:
+    """
+    수집된 원시 데이터로 시장 스냅샷을 만듭니다.
+    :param market: str - 시장 식별자.
+    :param raw_data: dict - current_price, candlestick_30d, raw_5min_data 를 가진 수집 결과.
+    :param indicators: dict - 기술적 지표 값.
+    :param timestamp: 스냅샷 시각.
+    :return: MarketSnapshot - 시장 스냅샷.
+    """
+    snapshot = MarketSnapshot(market, timestamp=timestamp, current_price=raw_data.get("current_price"))
+
+    candlestick_30d = raw_data.get("candlestick_30d")
+    if candlestick_30d is not None and not candlestick_30d.empty:
+        snapshot.volume_24h = extract_24h_volume(candlestick_30d)
+        snapshot.set_daily_candles(candlestick_30d)
+    else:
+        snapshot.errors["summary_30d"] = "30일 봉 데이터를 가져오는 데 실패했습니다."
+
+    raw_5min_data = raw_data.get("raw_5min_data")
+    if raw_5min_data is not None and not raw_5min_data.empty:
+        snapshot.set_minute_candles(raw_5min_data)
+    else:
+        snapshot.errors["processed_5min"] = "5분 봉 데이터를 가져오는 데 실패했습니다."
+
+    snapshot.indicators = dict(indicators or {})
+    return snapshot
@@ -0,0 +1,295 @@
+# data_collection/tick_stream.py
+import json
+import logging
+import threading
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from data_collection.candle_store import CANDLE_COLUMNS, CANDLE_DTYPE
+
+# 체결 스트림을 상시 수신해 메모리의 링 버퍼에 쌓고 1분/5분/15분 캔들로 즉시 집계하는 모듈
+
+UPBIT_WEBSOCKET_URL = "wss://api.upbit.com/websocket/v1"
+KST_OFFSET_MS = 9 * 60 * 60 * 1000  # 캔들 시각은 pyupbit 와 같은 KST 기준
+
+TICK_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # 체결 시각 (UTC epoch ms)
+    ("price", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+class TickRingBuffer:
+    """
+    고정 크기로 미리 할당된 체결 링 버퍼. 가득 차면 가장 오래된 체결을 덮어씁니다.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.head = 0  # 다음에 쓸 위치
+        self.count = 0
+
+    def append(self, timestamp: int, price: float, volume: float) -> None:
+        slot = self.buffer[self.head]
+        slot["timestamp"], slot["price"], slot["volume"] = timestamp, price, volume
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self, n: int = None) -> np.ndarray:
+        """
+        최근 n 개의 체결을 시간순으로 복사해 반환합니다.
+        """
+        n = self.count if n is None else min(n, self.count)
+        positions = (self.head - n + np.arange(n)) % self.capacity
+        return self.buffer[positions]
+
+
+class CandleRing:
+    """
+    하나의 (시장, 봉 간격)에 대한 캔들 링 버퍼. 체결이 들어올 때마다 진행 중인 캔들을 갱신하고,
+    새 구간의 체결이 오면 다음 슬롯에서 새 캔들을 시작합니다.
+    """
+
+    def __init__(self, interval_seconds: int, capacity: int = 1_440):
+        self.interval_ms = interval_seconds * 1000
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=CANDLE_DTYPE)
+        self.head = -1  # 진행 중인 캔들 위치
+        self.count = 0
+        self.current_start = None  # 진행 중인 캔들 시작 시각 (KST epoch ms)
+
+    def add_tick(self, timestamp: int, price: float, volume: float) -> None:
+        local = timestamp + KST_OFFSET_MS
+        start = local - local % self.interval_ms
+        if self.current_start is not None and start < self.current_start:
+            return  # 이미 마감된 구간의 늦은 체결은 무시
+
+        if start != self.current_start:
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.current_start = start
+            candle = self.buffer[self.head]
+            candle["timestamp"] = start * 1_000_000
+            candle["open"] = candle["high"] = candle["low"] = candle["close"] = price
+            candle["volume"], candle["value"] = volume, price * volume
+            return
+
+        candle = self.buffer[self.head]
+        if price > candle["high"]:
+            candle["high"] = price
+        if price < candle["low"]:
+            candle["low"] = price
+        candle["close"] = price
+        candle["volume"] += volume
+        candle["value"] += price * volume
+
+    def seed(self, data: pd.DataFrame) -> None:
+        """
+        REST 로 받은 캔들로 버퍼를 미리 채웁니다 (스트림 시작 직후 빈 구간 보완).
+        """
+        for timestamp, row in data.sort_index().iterrows():
+            start = pd.Timestamp(timestamp).as_unit("ns").value // 1_000_000
+            if self.current_start is not None and start <= self.current_start:
+                continue
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.current_start = start
+            candle = self.buffer[self.head]
+            candle["timestamp"] = start * 1_000_000
+            for column in CANDLE_COLUMNS:
+                candle[column] = row.get(column, np.nan)
+
+    def latest(self, n: int) -> np.ndarray:
+        n = min(n, self.count)
+        positions = (self.head - n + 1 + np.arange(n)) % self.capacity
+        return self.buffer[positions]
+
+
+class ReplayFileSource:
+    """
+    Upbit 체결 메시지(JSON Lines)를 파일에서 읽어 재생하는 소스 (테스트 및 재현용).
+    """
+
+    def __init__(self, path: str, speed: float = None):
+        """
+        :param path: str - 체결 메시지 파일 경로 (한 줄에 하나의 JSON).
+        :param speed: float - 재생 배속, None 이면 지연 없이 재생.
+        """
+        self.path = path
+        self.speed = speed
+
+    def __iter__(self):
+        previous = None
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if self.speed and previous is not None:
+                    time.sleep(max(0, message["trade_timestamp"] - previous) / 1000 / self.speed)
+                previous = message["trade_timestamp"]
+                yield message
+
+
+class UpbitWebSocketSource:
+    """
+    Upbit 웹소켓 체결(trade) 스트림 소스. 연결이 끊기면 지수 백오프로 다시 연결합니다.
+    """
+
+    def __init__(self, markets: list, url: str = UPBIT_WEBSOCKET_URL, max_backoff: float = 30.0):
+        self.markets = markets
+        self.url = url
+        self.max_backoff = max_backoff
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+    def __iter__(self):
+        from websockets.sync.client import connect
+
+        backoff = 1.0
+        while not self.closed:
+            try:
+                with connect(self.url) as ws:
+                    ws.send(json.dumps([
+                        {"ticket": str(uuid.uuid4())},
+                        {"type": "trade", "codes": self.markets, "isOnlyRealtime": True},
+                    ]))
+                    backoff = 1.0
+                    while not self.closed:
+                        yield json.loads(ws.recv(timeout=60))
+            except Exception as e:
+                logging.error(f"웹소켓 체결 스트림 오류: {e}. {backoff:.0f}초 후 재연결")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+
+class TickIngestor:
+    """
+    체결 소스를 백그라운드 스레드에서 소비해 시장별 체결 링 버퍼와 캔들 링 버퍼를 갱신합니다.
+    collect_market_data 는 snapshot/last_price 로 메모리의 최신 데이터를 바로 읽습니다.
+    마지막 체결을 받은 지 max_age 초가 지나면 (연결 끊김, 재연결 반복 등) 준비되지 않은 것으로 봅니다.
+    """
+
+    def __init__(self, source, intervals: tuple = (60, 300, 900), tick_capacity: int = 100_000,
+                 candle_capacity: int = 1_440, max_age: float = 120.0, clock=time.monotonic):
+        """
+        :param max_age: float - 최근 체결로 인정할 최대 경과 시간 (초).
+        :param clock: Callable - 경과 시간(초)을 반환하는 함수.
+        """
+        self.source = source
+        self.max_age = max_age
+        self.clock = clock
+        self.received_at = {}  # 시장별 마지막 체결 수신 시각 (clock 기준)
+        self.intervals = intervals
+        self.tick_capacity = tick_capacity
+        self.candle_capacity = candle_capacity
+        self.ticks = {}
+        self.candles = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _buffers(self, market: str):
+        if market not in self.ticks:
+            self.ticks[market] = TickRingBuffer(self.tick_capacity)
+            for interval in self.intervals:
+                self.candles[(market, interval)] = CandleRing(interval, self.candle_capacity)
+        return self.ticks[market]
+
+    def ingest(self, message: dict) -> None:
+        """
+        Upbit 체결 메시지 하나를 반영합니다.
+        :param message: dict - code, trade_timestamp, trade_price, trade_volume 필드를 가진 체결 메시지.
+        """
+        market = message.get("code") or message.get("cd")
+        timestamp = int(message.get("trade_timestamp", message.get("ttms")))
+        price = float(message.get("trade_price", message.get("tp")))
+        volume = float(message.get("trade_volume", message.get("tv")))
+        with self._lock:
+            self._buffers(market).append(timestamp, price, volume)
+            self.received_at[market] = self.clock()
+            for interval in self.intervals:
+                self.candles[(market, interval)].add_tick(timestamp, price, volume)
+
+    def run(self) -> None:
+        """
+        소스가 끝날 때까지 체결을 소비합니다 (블로킹).
+        """
+        for message in self.source:
+            try:
+                self.ingest(message)
+            except Exception as e:
+                logging.error(f"체결 메시지 처리 중 오류 발생: {e} - {message}")
+
+    def start(self) -> None:
+        """
+        백그라운드 데몬 스레드에서 수신을 시작합니다.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.run, name="tick-ingestor", daemon=True)
+            self._thread.start()
+            logging.info("체결 스트림 수신 시작")
+
+    def stop(self) -> None:
+        if hasattr(self.source, "close"):
+            self.source.close()
+
+    def seed(self, market: str, interval: int, data: pd.DataFrame) -> None:
+        """
+        REST 로 받은 캔들로 캔들 링 버퍼를 미리 채웁니다.
+        :param market: str - 시장 식별자.
+        :param interval: int - 봉 간격(초).
+        :param data: DataFrame - get_ohlcv 형식의 캔들 데이터.
+        """
+        if data is None or data.empty:
+            return
+        with self._lock:
+            self._buffers(market)
+            self.candles[(market, interval)].seed(data)
+
+    def age(self, market: str) -> float:
+        """
+        마지막 체결을 받은 뒤 지난 시간(초)을 반환합니다.
+        :return: float - 경과 시간 또는 받은 체결이 없으면 None.
+        """
+        with self._lock:
+            received_at = self.received_at.get(market)
+        return None if received_at is None else self.clock() - received_at
+
+    def is_ready(self, market: str, interval: int, count: int) -> bool:
+        """
+        count 개 이상의 캔들과 max_age 초 이내에 받은 체결 가격이 준비되었는지 확인합니다.
+        """
+        age = self.age(market)
+        if age is None or age > self.max_age:
+            return False
+        with self._lock:
+            ring = self.candles.get((market, interval))
+            return ring is not None and ring.count >= count
+
+    def last_price(self, market: str) -> float:
+        """
+        가장 최근 체결 가격을 반환합니다.
+        :return: float - 최근 체결 가격 또는 체결이 없으면 None.
+        """
+        with self._lock:
+            ticks = self.ticks.get(market)
+            if ticks is None or ticks.count == 0:
+                return None
+            return float(ticks.latest(1)["price"][0])
+
+    def snapshot(self, market: str, interval: int, count: int) -> pd.DataFrame:
+        """
+        최근 count 개의 캔들(마지막은 진행 중인 캔들)을 get_ohlcv 형식으로 반환합니다.
+        :return: DataFrame - 캔들 데이터 또는 데이터가 없으면 None.
+        """
+        with self._lock:
+            ring = self.candles.get((market, interval))
+            if ring is None or ring.count == 0:
+                return None
+            records = ring.latest(count)
+        index = pd.to_datetime(records["timestamp"])
+        return pd.DataFrame({column: records[column] for column in CANDLE_COLUMNS}, index=index)
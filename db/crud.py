@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from db.models import Trade, Performance, Portfolio
+from db.models import Trade, Performance, Portfolio, LLMRequest
 import datetime
 import logging
 
@@ -26,6 +26,30 @@ def create_trade(db: Session, trade_data: dict):
         raise
 
 
+def update_trade_fill(db: Session, trade_id: int, fill_data: dict):
+    """
+    주문 체결 결과(실제 체결 가격, 체결 금액, 수수료 등)를 거래 기록에 반영
+    :param db: SQLAlchemy Session
+    :param trade_id: 거래 ID
+    :param fill_data: 갱신할 필드 (dict)
+    """
+    try:
+        trade = db.query(Trade).filter(Trade.id == trade_id).first()
+        if not trade:
+            logging.warning(f"Trade not found: {trade_id}")
+            return None
+        for key, value in fill_data.items():
+            setattr(trade, key, value)
+        db.commit()
+        db.refresh(trade)
+        logging.info(f"Trade fill updated: {trade}")
+        return trade
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Failed to update trade fill: {e}")
+        raise
+
+
 def get_trades(db: Session, limit: int = 100):
     """
     모든 거래 기록 조회
@@ -137,9 +161,11 @@ def update_portfolio(db: Session, portfolio_data: dict):
     """
     포트폴리오 상태 갱신
     :param db: SQLAlchemy Session
-    :param portfolio_data: 포트폴리오 데이터 (dict)
+    :param portfolio_data: 포트폴리오 데이터 (dict 또는 to_record 를 가진 PortfolioSnapshot)
     """
     try:
+        if hasattr(portfolio_data, "to_record"):
+            portfolio_data = portfolio_data.to_record(datetime.datetime.now())
         portfolio = db.query(Portfolio).order_by(Portfolio.timestamp.desc()).first()
         if portfolio:
             for key, value in portfolio_data.items():
@@ -165,3 +191,38 @@ def get_portfolio(db: Session):
     :param db: SQLAlchemy Session
     """
     return db.query(Portfolio).order_by(Portfolio.timestamp.desc()).first()
+
+
+# ===========================
+# LLMRequest 관련 CRUD
+# ===========================
+
+def create_llm_request(db: Session, request_data: dict):
+    """
+    GPT 요청 기록 생성
+    :param db: SQLAlchemy Session
+    :param request_data: 요청 기록 (dict, RequestMetrics.to_record 형식)
+    """
+    try:
+        llm_request = LLMRequest(**request_data)
+        db.add(llm_request)
+        db.commit()
+        db.refresh(llm_request)
+        return llm_request
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Failed to create llm request: {e}")
+        raise
+
+
+def get_llm_requests(db: Session, limit: int = 500, model: str = None):
+    """
+    최근 GPT 요청 기록 조회
+    :param db: SQLAlchemy Session
+    :param limit: 조회할 최대 기록 수
+    :param model: 특정 모델만 조회 (None 이면 전체)
+    """
+    query = db.query(LLMRequest)
+    if model is not None:
+        query = query.filter(LLMRequest.model == model)
+    return query.order_by(LLMRequest.timestamp.desc()).limit(limit).all()
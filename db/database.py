@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from .base import Base  # Base를 base.py에서 가져옵니다.
 import os
@@ -18,9 +18,46 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 기존 테이블에 나중에 추가된 열 (create_all 은 이미 있는 테이블을 바꾸지 않으므로 직접 추가)
+COLUMN_MIGRATIONS = {
+    "trades": [
+        ("order_uuid", "VARCHAR(64)"),
+        ("order_state", "VARCHAR(10)"),
+        ("expected_price", "FLOAT"),
+        ("filled_volume", "FLOAT"),
+        ("paid_fee", "FLOAT"),
+        ("slippage_bps", "FLOAT"),
+    ],
+}
+INDEX_MIGRATIONS = [
+    "CREATE INDEX IF NOT EXISTS ix_trades_order_uuid ON trades (order_uuid)",
+]
+
+def migrate_db(bind=None):
+    """
+    기존 테이블에 없는 열과 인덱스를 추가합니다 (여러 번 실행해도 안전).
+    :param bind: Engine - 대상 엔진, 기본값은 공유 엔진.
+    :return: list - 실행한 SQL 문.
+    """
+    bind = bind or engine
+    existing = {table: {column["name"] for column in inspect(bind).get_columns(table)} for table in COLUMN_MIGRATIONS}
+    statements = []
+    for table, columns in COLUMN_MIGRATIONS.items():
+        if_not_exists = "IF NOT EXISTS " if bind.dialect.name == "postgresql" else ""
+        statements += [
+            f"ALTER TABLE {table} ADD COLUMN {if_not_exists}{name} {column_type}"
+            for name, column_type in columns if name not in existing[table]
+        ]
+    statements += INDEX_MIGRATIONS
+    with bind.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    return statements
+
 def init_db():
     from . import models  # models를 여기서 import
     Base.metadata.create_all(bind=engine)
+    migrate_db()
 
 # 의존성 주입
 def get_db():
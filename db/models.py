@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -17,6 +17,12 @@ class Trade(Base):
     price = Column(Float, nullable=False)  # 거래 당시 자산 가격
     total_value = Column(Float, nullable=False)  # 거래 총 금액
     reason = Column(String, nullable=True)  # GPT 판단 근거
+    order_uuid = Column(String(64), nullable=True, index=True)  # 업비트 주문 UUID (분할 주문은 부모 주문 ID)
+    order_state = Column(String(10), nullable=True)  # 주문 상태 ('wait', 'done', 'cancel')
+    expected_price = Column(Float, nullable=True)  # 판단 시점 가격 (체결 전)
+    filled_volume = Column(Float, nullable=True)  # 체결 수량
+    paid_fee = Column(Float, nullable=True)  # 지불한 수수료 (KRW)
+    slippage_bps = Column(Float, nullable=True)  # 판단 시점 가격 대비 체결 가격 차이 (bp, 양수면 불리)
 
     def __repr__(self):
         return f"<Trade(id={self.id}, action={self.action}, currency={self.currency}, amount={self.amount})>"
@@ -55,3 +61,32 @@ class Portfolio(Base):
 
     def __repr__(self):
         return f"<Portfolio(id={self.id}, currency={self.currency}, cash_balance={self.cash_balance})>"
+
+
+class LLMRequest(Base):
+    """
+    GPT 요청별 토큰, 지연, 비용, 판단 결과를 저장하는 테이블
+    """
+    __tablename__ = "llm_requests"
+
+    id = Column(Integer, primary_key=True, index=True)  # Primary Key
+    timestamp = Column(DateTime, nullable=False, index=True)  # 기록 시각
+    kind = Column(String(10), nullable=False)  # 요청 종류 ('single', 'batch')
+    model = Column(String(50), nullable=False)  # 모델 이름
+    markets = Column(String, nullable=False)  # 요청에 포함된 시장 (쉼표 구분)
+    estimated_prompt_tokens = Column(Integer, nullable=True)  # 요청 전 추정한 입력 토큰 수
+    prompt_tokens = Column(Integer, nullable=True)  # 입력 토큰 수 (API usage)
+    cached_tokens = Column(Integer, nullable=True)  # 프롬프트 캐시에서 처리된 입력 토큰 수
+    completion_tokens = Column(Integer, nullable=True)  # 출력 토큰 수
+    ttft = Column(Float, nullable=True)  # 첫 응답 토큰까지 걸린 시간 (초)
+    latency = Column(Float, nullable=True)  # 응답 완료까지 걸린 시간 (초)
+    cost = Column(Float, nullable=True)  # 추정 비용 (USD)
+    hedged = Column(Boolean, nullable=False, default=False)  # 헤지 요청 여부
+    status = Column(String(10), nullable=False)  # 결과 ('ok', 'timeout', 'error', 'invalid')
+    error = Column(String, nullable=True)  # 오류 내용
+    action = Column(String(10), nullable=True)  # 단일 요청의 판단 ('buy', 'sell', 'hold')
+    amount = Column(Float, nullable=True)  # 단일 요청의 판단 금액/수량
+    decisions = Column(Text, nullable=True)  # 시장별 판단 (JSON)
+
+    def __repr__(self):
+        return f"<LLMRequest(id={self.id}, kind={self.kind}, status={self.status}, latency={self.latency})>"
@@ -0,0 +1,4 @@
+# exchange/__init__.py
+
+# 업비트 API 공유 클라이언트 모듈
+from .upbit_client import UpbitClient, UpbitAPIError, get_upbit_client, set_upbit_client
@@ -0,0 +1,512 @@
+# exchange/paper_exchange.py
+import bisect
+import datetime
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import pytz
+from data_collection.candle_store import INTERVAL_SECONDS
+from exchange.upbit_client import UpbitAPIError
+
+# 실제 자금과 네트워크 없이 주문을 체결하는 모의(페이퍼) 거래소 모듈
+# UpbitClient 와 같은 메서드를 제공하므로 set_upbit_client 로 설치하면 주문, 잔고 조회, 시세 조회가
+# 모두 이 객체를 거칩니다. 체결은 기록된 호가 스냅샷 또는 현재가 주변의 합성 호가를 소비하며 이루어집니다.
+
+FEE_RATE = 0.0005  # 업비트 KRW 마켓 수수료율
+MIN_ORDER_AMOUNT = 5000  # 최소 주문 금액 (KRW)
+KST = pytz.timezone("Asia/Seoul")
+
+
+def _format(value: float) -> str:
+    # 업비트 응답처럼 숫자를 문자열로 표시
+    return f"{value:.8f}".rstrip("0").rstrip(".") or "0"
+
+
+class SimulatedClock:
+    """
+    배속으로 흐르는 모의 시계 (KST 기준 naive datetime).
+    - speed > 0: 실제 시간의 speed 배로 흐르며, sleep 은 seconds / speed 초만 실제로 대기
+    - speed == 0: 실제 시간과 무관하게 sleep 으로만 흐름 (테스트/최대 속도 실행)
+    - wait: 시계를 움직이지 않고 다른 스레드(메인 루프)가 시계를 움직일 때까지 대기 (백그라운드 작업용)
+    """
+
+    def __init__(self, start=None, speed: float = 1.0):
+        self.start = pd.Timestamp(start).to_pydatetime() if start is not None else (
+            datetime.datetime.now(KST).replace(tzinfo=None)
+        )
+        self.speed = speed
+        self._origin = time.monotonic()
+        self._skipped = 0.0
+        self._lock = threading.Lock()
+        self._advanced = threading.Condition(self._lock)
+
+    def now(self) -> datetime.datetime:
+        with self._lock:
+            elapsed = (time.monotonic() - self._origin) * self.speed + self._skipped
+        return self.start + datetime.timedelta(seconds=elapsed)
+
+    def sleep(self, seconds: float) -> None:
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+        else:
+            with self._advanced:
+                self._skipped += seconds
+                self._advanced.notify_all()
+
+    def wait(self, seconds: float, timeout: float = 1.0) -> None:
+        """
+        모의 시계가 seconds 만큼 흐를 때까지 기다립니다 (speed == 0 에서도 시계를 직접 움직이지 않음).
+        :param seconds: float - 기다릴 모의 시간 (초).
+        :param timeout: float - speed == 0 일 때 최대 실제 대기 시간 (초), 지나면 그대로 반환.
+        """
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+            return
+        with self._advanced:
+            target = self._skipped + seconds
+            self._advanced.wait_for(lambda: self._skipped >= target, timeout)
+
+
+class OrderBook:
+    """
+    한 시장의 호가. asks 는 가격 오름차순, bids 는 가격 내림차순 [가격, 잔량] 목록이며,
+    체결되면 잔량이 줄어 같은 스냅샷 안에서 연속 주문은 더 깊은 호가까지 체결됩니다.
+    """
+
+    def __init__(self, market: str, asks: List[List[float]], bids: List[List[float]], timestamp=None):
+        self.market = market
+        self.asks = sorted([[float(p), float(s)] for p, s in asks if s > 0], key=lambda level: level[0])
+        self.bids = sorted([[float(p), float(s)] for p, s in bids if s > 0], key=lambda level: -level[0])
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict):
+        """
+        업비트 /v1/orderbook 응답 항목으로 호가를 만듭니다.
+        """
+        units = snapshot.get("orderbook_units", [])
+        return cls(
+            snapshot["market"],
+            [[unit["ask_price"], unit["ask_size"]] for unit in units],
+            [[unit["bid_price"], unit["bid_size"]] for unit in units],
+            snapshot.get("timestamp"),
+        )
+
+    @classmethod
+    def synthetic(cls, market: str, mid_price: float, levels: int = 15, spread_bps: float = 5.0,
+                  step_bps: float = 5.0, depth_krw: float = 2_000_000.0, growth: float = 1.3, timestamp=None):
+        """
+        현재가 주변의 합성 호가를 만듭니다. 멀어질수록 잔량이 growth 배씩 늘어납니다.
+        :param mid_price: float - 기준가.
+        :param levels: int - 호가 단계 수.
+        :param spread_bps: float - 최우선 매수/매도 호가 간격 (bp).
+        :param step_bps: float - 호가 단계 간격 (bp).
+        :param depth_krw: float - 최우선 호가의 잔량 (KRW 환산).
+        :param growth: float - 단계별 잔량 증가 배수.
+        """
+        offsets = spread_bps / 2 + step_bps * np.arange(levels)
+        sizes = depth_krw / mid_price * growth ** np.arange(levels)
+        asks = np.column_stack([mid_price * (1 + offsets / 10_000), sizes])
+        bids = np.column_stack([mid_price * (1 - offsets / 10_000), sizes])
+        return cls(market, asks.tolist(), bids.tolist(), timestamp)
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        if not self.asks or not self.bids:
+            return None
+        return (self.asks[0][0] + self.bids[0][0]) / 2
+
+    def take(self, side: str, volume: float = None, funds: float = None, limit: float = None) -> List[List[float]]:
+        """
+        반대편 호가를 소비해 체결 목록을 만듭니다.
+        :param side: str - 'bid'(매수, asks 소비) 또는 'ask'(매도, bids 소비).
+        :param volume: float - 체결할 최대 수량.
+        :param funds: float - 체결할 최대 금액 (시장가 매수).
+        :param limit: float - 지정가 (매수는 이하, 매도는 이상인 호가만 체결).
+        :return: List[List[float]] - [가격, 수량] 체결 목록.
+        """
+        levels = self.asks if side == "bid" else self.bids
+        fills = []
+        while levels and (volume is None or volume > 1e-12) and (funds is None or funds > 1e-8):
+            price, size = levels[0]
+            if limit is not None and (price > limit if side == "bid" else price < limit):
+                break
+            take = size
+            if volume is not None:
+                take = min(take, volume)
+            if funds is not None:
+                take = min(take, funds / price)
+            fills.append([price, take])
+            levels[0][1] -= take
+            if levels[0][1] <= 1e-12:
+                levels.pop(0)
+            if volume is not None:
+                volume -= take
+            if funds is not None:
+                funds -= take * price
+        return fills
+
+    def to_snapshot(self, levels: int = 15) -> Dict:
+        """
+        업비트 /v1/orderbook 응답 형식으로 변환합니다.
+        """
+        units = [
+            {"ask_price": ask[0], "ask_size": ask[1], "bid_price": bid[0], "bid_size": bid[1]}
+            for ask, bid in zip(self.asks[:levels], self.bids[:levels])
+        ]
+        return {
+            "market": self.market,
+            "timestamp": self.timestamp,
+            "total_ask_size": sum(size for _, size in self.asks),
+            "total_bid_size": sum(size for _, size in self.bids),
+            "orderbook_units": units,
+        }
+
+
+class RecordedOrderBooks:
+    """
+    {"market", "timestamp"(ms), "orderbook_units"} 형식의 JSON Lines 로 기록된 호가 스냅샷을
+    모의 시계 기준으로 재생합니다 (각 시각 이전의 가장 최근 스냅샷).
+    """
+
+    def __init__(self, snapshots: List[Dict], clock: SimulatedClock):
+        self.clock = clock
+        self.snapshots: Dict[str, List] = {}
+        for snapshot in sorted(snapshots, key=lambda item: item["timestamp"]):
+            self.snapshots.setdefault(snapshot["market"], []).append(snapshot)
+        self.times = {market: [item["timestamp"] for item in items] for market, items in self.snapshots.items()}
+
+    @classmethod
+    def from_jsonl(cls, path: str, clock: SimulatedClock):
+        with open(path, encoding="utf-8") as f:
+            return cls([json.loads(line) for line in f if line.strip()], clock)
+
+    def __call__(self, market: str, mid_price: float = None) -> Optional[OrderBook]:
+        times = self.times.get(market)
+        if not times:
+            return None
+        now_ms = KST.localize(self.clock.now()).timestamp() * 1000
+        position = bisect.bisect_right(times, now_ms) - 1
+        return OrderBook.from_snapshot(self.snapshots[market][max(position, 0)])
+
+
+class ReplayMarketData:
+    """
+    캔들 저장소의 캔들을 모의 시계 기준으로 재생하는 시세 소스 (네트워크 없이 동작).
+    미래 데이터가 섞이지 않도록 시계 시각까지 완성된 캔들만 보이며, 현재가는 마지막으로 완성된
+    price_interval 캔들의 종가입니다.
+    주의: 실시간 캔들 저장소와 다른 디렉터리를 사용해야 합니다 (수집 단계가 저장소를 덮어씀).
+    """
+
+    def __init__(self, store, clock: SimulatedClock, price_interval: str = "minute5"):
+        self.store = store
+        self.clock = clock
+        self.price_interval = price_interval
+
+    def _visible(self, market: str, interval: str, to=None) -> np.ndarray:
+        records = self.store.read_records(market, interval)
+        # to 는 업비트 API 와 같이 UTC 기준
+        now = pd.Timestamp(to) + pd.Timedelta(hours=9) if to is not None else pd.Timestamp(self.clock.now())
+        limit = (now - pd.Timedelta(seconds=INTERVAL_SECONDS.get(interval, 0))).value
+        return records[:int(np.searchsorted(records["timestamp"], limit, side="right"))]
+
+    def get_ohlcv(self, market: str = "KRW-BTC", interval: str = "day", count: int = 200, to=None) -> pd.DataFrame:
+        records = self._visible(market, interval, to)[-count:]
+        if len(records) == 0:
+            return None
+        return self.store.to_dataframe(records)
+
+    def get_current_price(self, markets):
+        prices = {}
+        for market in [markets] if isinstance(markets, str) else markets:
+            records = self._visible(market, self.price_interval)
+            prices[market] = float(records["close"][-1]) if len(records) else None
+        return prices.get(markets) if isinstance(markets, str) else prices
+
+
+class PaperExchange:
+    """
+    모의 계좌와 주문 체결 엔진. UpbitClient 의 주문/잔고/시세 메서드를 같은 응답 형식으로 제공합니다.
+    - 시장가 매수('price')/매도('market'): 호가를 소비하며 즉시 체결, 호가가 부족하면 남은 부분은 취소
+    - 지정가('limit'): 체결 가능한 부분은 즉시 체결하고 나머지는 대기, 호가가 갱신될 때마다 다시 매칭
+    - 수수료: 매수는 체결 금액에 더해 차감, 매도는 체결 대금에서 차감
+    """
+
+    def __init__(self, market_data, cash: float = 1_000_000.0, clock: SimulatedClock = None,
+                 orderbooks: Callable = None, fee_rate: float = FEE_RATE, min_order_amount: float = MIN_ORDER_AMOUNT,
+                 book_refresh_seconds: float = 1.0, synthetic_depth: Dict = None):
+        """
+        :param market_data: get_ohlcv / get_current_price 를 제공하는 시세 소스 (UpbitClient 또는 ReplayMarketData).
+        :param cash: float - 초기 현금 (KRW).
+        :param clock: SimulatedClock - 모의 시계, None 이면 실제 시간.
+        :param orderbooks: Callable - (시장, 기준가) -> OrderBook, None 이거나 None 을 반환하면 합성 호가 사용.
+        :param fee_rate: float - 수수료율.
+        :param min_order_amount: float - 최소 주문 금액 (KRW).
+        :param book_refresh_seconds: float - 호가를 새로 가져오는 간격 (모의 시계 기준 초).
+        :param synthetic_depth: Dict - OrderBook.synthetic 에 넘길 설정.
+        """
+        self.market_data = market_data
+        self.clock = clock or SimulatedClock()
+        self.orderbooks = orderbooks
+        self.fee_rate = fee_rate
+        self.min_order_amount = min_order_amount
+        self.book_refresh_seconds = book_refresh_seconds
+        self.synthetic_depth = synthetic_depth or {}
+        self.accounts = {"KRW": {"balance": cash, "locked": 0.0, "avg_buy_price": 0.0}}
+        self.orders: Dict[str, Dict] = {}
+        self.books: Dict[str, OrderBook] = {}
+        self._refreshed: Dict[str, datetime.datetime] = {}
+        self._lock = threading.RLock()
+
+    # ===========================
+    # 시세
+    # ===========================
+
+    def get_ohlcv(self, market: str = "KRW-BTC", interval: str = "day", count: int = 200, to=None) -> pd.DataFrame:
+        return self.market_data.get_ohlcv(market, interval=interval, count=count, to=to)
+
+    def get_current_price(self, markets):
+        return self.market_data.get_current_price(markets)
+
+    def get_tickers(self, markets) -> list:
+        prices = self.get_current_price([markets] if isinstance(markets, str) else list(markets))
+        return [{"market": market, "trade_price": price} for market, price in prices.items()]
+
+    def get_orderbook(self, markets) -> list:
+        with self._lock:
+            return [self.book(market).to_snapshot() for market in ([markets] if isinstance(markets, str) else markets)]
+
+    def book(self, market: str) -> OrderBook:
+        """
+        시장의 현재 호가를 반환합니다. 갱신 간격이 지났으면 새로 가져오고 대기 중인 지정가 주문을 매칭합니다.
+        """
+        with self._lock:
+            now = self.clock.now()
+            last = self._refreshed.get(market)
+            if market not in self.books or (now - last).total_seconds() >= self.book_refresh_seconds:
+                mid_price = self.market_data.get_current_price(market)
+                book = self.orderbooks(market, mid_price) if self.orderbooks is not None else None
+                if book is None:
+                    if not mid_price:
+                        raise UpbitAPIError(f"{market} 시세가 없어 호가를 만들 수 없습니다.", 400)
+                    book = OrderBook.synthetic(market, mid_price, timestamp=now, **self.synthetic_depth)
+                self.books[market], self._refreshed[market] = book, now
+                self._match_resting(market)
+            return self.books[market]
+
+    # ===========================
+    # 계좌
+    # ===========================
+
+    def _account(self, currency: str) -> Dict:
+        return self.accounts.setdefault(currency, {"balance": 0.0, "locked": 0.0, "avg_buy_price": 0.0})
+
+    def get_accounts(self) -> list:
+        """
+        업비트 /v1/accounts 응답 형식의 잔고 목록을 반환합니다.
+        """
+        with self._lock:
+            for market in list(self.books):
+                self.book(market)  # 대기 주문 체결 반영
+            return [
+                {
+                    "currency": currency,
+                    "balance": _format(account["balance"]),
+                    "locked": _format(account["locked"]),
+                    "avg_buy_price": _format(account["avg_buy_price"]),
+                    "avg_buy_price_modified": False,
+                    "unit_currency": "KRW",
+                }
+                for currency, account in self.accounts.items()
+                if currency == "KRW" or account["balance"] + account["locked"] > 0
+            ]
+
+    # ===========================
+    # 주문
+    # ===========================
+
+    def place_order(self, market: str, side: str, ord_type: str, volume: float = None,
+                    price: float = None) -> dict:
+        """
+        주문을 접수하고 가능한 만큼 즉시 체결합니다 (UpbitClient.place_order 와 같은 인자).
+        :raises UpbitAPIError: 최소 주문 금액 미만, 잔고 부족, 잘못된 주문 유형.
+        """
+        with self._lock:
+            book = self.book(market)
+            currency = market.split("-")[1]
+            now = self.clock.now()
+            order = {
+                "uuid": str(uuid.uuid4()), "side": side, "ord_type": ord_type, "market": market,
+                "state": "wait", "created_at": KST.localize(now).isoformat(),
+                "price": price, "volume": volume, "remaining_volume": volume, "executed_volume": 0.0,
+                "executed_funds": 0.0, "paid_fee": 0.0, "locked": 0.0, "trades": [],
+            }
+
+            if ord_type == "price" and side == "bid":
+                self._check_minimum(price, "bid")
+                order["locked"] = self._lock_funds("KRW", price * (1 + self.fee_rate), "bid")
+                self._apply_fills(order, book.take("bid", funds=price))
+                self._close_market_order(order)
+            elif ord_type == "market" and side == "ask":
+                self._check_minimum(volume * (book.mid_price or self.market_data.get_current_price(market) or 0), "ask")
+                order["locked"] = self._lock_funds(currency, volume, "ask")
+                order["volume"] = order["remaining_volume"] = order["locked"]
+                self._apply_fills(order, book.take("ask", volume=order["locked"]))
+                self._close_market_order(order)
+            elif ord_type == "limit" and side in ("bid", "ask"):
+                self._check_minimum(price * volume, side)
+                reserve = price * volume * (1 + self.fee_rate) if side == "bid" else volume
+                order["locked"] = self._lock_funds("KRW" if side == "bid" else currency, reserve, side)
+                if side == "ask":
+                    order["volume"] = order["remaining_volume"] = order["locked"]
+                self._apply_fills(order, book.take(side, volume=order["remaining_volume"], limit=price))
+                self._close_filled_limit_order(order)
+            else:
+                raise UpbitAPIError(f"지원하지 않는 주문 유형입니다: {side}/{ord_type}", 400)
+
+            self.orders[order["uuid"]] = order
+            logging.info(
+                f"[모의 주문] {market} {side}/{ord_type} 체결 {_format(order['executed_volume'])} "
+                f"({order['state']}, 수수료 {order['paid_fee']:.2f} KRW)"
+            )
+            return self._order_response(order, with_trades=False)
+
+    def buy_market_order(self, market: str, price: float) -> dict:
+        return self.place_order(market, "bid", "price", price=price)
+
+    def sell_market_order(self, market: str, volume: float) -> dict:
+        return self.place_order(market, "ask", "market", volume=volume)
+
+    def buy_limit_order(self, market: str, price: float, volume: float) -> dict:
+        return self.place_order(market, "bid", "limit", volume=volume, price=price)
+
+    def sell_limit_order(self, market: str, price: float, volume: float) -> dict:
+        return self.place_order(market, "ask", "limit", volume=volume, price=price)
+
+    def get_order(self, order_uuid: str) -> dict:
+        """
+        주문 상세(체결 내역 포함)를 반환합니다. 대기 주문은 호가를 갱신해 다시 매칭한 뒤 반환합니다.
+        """
+        with self._lock:
+            order = self._get(order_uuid)
+            if order["state"] == "wait":
+                self.book(order["market"])
+            return self._order_response(order, with_trades=True)
+
+    def cancel_order(self, order_uuid: str) -> dict:
+        """
+        대기 중인 주문을 취소하고 묶인 잔고를 돌려줍니다.
+        """
+        with self._lock:
+            order = self._get(order_uuid)
+            if order["state"] != "wait":
+                raise UpbitAPIError(f"대기 중인 주문이 아닙니다: {order_uuid}", 400, {"error": {"name": "order_not_found"}})
+            self._release(order)
+            order["state"] = "cancel"
+            return self._order_response(order, with_trades=False)
+
+    # ===========================
+    # 체결 처리
+    # ===========================
+
+    def _get(self, order_uuid: str) -> Dict:
+        order = self.orders.get(order_uuid)
+        if order is None:
+            raise UpbitAPIError(f"주문을 찾을 수 없습니다: {order_uuid}", 404, {"error": {"name": "order_not_found"}})
+        return order
+
+    def _check_minimum(self, amount: float, side: str) -> None:
+        if amount is None or amount < self.min_order_amount:
+            name = "under_min_total_bid" if side == "bid" else "under_min_total_ask"
+            raise UpbitAPIError(f"최소 주문 금액 미만입니다: {amount}", 400, {"error": {"name": name}})
+
+    def _lock_funds(self, currency: str, amount: float, side: str) -> float:
+        # 잔고를 묶고 실제로 묶인 양을 반환 (부동소수점 오차만큼 초과한 요청은 잔고 전체로 맞춤)
+        account = self._account(currency)
+        if amount > account["balance"] * (1 + 1e-9):
+            name = "insufficient_funds_bid" if side == "bid" else "insufficient_funds_ask"
+            raise UpbitAPIError(f"잔고가 부족합니다: {currency} {amount}", 400, {"error": {"name": name}})
+        amount = min(amount, account["balance"])
+        account["balance"] -= amount
+        account["locked"] += amount
+        return amount
+
+    def _apply_fills(self, order: Dict, fills: List[List[float]]) -> None:
+        # 체결마다 잔고를 옮기고 체결 내역을 기록 (매수는 묶인 KRW 에서 차감, 매도는 묶인 코인에서 차감)
+        currency = order["market"].split("-")[1]
+        krw, coin = self._account("KRW"), self._account(currency)
+        for price, volume in fills:
+            funds = price * volume
+            fee = funds * self.fee_rate
+            if order["side"] == "bid":
+                cost = funds + fee
+                krw["locked"] -= cost
+                order["locked"] -= cost
+                coin["avg_buy_price"] = (
+                    (coin["balance"] + coin["locked"]) * coin["avg_buy_price"] + funds
+                ) / (coin["balance"] + coin["locked"] + volume)
+                coin["balance"] += volume
+            else:
+                coin["locked"] -= volume
+                order["locked"] -= volume
+                krw["balance"] += funds - fee
+                if coin["balance"] + coin["locked"] <= 1e-12:
+                    coin["avg_buy_price"] = 0.0
+            order["executed_volume"] += volume
+            order["executed_funds"] += funds
+            order["paid_fee"] += fee
+            if order["remaining_volume"] is not None:
+                order["remaining_volume"] -= volume
+            order["trades"].append({
+                "market": order["market"], "uuid": str(uuid.uuid4()), "price": _format(price),
+                "volume": _format(volume), "funds": _format(funds), "side": order["side"],
+                "created_at": KST.localize(self.clock.now()).isoformat(),
+            })
+
+    def _release(self, order: Dict) -> None:
+        # 남은 묶인 잔고를 사용 가능 잔고로 돌려줌
+        currency = "KRW" if order["side"] == "bid" else order["market"].split("-")[1]
+        account = self._account(currency)
+        account["locked"] -= order["locked"]
+        account["balance"] += order["locked"]
+        order["locked"] = 0.0
+        if abs(account["locked"]) < 1e-9:
+            account["locked"] = 0.0  # 체결 금액 합산 오차 정리
+
+    def _close_market_order(self, order: Dict) -> None:
+        # 시장가 주문은 호가가 부족해 남은 부분이 있으면 취소 (업비트와 같은 동작)
+        filled = (order["remaining_volume"] is not None and order["remaining_volume"] <= 1e-12) or (
+            order["ord_type"] == "price" and order["executed_funds"] >= order["price"] - 1e-6
+        )
+        self._release(order)
+        order["state"] = "done" if filled else "cancel"
+
+    def _match_resting(self, market: str) -> None:
+        book = self.books[market]
+        for order in self.orders.values():
+            if order["market"] != market or order["state"] != "wait":
+                continue
+            self._apply_fills(order, book.take(order["side"], volume=order["remaining_volume"], limit=order["price"]))
+            self._close_filled_limit_order(order)
+
+    def _close_filled_limit_order(self, order: Dict) -> None:
+        # 지정가 주문이 모두 체결되면 완료 처리
+        if order["remaining_volume"] <= 1e-12:
+            order["state"] = "done"
+            if order["side"] == "bid":
+                self._release(order)  # 지정가보다 싸게 체결되어 남은 예약 금액 반환
+
+    def _order_response(self, order: Dict, with_trades: bool) -> dict:
+        response = {
+            key: (_format(value) if isinstance(value, float) else value)
+            for key, value in order.items() if key not in ("trades", "executed_funds")
+        }
+        response["trades_count"] = len(order["trades"])
+        if with_trades:
+            response["trades"] = list(order["trades"])
+        return response
@@ -0,0 +1,389 @@
+# exchange/upbit_client.py
+import datetime
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, unquote
+import jwt
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# 모든 업비트 API 호출이 공유하는 커넥션 풀, 요청 그룹별 속도 제한, 재시도를 제공하는 클라이언트 모듈
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+dotenv_path = os.path.join(BASE_DIR, ".env")
+load_dotenv(dotenv_path)
+
+UPBIT_BASE_URL = "https://api.upbit.com"
+
+# 요청 그룹별 초당 허용 요청 수 (업비트 요청 수 제한 정책 기준)
+RATE_LIMITS = {
+    "market": 10,
+    "candle": 10,
+    "ticker": 10,
+    "orderbook": 10,
+    "trade": 10,
+    "default": 30,  # 주문 외 Exchange API
+    "order": 8,
+}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+REMAINING_REQ_PATTERN = re.compile(r"group=([a-z\-]+); min=([0-9]+); sec=([0-9]+)")
+
+
+class UpbitAPIError(Exception):
+    """
+    업비트 API 요청 실패 (재시도 후에도 실패했거나 재시도 대상이 아닌 오류 응답).
+    """
+
+    def __init__(self, message: str, status_code: int = None, payload=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.payload = payload
+
+
+class TokenBucket:
+    """
+    초당 rate 개의 토큰이 채워지는 토큰 버킷. acquire 는 토큰이 생길 때까지 대기합니다.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """
+        토큰 하나를 사용합니다.
+        :return: float - 대기한 시간(초).
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self) -> None:
+        """
+        서버가 남은 요청 수를 0으로 알려온 경우 남은 토큰을 비워 다음 초까지 대기하게 합니다.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+
+class UpbitClient:
+    """
+    업비트 REST API 클라이언트.
+    - keep-alive 커넥션 풀을 가진 requests.Session 공유
+    - 요청 그룹별 토큰 버킷 속도 제한 (Remaining-Req 헤더 반영)
+    - 429/5xx 응답과 네트워크 오류에 대해 지터를 준 지수 백오프 재시도
+    - 모든 호출에 타임아웃 적용
+    """
+
+    def __init__(self, access_key: str = None, secret_key: str = None, timeout: tuple = (3.05, 10),
+                 max_retries: int = 3, backoff_base: float = 0.5, pool_size: int = 10,
+                 base_url: str = UPBIT_BASE_URL):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.base_url = base_url
+        self.limiters = {group: TokenBucket(rate) for group, rate in RATE_LIMITS.items()}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(RATE_LIMITS), pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+    # ===========================
+    # 요청 공통 처리
+    # ===========================
+
+    def _auth_headers(self, params: dict = None) -> dict:
+        payload = {"access_key": self.access_key, "nonce": str(uuid.uuid4())}
+        if params:
+            query = unquote(urlencode(params, doseq=True)).encode()
+            payload["query_hash"] = hashlib.sha512(query).hexdigest()
+            payload["query_hash_alg"] = "SHA512"
+        return {"Authorization": f"Bearer {jwt.encode(payload, self.secret_key)}"}
+
+    def _update_limit(self, group: str, response: requests.Response) -> None:
+        matched = REMAINING_REQ_PATTERN.search(response.headers.get("Remaining-Req", ""))
+        if matched and int(matched.group(3)) == 0:
+            self.limiters[group].drain()
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 0 ~ base * 2^attempt 사이의 임의 지연
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def request(self, method: str, path: str, group: str = "default", params: dict = None,
+                auth: bool = False):
+        """
+        업비트 API 를 호출하고 JSON 응답을 반환합니다.
+        :param method: str - HTTP 메서드 ('GET', 'POST', 'DELETE').
+        :param path: str - API 경로 (예: '/v1/accounts').
+        :param group: str - 요청 수 제한 그룹 (RATE_LIMITS 의 키).
+        :param params: dict - 요청 파라미터 (POST 는 JSON 본문으로 전송).
+        :param auth: bool - 인증이 필요한 Exchange API 여부.
+        :return: JSON 응답.
+        :raises UpbitAPIError: 재시도 후에도 실패한 경우.
+        """
+        url = f"{self.base_url}{path}"
+        limiter = self.limiters.get(group, self.limiters["default"])
+        # 주문 전송(POST)은 중복 체결을 막기 위해 서버가 거절한 429 응답만 재시도
+        retry_codes = {429} if method == "POST" else RETRY_STATUS_CODES
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            headers = self._auth_headers(params) if auth else {}
+            try:
+                if method == "POST":
+                    response = self.session.post(url, json=params, headers=headers, timeout=self.timeout)
+                else:
+                    response = self.session.request(method, url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = UpbitAPIError(f"업비트 API 연결 오류: {e}")
+                if method == "POST":
+                    raise last_error
+            else:
+                self._update_limit(group, response)
+                if response.status_code < 400:
+                    return response.json()
+                try:
+                    payload = response.json()
+                except ValueError:
+                    payload = response.text
+                last_error = UpbitAPIError(
+                    f"업비트 API 오류: {response.status_code} - {payload}", response.status_code, payload
+                )
+                if response.status_code not in retry_codes:
+                    raise last_error
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                logging.warning(f"업비트 API 재시도 {attempt + 1}/{self.max_retries} ({path}): {last_error}, {delay:.2f}초 후")
+                time.sleep(delay)
+
+        raise last_error
+
+    # ===========================
+    # Quotation API
+    # ===========================
+
+    @staticmethod
+    def _candle_path(interval: str) -> str:
+        if interval in ("day", "days"):
+            return "/v1/candles/days"
+        if interval in ("week", "weeks"):
+            return "/v1/candles/weeks"
+        if interval in ("month", "months"):
+            return "/v1/candles/months"
+        if interval.startswith("minute"):
+            return f"/v1/candles/minutes/{int(re.sub(r'[^0-9]', '', interval))}"
+        raise ValueError(f"지원하지 않는 봉 간격입니다: {interval}")
+
+    def get_ohlcv(self, market: str = "KRW-BTC", interval: str = "day", count: int = 200,
+                  to=None) -> pd.DataFrame:
+        """
+        캔들 데이터를 pyupbit.get_ohlcv 와 같은 형식으로 가져옵니다 (200개 단위로 나눠 요청).
+        :param market: str - 시장 식별자.
+        :param interval: str - 봉 간격 ('day', 'minute5' 등).
+        :param count: int - 가져올 캔들 수.
+        :param to: datetime/str - 마지막 캔들 시각 (UTC), 기본값은 현재.
+        :return: DataFrame - 캔들 데이터 (열: open, high, low, close, volume, value).
+        """
+        path = self._candle_path(interval)
+        if isinstance(to, (datetime.datetime, pd.Timestamp)):
+            to = to.strftime("%Y-%m-%d %H:%M:%S")
+
+        contents = []
+        remaining = max(count, 1)
+        while remaining > 0:
+            params = {"market": market, "count": min(200, remaining)}
+            if to is not None:
+                params["to"] = to
+            page = self.request("GET", path, group="candle", params=params)
+            if not page:
+                break
+            contents.extend(page)
+            remaining -= len(page)
+            to = page[-1]["candle_date_time_utc"].replace("T", " ")
+
+        index = [datetime.datetime.strptime(x["candle_date_time_kst"], "%Y-%m-%dT%H:%M:%S") for x in contents]
+        data = pd.DataFrame(contents, index=index, columns=[
+            "opening_price", "high_price", "low_price", "trade_price",
+            "candle_acc_trade_volume", "candle_acc_trade_price",
+        ]).rename(columns={
+            "opening_price": "open",
+            "high_price": "high",
+            "low_price": "low",
+            "trade_price": "close",
+            "candle_acc_trade_volume": "volume",
+            "candle_acc_trade_price": "value",
+        })
+        return data[~data.index.duplicated()].sort_index()
+
+    def get_tickers(self, markets) -> list:
+        """
+        여러 시장의 현재 시세를 한 번의 요청으로 가져옵니다.
+        :param markets: str/list - 시장 식별자 또는 목록.
+        :return: list - 시장별 시세 정보.
+        """
+        if isinstance(markets, str):
+            markets = [markets]
+        return self.request("GET", "/v1/ticker", group="ticker", params={"markets": ",".join(markets)})
+
+    def get_current_price(self, markets):
+        """
+        현재 체결 가격을 가져옵니다.
+        :param markets: str/list - 시장 식별자 또는 목록.
+        :return: float (단일 시장) 또는 dict {시장: 가격} (목록).
+        """
+        prices = {ticker["market"]: ticker["trade_price"] for ticker in self.get_tickers(markets)}
+        if isinstance(markets, str):
+            return prices.get(markets)
+        return prices
+
+    def get_orderbook(self, markets) -> list:
+        """
+        호가 정보를 가져옵니다.
+        :param markets: str/list - 시장 식별자 또는 목록.
+        :return: list - 시장별 호가 정보.
+        """
+        if isinstance(markets, str):
+            markets = [markets]
+        return self.request("GET", "/v1/orderbook", group="orderbook", params={"markets": ",".join(markets)})
+
+    # ===========================
+    # Exchange API
+    # ===========================
+
+    def get_accounts(self) -> list:
+        """
+        보유 자산 목록을 가져옵니다.
+        """
+        return self.request("GET", "/v1/accounts", auth=True)
+
+    def get_order(self, order_uuid: str) -> dict:
+        """
+        주문 상세(체결 내역 포함)를 가져옵니다.
+        """
+        return self.request("GET", "/v1/order", params={"uuid": order_uuid}, auth=True)
+
+    def cancel_order(self, order_uuid: str) -> dict:
+        """
+        주문을 취소합니다.
+        """
+        return self.request("DELETE", "/v1/order", group="order", params={"uuid": order_uuid}, auth=True)
+
+    def place_order(self, market: str, side: str, ord_type: str, volume: float = None,
+                    price: float = None) -> dict:
+        """
+        주문을 전송합니다.
+        :param market: str - 시장 식별자.
+        :param side: str - 'bid'(매수) 또는 'ask'(매도).
+        :param ord_type: str - 'limit', 'price'(시장가 매수), 'market'(시장가 매도).
+        :param volume: float - 주문 수량.
+        :param price: float - 주문 가격 (시장가 매수는 주문 총액).
+        :return: dict - 주문 접수 결과.
+        """
+        params = {"market": market, "side": side, "ord_type": ord_type}
+        if volume is not None:
+            params["volume"] = f"{volume:.8f}".rstrip("0").rstrip(".")
+        if price is not None:
+            params["price"] = f"{price:.8f}".rstrip("0").rstrip(".")
+        return self.request("POST", "/v1/orders", group="order", params=params, auth=True)
+
+    def buy_market_order(self, market: str, price: float) -> dict:
+        return self.place_order(market, "bid", "price", price=price)
+
+    def sell_market_order(self, market: str, volume: float) -> dict:
+        return self.place_order(market, "ask", "market", volume=volume)
+
+    def buy_limit_order(self, market: str, price: float, volume: float) -> dict:
+        return self.place_order(market, "bid", "limit", volume=volume, price=price)
+
+    def sell_limit_order(self, market: str, price: float, volume: float) -> dict:
+        return self.place_order(market, "ask", "limit", volume=volume, price=price)
+
+
+# ===========================
+# 공유 클라이언트
+# ===========================
+
+_clients = {}
+_clients_lock = threading.Lock()
+_override = None
+
+
+def set_upbit_client(client) -> None:
+    """
+    모든 get_upbit_client 호출이 반환할 클라이언트를 설치합니다 (예: 모의 거래소 PaperExchange).
+    :param client: UpbitClient 와 같은 메서드를 가진 객체, None 이면 실제 클라이언트로 되돌림.
+    """
+    global _override
+    with _clients_lock:
+        _override = client
+
+
+def get_upbit_client(access_key: str = None, secret_key: str = None) -> UpbitClient:
+    """
+    API 키별로 하나씩 생성되는 공유 클라이언트를 반환합니다 (기본값은 .env 의 키).
+    set_upbit_client 로 설치된 클라이언트가 있으면 키와 관계없이 그 클라이언트를 반환합니다.
+    :param access_key: str - 업비트 API Access Key.
+    :param secret_key: str - 업비트 API Secret Key.
+    :return: UpbitClient - 공유 클라이언트.
+    """
+    if _override is not None:
+        return _override
+    access_key = access_key or os.getenv("UPBIT_API_KEY")
+    secret_key = secret_key or os.getenv("UPBIT_API_SECRET")
+    with _clients_lock:
+        if access_key not in _clients:
+            _clients[access_key] = UpbitClient(access_key, secret_key)
+        return _clients[access_key]
+
+
+def get_ohlcv(market: str = "KRW-BTC", interval: str = "day", count: int = 200, to=None) -> pd.DataFrame:
+    """
+    공유 클라이언트로 캔들 데이터를 가져옵니다 (pyupbit.get_ohlcv 처럼 실패 시 None).
+    """
+    try:
+        return get_upbit_client().get_ohlcv(market, interval=interval, count=count, to=to)
+    except Exception as e:
+        logging.error(f"캔들 데이터 요청 실패: {market} {interval} - {e}")
+        return None
+
+
+def get_current_price(markets="KRW-BTC"):
+    """
+    공유 클라이언트로 현재 가격을 가져옵니다 (pyupbit.get_current_price 처럼 실패 시 None).
+    """
+    try:
+        return get_upbit_client().get_current_price(markets)
+    except Exception as e:
+        logging.error(f"현재 가격 요청 실패: {markets} - {e}")
+        return None
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+import openai
+from gpt_interface.instrumentation import RequestMetrics
+from gpt_interface.prompt_templates import PREFIX_CACHE_METER
+from gpt_interface.response_decoder import decode_payload
+
+# 마감 시간 안에서 GPT 요청을 비동기로 보내고, 응답이 늦으면 중복(헤지) 요청을 보내는 모듈
+# 마감 시간이 지나면 항상 같은 hold 판단으로 대체합니다.
+
+DEFAULT_HEDGE_DELAY = 8.0  # 지연 기록이 부족할 때 헤지 요청까지 기다리는 시간(초)
+HEDGE_PERCENTILE = 95  # 이 백분위 지연을 넘으면 헤지 요청 전송
+MIN_SAMPLES = 20  # 백분위 계산에 필요한 최소 기록 수
+
+FALLBACK_REASON = "No decision was received before the deadline, so the position is held."
+
+
+class LatencyTracker:
+    """
+    모델별 최근 응답 지연(초)을 기록하고 백분위를 계산합니다 (스레드 안전).
+    """
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.samples = {}
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def record_failure(self, model: str) -> None:
+        with self._lock:
+            self.failures[model] = self.failures.get(model, 0) + 1
+
+    def percentile(self, model: str, q: float, min_samples: int = MIN_SAMPLES) -> Optional[float]:
+        """
+        모델의 q 백분위 지연을 반환합니다.
+        :return: float - 지연(초) 또는 기록이 부족하면 None.
+        """
+        with self._lock:
+            samples = list(self.samples.get(model, ()))
+        if len(samples) < min_samples:
+            return None
+        return float(np.percentile(samples, q))
+
+    def summary(self, model: str) -> Dict:
+        """
+        모델의 지연 요약 (count, failures, p50, p95, p99, max)을 반환합니다.
+        """
+        with self._lock:
+            samples = np.array(self.samples.get(model, ()), dtype=float)
+            failures = self.failures.get(model, 0)
+        if samples.size == 0:
+            return {"count": 0, "failures": failures}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            "count": int(samples.size),
+            "failures": failures,
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(samples.max()), 3),
+        }
+
+
+LATENCY_TRACKER = LatencyTracker()
+
+
+def fallback_decision(reason: str = FALLBACK_REASON) -> Dict:
+    """
+    마감 시간 초과 또는 요청 실패 시 사용할 hold 판단을 반환합니다.
+    """
+    return {"action": "hold", "amount": 0.0, "reason": reason, "fallback": True}
+
+
+async def _complete(client, request_data: Dict, tracker: LatencyTracker, metrics: RequestMetrics = None) -> Dict:
+    # 스트리밍으로 받아 첫 토큰 시각(TTFT)을 측정하고, 완료된 내용만 디코딩
+    started = time.monotonic()
+    ttft, usage, parts = None, None, []
+    stream = await client.chat.completions.create(
+        model=request_data["model"],
+        messages=request_data["messages"],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    async for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            if ttft is None:
+                ttft = time.monotonic() - started
+            parts.append(chunk.choices[0].delta.content)
+    latency = time.monotonic() - started
+    tracker.record(request_data["model"], latency)
+    if usage is not None:
+        PREFIX_CACHE_METER.record(request_data["model"], usage)
+    payload = decode_payload("".join(parts))
+    if metrics is not None:
+        # 헤지 요청 중 먼저 완료된 요청의 측정값만 남도록 디코딩 성공 후 기록
+        metrics.ttft, metrics.latency = ttft, latency
+        if usage is not None:
+            metrics.observe_usage(usage)
+    return payload
+
+
+async def send_request_async(request_data: Dict, timeout: float, client=None,
+                             tracker: LatencyTracker = LATENCY_TRACKER, hedge_delay: float = None,
+                             metrics: RequestMetrics = None) -> Dict:
+    """
+    GPT 요청을 마감 시간 안에서 보냅니다. 첫 요청이 헤지 지연 안에 끝나지 않거나 실패하면
+    같은 요청을 한 번 더 보내고, 먼저 성공한 응답을 사용합니다.
+    :param request_data: Dict - prepare_request 로 만든 요청 데이터.
+    :param timeout: float - 남은 시간(초). 지나면 hold 로 대체합니다.
+    :param client: AsyncOpenAI 호환 클라이언트, None 이면 새로 만들어 사용 후 닫습니다.
+    :param tracker: LatencyTracker - 지연 기록 저장소.
+    :param hedge_delay: float - 헤지 요청까지 기다리는 시간(초), None 이면 기록된 백분위 지연 사용.
+    :param metrics: RequestMetrics - 토큰/지연/상태를 기록할 측정값, None 이면 기록하지 않음.
+    :return: Dict - GPT 응답 데이터 또는 fallback_decision().
+    """
+    if client is None:
+        async with openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0) as client:
+            return await send_request_async(request_data, timeout, client, tracker, hedge_delay, metrics)
+
+    model = request_data["model"]
+    if hedge_delay is None:
+        hedge_delay = tracker.percentile(model, HEDGE_PERCENTILE) or DEFAULT_HEDGE_DELAY
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    pending = {asyncio.ensure_future(_complete(client, request_data, tracker, metrics))}
+    hedged = False
+    last_error = None
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            wait = remaining if hedged else min(remaining, hedge_delay)
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                try:
+                    return task.result()
+                except Exception as e:
+                    tracker.record_failure(model)
+                    last_error = str(e)
+                    logging.error(f"GPT 요청 실패: {e}")
+
+            if not hedged and loop.time() < deadline:
+                # 첫 요청이 느리거나 실패하면 한 번만 중복 요청
+                hedged = True
+                if metrics is not None:
+                    metrics.hedged = True
+                logging.warning(f"GPT 응답 지연/실패로 헤지 요청 전송 (대기 {hedge_delay:.1f}초)")
+                pending.add(asyncio.ensure_future(_complete(client, request_data, tracker, metrics)))
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if pending:
+        tracker.record_failure(model)
+        logging.error(f"GPT 응답 마감 시간({timeout:.1f}초) 초과, hold 로 대체합니다.")
+        if metrics is not None:
+            metrics.fail("timeout", f"deadline {timeout:.1f}s exceeded")
+        return fallback_decision()
+    if metrics is not None:
+        metrics.fail("error", last_error)
+    return fallback_decision("The decision request failed, so the position is held.")
+
+
+def send_request_with_deadline(request_data: Dict, timeout: float, metrics: RequestMetrics = None) -> Dict:
+    """
+    send_request_async 를 동기 코드에서 호출합니다.
+    :param request_data: Dict - GPT 요청 데이터.
+    :param timeout: float - 남은 시간(초).
+    :param metrics: RequestMetrics - 토큰/지연/상태를 기록할 측정값.
+    :return: Dict - GPT 응답 데이터 또는 fallback_decision().
+    """
+    if timeout <= 0:
+        logging.error("GPT 요청 전에 사이클 시간 예산을 모두 사용했습니다. hold 로 대체합니다.")
+        if metrics is not None:
+            metrics.fail("timeout", "cycle budget exhausted before request")
+        return fallback_decision()
+    return asyncio.run(send_request_async(request_data, timeout, metrics=metrics))
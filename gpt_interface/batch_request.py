@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+import openai
+from gpt_interface.async_client import LATENCY_TRACKER, fallback_decision
+from gpt_interface.instrumentation import RequestMetrics
+from gpt_interface.prompt_encoder import DEFAULT_MODEL
+from gpt_interface.prompt_templates import BATCH_DECISION_TEMPLATE, PREFIX_CACHE_METER, PromptTemplate
+from gpt_interface.response_decoder import decode_decision, loads
+
+# 여러 시장의 스냅샷을 하나의 GPT 요청으로 묶고, 스트리밍 응답에서 시장별 판단이 완성되는 즉시 처리하는 모듈
+
+
+def prepare_batch_request(entries: Dict[str, str], model: str = DEFAULT_MODEL) -> Dict:
+    """
+    시장별로 포맷팅된 데이터를 공유 시스템 프롬프트를 가진 하나의 요청으로 묶습니다.
+    :param entries: Dict[str, str] - {시장: format_input 으로 포맷팅된 텍스트}.
+    :param model: str - 모델 이름.
+    :return: Dict - GPT API 요청 데이터 (prompt_tokens: 입력 토큰 수 포함).
+    """
+    try:
+        sections = "\n\n".join(f"### {market}\n{text}" for market, text in entries.items())
+        template = BATCH_DECISION_TEMPLATE
+        if model != template.model:
+            template = PromptTemplate(template.name, template.system_message["content"], template.user_prefix, model)
+        return template.build_request(f"Markets: {', '.join(entries)}\n\n{sections}")
+    except Exception as e:
+        raise ValueError(f"묶음 요청 데이터 생성 중 오류 발생: {e}")
+
+
+class StreamingArrayParser:
+    """
+    JSON 배열을 조각 단위로 받아, 배열 바로 아래의 객체가 닫히는 즉시 반환하는 증분 파서.
+    배열 앞의 설명 문자열이나 코드 블록 표시(```json)는 무시합니다.
+    """
+
+    def __init__(self):
+        self.depth = 0  # 0: 배열 시작 전, 1: 배열 안, 2 이상: 객체 안
+        self.in_string = False
+        self.escaped = False
+        self.current = []  # 진행 중인 객체 텍스트 조각
+        self.closed = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        텍스트 조각을 추가하고 새로 완성된 객체 목록을 반환합니다.
+        :param chunk: str - 스트림 텍스트 조각.
+        :return: List[Dict] - 완성된 객체 목록 (파싱 실패한 객체는 로그 후 건너뜀).
+        """
+        completed = []
+        start = 0 if self.depth >= 2 else None
+        for i, char in enumerate(chunk):
+            if self.closed:
+                break
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"' and self.depth >= 1:
+                self.in_string = True
+            elif char in "[{":
+                if self.depth == 0 and char == "{":
+                    continue  # 배열 없이 시작한 객체는 무시
+                self.depth += 1
+                if self.depth == 2:
+                    start = i
+            elif char in "]}":
+                if self.depth == 0:
+                    continue
+                self.depth -= 1
+                if self.depth == 1 and char == "}":
+                    self.current.append(chunk[start:i + 1])
+                    text, self.current, start = "".join(self.current), [], None
+                    try:
+                        completed.append(loads(text))
+                    except json.JSONDecodeError as e:
+                        logging.error(f"스트림 객체 파싱 실패: {e} - {text}")
+                elif self.depth == 0:
+                    self.closed = True
+
+        if start is not None and self.depth >= 2:
+            self.current.append(chunk[start:])
+        return completed
+
+
+def validate_market_decision(item: Dict, markets) -> Optional[Dict]:
+    """
+    시장별 판단의 필수 필드와 값을 검증합니다.
+    :param item: Dict - 스트림에서 완성된 판단 객체.
+    :param markets: 요청에 포함된 시장 목록.
+    :return: Dict - decode_decision 으로 정규화한 판단 (market 제외) 또는 유효하지 않으면 None.
+    """
+    if not isinstance(item, dict):
+        logging.error(f"유효하지 않은 판단 형식: {item}")
+        return None
+    market = item.get("market")
+    if market not in markets:
+        logging.error(f"요청하지 않은 시장의 판단: {item}")
+        return None
+    try:
+        decision = decode_decision(item, market)
+    except ValueError as e:
+        logging.error(f"{market} 판단이 유효하지 않습니다: {e} - {item}")
+        return None
+    decision.pop("market")
+    return decision
+
+
+async def stream_batch_decisions_async(request_data: Dict, markets: List[str],
+                                       on_decision: Callable[[str, Dict], None], timeout: float,
+                                       client=None, metrics: RequestMetrics = None) -> Dict[str, Dict]:
+    """
+    묶음 요청을 스트리밍으로 보내고, 시장별 판단이 완성될 때마다 on_decision 을 호출합니다.
+    마감 시간까지 판단을 받지 못했거나 판단이 유효하지 않은 시장은 hold 로 대체합니다.
+    :param request_data: Dict - prepare_batch_request 로 만든 요청 데이터.
+    :param markets: List[str] - 요청에 포함된 시장 목록.
+    :param on_decision: Callable - (시장, 판단) 을 받는 콜백 (스트림 수신 중에 호출됨).
+    :param timeout: float - 남은 시간(초).
+    :param client: AsyncOpenAI 호환 클라이언트, None 이면 새로 만들어 사용 후 닫습니다.
+    :param metrics: RequestMetrics - 토큰/지연/상태를 기록할 측정값, None 이면 기록하지 않음.
+    :return: Dict[str, Dict] - {시장: 판단}.
+    """
+    if client is None:
+        async with openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0) as client:
+            return await stream_batch_decisions_async(request_data, markets, on_decision, timeout, client, metrics)
+
+    decisions = {}
+    model = request_data["model"]
+
+    def emit(market: str, decision: Dict) -> None:
+        decisions[market] = decision
+        try:
+            on_decision(market, decision)
+        except Exception as e:
+            logging.error(f"{market} 판단 처리 중 오류 발생: {e}")
+
+    async def consume() -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        parser = StreamingArrayParser()
+        stream = await client.chat.completions.create(
+            model=model, messages=request_data["messages"], stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                PREFIX_CACHE_METER.record(model, chunk.usage)
+                if metrics is not None:
+                    metrics.observe_usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            if metrics is not None and metrics.ttft is None and chunk.choices[0].delta.content:
+                metrics.ttft = loop.time() - started
+            for item in parser.feed(chunk.choices[0].delta.content or ""):
+                decision = validate_market_decision(item, markets)
+                if decision is not None and item["market"] not in decisions:
+                    logging.info(f"{item['market']} 판단 수신 ({loop.time() - started:.2f}초): {decision}")
+                    emit(item["market"], decision)
+        LATENCY_TRACKER.record(model, loop.time() - started)
+        if metrics is not None:
+            metrics.latency = loop.time() - started
+
+    try:
+        await asyncio.wait_for(consume(), timeout=max(timeout, 0))
+    except asyncio.TimeoutError:
+        LATENCY_TRACKER.record_failure(model)
+        logging.error(f"GPT 묶음 응답 마감 시간({timeout:.1f}초) 초과")
+        if metrics is not None:
+            metrics.fail("timeout", f"deadline {timeout:.1f}s exceeded")
+    except Exception as e:
+        LATENCY_TRACKER.record_failure(model)
+        logging.error(f"GPT 묶음 요청 처리 중 오류 발생: {e}")
+        if metrics is not None:
+            metrics.fail("error", str(e))
+
+    for market in markets:
+        if market not in decisions:
+            emit(market, fallback_decision())
+    return decisions
+
+
+def stream_batch_decisions(request_data: Dict, markets: List[str], on_decision: Callable[[str, Dict], None],
+                           timeout: float, metrics: RequestMetrics = None) -> Dict[str, Dict]:
+    """
+    stream_batch_decisions_async 를 동기 코드에서 호출합니다.
+    """
+    return asyncio.run(stream_batch_decisions_async(request_data, markets, on_decision, timeout, metrics=metrics))
@@ -0,0 +1,125 @@
+import bisect
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from gpt_interface.feasibility import MIN_ORDER_AMOUNT
+
+# 시장 상태가 크게 바뀌지 않았으면 직전 GPT 판단을 재사용해 API 호출을 건너뛰는 캐시 모듈
+
+PRICE_STEP = 0.005  # 가격 구간 폭 (0.5%)
+VOLATILITY_REGIMES = (0.002, 0.005, 0.01)  # 가격 대비 표준편차 경계 (낮음/보통/높음/매우 높음)
+HOLDING_STEPS = 10  # 자산 비중 구간 수 (10% 단위)
+
+
+def snapshot_fingerprint(market, portfolio, price_step: float = PRICE_STEP) -> Optional[Tuple]:
+    """
+    시장/포트폴리오 스냅샷을 양자화한 캐시 키를 만듭니다.
+    (시장, 가격 구간, 추세, 변동성 구간, 자산 비중 구간, 매수 가능 여부, 매도 가능 여부)
+    :param market: MarketSnapshot - 시장 스냅샷.
+    :param portfolio: PortfolioSnapshot - 포트폴리오 스냅샷.
+    :param price_step: float - 가격 구간 폭 (비율).
+    :return: Tuple - 캐시 키 또는 키를 만들 수 없으면 None.
+    """
+    price = market.current_price
+    if not price or price <= 0 or portfolio.error:
+        return None
+
+    price_bucket = math.floor(math.log(price) / math.log1p(price_step))
+    volatility_regime = None
+    if market.max_volatility is not None:
+        volatility_regime = bisect.bisect(VOLATILITY_REGIMES, market.max_volatility / price)
+
+    asset_value = (portfolio.balance or 0.0) * price
+    cash = portfolio.cash_balance or 0.0
+    total = cash + asset_value
+    holding_bucket = round(asset_value / total * HOLDING_STEPS) if total > 0 else 0
+
+    return (
+        market.market,
+        price_bucket,
+        market.trend,
+        volatility_regime,
+        holding_bucket,
+        cash >= MIN_ORDER_AMOUNT,
+        asset_value >= MIN_ORDER_AMOUNT,
+    )
+
+
+class DecisionCache:
+    """
+    TTL 과 LRU 제거를 가진 GPT 판단 캐시 (스레드 안전).
+    같은 키로 다시 조회하면 hold 판단은 그대로, buy/sell 판단은 중복 주문을 막기 위해 hold 로 바꿔 반환합니다.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 256, clock=time.monotonic):
+        """
+        :param ttl_seconds: float - 판단 유효 시간(초).
+        :param max_entries: int - 최대 항목 수 (초과하면 가장 오래 사용하지 않은 항목 제거).
+        :param clock: 현재 시각(초)을 반환하는 함수.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (저장 시각, 판단)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key) -> Optional[Dict]:
+        """
+        캐시된 판단을 조회합니다.
+        :param key: snapshot_fingerprint 로 만든 키.
+        :return: Dict - 재사용할 판단 (cached 필드 포함) 또는 없으면 None.
+        """
+        if key is None:
+            return None
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or self.clock() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            stored_at, decision = entry
+
+        decision = dict(decision)
+        if decision.get("action") in ("buy", "sell"):
+            decision["reason"] = f"직전 판단({decision['action']}) 이후 시장 상태 변화 없음: {decision.get('reason')}"
+            decision["action"], decision["amount"] = "hold", 0.0
+        decision["cached"] = True
+        decision["cache_age"] = round(self.clock() - stored_at, 1)
+        return decision
+
+    def put(self, key, decision: Dict) -> None:
+        """
+        판단을 저장합니다.
+        :param key: snapshot_fingerprint 로 만든 키 (None 이면 저장하지 않음).
+        :param decision: Dict - GPT 판단 (action, amount, reason).
+        """
+        if key is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self.entries[key] = (self.clock(), dict(decision))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """
+        캐시 적중 통계를 반환합니다.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+        }
+
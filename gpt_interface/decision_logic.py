@@ -3,48 +3,46 @@ from typing import Dict
 
 # 판단 로직 모듈
 from typing import Dict, Tuple, Optional  # Tuple과 Optional을 포함하여 typing 임포트
+from data_collection.snapshot import PortfolioSnapshot
+from gpt_interface.response_decoder import decode_decision
+from gpt_interface.feasibility import FEE_RATE, MIN_ORDER_AMOUNT
 
-def make_decision(gpt_response: Dict, portfolio: Dict, current_price ,market_name="KRW-BTC") -> Tuple[str, Optional[float]]:
+def make_decision(gpt_response: Dict, portfolio: Dict, current_price ,market_name="KRW-BTC",
+                  fee_rate: float = FEE_RATE, min_order_amount: float = MIN_ORDER_AMOUNT) -> Tuple[str, Optional[float]]:
     """
     GPT 응답 데이터를 기반으로 매수/매도/보류 판단을 결정하고 실행 가능성을 확인합니다.
     :param gpt_response: Dict - GPT 응답 데이터.
-    :param portfolio: Dict - 현재 포트폴리오 상태 (현금 및 투자 정보).
+    :param portfolio: PortfolioSnapshot 또는 Dict - 현재 포트폴리오 상태 (현금 및 투자 정보).
     :param market_name: str - 시장 이름 (예: 'KRW-BTC').
+    :param fee_rate: float - 거래 수수료율 (기본값은 업비트 0.05%, 백테스트는 모의 거래소의 수수료율).
+    :param min_order_amount: float - 최소 주문 금액 (KRW 기준).
     :return: Tuple[str, Optional[float]] - 결정된 행동 ('buy', 'sell', 'hold') 및 실행 금액 (None일 수 있음).
     """
     try:
-        fee_rate = 0.0005  # 거래 수수료율 0.05%
-        min_order_amount = 5000  # 업비트 최소 주문 금액 (KRW 기준)
-        action = gpt_response.get("action")
-        amount_str = gpt_response.get("amount")
-        reason = gpt_response.get("reason", "No reason provided.")
         target_currency = market_name.split("-")[1]
+        portfolio = PortfolioSnapshot.from_dict(portfolio, target_currency)
+
+        # 응답 검증 및 금액/통화 정규화 (잘못된 형식은 예외 -> hold)
+        decision = decode_decision(gpt_response, market_name)
+        action, amount, currency = decision["action"], decision["amount"], decision["currency"]
+        reason = decision["reason"]
 
         # 'hold' 처리
         if action == "hold":
             logging.info(f"Decision: {action}. Reason: {reason}")
             return "hold", 0
 
-        # 금액 변환
-        try:
-            if isinstance(amount_str, (float, int)):
-                amount = float(amount_str)
-                currency = target_currency if amount < min_order_amount else "KRW"
-            else:
-                amount = float(amount_str.split()[0])  # 금액 추출
-                currency = amount_str.split()[1]  # 통화 단위 추출 (KRW 또는 BTC)
-        except (ValueError, IndexError):
-            raise ValueError(f"Invalid amount format in GPT response: {amount_str}")
-
-        # 행동 유효성 확인
-        if action not in ["buy", "sell", "hold"]:
-            raise ValueError(f"Invalid action received from GPT: {action}")
+        # 주문 단위로 변환 (매수는 KRW, 매도는 코인 수량)
+        if action == "buy" and currency != "KRW":
+            amount, currency = amount * current_price, "KRW"
+        elif action == "sell" and currency == "KRW":
+            amount, currency = amount / current_price, target_currency
 
         logging.info(f"GPT Decision: {action} {amount} {currency}. Reason: {reason}")
 
         # 구매 로직
         if action == "buy":
-            cash_balance = portfolio.get("cash_balance", 0)
+            cash_balance = portfolio.cash_balance
 
             # 구매 가능 금액 계산
             max_purchase_amount = cash_balance / (1 + fee_rate)
@@ -73,9 +71,7 @@ def make_decision(gpt_response: Dict, portfolio: Dict, current_price ,market_nam
 
         # 판매 로직
         elif action == "sell":
-            target_asset = portfolio.get("target_asset", {})
-            asset_balance = target_asset.get("balance", 0)
-            print(current_price)
+            asset_balance = portfolio.balance
             if currency == target_currency:
                 total_value = amount * current_price
                 if total_value < min_order_amount:
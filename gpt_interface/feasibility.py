@@ -0,0 +1,93 @@
+import logging
+from gpt_interface.prompt_encoder import format_balance, format_number
+
+# GPT 요청 전에 포트폴리오, 가격, 수수료, 최소 주문 금액으로 가능한 행동과 금액 범위를 계산하는 모듈
+
+FEE_RATE = 0.0005  # 거래 수수료율 0.05%
+MIN_ORDER_AMOUNT = 5000  # 업비트 최소 주문 금액 (KRW 기준)
+
+
+class TradeConstraints:
+    """
+    한 시장에서 이번 사이클에 가능한 행동과 금액 범위.
+    - 매수: min_buy_krw ~ max_buy_krw (KRW)
+    - 매도: min_sell_volume ~ max_sell_volume (코인 수량)
+    """
+
+    __slots__ = (
+        "currency", "allowed_actions", "min_buy_krw", "max_buy_krw",
+        "min_sell_volume", "max_sell_volume", "reason",
+    )
+
+    def __init__(self, currency: str, allowed_actions: tuple, min_buy_krw: float = 0.0, max_buy_krw: float = 0.0,
+                 min_sell_volume: float = 0.0, max_sell_volume: float = 0.0, reason: str = None):
+        self.currency = currency
+        self.allowed_actions = allowed_actions
+        self.min_buy_krw = min_buy_krw
+        self.max_buy_krw = max_buy_krw
+        self.min_sell_volume = min_sell_volume
+        self.max_sell_volume = max_sell_volume
+        self.reason = reason  # hold 만 가능한 이유
+
+    @property
+    def only_hold(self) -> bool:
+        return self.allowed_actions == ("hold",)
+
+    def to_prompt(self) -> str:
+        """
+        프롬프트에 넣을 한 줄 요약을 반환합니다. 예: 'ALLOWED buy,hold buy=5000~49975KRW sell=none'
+        """
+        buy = (f"{format_number(self.min_buy_krw)}~{format_number(self.max_buy_krw)}KRW"
+               if "buy" in self.allowed_actions else "none")
+        sell = (f"{format_balance(self.min_sell_volume)}~{format_balance(self.max_sell_volume)}{self.currency}"
+                if "sell" in self.allowed_actions else "none")
+        return f"ALLOWED {','.join(self.allowed_actions)} buy={buy} sell={sell}"
+
+    def hold_decision(self) -> dict:
+        """
+        GPT 요청 없이 사용할 hold 판단을 반환합니다.
+        """
+        return {"action": "hold", "amount": 0.0, "currency": "KRW", "reason": self.reason, "skipped": True}
+
+
+def check_feasibility(portfolio, current_price: float, market_name: str = "KRW-BTC", fee_rate: float = FEE_RATE,
+                      min_order_amount: float = MIN_ORDER_AMOUNT) -> TradeConstraints:
+    """
+    현재 포트폴리오와 가격으로 가능한 행동과 금액 범위를 계산합니다.
+    (make_decision 의 최소 주문 금액/잔고 검사와 같은 기준)
+    :param portfolio: PortfolioSnapshot - 포트폴리오 스냅샷.
+    :param current_price: float - 현재 가격.
+    :param market_name: str - 시장 이름 (예: 'KRW-BTC').
+    :param fee_rate: float - 거래 수수료율.
+    :param min_order_amount: float - 최소 주문 금액 (KRW).
+    :return: TradeConstraints - 가능한 행동과 금액 범위.
+    """
+    currency = market_name.split("-")[1]
+    if portfolio.error:
+        return TradeConstraints(currency, ("hold",), reason=f"Portfolio is unavailable: {portfolio.error}")
+    if not current_price or current_price <= 0:
+        return TradeConstraints(currency, ("hold",), reason="Current price is unavailable.")
+
+    actions = []
+    max_buy_krw = (portfolio.cash_balance or 0.0) / (1 + fee_rate)
+    if max_buy_krw >= min_order_amount:
+        actions.append("buy")
+
+    balance = (portfolio.balance or 0.0) if portfolio.currency in (None, currency) else 0.0
+    min_sell_volume = min_order_amount / current_price
+    if balance >= min_sell_volume:
+        actions.append("sell")
+    actions.append("hold")
+
+    constraints = TradeConstraints(
+        currency, tuple(actions),
+        min_buy_krw=min_order_amount, max_buy_krw=max_buy_krw,
+        min_sell_volume=min_sell_volume, max_sell_volume=balance,
+    )
+    if constraints.only_hold:
+        constraints.reason = (
+            f"Only hold is possible: cash {max_buy_krw:,.0f} KRW and holdings worth "
+            f"{balance * current_price:,.0f} KRW are both below the minimum order of {min_order_amount:,.0f} KRW."
+        )
+        logging.info(f"{market_name} 거래 불가 ({constraints.reason}) - GPT 요청 생략")
+    return constraints
@@ -0,0 +1,157 @@
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+from gpt_interface.prompt_templates import usage_metrics
+from utils.request_stats import summarize_records
+
+# GPT 요청별 토큰, 지연, 비용, 판단 결과를 기록하고 최근 요청의 백분위를 계산하는 모듈
+# 기록은 sink(예: DB 저장 함수)로 넘기고, 메모리에는 최근 window 개만 보관합니다.
+
+# 모델별 100만 토큰당 가격 (USD): (입력, 캐시된 입력, 출력)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    토큰 수로 요청 비용(USD)을 추정합니다.
+    :return: float - 비용 또는 가격을 모르는 모델이면 None.
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+class RequestMetrics:
+    """
+    GPT 요청 한 건의 측정값. 요청 함수가 응답을 받는 동안 채웁니다.
+    - ttft: 첫 응답 토큰까지 걸린 시간(초)
+    - latency: 응답 완료까지 걸린 시간(초)
+    - status: 'ok', 'timeout', 'error', 'invalid'
+    """
+
+    __slots__ = (
+        "kind", "model", "markets", "estimated_prompt_tokens", "ttft", "latency",
+        "prompt_tokens", "cached_tokens", "completion_tokens", "hedged", "status", "error",
+    )
+
+    def __init__(self, request_data: Dict, kind: str = "single", markets: Iterable[str] = ()):
+        self.kind = kind
+        self.model = request_data["model"]
+        self.markets = list(markets)
+        self.estimated_prompt_tokens = request_data.get("prompt_tokens")
+        self.ttft = None
+        self.latency = None
+        self.prompt_tokens = None
+        self.cached_tokens = None
+        self.completion_tokens = None
+        self.hedged = False
+        self.status = "ok"
+        self.error = None
+
+    def observe_usage(self, usage) -> None:
+        """
+        응답 usage 의 토큰 수를 기록합니다.
+        """
+        metrics = usage_metrics(usage)
+        self.prompt_tokens = metrics["prompt_tokens"]
+        self.cached_tokens = metrics["cached_tokens"]
+        self.completion_tokens = metrics["completion_tokens"]
+
+    def fail(self, status: str, error: str = None) -> None:
+        self.status = status
+        self.error = error
+
+    def to_record(self, decisions: Dict[str, Dict], timestamp: datetime = None) -> Dict:
+        """
+        DB(llm_requests 테이블)에 저장할 형식으로 변환합니다.
+        :param decisions: Dict[str, Dict] - {시장: 검증된 판단}.
+        :param timestamp: datetime - 기록 시각, None 이면 현재 시각.
+        :return: Dict - LLMRequest 컬럼과 같은 키를 가진 기록.
+        """
+        status = self.status
+        if status == "ok" and any(decision.get("fallback") for decision in decisions.values()):
+            status = "invalid"  # 응답은 받았지만 판단이 유효하지 않아 hold 로 대체됨
+
+        single = decisions.get(self.markets[0]) if len(self.markets) == 1 else None
+        cost = None
+        if self.prompt_tokens is not None:
+            cost = estimate_cost(self.model, self.prompt_tokens, self.cached_tokens, self.completion_tokens)
+        return {
+            "timestamp": timestamp or datetime.now(),
+            "kind": self.kind,
+            "model": self.model,
+            "markets": ",".join(self.markets),
+            "estimated_prompt_tokens": self.estimated_prompt_tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "ttft": self.ttft,
+            "latency": self.latency,
+            "cost": cost,
+            "hedged": self.hedged,
+            "status": status,
+            "error": self.error,
+            "action": single.get("action") if single else None,
+            "amount": single.get("amount") if single else None,
+            "decisions": json.dumps(
+                {
+                    market: {key: decision.get(key) for key in ("action", "amount", "currency")}
+                    for market, decision in decisions.items()
+                },
+                ensure_ascii=False,
+            ),
+        }
+
+
+class LLMRecorder:
+    """
+    요청 기록을 sink 로 넘기고 최근 window 개를 메모리에 보관합니다 (스레드 안전).
+    sink 오류는 로그만 남기고 매매 흐름을 막지 않습니다.
+    """
+
+    def __init__(self, window: int = 500, sink: Callable[[Dict], None] = None):
+        self.records = deque(maxlen=window)
+        self.sink = sink
+        self._lock = threading.Lock()
+
+    def record(self, metrics: RequestMetrics, decisions: Dict[str, Dict]) -> Dict:
+        """
+        요청 한 건을 기록합니다.
+        :param metrics: RequestMetrics - 요청 측정값.
+        :param decisions: Dict[str, Dict] - {시장: 검증된 판단}.
+        :return: Dict - 저장된 기록.
+        """
+        record = metrics.to_record(decisions)
+        with self._lock:
+            self.records.append(record)
+        logging.info(
+            f"GPT 요청 기록 ({record['kind']}, {record['status']}): 지연 {record['latency']}초, "
+            f"첫 토큰 {record['ttft']}초, 입력 {record['prompt_tokens']} (캐시 {record['cached_tokens']}), "
+            f"출력 {record['completion_tokens']}, 비용 {record['cost']} USD"
+        )
+        if self.sink is not None:
+            try:
+                self.sink(record)
+            except Exception as e:
+                logging.error(f"GPT 요청 기록 저장 중 오류 발생: {e}")
+        return record
+
+    def summary(self, model: str = None) -> Dict:
+        """
+        메모리에 있는 최근 기록의 요약을 반환합니다.
+        :param model: str - 특정 모델만 집계, None 이면 전체.
+        """
+        with self._lock:
+            records = [record for record in self.records if model is None or record["model"] == model]
+        return summarize_records(records)
+
+
+LLM_RECORDER = LLMRecorder()
@@ -0,0 +1,188 @@
+import logging
+import math
+from typing import Dict, List, Optional
+
+# 시장/포트폴리오 스냅샷을 토큰 예산 안에 들어가는 간결한 표 형식 텍스트로 변환하는 모듈
+
+DEFAULT_MODEL = "gpt-4o-mini"
+PRICE_DIGITS = 6  # 가격 유효 숫자
+STAT_DIGITS = 4  # 변동성/거래량/지표 유효 숫자
+BALANCE_DECIMALS = 8  # 코인 수량 소수점 자릿수
+
+_encodings = {}
+
+
+def _get_encoding(model: str):
+    # tiktoken 은 선택 의존성이며, 사용할 수 없으면 None 을 캐시해 추정치를 사용
+    if model not in _encodings:
+        try:
+            import tiktoken
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logging.warning(f"tiktoken 을 사용할 수 없어 토큰 수를 추정합니다: {e}")
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> Dict:
+    """
+    텍스트의 토큰 수를 계산합니다.
+    :param text: str - 토큰 수를 계산할 텍스트.
+    :param model: str - 토크나이저를 결정할 모델 이름.
+    :return: Dict - tokens (토큰 수), exact (tiktoken 으로 계산했는지 여부).
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return {"tokens": math.ceil(len(text) / 4), "exact": False}
+    return {"tokens": len(encoding.encode(text)), "exact": True}
+
+
+def count_message_tokens(messages: List[Dict], model: str = DEFAULT_MODEL) -> Dict:
+    """
+    Chat Completions 메시지 목록의 입력 토큰 수를 계산합니다 (메시지별 고정 오버헤드 포함).
+    :param messages: List[Dict] - role, content 를 가진 메시지 목록.
+    :param model: str - 모델 이름.
+    :return: Dict - tokens (토큰 수), exact (tiktoken 으로 계산했는지 여부).
+    """
+    total, exact = 3, True  # 응답 시작 토큰
+    for message in messages:
+        counted = count_tokens(message["content"], model)
+        total += counted["tokens"] + 4  # role 및 구분 토큰
+        exact = exact and counted["exact"]
+    return {"tokens": total, "exact": exact}
+
+
+def format_number(value, digits: int = PRICE_DIGITS) -> str:
+    """
+    값을 지정한 유효 숫자로 반올림해 지수 표기 없이 짧게 표시합니다 (예: 3123.456789 -> 3123.46).
+    :param value: float - 표시할 값.
+    :param digits: int - 유효 숫자.
+    :return: str - 포맷된 문자열 (값이 없으면 '-').
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "-"
+    value = float(value)
+    if value == 0:
+        return "0"
+    decimals = max(0, digits - 1 - math.floor(math.log10(abs(value))))
+    text = f"{value:.{decimals}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text
+
+
+def format_balance(value) -> str:
+    """
+    코인 수량을 소수점 8자리까지 표시합니다 (불필요한 0 제거).
+    """
+    text = f"{float(value or 0):.{BALANCE_DECIMALS}f}".rstrip("0").rstrip(".")
+    return text or "0"
+
+
+def _short_range(date_range: str) -> str:
+    # '2024-12-01 09:00:00 to 2024-12-10 09:00:00' -> '2024-12-01~12-10'
+    try:
+        start, end = (part.strip().split(" ")[0] for part in date_range.split(" to "))
+        return f"{start}~{end[5:]}" if start[:4] == end[:4] else f"{start}~{end}"
+    except ValueError:
+        return date_range
+
+
+class EncodedPrompt:
+    """
+    인코딩된 프롬프트 데이터와 토큰 수.
+    """
+
+    __slots__ = ("text", "tokens", "exact", "dropped")
+
+    def __init__(self, text: str, tokens: int, exact: bool, dropped: int = 0):
+        self.text = text
+        self.tokens = tokens
+        self.exact = exact
+        self.dropped = dropped  # 예산을 맞추기 위해 생략한 행 수
+
+
+def _encode(market, portfolio, segment_rows, bucket_rows, include_indicators: bool, constraints=None) -> str:
+    if portfolio.currency:
+        holding = (f"{portfolio.currency}={format_balance(portfolio.balance)} "
+                   f"avg_buy={format_number(portfolio.avg_buy_price)}KRW")
+    else:
+        holding = "asset=none"
+    lines = [
+        f"PORTFOLIO cash={format_number(portfolio.cash_balance)}KRW {holding}",
+        f"MARKET {market.market} price={format_number(market.current_price)}KRW "
+        f"vol24h={format_number(market.volume_24h, STAT_DIGITS)}",
+    ]
+    if constraints is not None:
+        lines.append(constraints.to_prompt())
+
+    if len(segment_rows):
+        lines.append("DAILY range|avg|high|low|std")
+        for date_range, (average_price, high_price, low_price, volatility) in segment_rows:
+            lines.append(
+                f"{_short_range(date_range)}|{format_number(average_price)}|{format_number(high_price)}|"
+                f"{format_number(low_price)}|{format_number(volatility, STAT_DIGITS)}"
+            )
+
+    if len(bucket_rows):
+        lines.append(f"{market.bucket_prefix.split('_', 1)[-1].upper()} #|avg|high|low|std|vwap|vol")
+        for idx, (avg_price, high_price, low_price, volatility, vwap, total_vol) in bucket_rows:
+            lines.append(
+                f"{int(idx) + 1}|{format_number(avg_price)}|{format_number(high_price)}|{format_number(low_price)}|"
+                f"{format_number(volatility, STAT_DIGITS)}|{format_number(vwap)}|{format_number(total_vol, STAT_DIGITS)}"
+            )
+
+    if market.trend is not None:
+        lines.append(
+            f"OVERALL trend={market.trend} std={format_number(market.max_volatility, STAT_DIGITS)} "
+            f"outliers={market.outlier_count}"
+        )
+
+    if include_indicators:
+        indicators = [
+            f"{name}={format_number(value, STAT_DIGITS if abs(value) < 1000 else PRICE_DIGITS)}"
+            for name, value in market.indicators.items() if value is not None
+        ]
+        if indicators:
+            lines.append("INDICATORS " + " ".join(indicators))
+
+    return "\n".join(lines)
+
+
+def encode_prompt(market, portfolio, max_tokens: Optional[int] = None, model: str = DEFAULT_MODEL,
+                  constraints=None) -> EncodedPrompt:
+    """
+    시장/포트폴리오 스냅샷을 간결한 표 형식 텍스트로 인코딩합니다.
+    토큰 예산을 넘으면 가장 오래된 15분 구간, 가장 오래된 일봉 구간, 지표 순으로 생략합니다.
+    :param market: MarketSnapshot - 시장 스냅샷.
+    :param portfolio: PortfolioSnapshot - 포트폴리오 스냅샷.
+    :param max_tokens: int - 데이터 부분의 최대 토큰 수, None 이면 제한 없음.
+    :param model: str - 토큰 수 계산에 사용할 모델 이름.
+    :param constraints: TradeConstraints - 가능한 행동과 금액 범위 (항상 포함).
+    :return: EncodedPrompt - 인코딩된 텍스트와 토큰 수.
+    """
+    segment_rows = list(zip(market.segment_ranges, market.segments))
+    bucket_rows = list(zip(market.bucket_ids, market.buckets))
+    include_indicators = True
+    dropped = 0
+
+    while True:
+        text = _encode(market, portfolio, segment_rows, bucket_rows, include_indicators, constraints)
+        counted = count_tokens(text, model)
+        if max_tokens is None or counted["tokens"] <= max_tokens:
+            break
+        if len(bucket_rows) > 1:
+            bucket_rows = bucket_rows[1:]
+        elif len(segment_rows) > 1:
+            segment_rows = segment_rows[1:]
+        elif include_indicators and market.indicators:
+            include_indicators = False
+        else:
+            logging.warning(f"프롬프트가 토큰 예산을 초과합니다: {counted['tokens']} > {max_tokens}")
+            break
+        dropped += 1
+
+    return EncodedPrompt(text, counted["tokens"], counted["exact"], dropped)
@@ -0,0 +1,220 @@
+import logging
+import threading
+from typing import Dict, List
+from gpt_interface.prompt_encoder import DEFAULT_MODEL, count_message_tokens, count_tokens
+
+# 미리 만들어 둔 프롬프트 템플릿 모듈
+# 시스템 지시문, 데이터 설명, 판단 기준, 응답 형식과 예시를 앞에, 매번 바뀌는 데이터를 맨 뒤에 두어 요청마다 앞부분이 바이트 단위로 같게 유지합니다.
+# (OpenAI 프롬프트 캐싱은 같은 앞부분이 1024 토큰 이상일 때 적용되므로 고정 부분을 그 이상으로 유지, 적중 여부는 PREFIX_CACHE_METER 로 확인)
+
+DATA_REFERENCE = (
+    "Data Reference:\n"
+    "Each market is described with the same compact lines. Tables are '|' separated, rows are oldest first, "
+    "and numbers are rounded to a few significant digits. Older rows may be omitted when the data is long.\n"
+    "- PORTFOLIO cash=<KRW> <COIN>=<balance> avg_buy=<KRW>: cash and coin balance that can be used for new orders, "
+    "and the average buy price of the coin held. 'asset=none' means no coin is held.\n"
+    "- MARKET <KRW-COIN> price=<KRW> vol24h=<volume>: latest trade price and the volume traded in the last 24 hours.\n"
+    "- ALLOWED <actions> buy=<min>~<max>KRW sell=<min>~<max><COIN>: actions that can be executed right now and the valid "
+    "amount range of each, already adjusted for fees, balances and the 5000 KRW minimum order. 'none' means that side "
+    "cannot be traded.\n"
+    "- DAILY range|avg|high|low|std: one row per date range of the recent daily candles with the average, high and low "
+    "price and the price standard deviation (std, volatility) in that range.\n"
+    "- 15MIN #|avg|high|low|std|vwap|vol: one row per 15-minute bucket of the recent minute candles (# is the bucket "
+    "number). vwap is the volume-weighted average price and vol is the traded volume of the bucket.\n"
+    "- OVERALL trend=<up|down> std=<volatility> outliers=<count>: direction of the close price over the buckets, the "
+    "largest bucket volatility, and the number of closes more than 2 standard deviations away from the mean.\n"
+    "- INDICATORS: ema_12 and ema_26 are exponential moving averages of the close; rsi_14 is the relative strength index "
+    "(0-100); macd_macd, macd_signal and macd_histogram are MACD 12/26/9; bb_upper, bb_middle and bb_lower are "
+    "Bollinger Bands (20 periods, 2 standard deviations); atr_14 is the average true range in KRW; obv is the "
+    "on-balance volume. Indicators that are still warming up are left out.\n"
+)
+
+DECISION_GUIDELINES = (
+    "Decision Guidelines:\n"
+    "- Trend: prefer buying when the trend is up, the price is above ema_26 and macd_histogram is positive or rising. "
+    "Prefer selling held coins when the trend turns down and macd_histogram turns negative.\n"
+    "- Momentum: rsi_14 below 30 or a price near bb_lower suggests an oversold market, rsi_14 above 70 or a price near "
+    "bb_upper suggests an overbought market. Combine these with the trend instead of using them alone.\n"
+    "- Volatility: when std or atr_14 is large compared with the price, trade smaller amounts. A move smaller than the "
+    "fees of a buy and a later sell is not worth trading.\n"
+    "- Volume: a price move with rising vol or obv is stronger than a move on falling volume. vwap above the price "
+    "means recent buyers are at a loss.\n"
+    "- Position: compare the price with avg_buy to judge the unrealized profit or loss. Take partial profits on "
+    "strength and cut losses when the trend breaks down.\n"
+    "- Amounts: buy amounts are the KRW to spend (fees are charged on top), sell amounts are the coin quantity to sell. "
+    "A unit may follow the number (e.g. '150000 KRW', '12.5 XRP'). Partial amounts are allowed, but every buy or sell "
+    "amount must be greater than 0 and inside the ALLOWED range. Use '0' with 'hold'.\n"
+    "- When signals are weak or conflict, 'hold' is the right answer.\n"
+)
+
+RESPONSE_RULES = (
+    "Response Rules:\n"
+    "- 'action' must be exactly one of 'buy', 'sell' or 'hold' and must be listed in ALLOWED.\n"
+    "- 'amount' is a string holding a plain number with an optional unit: 'KRW' or the market's coin. "
+    "Do not use percentages, ranges, thousands separators or words such as 'all' or 'half'.\n"
+    "- A buy given in coin units is converted to KRW at the current price, and a sell given in KRW is converted to "
+    "coin units, so prefer the native unit of each action to avoid rounding.\n"
+    "- 'reason' is required, written in English as one short sentence that names the signals behind the decision.\n"
+    "- A response with an unknown action, a missing reason, a non-positive buy or sell amount or a unit of another "
+    "market is rejected and handled as 'hold', and an amount outside the allowed range is reduced or rejected.\n"
+    "- Do not wrap the JSON in markdown code fences and do not add comments or keys that are not in the format.\n"
+)
+
+SINGLE_SYSTEM_PROMPT = (
+    "You are a cryptocurrency trading expert. Based on market data and account status, recommend one of: 'buy,' 'sell,' or 'hold.' "
+    "Specify the exact amount to trade and a concise reason for your decision, considering the user's preferences and constraints.\n\n"
+    "Key Points:\n"
+    "1. The user prefers a slightly aggressive strategy.\n"
+    "2. Trades occur every 15 minutes and must optimize for short-term outcomes.\n"
+    "3. Trades (both buy and sell) below 5000 KRW are prohibited. Explicitly state when trading is not possible due to constraints.\n"
+    "4. A 0.05% trading fee applies. Recommendations must account for fees.\n"
+    "5. Maximize profit or minimize loss by analyzing:\n"
+    "   - Market trends (rising, falling, stable)\n"
+    "   - Portfolio status (cash balance, holdings, recent trades)\n"
+    "6. Ensure trades stay within available balances and comply with Upbit policies.\n"
+    "7. Provide reasons tailored to market conditions and user constraints.\n"
+    "8. If the action cannot be executed due to market constraints (e.g., minimum amount requirements for both buying and selling), return 'hold' as the action.\n"
+    "9. Prioritize 'hold' over invalid trades when constraints are not met.\n"
+    "10. Only choose an action listed in ALLOWED and keep the amount within its range.\n\n"
+    + DATA_REFERENCE + "\n" + DECISION_GUIDELINES + "\n" + RESPONSE_RULES + "\n"
+    + "Output Format:\n"
+    "{\n"
+    "    \"action\": \"buy\" | \"sell\" | \"hold\",\n"
+    "    \"amount\": \"specific amount\",\n"
+    "    \"reason\": \"Brief explanation (1 sentence)\"\n"
+    "}\n"
+    "Examples (the numbers are only illustrative):\n"
+    "{\"action\": \"buy\", \"amount\": \"150000 KRW\", \"reason\": \"Uptrend with a rising MACD histogram and RSI at 55 leaves room to rise.\"}\n"
+    "{\"action\": \"sell\", \"amount\": \"12.5 XRP\", \"reason\": \"Price is 3% above the average buy price while RSI is above 70 near the upper band.\"}\n"
+    "{\"action\": \"hold\", \"amount\": \"0\", \"reason\": \"Mixed signals and low volume do not justify paying fees.\"}\n"
+    "If trading cannot be executed due to market or portfolio constraints, clearly state 'hold' as the action and provide the reason in the specified format.\n"
+    "Respond strictly in JSON format without extra text."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a cryptocurrency trading expert. For each market in the data, recommend one of: 'buy,' 'sell,' or 'hold,' "
+    "based on that market's data and the shared account status.\n\n"
+    "Key Points:\n"
+    "1. The user prefers a slightly aggressive strategy.\n"
+    "2. Trades occur every 15 minutes and must optimize for short-term outcomes.\n"
+    "3. Trades (both buy and sell) below 5000 KRW are prohibited. Return 'hold' when a trade is not possible.\n"
+    "4. A 0.05% trading fee applies. Recommendations must account for fees.\n"
+    "5. The cash balance is shared by all markets; the total of all buy amounts must not exceed it.\n"
+    "6. Buy amounts are in KRW, sell amounts are in the market's coin.\n"
+    "7. Only choose an action listed in the market's ALLOWED line and keep the amount within its range.\n"
+    "8. The data starts with a 'Markets:' line listing every market, followed by one '### <KRW-COIN>' section per market.\n\n"
+    + DATA_REFERENCE + "\n" + DECISION_GUIDELINES + "\n" + RESPONSE_RULES + "\n"
+    + "Output Format (one object per market, in the given order):\n"
+    "[\n"
+    "    {\"market\": \"KRW-XXX\", \"action\": \"buy\" | \"sell\" | \"hold\", \"amount\": \"specific amount\", "
+    "\"reason\": \"Brief explanation (1 sentence)\"}\n"
+    "]\n"
+    "Example for 'Markets: KRW-BTC, KRW-XRP' (the numbers are only illustrative):\n"
+    "[\n"
+    "    {\"market\": \"KRW-BTC\", \"action\": \"buy\", \"amount\": \"100000 KRW\", \"reason\": \"Price holds above EMA 26 with a positive MACD histogram.\"},\n"
+    "    {\"market\": \"KRW-XRP\", \"action\": \"hold\", \"amount\": \"0\", \"reason\": \"Sideways market with RSI near 50 gives no edge after fees.\"}\n"
+    "]\n"
+    "Respond strictly with the JSON array without extra text."
+)
+
+class PromptTemplate:
+    """
+    고정된 시스템 메시지와 사용자 메시지 앞부분을 한 번만 만들어 두고, 데이터만 뒤에 붙이는 템플릿.
+    고정 부분의 토큰 수도 첫 요청에서 한 번만 계산합니다.
+    """
+
+    __slots__ = ("name", "model", "system_message", "user_prefix", "prefix_tokens", "prefix_exact")
+
+    def __init__(self, name: str, system_prompt: str, user_prefix: str, model: str = DEFAULT_MODEL):
+        self.name = name
+        self.model = model
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.user_prefix = user_prefix
+        self.prefix_tokens = None
+        self.prefix_exact = False
+
+    def render(self, data: str) -> List[Dict]:
+        """
+        데이터를 붙인 메시지 목록을 반환합니다 (시스템 메시지는 매번 같은 객체).
+        """
+        return [self.system_message, {"role": "user", "content": self.user_prefix + data}]
+
+    def build_request(self, data: str) -> Dict:
+        """
+        GPT API 요청 데이터를 만들고 입력 토큰 수를 기록합니다.
+        :param data: str - 포맷팅된 데이터 텍스트.
+        :return: Dict - model, messages, prompt_tokens 를 가진 요청 데이터.
+        """
+        if self.prefix_tokens is None:
+            prefix = count_message_tokens([self.system_message, {"role": "user", "content": self.user_prefix}], self.model)
+            self.prefix_tokens, self.prefix_exact = prefix["tokens"], prefix["exact"]
+        counted = count_tokens(data, self.model)
+        prompt_tokens = self.prefix_tokens + counted["tokens"]
+        exact = self.prefix_exact and counted["exact"]
+        logging.info(
+            f"GPT 요청 입력 토큰 ({self.name}): {prompt_tokens} (고정 {self.prefix_tokens})"
+            + ("" if exact else " (추정)")
+        )
+        return {"model": self.model, "messages": self.render(data), "prompt_tokens": prompt_tokens}
+
+
+SINGLE_DECISION_TEMPLATE = PromptTemplate(
+    "single",
+    SINGLE_SYSTEM_PROMPT,
+    "The following is the recent market data and account status. Analyze and provide your recommendation.\n\nData:\n",
+)
+
+BATCH_DECISION_TEMPLATE = PromptTemplate(
+    "batch",
+    BATCH_SYSTEM_PROMPT,
+    "The following is the recent market data of each market and the shared account status. Analyze each market.\n\n",
+)
+
+
+def usage_metrics(usage) -> Dict:
+    """
+    응답 usage 에서 입력/캐시/출력 토큰 수를 꺼냅니다.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+class PrefixCacheMeter:
+    """
+    모델별 입력 토큰 중 프롬프트 캐시에서 처리된 토큰 비율을 누적합니다 (스레드 안전).
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, usage) -> Dict:
+        """
+        응답 usage 를 누적하고 로그를 남깁니다.
+        :return: Dict - 이번 응답의 prompt_tokens, cached_tokens, completion_tokens.
+        """
+        metrics = usage_metrics(usage)
+        with self._lock:
+            totals = self.totals.setdefault(model, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            totals["requests"] += 1
+            totals["prompt_tokens"] += metrics["prompt_tokens"]
+            totals["cached_tokens"] += metrics["cached_tokens"]
+        logging.info(
+            f"GPT 사용 토큰 ({model}): 입력 {metrics['prompt_tokens']} (캐시 {metrics['cached_tokens']}), "
+            f"출력 {metrics['completion_tokens']} - 누적 캐시 적중률 {self.hit_rate(model):.1%}"
+        )
+        return metrics
+
+    def hit_rate(self, model: str) -> float:
+        with self._lock:
+            totals = self.totals.get(model)
+            if not totals or not totals["prompt_tokens"]:
+                return 0.0
+            return totals["cached_tokens"] / totals["prompt_tokens"]
+
+
+PREFIX_CACHE_METER = PrefixCacheMeter()
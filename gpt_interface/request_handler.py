@@ -5,63 +5,21 @@ from typing import Dict
 
 import json
 from typing import Dict
+from gpt_interface.prompt_templates import PREFIX_CACHE_METER, SINGLE_DECISION_TEMPLATE
+from gpt_interface.response_decoder import decode_payload
 
 def prepare_request(data: Dict) -> Dict:
     """
     전처리된 데이터를 GPT API가 요구하는 형식으로 변환합니다.
-    :param data: Dict - 전처리된 데이터.
-    :return: Dict - GPT API 요청 데이터.
+    :param data: str | Dict - format_input 으로 포맷팅된 텍스트 또는 전처리된 데이터.
+    :return: Dict - GPT API 요청 데이터 (prompt_tokens: 입력 토큰 수 포함).
     """
     try:
-        formatted_data = json.dumps(data, indent=4, ensure_ascii=False)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a cryptocurrency trading expert. Based on market data and account status, recommend one of: 'buy,' 'sell,' or 'hold.' "
-                    "Specify the exact amount to trade and a concise reason for your decision, considering the user's preferences and constraints.\n\n"
-                    "Key Points:\n"
-                    "1. The user prefers a slightly aggressive strategy.\n"
-                    "2. Trades occur every 15 minutes and must optimize for short-term outcomes.\n"
-                    "3. Trades (both buy and sell) below 5000 KRW are prohibited. Explicitly state when trading is not possible due to constraints.\n"
-                    "4. A 0.05% trading fee applies. Recommendations must account for fees.\n"
-                    "5. Maximize profit or minimize loss by analyzing:\n"
-                    "   - Market trends (rising, falling, stable)\n"
-                    "   - Portfolio status (cash balance, holdings, recent trades)\n"
-                    "6. Ensure trades stay within available balances and comply with Upbit policies.\n"
-                    "7. Provide reasons tailored to market conditions and user constraints.\n"
-                    "8. If the action cannot be executed due to market constraints (e.g., minimum amount requirements for both buying and selling), return 'hold' as the action.\n"
-                    "9. Prioritize 'hold' over invalid trades when constraints are not met.\n\n"
-                    "Output Format:\n"
-                    "{\n"
-                    "    \"action\": \"buy\" | \"sell\" | \"hold\",\n"
-                    "    \"amount\": \"specific amount\",\n"
-                    "    \"reason\": \"Brief explanation (1 sentence)\"\n"
-                    "}\n"
-                    "If trading cannot be executed due to market or portfolio constraints, clearly state 'hold' as the action and provide the reason in the specified format.\n"
-                    "Respond strictly in JSON format without extra text."
-                )
-            },
-            {
-                "role": "user",
-                "content": (
-                    "The following is the recent Bitcoin market data and account status. "
-                    "Analyze and provide your recommendation.\n\n"
-                    f"Data:\n{formatted_data}\n\n"
-                    "Response Format:\n"
-                    "{\n"
-                    "    \"action\": \"buy\" | \"sell\" | \"hold\",\n"
-                    "    \"amount\": \"specific amount\",\n"
-                    "    \"reason\": \"Brief explanation(1 sentence)\"\n"
-                    "}\n"
-                ),
-            },
-        ]
+        # 포맷팅된 텍스트는 그대로 사용 (JSON 으로 다시 감싸면 이스케이프/들여쓰기 토큰만 늘어남)
+        formatted_data = data if isinstance(data, str) else json.dumps(data, separators=(",", ":"), ensure_ascii=False)
 
-
-        
-        return {"model": "gpt-4o-mini", "messages": messages}
+        # 고정 지시문과 응답 형식은 템플릿 앞부분에 두고, 데이터는 맨 뒤에 붙임
+        return SINGLE_DECISION_TEMPLATE.build_request(formatted_data)
     
     except Exception as e:
         raise ValueError(f"요청 데이터 생성 중 오류 발생: {e}")
@@ -78,9 +36,11 @@ def send_request(request_data: Dict) -> Dict:
             model=request_data["model"],
             messages=request_data["messages"]
         )
+        if response.usage is not None:
+            PREFIX_CACHE_METER.record(request_data["model"], response.usage)
         # 응답 내용을 JSON 형식으로 반환
-        return json.loads(response.choices[0].message.content)
-    except json.JSONDecodeError as e:
+        return decode_payload(response.choices[0].message.content)
+    except ValueError as e:
         raise ValueError(f"응답 데이터를 JSON으로 변환하는 중 오류 발생: {e}")
     except Exception as e:
         raise ValueError(f"GPT 요청 처리 중 오류 발생: {e}")
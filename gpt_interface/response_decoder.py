@@ -0,0 +1,126 @@
+import json
+import math
+import re
+from typing import Dict, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 사용
+    orjson = None
+
+# GPT 응답을 한 번에 검증하고 금액/통화 단위를 정규화하는 스키마 기반 디코더 모듈
+
+VALID_ACTIONS = ("buy", "sell", "hold")
+KRW_ALIASES = {"KRW", "WON", "원", "₩"}
+
+_AMOUNT_PATTERN = re.compile(
+    r"^\s*(?P<prefix>₩)?\s*(?P<number>[-+]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)\s*(?P<unit>[A-Za-z]+|원)?\s*$"
+)
+_FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def loads(text: Union[str, bytes]):
+    """
+    JSON 텍스트를 파싱합니다 (orjson 이 있으면 orjson 사용).
+    :raises ValueError: JSON 형식이 아닐 때 (json.JSONDecodeError 포함).
+    """
+    if orjson is not None:
+        return orjson.loads(text)  # orjson.JSONDecodeError 는 json.JSONDecodeError 의 하위 클래스
+    return json.loads(text)
+
+
+def decode_payload(text: Union[str, bytes]) -> Dict:
+    """
+    모델 출력 텍스트에서 JSON 객체를 꺼냅니다. 코드 블록 표시나 앞뒤 설명 문장은 무시합니다.
+    :param text: str - 모델 출력 텍스트.
+    :return: Dict - 파싱된 객체.
+    :raises ValueError: JSON 객체를 찾을 수 없을 때.
+    """
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+    try:
+        payload = loads(text)
+    except ValueError:
+        # 느린 경로: 코드 블록/설명이 섞인 응답에서 첫 '{' 부터 마지막 '}' 까지 다시 파싱
+        stripped = _FENCE_PATTERN.sub("", text)
+        start, end = stripped.find("{"), stripped.rfind("}")
+        if start < 0 or end <= start:
+            raise ValueError(f"응답에서 JSON 객체를 찾을 수 없습니다: {text!r}")
+        try:
+            payload = loads(stripped[start:end + 1])
+        except ValueError as e:
+            raise ValueError(f"응답 데이터를 JSON으로 변환하는 중 오류 발생: {e}") from None
+    if not isinstance(payload, dict):
+        raise ValueError(f"응답 데이터가 유효한 객체 형식이 아닙니다: {payload!r}")
+    return payload
+
+
+def parse_amount(value, currency: str = None):
+    """
+    금액 값을 (수량, 통화) 로 변환합니다. 예: '10,000 KRW' -> (10000.0, 'KRW'), 1.5 -> (1.5, None).
+    :param value: str | float | int - 금액 값.
+    :param currency: str - 응답에 별도로 지정된 통화 (문자열 안의 단위가 없을 때 사용).
+    :return: Tuple[float, str] - 수량과 통화 (알 수 없으면 None).
+    :raises ValueError: 금액 형식이 잘못되었을 때.
+    """
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"잘못된 금액 형식: {value!r}")
+    if isinstance(value, (int, float)):
+        amount, unit = float(value), None
+    elif isinstance(value, str):
+        match = _AMOUNT_PATTERN.match(value)
+        if match is None:
+            raise ValueError(f"잘못된 금액 형식: {value!r}")
+        amount = float(match.group("number").replace(",", ""))
+        unit = "KRW" if match.group("prefix") else match.group("unit")
+    else:
+        raise ValueError(f"잘못된 금액 형식: {value!r}")
+
+    if not math.isfinite(amount):
+        raise ValueError(f"잘못된 금액 값: {value!r}")
+    unit = unit or currency
+    if unit is not None:
+        unit = unit.strip().upper()
+        if unit in KRW_ALIASES:
+            unit = "KRW"
+    return amount, unit
+
+
+def decode_decision(response: Union[str, bytes, Dict], market_name: str = "KRW-BTC") -> Dict:
+    """
+    GPT 판단을 한 번에 검증하고 정규화합니다.
+    - action: 'buy' | 'sell' | 'hold' (대소문자 무시)
+    - amount: float, currency: 'KRW' 또는 대상 코인 (단위가 없으면 buy 는 KRW, sell 은 코인)
+    - hold 는 금액과 관계없이 0.0
+    이미 정규화된 판단이나 그 밖의 필드(cached, fallback 등)는 그대로 유지합니다.
+    :param response: str | Dict - 모델 출력 텍스트 또는 파싱된 객체.
+    :param market_name: str - 시장 이름 (예: 'KRW-BTC').
+    :return: Dict - action, amount, currency, reason 을 가진 판단.
+    :raises ValueError: 필수 필드가 없거나 값이 잘못되었을 때.
+    """
+    data = dict(response) if isinstance(response, dict) else decode_payload(response)
+    target_currency = market_name.split("-")[1]
+
+    action = data.get("action")
+    action = action.strip().lower() if isinstance(action, str) else action
+    if action not in VALID_ACTIONS:
+        raise ValueError(f"유효하지 않은 action: {data.get('action')!r}")
+    reason = data.get("reason")
+    if not isinstance(reason, str):
+        raise ValueError("응답 데이터에 reason 이 없습니다.")
+
+    if action == "hold":
+        amount, currency = 0.0, data.get("currency") or "KRW"
+    else:
+        if "amount" not in data:
+            raise ValueError("응답 데이터에 amount 가 없습니다.")
+        amount, currency = parse_amount(data["amount"], data.get("currency"))
+        if currency is None:
+            currency = "KRW" if action == "buy" else target_currency
+        if currency not in ("KRW", target_currency):
+            raise ValueError(f"{market_name} 에서 사용할 수 없는 통화: {currency}")
+        if amount <= 0:
+            raise ValueError(f"{action} 금액은 0보다 커야 합니다: {data['amount']!r}")
+
+    data.update({"action": action, "amount": amount, "currency": currency, "reason": reason})
+    return data
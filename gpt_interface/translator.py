@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+# GPT 판단 사유(영문)를 주문 경로 밖에서 한국어로 번역하고, 번역 결과를 파일에 캐시하는 모듈
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키로 사용할 수 있도록 공백을 정리하고 소문자로 변환합니다.
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class TranslationCache:
+    """
+    정규화한 영문 사유 -> 한국어 번역 캐시. 최대 크기를 넘으면 가장 오래 사용하지 않은 항목을 제거합니다.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 2000):
+        """
+        :param path: str - 저장 파일 경로, None 이면 메모리에만 보관.
+        :param max_entries: int - 최대 항목 수.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, text: str) -> Optional[str]:
+        key = normalize_text(text)
+        with self._lock:
+            translated = self.entries.get(key)
+            if translated is not None:
+                self.entries.move_to_end(key)
+            return translated
+
+    def put(self, text: str, translated: str) -> None:
+        key = normalize_text(text)
+        with self._lock:
+            self.entries[key] = translated
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def load(self) -> None:
+        """
+        저장된 번역을 불러옵니다. 파일이 없거나 손상되었으면 빈 캐시로 시작합니다.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.error(f"번역 캐시를 불러오는 중 오류 발생: {e}")
+            return
+        for key, translated in list(entries.items())[-self.max_entries:]:
+            self.entries[key] = translated
+
+    def save(self) -> None:
+        """
+        번역 캐시를 JSON 파일로 저장합니다 (임시 파일에 쓴 뒤 교체).
+        """
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:  # 번역 스레드끼리 같은 임시 파일에 동시에 쓰지 않도록 잠금 안에서 저장
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class GoogleTranslateBackend:
+    """
+    deep_translator 의 GoogleTranslator 를 사용하는 번역 백엔드.
+    """
+
+    def __init__(self, source: str = "en", target: str = "ko"):
+        self.source = source
+        self.target = target
+
+    def translate(self, text: str) -> str:
+        from deep_translator import GoogleTranslator
+
+        return GoogleTranslator(source=self.source, target=self.target).translate(text)
+
+
+class StubTranslateBackend:
+    """
+    네트워크 없이 동작하는 로컬 번역 백엔드 (테스트 및 오프라인 실행용).
+    """
+
+    def __init__(self, mapping: Dict[str, str] = None):
+        self.mapping = mapping or {}
+        self.calls = 0
+
+    def translate(self, text: str) -> str:
+        self.calls += 1
+        return self.mapping.get(text, f"[ko] {text}")
+
+
+class ReasonTranslator:
+    """
+    번역 백엔드와 캐시를 묶어, 백그라운드 스레드에서 번역하고 Future 로 결과를 돌려줍니다.
+    번역에 실패하면 원문을 그대로 사용합니다.
+    """
+
+    def __init__(self, backend, cache: TranslationCache = None, max_workers: int = 2):
+        self.backend = backend
+        self.cache = cache if cache is not None else TranslationCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translator")
+
+    def translate(self, text: str) -> str:
+        """
+        캐시를 먼저 확인하고, 없으면 백엔드로 번역해 캐시에 저장합니다.
+        :param text: str - 영문 사유.
+        :return: str - 번역 결과 또는 실패 시 원문.
+        """
+        if not text:
+            return text
+        translated = self.cache.get(text)
+        if translated is not None:
+            return translated
+        try:
+            translated = self.backend.translate(text)
+        except Exception as e:
+            logging.error(f"번역 오류: {e}")
+            return text
+        if not translated:
+            return text
+        self.cache.put(text, translated)
+        try:
+            self.cache.save()
+        except Exception as e:
+            logging.error(f"번역 캐시 저장 중 오류 발생: {e}")
+        return translated
+
+    def submit(self, text: str) -> Future:
+        """
+        번역을 백그라운드에서 시작합니다. 캐시에 있으면 이미 완료된 Future 를 반환합니다.
+        :param text: str - 영문 사유.
+        :return: Future - 번역 결과 Future.
+        """
+        translated = self.cache.get(text) if text else text
+        if translated is not None:
+            future = Future()
+            future.set_result(translated)
+            return future
+        return self._executor.submit(self.translate, text)
+
+    @staticmethod
+    def resolve(future: Future, original: str, timeout: float = 5.0) -> str:
+        """
+        번역 Future 의 결과를 기다립니다. 시간 안에 끝나지 않으면 원문을 반환합니다.
+        """
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            logging.warning(f"번역 대기 시간 초과 또는 오류, 원문 사용: {e}")
+            return original
+
+    @staticmethod
+    def when_done(future: Future, original: str, callback: Callable[[str], None]) -> None:
+        """
+        번역이 끝나면 번역 결과(실패 시 원문)로 callback 을 호출합니다 (이미 끝났으면 바로 호출).
+        callback 은 번역 스레드에서 실행되며, 오류는 로깅만 합니다.
+        """
+        def done(finished: Future) -> None:
+            try:
+                callback(ReasonTranslator.resolve(finished, original, timeout=0))
+            except Exception as e:
+                logging.error(f"번역 완료 후 처리 중 오류 발생: {e}")
+
+        future.add_done_callback(done)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -3,18 +3,38 @@ import time
 import os
 import pytz
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 from data_collection.fetch_quantitative import *
 from data_collection.preprocess import *
+from data_collection.parallel_fetch import run_concurrently
+from data_collection.candle_store import CandleStore
+from data_collection.indicators import IndicatorEngine
+from data_collection.tick_stream import TickIngestor, UpbitWebSocketSource, ReplayFileSource
+from data_collection.snapshot import PortfolioSnapshot, build_market_snapshot
 from gpt_interface.data_formatter import *
 from gpt_interface.request_handler import *
 from gpt_interface.decision_logic import *
+from gpt_interface.decision_cache import DecisionCache, snapshot_fingerprint
+from gpt_interface.async_client import LATENCY_TRACKER, fallback_decision, send_request_with_deadline
+from gpt_interface.response_decoder import decode_decision
+from gpt_interface.feasibility import FEE_RATE, check_feasibility
+from gpt_interface.translator import GoogleTranslateBackend, ReasonTranslator, StubTranslateBackend, TranslationCache
+from gpt_interface.batch_request import prepare_batch_request, stream_batch_decisions
+from gpt_interface.instrumentation import LLM_RECORDER, RequestMetrics
 from trade_manager.trade_handler import *
 from trade_manager.account_status import *
+from trade_manager.order_tracker import OrderTracker, compute_slippage_bps
+from trade_manager.execution_scheduler import STRATEGIES, ExecutionScheduler
+from trade_manager.portfolio_service import PORTFOLIO_SERVICE
+from trade_manager.position_ledger import LedgerReconciler, PositionLedger
+from trade_manager.portfolio_valuation import value_portfolio
+from exchange.upbit_client import get_upbit_client, set_upbit_client
+from exchange.paper_exchange import PaperExchange, RecordedOrderBooks, ReplayMarketData, SimulatedClock
+from backtest.providers import RuleBasedProvider
 from db.database import SessionLocal, init_db
 from db.crud import *
 from notifications.slack_notifier import SlackNotifier
-from deep_translator import GoogleTranslator
 from datetime import datetime
 
 # ==========================
@@ -29,6 +49,109 @@ logging.basicConfig(
     ]
 )
 
+# 데이터 수집 호출별 타임아웃 (초)
+COLLECTION_TIMEOUT = float(os.getenv("COLLECTION_TIMEOUT", "10"))
+
+# 캔들 저장소 (새 캔들만 요청하고 나머지는 디스크에서 읽음)
+CANDLE_STORE = CandleStore(
+    os.getenv("CANDLE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "candles"))
+)
+
+# 기술적 지표 엔진 (재시작 시 저장된 상태에서 이어서 계산)
+INDICATOR_STATE_PATH = os.getenv(
+    "INDICATOR_STATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "indicators.json")
+)
+INDICATOR_ENGINE = IndicatorEngine.load(INDICATOR_STATE_PATH)
+
+# 거래 대상 시장
+MARKET_NAME = os.getenv("MARKET_NAME", "KRW-XRP")
+# 여러 시장 거래 시 쉼표로 구분 (2개 이상이면 한 번의 묶음 요청으로 판단)
+MARKET_NAMES = [name.strip() for name in os.getenv("MARKET_NAMES", MARKET_NAME).split(",") if name.strip()]
+# 묶음 판단을 스트림 수신과 별도로 한 시장씩 순서대로 실행하는 작업자 (주문/DB 저장이 스트림 수신을 막지 않도록)
+DECISION_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-decision")
+
+# 사이클 시작부터 GPT 판단까지의 시간 예산 (초, 넘으면 hold)
+CYCLE_LATENCY_BUDGET = float(os.getenv("CYCLE_LATENCY_BUDGET", "60"))
+
+# GPT 판단 캐시 (시장 상태가 같으면 API 호출 생략, 크기 0 이면 사용 안 함)
+DECISION_CACHE = DecisionCache(
+    ttl_seconds=float(os.getenv("DECISION_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("DECISION_CACHE_SIZE", "256")),
+)
+
+# 판단 사유 번역 (주문 이후 단계에서 사용, "stub" 이면 네트워크 없이 동작)
+REASON_TRANSLATOR = ReasonTranslator(
+    StubTranslateBackend() if os.getenv("TRANSLATION_BACKEND", "google") == "stub" else GoogleTranslateBackend(),
+    TranslationCache(
+        os.getenv(
+            "TRANSLATION_CACHE_PATH",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "translations.json"),
+        ),
+        max_entries=int(os.getenv("TRANSLATION_CACHE_SIZE", "2000")),
+    ),
+)
+
+# GPT 요청 기록을 짧은 별도 세션으로 llm_requests 테이블에 저장
+def save_llm_request(record):
+    db = SessionLocal()
+    try:
+        create_llm_request(db, record)
+    finally:
+        db.close()
+
+LLM_RECORDER.sink = save_llm_request
+
+# 주문 체결 추적 (체결 완료 후 실제 체결 가격과 수수료를 거래 기록에 반영)
+ORDER_TRACKER = OrderTracker(timeout=float(os.getenv("ORDER_TRACK_TIMEOUT", "120")))
+
+# 분할 주문 실행 ("single" 이면 한 번에 주문, "twap"/"iceberg" 이면 SLICE_THRESHOLD 이상 주문을 나눠 실행)
+EXECUTION_STRATEGY = os.getenv("EXECUTION_STRATEGY", "single")
+SLICE_THRESHOLD = float(os.getenv("SLICE_THRESHOLD", "300000"))  # 분할 기준 주문 금액 (KRW)
+SLICE_OPTIONS = {
+    "slices": int(os.getenv("SLICE_COUNT", "5")),
+    "duration": float(os.getenv("SLICE_DURATION", "300")),
+    "child_type": os.getenv("SLICE_CHILD_TYPE", "limit"),
+    "replace_after": float(os.getenv("SLICE_REPLACE_AFTER", "30")),
+}
+EXECUTION_SCHEDULER = ExecutionScheduler(max_open_children=int(os.getenv("SLICE_MAX_OPEN_CHILDREN", "2")))
+
+# 판단 시점 잔고 소스 ("exchange": 캐시된 계좌 조회, "ledger": 체결로 갱신되는 로컬 원장)
+PORTFOLIO_SOURCE = os.getenv("PORTFOLIO_SOURCE", "exchange")
+POSITION_LEDGER = PositionLedger()
+# 원장과 거래소 잔고 대사 주기 (초)
+LEDGER_RECONCILE_INTERVAL = float(os.getenv("LEDGER_RECONCILE_INTERVAL", "600"))
+LEDGER_RECONCILER = None
+# 사이클마다 보유 중인 모든 코인을 한 번의 묶음 시세 요청으로 평가 ("0" 이면 사용 안 함)
+ACCOUNT_VALUATION = os.getenv("ACCOUNT_VALUATION", "1") != "0"
+
+# 주문 실행 백엔드 ("live": 업비트 실계좌, "paper": 모의 거래소)
+EXECUTION_BACKEND = os.getenv("EXECUTION_BACKEND", "live")
+# 모의 거래 설정: 초기 현금, 시계 배속(0 이면 대기 없이 진행), 시작 시각, 시세 소스("live" 또는 "replay"), 기록된 호가
+PAPER_CASH = float(os.getenv("PAPER_CASH", "1000000"))
+PAPER_CLOCK_SPEED = float(os.getenv("PAPER_CLOCK_SPEED", "1"))
+PAPER_START = os.getenv("PAPER_START") or None
+PAPER_MARKET_DATA = os.getenv("PAPER_MARKET_DATA", "live")
+PAPER_REPLAY_DIR = os.getenv(
+    "PAPER_REPLAY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "replay")
+)
+PAPER_ORDERBOOK_PATH = os.getenv("PAPER_ORDERBOOK_PATH", "")
+PAPER_MAX_CYCLES = int(os.getenv("PAPER_MAX_CYCLES", "0"))
+PAPER_EXCHANGE = None
+PAPER_CLOCK = None
+
+# 판단 백엔드 ("gpt" 또는 네트워크 없이 동작하는 규칙 기반 "rule")
+DECISION_BACKEND = os.getenv("DECISION_BACKEND", "gpt")
+DECISION_PROVIDER = RuleBasedProvider() if DECISION_BACKEND == "rule" else None
+
+# 수집 단계에서 사용하는 캔들 저장소 (재생 시세에서는 저장소를 거치지 않음)
+MARKET_DATA_STORE = CANDLE_STORE
+
+# 체결 스트림 소스 ("websocket", 재생 파일 경로 또는 빈 값이면 사용 안 함)
+TICK_STREAM_SOURCE = os.getenv("TICK_STREAM_SOURCE", "")
+# 마지막 체결 수신 후 이 시간(초)이 지나면 스트림 대신 REST 로 수집
+TICK_STREAM_MAX_AGE = float(os.getenv("TICK_STREAM_MAX_AGE", "120"))
+TICK_INGESTOR = None
+
 # 환경 초기화
 def initialize_env():
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -36,82 +159,324 @@ def initialize_env():
     load_dotenv(dotenv_path)
     logging.info("환경 변수가 초기화되었습니다.")
 
-# 현재 시간 가져오기
+# 현재 시간 가져오기 (모의 거래 중에는 모의 시계 기준)
 def get_current_time():
     seoul_tz = pytz.timezone("Asia/Seoul")
+    if PAPER_CLOCK is not None:
+        return seoul_tz.localize(PAPER_CLOCK.now()).isoformat()
     return datetime.now(seoul_tz).isoformat()
 
-# 데이터 수집
-def collect_market_data(market_name="KRW-BTC"):
-    logging.info(f"데이터 수집 시작: {market_name}")
-    current_price = fetch_current_price(market_name)
-    volume_24h = fetch_24h_volume(market_name)
-    candlestick_30d = fetch_30d_candlestick(market_name)
-
-    if candlestick_30d is not None:
-        cleaned_30d = handle_missing_values(candlestick_30d)
-        normalized_30d = normalize_data(cleaned_30d)
-        summary_30d = extract_relevant_data(normalized_30d)
+# 모의 거래소 설치 (이후 주문, 잔고, 시세 조회가 모두 모의 거래소를 거침)
+def setup_execution_backend():
+    global PAPER_EXCHANGE, PAPER_CLOCK, MARKET_DATA_STORE, INDICATOR_ENGINE, INDICATOR_STATE_PATH
+    if EXECUTION_BACKEND != "paper":
+        return None
+
+    PAPER_CLOCK = SimulatedClock(PAPER_START, PAPER_CLOCK_SPEED)
+    if PAPER_MARKET_DATA == "replay":
+        market_data = ReplayMarketData(CandleStore(PAPER_REPLAY_DIR), PAPER_CLOCK)
+        MARKET_DATA_STORE = None
+        # 재생 시각의 지표는 실시간 지표 상태와 섞이지 않도록 새로 계산하고 저장하지 않음
+        INDICATOR_ENGINE, INDICATOR_STATE_PATH = IndicatorEngine(), None
     else:
-        summary_30d = {"error": "30일 봉 데이터를 가져오는 데 실패했습니다."}
-
-    raw_5min_data = fetch_5min_data(market_name)
-    if raw_5min_data is not None:
-        cleaned_5min = handle_missing_values(raw_5min_data)
-        processed_5min = preprocess_15min_data(cleaned_5min)
+        market_data = get_upbit_client()
+    orderbooks = RecordedOrderBooks.from_jsonl(PAPER_ORDERBOOK_PATH, PAPER_CLOCK) if PAPER_ORDERBOOK_PATH else None
+
+    PAPER_EXCHANGE = PaperExchange(market_data, cash=PAPER_CASH, clock=PAPER_CLOCK, orderbooks=orderbooks)
+    set_upbit_client(PAPER_EXCHANGE)
+    # 분할 주문 스레드는 모의 시계를 직접 움직이지 않고 메인 루프가 시계를 움직이기를 기다림
+    EXECUTION_SCHEDULER.sleep = PAPER_CLOCK.wait
+    EXECUTION_SCHEDULER.clock = lambda: PAPER_CLOCK.now().timestamp()
+    PORTFOLIO_SERVICE.clock = EXECUTION_SCHEDULER.clock
+    logging.info(
+        f"모의 거래 모드: 초기 현금 {PAPER_CASH:,.0f} KRW, 시계 배속 {PAPER_CLOCK_SPEED}, 시세 {PAPER_MARKET_DATA}, "
+        f"시작 {PAPER_CLOCK.now()}"
+    )
+    return PAPER_EXCHANGE
+
+# 로컬 포지션 원장 시작 (거래소 잔고로 초기화하고 느린 주기로 대사)
+def start_position_ledger():
+    global LEDGER_RECONCILER
+    if PORTFOLIO_SOURCE != "ledger":
+        return None
+    LEDGER_RECONCILER = LedgerReconciler(
+        POSITION_LEDGER, interval=LEDGER_RECONCILE_INTERVAL, on_drift=notify_ledger_drift,
+        busy=lambda: bool(ORDER_TRACKER.pending() or EXECUTION_SCHEDULER.status()),
+    )
+    LEDGER_RECONCILER.start()
+    return LEDGER_RECONCILER
+
+# 원장과 거래소 잔고 차이 알림 (모의 거래 중에는 로그만 남김)
+def notify_ledger_drift(drifts):
+    if PAPER_EXCHANGE is not None:
+        return
+    notifier = SlackNotifier()
+    if notifier.check_connection():
+        lines = [f"{drift['currency']} {drift['field']}: 원장 {drift['local']}, 거래소 {drift['exchange']}" for drift in drifts]
+        notifier.send_message("#autobitcoin", "원장과 거래소 잔고 차이 발견 (거래소 값으로 맞춤)\n" + "\n".join(lines))
     else:
-        processed_5min = {"error": "5분 봉 데이터를 가져오는 데 실패했습니다."}
+        logging.warning("Slack 연결 실패")
 
-    logging.info("데이터 수집 완료")
+# 판단 시점 포트폴리오 스냅샷 (원장 모드에서는 메모리의 원장을 읽음)
+def read_portfolio_snapshot(market_name="KRW-BTC"):
+    if PORTFOLIO_SOURCE == "ledger" and POSITION_LEDGER.loaded:
+        return POSITION_LEDGER.snapshot(market_name)
+    return PORTFOLIO_SERVICE.snapshot(market_name)
+
+# 계좌 전체 평가 (보유 코인 전체의 평가 금액, 미실현 손익, 비중을 한 번의 시세 요청으로 계산)
+def log_account_valuation():
+    if not ACCOUNT_VALUATION:
+        return None
+    if PORTFOLIO_SOURCE == "ledger" and POSITION_LEDGER.loaded:
+        portfolio = POSITION_LEDGER.portfolio()
+    else:
+        portfolio = PORTFOLIO_SERVICE.get()
+    valuation = value_portfolio(portfolio)
+    if "error" in valuation:
+        logging.error(f"계좌 평가 실패: {valuation['error']}")
+        return valuation
+    logging.info(
+        f"계좌 평가: 총자산 {valuation['total_equity']:,.0f} KRW (코인 {valuation['total_market_value']:,.0f}, "
+        f"현금 {valuation['cash_balance']:,.0f}), 미실현 손익 {valuation['unrealized_pnl']:,.0f} KRW "
+        f"({valuation['unrealized_rate']:.2f}%), 코인 비중 {valuation['exposure'] * 100:.1f}%"
+    )
+    if valuation["missing_prices"]:
+        logging.warning(f"시세를 가져오지 못해 평가에서 제외된 시장: {valuation['missing_prices']}")
+    return valuation
+
+# 주문의 누적 체결 요약을 원장에 반영
+def record_ledger_fill(order_id, market_name, action, summary):
+    if PORTFOLIO_SOURCE == "ledger":
+        POSITION_LEDGER.apply_order_update(order_id, market_name, action, summary)
+
+# 접수한 주문에 묶이는 현금/수량을 원장에 잡아 둠 (체결되거나 주문이 끝나면 풀림)
+def reserve_ledger_order(trade_result, market_name, action, amount):
+    if PORTFOLIO_SOURCE != "ledger" or "error" in trade_result or not trade_result.get("uuid"):
+        return
+    locked = amount * (1 + FEE_RATE) if action == "buy" else amount
+    POSITION_LEDGER.reserve(trade_result["uuid"], market_name, action, locked)
+
+# 체결 스트림 수신 시작 (REST 5분 봉으로 캔들 버퍼를 미리 채움)
+def start_tick_stream(market_names):
+    global TICK_INGESTOR
+    if not TICK_STREAM_SOURCE:
+        return None
+    if TICK_STREAM_SOURCE == "websocket":
+        source = UpbitWebSocketSource(market_names)
+    else:
+        source = ReplayFileSource(TICK_STREAM_SOURCE)
+
+    TICK_INGESTOR = TickIngestor(source, max_age=TICK_STREAM_MAX_AGE)
+    for market_name in market_names:
+        TICK_INGESTOR.seed(market_name, 300, fetch_5min_data(market_name))
+    TICK_INGESTOR.start()
+    return TICK_INGESTOR
+
+# 체결 스트림에서 메모리의 최신 데이터 읽기 (준비되지 않았으면 빈 dict)
+def read_stream_snapshot(market_name="KRW-BTC"):
+    if TICK_INGESTOR is None or not TICK_INGESTOR.is_ready(market_name, 300, 36):
+        return {}
     return {
-        "current_price": current_price,
-        "volume_24h": volume_24h,
-        "summary_30d": summary_30d,
-        "processed_5min": processed_5min,
+        "current_price": TICK_INGESTOR.last_price(market_name),
+        "raw_5min_data": TICK_INGESTOR.snapshot(market_name, 300, 36),
     }
 
-# GPT 요청 처리 및 응답
-def handle_gpt_request(final_result, market_name="KRW-BTC"):
-    logging.info("GPT 요청 처리 시작")
-    json_result = convert_to_json(final_result)
-    formatted_input = format_input(json_result)
-    request_data = prepare_request(formatted_input)
-    response_content = send_request(request_data)
+# 데이터 수집 작업 목록 (일봉은 30일 요약과 24시간 거래량에 함께 사용하므로 한 번만 요청)
+def build_market_tasks(market_name="KRW-BTC"):
+    return {
+        "current_price": (fetch_current_price, (market_name,)),
+        "candlestick_30d": (fetch_30d_candlestick, (market_name, 30, MARKET_DATA_STORE)),
+        "raw_5min_data": (fetch_5min_data, (market_name, 36, MARKET_DATA_STORE)),
+    }
 
-    if "reason" in response_content:
+# 수집된 원시 데이터로 시장 스냅샷 생성
+def summarize_market_data(raw_data, market_name="KRW-BTC"):
+    raw_5min_data = raw_data.get("raw_5min_data")
+    if raw_5min_data is not None:
+        indicators = INDICATOR_ENGINE.update_frame(market_name, "minute5", handle_missing_values(raw_5min_data))
         try:
-            translated_reason = GoogleTranslator(source="en", target="ko").translate(response_content["reason"])
-            response_content["reason"] = translated_reason
-            logging.info(f"GPT 응답: {response_content}")
+            if INDICATOR_STATE_PATH:
+                INDICATOR_ENGINE.save(INDICATOR_STATE_PATH)
         except Exception as e:
-            logging.error(f"번역 오류: {e}")
+            logging.error(f"지표 상태 저장 중 오류 발생: {e}")
+    else:
+        indicators = INDICATOR_ENGINE.values(market_name, "minute5")
+
+    return build_market_snapshot(market_name, raw_data, indicators, timestamp=get_current_time())
 
+# 원시 데이터 수집 (스트림에 준비된 데이터는 메모리에서 읽고 나머지만 병렬 요청)
+def fetch_raw_market_data(market_name="KRW-BTC", extra_tasks=None):
+    stream_data = read_stream_snapshot(market_name)
+    tasks = {name: task for name, task in build_market_tasks(market_name).items() if name not in stream_data}
+    tasks.update(extra_tasks or {})
+    raw_data = run_concurrently(tasks, timeout=COLLECTION_TIMEOUT)
+    raw_data.update(stream_data)
+    return raw_data
+
+# 데이터 수집
+def collect_market_data(market_name="KRW-BTC"):
+    logging.info(f"데이터 수집 시작: {market_name}")
+    raw_data = fetch_raw_market_data(market_name)
+    market_data = summarize_market_data(raw_data, market_name)
+    logging.info("데이터 수집 완료")
+    return market_data
+
+# 시장 데이터와 포트폴리오 상태를 한 번에 병렬 수집
+def collect_cycle_data(market_name="KRW-BTC"):
+    logging.info(f"데이터 수집 시작: {market_name}")
+    # 잔고는 원장 또는 포트폴리오 서비스 캐시에서 읽으므로 여러 시장을 수집해도 계좌 조회는 많아야 한 번
+    raw_data = fetch_raw_market_data(market_name, {"portfolio_status": (read_portfolio_snapshot, (market_name,))})
+
+    market_data = summarize_market_data(raw_data, market_name)
+    portfolio_status = raw_data["portfolio_status"]
+    if portfolio_status is None:
+        portfolio_status = PortfolioSnapshot(error="포트폴리오 상태를 가져오는 데 실패했습니다.")
+    logging.info("데이터 수집 완료")
+    return market_data, portfolio_status
+
+# GPT 응답 검증 및 금액/통화 정규화
+def normalize_response(response_content, market_name="KRW-BTC"):
     try:
-        amount = response_content.get("amount", 0)
-        if isinstance(amount, str):
-            if "KRW" in amount or "BTC" in amount or market_name.split("-")[1] in amount:
-                amount = float(amount.replace(" KRW", "").replace(" BTC", "").strip().replace(" {}".format(market_name.split("-")[1]), "").strip())
-            else:
-                amount = float(amount.strip())
-        elif isinstance(amount, (float, int)):
-            amount = float(amount)
-        else:
-            raise ValueError("잘못된 금액 형식")
-        response_content["amount"] = amount
-    except ValueError as ve:
-        logging.error(f"잘못된 금액 형식: {response_content.get('amount')} - {ve}")
-        response_content["amount"] = 0.0
+        response_content = decode_decision(response_content, market_name)
+    except ValueError as e:
+        logging.error(f"잘못된 GPT 응답: {response_content} - {e}")
+        response_content = fallback_decision("The decision response was invalid, so the position is held.")
 
+    logging.info(f"GPT 응답: {response_content}")
+    return response_content
+
+# GPT 요청 처리 및 응답
+def handle_gpt_request(final_result, market_name="KRW-BTC", deadline=None):
+    logging.info("GPT 요청 처리 시작")
+    constraints = check_feasibility(final_result["portfolio"], final_result["market_data"].current_price, market_name)
+    if constraints.only_hold:
+        return constraints.hold_decision()
+    final_result["constraints"] = constraints
+
+    if DECISION_PROVIDER is not None:
+        response_content = DECISION_PROVIDER.decide(final_result["market_data"], final_result["portfolio"])
+        return normalize_response(response_content, market_name)
+
+    cache_key = snapshot_fingerprint(final_result["market_data"], final_result["portfolio"])
+    cached = DECISION_CACHE.get(cache_key)
+    if cached is not None:
+        logging.info(f"판단 캐시 적중 ({cached['cache_age']}초 전 판단 재사용): {cached} - {DECISION_CACHE.stats()}")
+        return cached
+
+    formatted_input = format_input(final_result)
+    request_data = prepare_request(formatted_input)
+    if deadline is None:
+        deadline = time.monotonic() + CYCLE_LATENCY_BUDGET
+    metrics = RequestMetrics(request_data, "single", [market_name])
+    response_content = send_request_with_deadline(request_data, deadline - time.monotonic(), metrics)
+    logging.info(f"GPT 응답 지연 ({request_data['model']}): {LATENCY_TRACKER.summary(request_data['model'])}")
+
+    response_content = normalize_response(response_content, market_name)
+    LLM_RECORDER.record(metrics, {market_name: response_content})
+    if not response_content.get("fallback"):
+        DECISION_CACHE.put(cache_key, response_content)
     return response_content
 
+# 여러 시장의 GPT 판단을 한 번의 스트리밍 묶음 요청으로 받아 판단이 도착하는 즉시 처리
+# 같은 사이클에서 앞선 시장의 매수로 쓴 현금을 뺀 포트폴리오 스냅샷
+def deduct_spent_cash(portfolio_status, spent):
+    if spent <= 0 or portfolio_status.error:
+        return portfolio_status
+    return PortfolioSnapshot(
+        cash_balance=max((portfolio_status.cash_balance or 0.0) - spent, 0.0),
+        total_investment=portfolio_status.total_investment,
+        currency=portfolio_status.currency,
+        balance=portfolio_status.balance,
+        avg_buy_price=portfolio_status.avg_buy_price,
+        asset_investment=portfolio_status.asset_investment,
+    )
+
+def handle_batch_gpt_request(db, cycle_data, current_time, deadline=None):
+    if deadline is None:
+        deadline = time.monotonic() + CYCLE_LATENCY_BUDGET
+    # 모든 시장의 잔고는 사이클 시작 시 같은 시점에 읽었으므로, 앞선 시장의 매수 금액(수수료 포함)을 빼고 가능 여부를 다시 확인
+    spent = {"cash": 0.0}
+
+    def act(market_name, response_content):
+        market_data, portfolio_status = cycle_data[market_name]
+        portfolio_status = deduct_spent_cash(portfolio_status, spent["cash"])
+        action = response_content.get("action")
+        if action in ("buy", "sell"):
+            constraints = check_feasibility(portfolio_status, market_data.current_price, market_name)
+            if action not in constraints.allowed_actions:
+                logging.warning(f"{market_name} 앞선 주문 이후 {action} 불가 ({constraints.to_prompt()}), hold 로 대체")
+                response_content = {
+                    "action": "hold", "amount": 0.0, "currency": "KRW", "skipped": True,
+                    "reason": constraints.reason or f"Not enough balance left to {action} after earlier orders in this cycle.",
+                }
+        result = process_decision(db, response_content, market_data, portfolio_status, current_time, market_name)
+        if result and result[0] == "buy" and result[1]:
+            spent["cash"] += result[1] * (1 + FEE_RATE)
+
+    def on_decision(market_name, response_content):
+        response_content = normalize_response(response_content, market_name)
+        decisions[market_name] = response_content
+        if not response_content.get("fallback"):
+            DECISION_CACHE.put(cache_keys[market_name], response_content)
+        # 주문과 DB 저장은 작업자 스레드에서 도착 순서대로 실행 (스트림 수신 이벤트 루프를 막지 않음)
+        pending.append(DECISION_EXECUTOR.submit(act, market_name, response_content))
+
+    entries, cache_keys, decisions, pending = {}, {}, {}, []
+    for market_name, (market_data, portfolio_status) in cycle_data.items():
+        portfolio_status = deduct_spent_cash(portfolio_status, spent["cash"])
+        constraints = check_feasibility(portfolio_status, market_data.current_price, market_name)
+        if constraints.only_hold:
+            act(market_name, constraints.hold_decision())
+            continue
+
+        cache_keys[market_name] = snapshot_fingerprint(market_data, portfolio_status)
+        cached = DECISION_CACHE.get(cache_keys[market_name])
+        if cached is not None:
+            logging.info(f"{market_name} 판단 캐시 적중 ({cached['cache_age']}초 전 판단 재사용): {cached}")
+            act(market_name, cached)
+            continue
+        entries[market_name] = format_input(
+            {"portfolio": portfolio_status, "market_data": market_data, "constraints": constraints}
+        )
+
+    if not entries:
+        return
+    if DECISION_PROVIDER is not None:
+        for market_name in entries:
+            market_data, portfolio_status = cycle_data[market_name]
+            on_decision(market_name, DECISION_PROVIDER.decide(market_data, portfolio_status, entries[market_name]))
+    else:
+        logging.info(f"GPT 묶음 요청 처리 시작: {list(entries)}")
+        request_data = prepare_batch_request(entries)
+        metrics = RequestMetrics(request_data, "batch", list(entries))
+        stream_batch_decisions(request_data, list(entries), on_decision, deadline - time.monotonic(), metrics)
+        logging.info(f"GPT 응답 지연 ({request_data['model']}): {LATENCY_TRACKER.summary(request_data['model'])}")
+        LLM_RECORDER.record(metrics, decisions)
+
+    # 사이클을 끝내기 전에 모든 시장의 판단 실행을 기다림
+    wait(pending)
+    for market_name, future in zip(decisions, pending):
+        if future.exception() is not None:
+            logging.error(f"{market_name} 판단 실행 중 오류 발생: {future.exception()}")
+
 # 매매 실행 및 로깅
 def execute_trade_and_log(action, amount, current_price, response_content, market_name="KRW-BTC"):
     logging.info(f"매매 실행: {action}, 금액: {amount}, 현재 가격: {current_price}")
-    trade_result = execute_trade(action, amount, market_name)
+    order_value = amount if action == "buy" else amount * current_price
+    if EXECUTION_STRATEGY in STRATEGIES and order_value >= SLICE_THRESHOLD:
+        # 큰 주문은 백그라운드에서 나눠 실행 (판단 사이클은 기다리지 않음)
+        parent = EXECUTION_SCHEDULER.submit(
+            action, amount, market_name, strategy=EXECUTION_STRATEGY, on_progress=on_slice_progress, **SLICE_OPTIONS
+        )
+        trade_result = {"uuid": parent.id, "state": "wait", "market": market_name, "volume": amount}
+    else:
+        trade_result = execute_trade(action, amount, market_name)
+    reserve_ledger_order(trade_result, market_name, action, amount)
     log_transaction(action, trade_result)
 
     currency = market_name.split("-")[1]
 
+    # price/total_value 는 체결 전 추정값이며, 주문 체결이 끝나면 실제 체결 값으로 갱신됨
     trade_log = {
         "timestamp": get_current_time(),
         "action": action,
@@ -120,11 +485,82 @@ def execute_trade_and_log(action, amount, current_price, response_content, marke
         "price": current_price,
         "total_value": amount * current_price,
         "reason": response_content.get("reason"),
+        "order_uuid": trade_result.get("uuid"),
+        "order_state": trade_result.get("state", "error" if "error" in trade_result else None),
+        "expected_price": current_price,
     }
 
     logging.info(f"매매 로그 생성: {trade_log}")
     return trade_log
 
+# 주문 체결 요약을 거래 기록에 반영 (추적 스레드에서 짧은 별도 세션으로 저장)
+def save_trade_fill(trade_id, action, expected_price, summary):
+    fill_data = {
+        "order_state": summary["order_state"],
+        "filled_volume": summary["filled_volume"],
+        "paid_fee": summary["paid_fee"],
+    }
+    if summary["fill_price"] is not None:
+        fill_data.update({
+            "price": summary["fill_price"],
+            "total_value": summary["filled_funds"],
+            "slippage_bps": compute_slippage_bps(action, summary["fill_price"], expected_price),
+        })
+
+    db = SessionLocal()
+    try:
+        update_trade_fill(db, trade_id, fill_data)
+    finally:
+        db.close()
+    logging.info(f"체결 반영 (거래 {trade_id}): {fill_data}")
+
+# 번역된 매매 사유를 거래 기록에 반영 (번역 스레드에서 짧은 별도 세션으로 저장)
+def save_trade_reason(trade_id, original, reason):
+    if reason == original:
+        return
+    db = SessionLocal()
+    try:
+        update_trade_fill(db, trade_id, {"reason": reason})
+    finally:
+        db.close()
+    logging.info(f"매매 사유 번역 반영 (거래 {trade_id})")
+
+# 분할 주문 진행 상황 로깅
+def log_slice_progress(progress):
+    logging.info(
+        f"분할 주문 진행 ({progress['parent_id']}): {progress['state']} {progress['filled_ratio'] * 100:.1f}%, "
+        f"자식 주문 {progress['children']}개 (대기 {progress['open_children']}, 재주문 {progress['replaced']})"
+    )
+
+# 분할 주문 진행 상황 처리 (로깅 후 새 체결을 원장에 반영)
+def on_slice_progress(progress):
+    log_slice_progress(progress)
+    record_ledger_fill(progress["parent_id"], progress["market"], progress["action"], progress)
+
+# 주문 체결 추적 시작 (분할 주문은 부모 주문이 끝날 때 반영)
+def track_trade_fill(trade, trade_log):
+    if not trade_log.get("order_uuid"):
+        return None
+    # 거래 기록 저장에 실패해도 원장 반영과 묶인 양 해제를 위해 체결은 추적
+    trade_id = trade.id if trade is not None else None
+    order_uuid, action = trade_log["order_uuid"], trade_log["action"]
+    market_name = f"KRW-{trade_log['currency']}"
+
+    def on_update(summary):
+        record_ledger_fill(order_uuid, market_name, action, summary)
+
+    def on_complete(summary):
+        record_ledger_fill(order_uuid, market_name, action, summary)
+        PORTFOLIO_SERVICE.invalidate()
+        if trade_id is not None:
+            save_trade_fill(trade_id, action, trade_log["expected_price"], summary)
+
+    parent = EXECUTION_SCHEDULER.get(order_uuid)
+    if parent is not None:
+        parent.future.add_done_callback(lambda future: on_complete(future.result()))
+        return parent.future
+    return ORDER_TRACKER.track(order_uuid, on_update=on_update, on_complete=on_complete)
+
 # Slack 알림 생성 및 전송
 def send_slack_notification(db, trade_log, portfolio_status,performance_data, market_name="KRW-BTC"):
     notifier = SlackNotifier()
@@ -140,9 +576,9 @@ def send_slack_notification(db, trade_log, portfolio_status,performance_data, ma
             else f"{trade_log['amount']:,.2f} KRW"
         ),
         "total_value": f"{trade_log['total_value']:,.2f} KRW",
-        "balance": f"{portfolio_status.get('target_asset', {}).get('balance', 0.0):.8f} {currency}",
-        "cash_balance": f"{portfolio_status.get('cash_balance', 0.0):,.2f} KRW",
-        "investment": f"{portfolio_status.get('target_asset', {}).get('total_investment', 0.0):,.2f} KRW",
+        "balance": f"{portfolio_status.balance:.8f} {currency}",
+        "cash_balance": f"{portfolio_status.cash_balance:,.2f} KRW",
+        "investment": f"{portfolio_status.asset_investment:,.2f} KRW",
         "profit_amount": f"{performance_data.get('profit', 0.0):,.2f} KRW",
         "profit_rate": f"{performance_data.get('profit_rate', 0.0):.2f}%",
         "cumulative_profit_amount": f"{performance_data.get('cumulative_profit', 0.0):,.2f} KRW",
@@ -156,102 +592,131 @@ def send_slack_notification(db, trade_log, portfolio_status,performance_data, ma
     else:
         logging.warning("Slack 연결 실패")
 
-# 핵심 비즈니스 로직
-def business_logic():
+# 매매 알림 전송 (번역 스레드에서 호출되므로 별도 세션 사용)
+def notify_trade(trade_log, portfolio_status, performance_data, market_name="KRW-BTC"):
     db = SessionLocal()
-    MARKET_NAME = "KRW-XRP"
-    trade_log = None  # trade_log 초기화
     try:
-        logging.info("비즈니스 로직 시작")
+        send_slack_notification(
+            db=db,
+            trade_log=trade_log,
+            portfolio_status=portfolio_status,
+            performance_data=performance_data,
+            market_name=market_name
+        )
+        logging.info("Slack 전송 완료")
+    finally:
+        db.close()
 
-        current_time = get_current_time()
-        market_data = collect_market_data(MARKET_NAME)
-        portfolio_status = get_portfolio_status(MARKET_NAME)
+# GPT 판단 검증, 매매 실행 및 결과 저장/알림
+def process_decision(db, response_content, market_data, portfolio_status, current_time, market_name="KRW-BTC"):
+    trade_log = None
+    performance_data = {}
+    gpt_result = make_decision(response_content, portfolio_status, market_data.current_price, market_name)
 
-        final_result = {
-            "timestamp": current_time,
-            "portfolio": portfolio_status,
-            "market_data": market_data,
-        }
-
-        response_content = handle_gpt_request(final_result, MARKET_NAME)
-        gpt_result = make_decision(
-            response_content, portfolio_status, final_result["market_data"]["current_price"], MARKET_NAME
-        )
+    if gpt_result[0] != "hold":
+        # 사유 번역은 주문과 동시에 백그라운드에서 진행 (주문은 번역을 기다리지 않음)
+        reason_future = REASON_TRANSLATOR.submit(response_content.get("reason"))
 
-        if gpt_result[0] != "hold":
-            # 매매 로그 생성 및 저장
+        # 매매 로그 생성 및 저장
+        try:
+            trade_log = execute_trade_and_log(
+                gpt_result[0], gpt_result[1], market_data.current_price, response_content, market_name
+            )
+            trade = None
             try:
-                trade_log = execute_trade_and_log(
-                    gpt_result[0], gpt_result[1], market_data["current_price"], response_content, MARKET_NAME
-                )
-                create_trade(db, trade_log)
+                # 원문 사유로 바로 저장하고, 번역이 끝나면 별도 세션으로 사유를 갱신 (사이클은 번역을 기다리지 않음)
+                trade = create_trade(db, trade_log)
                 logging.info(f"매매 로그 저장 성공: {trade_log}")
+                ReasonTranslator.when_done(
+                    reason_future, trade_log["reason"],
+                    lambda reason, trade_id=trade.id, original=trade_log["reason"]: save_trade_reason(trade_id, original, reason),
+                )
             except Exception as e:
                 logging.error(f"매매 로그 저장 중 오류 발생: {e}")
+            track_trade_fill(trade, trade_log)
+        except Exception as e:
+            logging.error(f"매매 실행 중 오류 발생: {e}")
 
-        
+    if gpt_result[0] != "hold":
+        # 포트폴리오 상태 업데이트
+        try:
+            # 주문 직후에는 체결이 원장에 아직 반영되지 않았을 수 있으므로 거래소 잔고를 조회
+            portfolio_status = PORTFOLIO_SERVICE.snapshot(market_name)
+            update_portfolio(db, portfolio_status)
+            logging.info("포트폴리오 상태 업데이트 성공")
+        except Exception as e:
+            logging.error(f"포트폴리오 상태 업데이트 중 오류 발생: {e}")
 
-        if gpt_result[0] != "hold":
-            # 포트폴리오 상태 업데이트
-            try:
-                portfolio_status = get_portfolio_status(MARKET_NAME)
-                portfolio_data = {
-                    "timestamp": current_time,
-                    "cash_balance": portfolio_status.get("cash_balance", 0),
-                    "total_investment": portfolio_status.get("total_investment", 0),
-                    "currency": portfolio_status.get("target_asset", {}).get("currency", "N/A"),
-                    "target_asset_balance": portfolio_status.get("target_asset", {}).get("balance", 0),
-                    "avg_buy_price": portfolio_status.get("target_asset", {}).get("avg_buy_price", 0),
-                }
-                update_portfolio(db, portfolio_data)
-                logging.info("포트폴리오 상태 업데이트 성공")
-            except Exception as e:
-                logging.error(f"포트폴리오 상태 업데이트 중 오류 발생: {e}")
+        # 수익률 및 누적 수익률 계산
+        try:
+            current_price = market_data.current_price
+            target_balance = portfolio_status.balance
+            avg_buy_price = portfolio_status.avg_buy_price
+
+            invested_value = target_balance * avg_buy_price
+            current_value = target_balance * current_price
+            profit_loss = current_value - invested_value
+            profit_rate = (profit_loss / invested_value * 100) if invested_value > 0 else 0.0
+
+            cumulative_summary = calculate_cumulative_profit_and_rate(db)
+            cumulative_profit = cumulative_summary.get("cumulative_profit_loss", 0.0)
+            cumulative_profit_rate = cumulative_summary.get("cumulative_profit_rate", 0.0)
+            total_investment = portfolio_status.total_investment
+
+            cumulative_profit += profit_loss
+            cumulative_profit_rate = (cumulative_profit / total_investment * 100) if total_investment > 0 else 0.0
+
+            performance_data = {
+                "timestamp": current_time,
+                "profit": profit_loss,
+                "profit_rate": profit_rate,
+                "cumulative_profit": cumulative_profit,
+                "cumulative_profit_rate": cumulative_profit_rate,
+            }
+
+            create_performance(db, performance_data)
+            logging.info(f"수익률 데이터 저장 성공: {performance_data}")
+        except Exception as e:
+            logging.error(f"수익률 데이터 저장 중 오류 발생: {e}")
 
-            # 수익률 및 누적 수익률 계산
-            try:
-                current_price = market_data["current_price"]
-                target_asset = portfolio_status.get("target_asset", {})
-                target_balance = target_asset.get("balance", 0)
-                avg_buy_price = target_asset.get("avg_buy_price", 0)
-
-                invested_value = target_balance * avg_buy_price
-                current_value = target_balance * current_price
-                profit_loss = current_value - invested_value
-                profit_rate = (profit_loss / invested_value * 100) if invested_value > 0 else 0.0
-
-                cumulative_summary = calculate_cumulative_profit_and_rate(db)
-                cumulative_profit = cumulative_summary.get("cumulative_profit_loss", 0.0)
-                cumulative_profit_rate = cumulative_summary.get("cumulative_profit_rate", 0.0)
-                total_investment = portfolio_status.get("total_investment", 0)
-
-                cumulative_profit += profit_loss
-                cumulative_profit_rate = (cumulative_profit / total_investment * 100) if total_investment > 0 else 0.0
-
-                performance_data = {
-                    "timestamp": current_time,
-                    "profit": profit_loss,
-                    "profit_rate": profit_rate,
-                    "cumulative_profit": cumulative_profit,
-                    "cumulative_profit_rate": cumulative_profit_rate,
-                }
+    # Slack 알림 전송 (모의 거래는 로그로만 남김, 번역이 끝나면 번역된 사유로 번역 스레드에서 전송)
+    if trade_log and gpt_result[0] != "hold" and PAPER_EXCHANGE is None:
+        ReasonTranslator.when_done(
+            reason_future, trade_log["reason"],
+            lambda reason: notify_trade(dict(trade_log, reason=reason), portfolio_status, performance_data, market_name),
+        )
+    return gpt_result
 
-                create_performance(db, performance_data)
-                logging.info(f"수익률 데이터 저장 성공: {performance_data}")
-            except Exception as e:
-                logging.error(f"수익률 데이터 저장 중 오류 발생: {e}")
-
-        # Slack 알림 전송
-        if trade_log and gpt_result[0] != "hold":
-            send_slack_notification(
-                db=db,
-                trade_log=trade_log,
-                portfolio_status=portfolio_status,
-                performance_data = performance_data,
-                market_name=MARKET_NAME
+# 핵심 비즈니스 로직
+def business_logic():
+    db = SessionLocal()
+    try:
+        logging.info("비즈니스 로직 시작")
+        cycle_deadline = time.monotonic() + CYCLE_LATENCY_BUDGET
+
+        current_time = get_current_time()
+        if len(MARKET_NAMES) > 1:
+            collected = run_concurrently(
+                {market_name: (collect_cycle_data, (market_name,)) for market_name in MARKET_NAMES},
+                timeout=COLLECTION_TIMEOUT * 2,
             )
-            logging.info("Slack 전송 완료")
+            cycle_data = {market_name: data for market_name, data in collected.items() if data is not None}
+            handle_batch_gpt_request(db, cycle_data, current_time, cycle_deadline)
+            log_account_valuation()
+            logging.info("비즈니스 로직 완료")
+            return
+
+        market_data, portfolio_status = collect_cycle_data(MARKET_NAME)
+
+        final_result = {
+            "timestamp": current_time,
+            "portfolio": portfolio_status,
+            "market_data": market_data,
+        }
+
+        response_content = handle_gpt_request(final_result, MARKET_NAME, cycle_deadline)
+        process_decision(db, response_content, market_data, portfolio_status, current_time, MARKET_NAME)
+        log_account_valuation()
 
         logging.info("비즈니스 로직 완료")
 
@@ -262,8 +727,21 @@ def business_logic():
 
 
 
-# 스케줄러 실행
+# 스케줄러 실행 (모의 거래 중에는 모의 시계로 15분씩 진행)
 def run_scheduler():
+    if PAPER_CLOCK is not None:
+        cycles = 0
+        while not PAPER_MAX_CYCLES or cycles < PAPER_MAX_CYCLES:
+            business_logic()
+            cycles += 1
+            PAPER_CLOCK.sleep(15 * 60)
+        # 시계가 더 흐르지 않으므로 진행 중인 분할 주문은 중단
+        for progress in EXECUTION_SCHEDULER.status():
+            EXECUTION_SCHEDULER.cancel(progress["parent_id"])
+        EXECUTION_SCHEDULER.shutdown()
+        logging.info(f"모의 거래 종료 ({cycles}회): 잔고 {PAPER_EXCHANGE.get_accounts()}")
+        return
+
     schedule.every(15).minutes.do(business_logic)
     business_logic()  # 첫 실행
     while True:
@@ -273,4 +751,8 @@ def run_scheduler():
 if __name__ == "__main__":
     initialize_env()
     init_db()
+    setup_execution_backend()
+    start_position_ledger()
+    if MARKET_DATA_STORE is not None:
+        start_tick_stream(MARKET_NAMES)
     run_scheduler()
@@ -0,0 +1,57 @@
+# tests/helpers.py
+
+import numpy as np
+import pandas as pd
+
+# 여러 테스트에서 함께 쓰는 캔들 생성 함수와 시세 소스
+
+
+def make_candles(periods, freq="5min", seed=0, start="2024-12-13 09:00:00", step=10.0, spread=5.0, offset=0.0):
+    """
+    무작위 행보 가격으로 OHLCV 캔들을 만듭니다.
+    :param periods: int - 캔들 개수.
+    :param freq: str - 캔들 간격 (예: '5min', 'D').
+    :param seed: int - 난수 시드.
+    :param start: str - 첫 캔들 시각.
+    :param step: float - 캔들마다 가격 변화의 표준편차.
+    :param spread: float - 종가 대비 고가/저가 폭의 최댓값.
+    :param offset: float - 모든 가격에 더할 값 (소수점 자릿수 테스트용).
+    :return: pd.DataFrame - open, high, low, close, volume, value 열을 가진 캔들.
+    """
+    rng = np.random.default_rng(seed)
+    close = 3000 + rng.normal(0, step, periods).cumsum() + offset
+    return pd.DataFrame({
+        "open": close,
+        "high": close + rng.uniform(0, spread, periods),
+        "low": close - rng.uniform(0, spread, periods),
+        "close": close,
+        "volume": rng.uniform(0, 100, periods),
+        "value": close * 10,
+    }, index=pd.date_range(start=start, periods=periods, freq=freq))
+
+
+def make_ramp_candles(start, periods, freq="5min", base=100.0):
+    """
+    종가가 캔들마다 1씩 오르는 캔들을 만듭니다 (저장/병합 결과를 값으로 확인할 때 사용).
+    """
+    close = [base + i for i in range(periods)]
+    return pd.DataFrame({
+        "open": close,
+        "high": [c + 1 for c in close],
+        "low": [c - 1 for c in close],
+        "close": close,
+        "volume": [1.0] * periods,
+        "value": close,
+    }, index=pd.date_range(start=start, periods=periods, freq=freq))
+
+
+class FixedPrice:
+    """
+    고정 가격을 반환하는 시세 소스 (단일 시장은 가격, 시장 목록은 {시장: 가격}).
+    """
+
+    def __init__(self, price=1000.0):
+        self.price = price
+
+    def get_current_price(self, markets):
+        return self.price if isinstance(markets, str) else {market: self.price for market in markets}
@@ -0,0 +1,99 @@
+# tests/test_async_client.py
+
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from gpt_interface.async_client import LatencyTracker, send_request_async
+
+
+class FakeCompletions:
+    """
+    호출 순서별 지연(초)과 결과를 지정할 수 있는 가짜 chat.completions.
+    """
+
+    def __init__(self, delays, contents):
+        self.delays = list(delays)
+        self.contents = list(contents)
+        self.calls = 0
+
+    async def create(self, model, messages, **kwargs):
+        index = self.calls
+        self.calls += 1
+        await asyncio.sleep(self.delays[index])
+        content = self.contents[index]
+        if isinstance(content, Exception):
+            raise content
+        return self.stream(json.dumps(content))
+
+    @staticmethod
+    async def stream(text):
+        # 두 조각으로 나눠 보내고 마지막에 usage 전송
+        for piece in (text[:3], text[3:]):
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=30,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+def make_client(delays, contents):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(delays, contents)))
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def setUp(self):
+        self.request = {"model": "test-model", "messages": []}
+        self.tracker = LatencyTracker()
+
+    def run_request(self, client, timeout, hedge_delay):
+        return asyncio.run(send_request_async(self.request, timeout, client, self.tracker, hedge_delay))
+
+    def test_fast_response_is_not_hedged(self):
+        """
+        헤지 지연 안에 응답하면 중복 요청 없이 결과를 반환하고 지연을 기록하는지 테스트.
+        """
+        client = make_client([0.0], [{"action": "buy"}])
+        self.assertEqual(self.run_request(client, 1.0, 0.5), {"action": "buy"})
+        self.assertEqual(client.chat.completions.calls, 1)
+        self.assertEqual(self.tracker.summary("test-model")["count"], 1)
+
+    def test_slow_response_is_hedged(self):
+        """
+        첫 요청이 느리면 헤지 요청의 응답을 사용하는지 테스트.
+        """
+        client = make_client([0.5, 0.0], [{"action": "buy"}, {"action": "sell"}])
+        self.assertEqual(self.run_request(client, 1.0, 0.05), {"action": "sell"})
+        self.assertEqual(client.chat.completions.calls, 2)
+
+    def test_failure_is_hedged_immediately(self):
+        """
+        첫 요청이 실패하면 헤지 지연을 기다리지 않고 다시 요청하는지 테스트.
+        """
+        client = make_client([0.0, 0.0], [RuntimeError("boom"), {"action": "hold"}])
+        self.assertEqual(self.run_request(client, 1.0, 10.0), {"action": "hold"})
+        self.assertEqual(self.tracker.summary("test-model")["failures"], 1)
+
+    def test_deadline_falls_back_to_hold(self):
+        """
+        마감 시간이 지나면 hold 로 대체되는지 테스트.
+        """
+        client = make_client([1.0, 1.0], [{"action": "buy"}, {"action": "buy"}])
+        result = self.run_request(client, 0.1, 0.02)
+        self.assertEqual((result["action"], result["amount"]), ("hold", 0.0))
+        self.assertTrue(result["fallback"])
+
+    def test_percentile_requires_samples(self):
+        """
+        기록이 부족하면 백분위 대신 None 을 반환하는지 테스트.
+        """
+        self.assertIsNone(self.tracker.percentile("test-model", 95))
+        for seconds in range(1, 101):
+            self.tracker.record("test-model", float(seconds))
+        self.assertAlmostEqual(self.tracker.percentile("test-model", 95), 95.05)
+        self.assertEqual(self.tracker.summary("test-model")["max"], 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
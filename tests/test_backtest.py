@@ -0,0 +1,101 @@
+# tests/test_backtest.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest import RecordedProvider, RuleBasedProvider, SimulatedExchange, precompute_features, run_backtest
+from data_collection.candle_store import CandleStore
+from data_collection.preprocess import extract_relevant_data, preprocess_15min_data
+from helpers import make_candles
+
+
+def make_market(days=40, seed=0):
+    # 5분 봉과, 5분 봉 시작 40일 전부터의 일봉
+    minute = make_candles(288 * days, seed=seed, start="2024-09-01 09:00:00", step=5.0, spread=3.0)
+    daily = make_candles(days + 40, "D", seed=seed + 1, start="2024-07-23 09:00:00", step=30.0, spread=10.0)
+    return minute, daily
+
+
+class TestBacktest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.minute, cls.daily = make_market()
+        cls.features = precompute_features(
+            "KRW-XRP", CandleStore.to_records(cls.minute), CandleStore.to_records(cls.daily)
+        )
+
+    def test_features_match_live_preprocessing(self):
+        """
+        미리 계산한 특징이 실시간 경로의 preprocess_15min_data / extract_relevant_data 결과와 같은지 테스트.
+        """
+        for i in (0, 250, len(self.features) - 1):
+            snapshot = self.features.snapshot(i)
+            end = i * 3 + 36
+            expected = preprocess_15min_data(self.minute.iloc[end - 36:end])
+            actual = snapshot.processed_5min()
+            self.assertEqual(actual.pop("overall"), expected.pop("overall"))
+            for key, stats in expected.items():
+                np.testing.assert_allclose(list(actual[key].values()), list(stats.values()))
+
+            completed = self.daily[self.daily.index + pd.Timedelta(days=1) <= snapshot.timestamp].iloc[-30:]
+            self.assertEqual(snapshot.summary_30d(), extract_relevant_data(completed))
+            self.assertEqual(snapshot.current_price, self.minute["close"].iloc[end - 1])
+
+    def test_gaps_are_filled(self):
+        """
+        빠진 분봉이 직전 종가, 거래량 0 으로 채워져 판단 간격이 유지되는지 테스트.
+        """
+        records = CandleStore.to_records(self.minute.drop(self.minute.index[100:103]))
+        features = precompute_features("KRW-XRP", records, with_indicators=False)
+        self.assertEqual(len(features), len(self.features))
+        self.assertIn("summary_30d", features.snapshot(0).errors)
+
+    def test_exchange_fees_slippage_and_minimums(self):
+        """
+        모의 거래소가 수수료, 슬리피지, 최소 주문 금액을 반영하는지 테스트.
+        """
+        exchange = SimulatedExchange(cash=100_000.0, currency="XRP", slippage_bps=10)
+        self.assertIsNone(exchange.buy(4_000.0, 1000.0))
+        fill = exchange.buy(50_000.0, 1000.0)
+        self.assertAlmostEqual(fill["price"], 1001.0)
+        self.assertAlmostEqual(exchange.cash, 100_000.0 - 50_000.0 * 1.0005)
+        self.assertIsNone(exchange.sell(exchange.balance * 2, 1000.0))
+
+        exchange.sell(exchange.balance, 1000.0)
+        self.assertEqual(exchange.balance, 0.0)
+        self.assertLess(exchange.cash, 100_000.0)
+        self.assertAlmostEqual(exchange.turnover, 50_000.0 + fill["volume"] * 999.0)
+
+    def test_recorded_decisions_replay(self):
+        """
+        기록된 판단이 해당 시각에 그대로 재생되고 make_decision 검증을 거치는지 테스트.
+        """
+        buy_at, sell_at = self.features.timestamps[10], self.features.timestamps[20]
+        provider = RecordedProvider({
+            buy_at.isoformat(): {"action": "buy", "amount": "200000", "reason": "x"},
+            (sell_at + pd.Timedelta(seconds=3)).isoformat(): {"action": "sell", "amount": "1000000 XRP", "reason": "y"},
+        }, tolerance_seconds=5)
+        result = run_backtest(self.features, provider, SimulatedExchange(cash=1_000_000.0, currency="XRP"))
+
+        self.assertEqual(result.actions[10], "buy")
+        self.assertEqual(result.actions[20], "hold")  # 보유 수량 초과 매도는 make_decision 에서 hold
+        self.assertEqual(result.metrics["trades"], 1)
+        self.assertEqual(provider.misses, len(self.features) - 2)
+
+    def test_rule_based_run_metrics(self):
+        """
+        규칙 기반 제공자로 전체 기간을 재생하고 손익/낙폭/회전율이 일관되게 계산되는지 테스트.
+        """
+        result = run_backtest(self.features, RuleBasedProvider(), SimulatedExchange(currency="XRP"))
+        metrics = result.metrics
+        self.assertEqual(len(result.equity), len(self.features))
+        self.assertGreater(metrics["trades"], 0)
+        self.assertAlmostEqual(metrics["pnl"], result.equity[-1] - 1_000_000.0)
+        self.assertGreaterEqual(metrics["max_drawdown"], 0.0)
+        self.assertGreater(metrics["turnover"], 0.0)
+        self.assertEqual(list(result.to_frame().columns), ["price", "equity", "action"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/test_batch_request.py
+
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from gpt_interface.batch_request import (
+    StreamingArrayParser,
+    prepare_batch_request,
+    stream_batch_decisions_async,
+    validate_market_decision,
+)
+
+DECISIONS = [
+    {"market": "KRW-XRP", "action": "buy", "amount": "10000 KRW", "reason": "Uptrend {strong} [confirmed]"},
+    {"market": "KRW-ETH", "action": "hold", "amount": "0", "reason": "Say \"wait\""},
+]
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeStream:
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for text in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def make_client(chunks, delay=0.0):
+    async def create(model, messages, stream, **kwargs):
+        return FakeStream(chunks, delay)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class TestStreamingArrayParser(unittest.TestCase):
+
+    def test_objects_complete_across_chunks(self):
+        """
+        조각으로 나뉜 배열에서 객체가 닫히는 시점마다 반환되는지 테스트 (문자열 안의 괄호/따옴표 포함).
+        """
+        text = "```json\n" + json.dumps(DECISIONS) + "\n```"
+        parser = StreamingArrayParser()
+        completed = []
+        for chunk in chunked(text, 7):
+            completed.extend(parser.feed(chunk))
+        self.assertEqual(completed, DECISIONS)
+
+    def test_first_object_is_emitted_before_array_ends(self):
+        """
+        첫 번째 객체가 배열이 끝나기 전에 반환되는지 테스트.
+        """
+        text = json.dumps(DECISIONS)
+        split = text.index('"}, ') + 2
+        parser = StreamingArrayParser()
+        self.assertEqual(parser.feed(text[:split]), [DECISIONS[0]])
+        self.assertEqual(parser.feed(text[split:]), [DECISIONS[1]])
+
+    def test_wrapped_array(self):
+        """
+        {"decisions": [...]} 형식으로 감싼 응답도 파싱되는지 테스트.
+        """
+        parser = StreamingArrayParser()
+        self.assertEqual(parser.feed(json.dumps({"decisions": DECISIONS})), DECISIONS)
+
+
+class TestBatchRequest(unittest.TestCase):
+
+    def test_prepare_batch_request(self):
+        """
+        시스템 프롬프트는 하나이고 시장별 데이터가 구역으로 나뉘는지 테스트.
+        """
+        request = prepare_batch_request({"KRW-XRP": "MARKET KRW-XRP", "KRW-ETH": "MARKET KRW-ETH"})
+        self.assertEqual([message["role"] for message in request["messages"]], ["system", "user"])
+        self.assertIn("### KRW-ETH\nMARKET KRW-ETH", request["messages"][1]["content"])
+        self.assertGreater(request["prompt_tokens"], 0)
+
+    def test_validate_market_decision(self):
+        """
+        요청하지 않은 시장이나 잘못된 행동은 거부되는지 테스트.
+        """
+        markets = ["KRW-XRP"]
+        self.assertEqual(validate_market_decision(DECISIONS[0], markets)["action"], "buy")
+        self.assertIsNone(validate_market_decision(DECISIONS[1], markets))
+        self.assertIsNone(validate_market_decision({**DECISIONS[0], "action": "short"}, markets))
+
+    def test_stream_emits_decisions_and_fills_missing(self):
+        """
+        스트림의 판단을 도착 순서대로 처리하고, 응답에 없는 시장은 hold 로 채우는지 테스트.
+        """
+        received = []
+        client = make_client(chunked(json.dumps(DECISIONS), 5))
+        markets = ["KRW-XRP", "KRW-ETH", "KRW-SOL"]
+        decisions = asyncio.run(stream_batch_decisions_async(
+            {"model": "test-model", "messages": []}, markets, lambda m, d: received.append(m), 1.0, client
+        ))
+        self.assertEqual(received, markets)
+        self.assertEqual((decisions["KRW-XRP"]["amount"], decisions["KRW-XRP"]["currency"]), (10000.0, "KRW"))
+        self.assertTrue(decisions["KRW-SOL"]["fallback"])
+
+    def test_deadline_keeps_completed_decisions(self):
+        """
+        마감 시간 전에 완성된 판단은 유지하고 나머지는 hold 로 대체하는지 테스트.
+        """
+        text = json.dumps(DECISIONS)
+        split = text.index('"}, ') + 2
+        client = make_client([text[:split], text[split:]], delay=0.2)
+        decisions = asyncio.run(stream_batch_decisions_async(
+            {"model": "test-model", "messages": []}, ["KRW-XRP", "KRW-ETH"], lambda m, d: None, 0.3, client
+        ))
+        self.assertEqual(decisions["KRW-XRP"]["action"], "buy")
+        self.assertTrue(decisions["KRW-ETH"]["fallback"])
+
+
+if __name__ == "__main__":
+    unittest.main()
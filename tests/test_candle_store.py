@@ -0,0 +1,72 @@
+# tests/test_candle_store.py
+
+import tempfile
+import unittest
+import pandas as pd
+from data_collection.candle_store import CandleStore
+from helpers import make_ramp_candles
+
+
+class TestCandleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = CandleStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_and_read_roundtrip(self):
+        """
+        저장한 캔들이 같은 형식으로 다시 읽히는지 테스트.
+        """
+        data = make_ramp_candles("2024-12-13 00:00:00", 5)
+        self.store.write("KRW-BTC", "minute5", data)
+        result = self.store.read("KRW-BTC", "minute5")
+        pd.testing.assert_frame_equal(result, data, check_freq=False, check_index_type=False)
+
+    def test_write_replaces_overlapping_tail(self):
+        """
+        겹치는 마지막 캔들은 교체되고 새 캔들만 추가되는지 테스트.
+        """
+        self.store.write("KRW-BTC", "minute5", make_ramp_candles("2024-12-13 00:00:00", 5))
+        self.store.write("KRW-BTC", "minute5", make_ramp_candles("2024-12-13 00:20:00", 3, base=500.0))
+        result = self.store.read("KRW-BTC", "minute5")
+        self.assertEqual(len(result), 7)
+        self.assertEqual(result["close"].iloc[4], 500.0)
+        self.assertEqual(result["close"].iloc[-1], 502.0)
+
+    def test_write_keeps_open_memmaps_readable(self):
+        """
+        더 짧은 데이터로 덮어써도 이미 열린 memmap 은 이전 내용을 그대로 읽고, 새로 읽으면 병합 결과가 보이는지 테스트.
+        """
+        self.store.write("KRW-BTC", "minute5", make_ramp_candles("2024-12-13 00:00:00", 10))
+        records = self.store.read_records("KRW-BTC", "minute5")
+        self.store.write("KRW-BTC", "minute5", make_ramp_candles("2024-12-13 00:10:00", 2, base=500.0))
+
+        self.assertEqual(len(records), 10)
+        self.assertEqual(float(records["close"][-1]), 109.0)
+        result = self.store.read("KRW-BTC", "minute5")
+        self.assertListEqual(list(result["close"]), [100.0, 101.0, 500.0, 501.0])
+
+    def test_fetch_requests_only_missing_candles(self):
+        """
+        저장소가 채워진 뒤에는 새 캔들 수만큼만 요청하는지 테스트.
+        """
+        now = pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None).floor("5min")
+        history = make_ramp_candles(now - pd.Timedelta(minutes=5 * 35), 36)
+        requested = []
+
+        def fetcher(market, interval, count):
+            requested.append(count)
+            return history.iloc[-count:]
+
+        first = self.store.fetch("KRW-BTC", "minute5", 36, fetcher)
+        second = self.store.fetch("KRW-BTC", "minute5", 36, fetcher)
+        self.assertEqual(requested[0], 36)
+        self.assertLessEqual(requested[1], 2)
+        self.assertEqual(len(second), 36)
+        pd.testing.assert_frame_equal(first, second)
+
+if __name__ == "__main__":
+    unittest.main()
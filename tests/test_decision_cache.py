@@ -0,0 +1,77 @@
+# tests/test_decision_cache.py
+
+import unittest
+from data_collection.snapshot import MarketSnapshot, PortfolioSnapshot
+from gpt_interface.decision_cache import DecisionCache, snapshot_fingerprint
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_market(price, trend="rising", volatility=5.0):
+    market = MarketSnapshot("KRW-XRP", current_price=price)
+    market.trend, market.max_volatility = trend, volatility
+    return market
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = DecisionCache(ttl_seconds=900, max_entries=2, clock=self.clock)
+        self.portfolio = PortfolioSnapshot(cash_balance=50000.0, currency="XRP", balance=10.0, avg_buy_price=3000.0)
+
+    def test_fingerprint_quantization(self):
+        """
+        작은 가격 변화는 같은 키, 추세/보유량 변화는 다른 키가 되는지 테스트.
+        """
+        key = snapshot_fingerprint(make_market(3000.0), self.portfolio)
+        self.assertEqual(key, snapshot_fingerprint(make_market(3001.0), self.portfolio))
+        self.assertNotEqual(key, snapshot_fingerprint(make_market(3100.0), self.portfolio))
+        self.assertNotEqual(key, snapshot_fingerprint(make_market(3000.0, trend="falling"), self.portfolio))
+        sold = PortfolioSnapshot(cash_balance=80000.0, currency="XRP", balance=0.0)
+        self.assertNotEqual(key, snapshot_fingerprint(make_market(3000.0), sold))
+        self.assertIsNone(snapshot_fingerprint(make_market(None), self.portfolio))
+
+    def test_hit_reuses_hold_and_short_circuits_trades(self):
+        """
+        hold 판단은 그대로, buy 판단은 hold 로 바뀌어 재사용되는지 테스트.
+        """
+        self.cache.put("hold", {"action": "hold", "amount": 0.0, "reason": "stable"})
+        self.cache.put("buy", {"action": "buy", "amount": 10000.0, "reason": "rising"})
+        self.clock.now = 60
+
+        hold = self.cache.get("hold")
+        self.assertEqual(hold["action"], "hold")
+        self.assertTrue(hold["cached"])
+        self.assertEqual(hold["cache_age"], 60)
+
+        buy = self.cache.get("buy")
+        self.assertEqual((buy["action"], buy["amount"]), ("hold", 0.0))
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_ttl_and_lru_eviction(self):
+        """
+        TTL 이 지난 항목과 가장 오래 사용하지 않은 항목이 제거되는지 테스트.
+        """
+        self.cache.put("a", {"action": "hold"})
+        self.cache.put("b", {"action": "hold"})
+        self.cache.get("a")
+        self.cache.put("c", {"action": "hold"})
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+
+        self.clock.now = 901
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+# tests/test_execution_scheduler.py
+
+import unittest
+from exchange.paper_exchange import OrderBook, PaperExchange, SimulatedClock
+from trade_manager.execution_scheduler import ExecutionScheduler, ParentOrder
+
+
+class DriftingPrice:
+    """
+    모의 시계 1분에 drift 만큼씩 움직이는 가격.
+    """
+
+    def __init__(self, clock, start=1000.0, drift=0.0):
+        self.clock = clock
+        self.origin = clock.now()
+        self.start = start
+        self.drift = drift
+
+    def get_current_price(self, market):
+        minutes = (self.clock.now() - self.origin).total_seconds() / 60
+        return self.start + self.drift * minutes
+
+
+def thin_top_book(market, mid):
+    # 최우선 호가 잔량은 20개뿐이고 그다음 호가는 충분
+    return OrderBook(market, [[mid + 1, 20.0], [mid + 2, 1000.0]], [[mid - 1, 20.0], [mid - 2, 1000.0]])
+
+
+class RejectMarketOrders:
+    """
+    시장가 주문만 거부하고 나머지는 모의 거래소에 넘기는 클라이언트.
+    """
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+    def buy_market_order(self, market, price):
+        raise RuntimeError("market order rejected")
+
+
+class TestExecutionScheduler(unittest.TestCase):
+
+    def make(self, drift=0.0, **options):
+        self.clock = SimulatedClock("2024-10-01 09:00:00", speed=0)
+        self.exchange = PaperExchange(
+            DriftingPrice(self.clock, drift=drift), cash=1_000_000.0, clock=self.clock, orderbooks=thin_top_book
+        )
+        self.exchange.accounts["XRP"] = {"balance": 500.0, "locked": 0.0, "avg_buy_price": 1000.0}
+        self.max_open = 0
+        scheduler = ExecutionScheduler(
+            lambda: self.exchange, sleep=self.sleep, clock=lambda: self.clock.now().timestamp(), **options
+        )
+        self.scheduler = scheduler
+        return scheduler
+
+    def sleep(self, seconds):
+        self.max_open = max(self.max_open, self.scheduler.open_children())
+        self.clock.sleep(seconds)
+
+    def test_twap_releases_slices_over_time(self):
+        """
+        TWAP 매수가 시간에 맞춰 균등하게 나눠 주문되고, 목표 금액만큼 체결되어 진행 상황이 보고되는지 테스트.
+        """
+        scheduler = self.make()
+        progress = []
+        parent = scheduler.submit("buy", 100_000.0, "KRW-XRP", on_progress=progress.append,
+                                  strategy="twap", slices=5, duration=300, child_type="market")
+        summary = parent.future.result(timeout=10)
+        scheduler.shutdown()
+
+        self.assertEqual(summary["order_state"], "done")
+        self.assertEqual(summary["children"], 5)
+        self.assertAlmostEqual(summary["filled_funds"], 100_000.0)
+        self.assertAlmostEqual(summary["paid_fee"], 100_000.0 * 0.0005)
+        placed = [child["placed_at"] - parent.children[0]["placed_at"] for child in parent.children]
+        self.assertEqual(placed, [0.0, 60.0, 120.0, 180.0, 240.0])
+        self.assertAlmostEqual(progress[-1]["filled_ratio"], 1.0)
+        self.assertEqual(progress[-1]["state"], "done")
+
+    def test_iceberg_sell_limits_displayed_size(self):
+        """
+        iceberg 매도가 최우선 호가 잔량의 일부씩만 지정가로 주문하고, 동시 대기 주문 수 제한을 지키는지 테스트.
+        """
+        scheduler = self.make(max_open_children=1)
+        parent = scheduler.submit("sell", 100.0, "KRW-XRP", strategy="iceberg", child_type="limit",
+                                  display_fraction=0.5, duration=3600)
+        summary = parent.future.result(timeout=10)
+        scheduler.shutdown()
+
+        self.assertEqual(summary["order_state"], "done")
+        self.assertAlmostEqual(summary["filled_volume"], 100.0)
+        self.assertEqual(summary["children"], 10)
+        self.assertTrue(all(child["size"] <= 10.0 for child in parent.children))
+        self.assertLessEqual(self.max_open, 1)
+        self.assertAlmostEqual(self.exchange.accounts["XRP"]["balance"], 400.0)
+
+    def test_stale_limit_children_are_replaced_and_swept(self):
+        """
+        가격이 올라 체결되지 않는 지정가 매수는 취소 후 새 호가로 재주문되고, 기간이 끝나면 남은 금액을 시장가로 정리하는지 테스트.
+        """
+        scheduler = self.make(drift=5.0, max_open_children=1)
+        parent = scheduler.submit("buy", 100_000.0, "KRW-XRP", strategy="twap", slices=2, duration=120,
+                                  child_type="limit", replace_after=30)
+        summary = parent.future.result(timeout=10)
+        scheduler.shutdown()
+
+        self.assertEqual(summary["order_state"], "done")
+        self.assertGreater(parent.progress()["replaced"], 0)
+        self.assertEqual(parent.children[-1]["ord_type"], "market")
+        self.assertGreater(summary["filled_funds"], 100_000.0 - 5000)
+        self.assertEqual(self.exchange.accounts["KRW"]["locked"], 0.0)
+
+    def test_unfilled_remainder_is_not_reported_done(self):
+        """
+        시장가 정리 주문이 계속 실패하면 error, 정리하지 않고 남은 양이 있으면 partial 로 끝나는지 테스트.
+        """
+        scheduler = self.make(drift=5.0)
+        scheduler.client_getter = lambda: RejectMarketOrders(self.exchange)
+        parent = scheduler.submit("buy", 100_000.0, "KRW-XRP", strategy="twap", slices=2, duration=60,
+                                  child_type="limit", replace_after=10_000)
+        summary = parent.future.result(timeout=10)
+        scheduler.shutdown()
+        self.assertEqual(summary["order_state"], "error")
+        self.assertIn("rejected", parent.error)
+        self.assertLess(summary["filled_funds"], 100_000.0)
+
+        scheduler = self.make(drift=5.0)
+        parent = scheduler.submit("buy", 100_000.0, "KRW-XRP", strategy="twap", slices=2, duration=60,
+                                  child_type="limit", replace_after=10_000, final_market=False)
+        summary = parent.future.result(timeout=10)
+        scheduler.shutdown()
+        self.assertEqual(summary["order_state"], "partial")
+        self.assertLess(summary["filled_funds"], 100_000.0)
+
+    def test_cancel_and_invalid_options(self):
+        """
+        부모 주문 취소 시 대기 주문을 취소하고 끝나며, 잘못된 설정은 ValueError 를 발생시키는지 테스트.
+        """
+        scheduler = self.make(drift=5.0)
+        parent = scheduler.submit("buy", 100_000.0, "KRW-XRP", strategy="twap", slices=4, duration=3600,
+                                  child_type="limit", replace_after=10_000)
+        scheduler.cancel(parent.id)
+        summary = parent.future.result(timeout=10)
+        scheduler.shutdown()
+        self.assertEqual(summary["order_state"], "cancel")
+        self.assertEqual(parent.open_children(), [])
+        self.assertEqual(self.exchange.accounts["KRW"]["locked"], 0.0)
+
+        with self.assertRaises(ValueError):
+            ParentOrder("buy", 10_000.0, "KRW-XRP", strategy="vwap")
+
+
+if __name__ == "__main__":
+    unittest.main()
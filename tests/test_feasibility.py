@@ -0,0 +1,61 @@
+# tests/test_feasibility.py
+
+import unittest
+from data_collection.snapshot import MarketSnapshot, PortfolioSnapshot
+from gpt_interface.decision_logic import make_decision
+from gpt_interface.feasibility import check_feasibility
+from gpt_interface.prompt_encoder import encode_prompt
+
+
+class TestFeasibility(unittest.TestCase):
+
+    def test_only_hold_when_below_minimums(self):
+        """
+        현금과 보유 자산이 모두 최소 주문 금액 미만이면 hold 만 가능한지 테스트.
+        """
+        portfolio = PortfolioSnapshot(cash_balance=4000.0, currency="XRP", balance=1.0)
+        constraints = check_feasibility(portfolio, 3000.0, "KRW-XRP")
+        self.assertTrue(constraints.only_hold)
+        decision = constraints.hold_decision()
+        self.assertEqual((decision["action"], decision["amount"], decision["skipped"]), ("hold", 0.0, True))
+        self.assertIn("minimum order", decision["reason"])
+
+    def test_allowed_actions_and_bounds(self):
+        """
+        매수/매도 가능 여부와 금액 범위가 make_decision 기준과 같은지 테스트.
+        """
+        portfolio = PortfolioSnapshot(cash_balance=50000.0, currency="XRP", balance=1.0)
+        constraints = check_feasibility(portfolio, 3000.0, "KRW-XRP")
+        self.assertEqual(constraints.allowed_actions, ("buy", "hold"))
+        self.assertAlmostEqual(constraints.max_buy_krw, 50000.0 / 1.0005)
+        self.assertEqual(constraints.to_prompt(), "ALLOWED buy,hold buy=5000~49975KRW sell=none")
+
+        # 허용 범위 안의 판단은 make_decision 에서도 실행 가능
+        decision = {"action": "buy", "amount": constraints.max_buy_krw, "reason": "x"}
+        self.assertEqual(make_decision(decision, portfolio, 3000.0, "KRW-XRP")[0], "buy")
+        sell = {"action": "sell", "amount": 1.0, "reason": "x"}
+        self.assertEqual(make_decision(sell, portfolio, 3000.0, "KRW-XRP")[0], "hold")
+
+        rich = PortfolioSnapshot(cash_balance=0.0, currency="XRP", balance=10.0)
+        self.assertEqual(check_feasibility(rich, 3000.0, "KRW-XRP").allowed_actions, ("sell", "hold"))
+
+    def test_unavailable_inputs_force_hold(self):
+        """
+        포트폴리오 오류나 가격 누락 시 hold 만 가능한지 테스트.
+        """
+        self.assertTrue(check_feasibility(PortfolioSnapshot(error="down"), 3000.0, "KRW-XRP").only_hold)
+        self.assertTrue(check_feasibility(PortfolioSnapshot(cash_balance=1e6), None, "KRW-XRP").only_hold)
+
+    def test_constraints_in_prompt(self):
+        """
+        가능한 행동과 범위가 토큰 예산과 관계없이 프롬프트에 포함되는지 테스트.
+        """
+        market = MarketSnapshot("KRW-XRP", current_price=3000.0)
+        portfolio = PortfolioSnapshot(cash_balance=50000.0, currency="XRP", balance=10.0)
+        constraints = check_feasibility(portfolio, 3000.0, "KRW-XRP")
+        text = encode_prompt(market, portfolio, max_tokens=1, constraints=constraints).text
+        self.assertIn("ALLOWED buy,sell,hold buy=5000~49975KRW sell=1.66666667~10XRP", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_indicators.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from data_collection.indicators import IndicatorEngine
+from helpers import make_candles
+
+
+class TestIndicatorEngine(unittest.TestCase):
+
+    def test_indicators_match_batch_formulas(self):
+        """
+        증분 계산 결과가 전체 데이터로 계산한 값과 일치하는지 테스트.
+        """
+        data = make_candles(120, start="2024-12-13 00:00:00")
+        values = IndicatorEngine().update_frame("KRW-BTC", "minute5", data, include_last=True)
+
+        window = data["close"].iloc[-20:]
+        self.assertAlmostEqual(values["bb_middle"], window.mean(), places=6)
+        self.assertAlmostEqual(values["bb_upper"], window.mean() + 2 * window.std(ddof=0), places=6)
+
+        seed = data["close"].iloc[:12].mean()
+        ema = pd.concat([pd.Series([seed]), data["close"].iloc[12:]]).ewm(span=12, adjust=False).mean()
+        self.assertAlmostEqual(values["ema_12"], ema.iloc[-1], places=6)
+
+        direction = np.sign(data["close"].diff().fillna(0))
+        self.assertAlmostEqual(values["obv"], (direction * data["volume"]).sum(), places=6)
+        self.assertTrue(0 <= values["rsi_14"] <= 100)
+        self.assertIsNotNone(values["macd_histogram"])
+
+    def test_update_frame_skips_seen_and_open_candles(self):
+        """
+        이미 반영한 캔들과 진행 중인 마지막 캔들은 반영하지 않는지 테스트.
+        """
+        data = make_candles(40, start="2024-12-13 00:00:00")
+        engine = IndicatorEngine()
+        engine.update_frame("KRW-BTC", "minute5", data.iloc[:30])
+        engine.update_frame("KRW-BTC", "minute5", data)
+        state = engine.states[("KRW-BTC", "minute5")]
+        self.assertEqual(state.last_timestamp, data.index[-2])
+        self.assertEqual(state.macd.fast.count, 39)
+
+    def test_state_roundtrip_resumes_without_warmup(self):
+        """
+        저장한 상태에서 이어서 계산한 값이 중단 없이 계산한 값과 같은지 테스트.
+        """
+        data = make_candles(120, start="2024-12-13 00:00:00")
+        continuous = IndicatorEngine()
+        continuous.update_frame("KRW-BTC", "minute5", data, include_last=True)
+
+        first = IndicatorEngine()
+        first.update_frame("KRW-BTC", "minute5", data.iloc[:70], include_last=True)
+        resumed = IndicatorEngine.from_dict(first.to_dict())
+        resumed.update_frame("KRW-BTC", "minute5", data.iloc[70:], include_last=True)
+
+        expected = continuous.values("KRW-BTC", "minute5")
+        for name, value in resumed.values("KRW-BTC", "minute5").items():
+            self.assertAlmostEqual(value, expected[name], places=6)
+
+    def test_reads_state_with_separate_ema(self):
+        """
+        EMA 12/26 을 따로 저장하던 이전 상태 파일도 읽고, 새 상태에는 중복 EMA 를 저장하지 않는지 테스트.
+        """
+        data = make_candles(60, start="2024-12-13 00:00:00")
+        engine = IndicatorEngine()
+        engine.update_frame("KRW-BTC", "minute5", data, include_last=True)
+        state = engine.to_dict()
+        stored = state["KRW-BTC|minute5"]
+        self.assertNotIn("ema_fast", stored)
+
+        stored["ema_fast"], stored["ema_slow"] = stored["macd"]["fast"], stored["macd"]["slow"]
+        restored = IndicatorEngine.from_dict(state)
+        expected = engine.values("KRW-BTC", "minute5")
+        for name, value in restored.values("KRW-BTC", "minute5").items():
+            self.assertAlmostEqual(value, expected[name], places=6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# tests/test_instrumentation.py
+
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db.base import Base
+from db.crud import create_llm_request, get_llm_requests
+from gpt_interface.async_client import LatencyTracker, send_request_async
+from gpt_interface.instrumentation import LLMRecorder, RequestMetrics, estimate_cost
+from utils.request_stats import summarize_records
+
+
+def make_client(delay, content):
+    """
+    지연 후 content 를 두 조각으로 스트리밍하고 usage 를 보내는 가짜 AsyncOpenAI 클라이언트.
+    """
+    async def stream(text):
+        for piece in (text[:3], text[3:]):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None)
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=30,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+        yield SimpleNamespace(choices=[], usage=usage)
+
+    async def create(model, messages, **kwargs):
+        await asyncio.sleep(delay)
+        return stream(json.dumps(content))
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.request = {"model": "gpt-4o-mini", "messages": [], "prompt_tokens": 1180}
+
+    def test_metrics_from_streamed_request(self):
+        """
+        스트리밍 응답에서 첫 토큰 시간, 지연, 토큰 수, 비용이 기록되는지 테스트.
+        """
+        metrics = RequestMetrics(self.request, "single", ["KRW-XRP"])
+        client = make_client(0.0, {"action": "buy", "amount": "10000", "reason": "x"})
+        asyncio.run(send_request_async(self.request, 1.0, client, LatencyTracker(), 0.5, metrics))
+
+        self.assertLessEqual(metrics.ttft, metrics.latency)
+        self.assertEqual((metrics.prompt_tokens, metrics.cached_tokens, metrics.completion_tokens), (1200, 1024, 30))
+        record = metrics.to_record({"KRW-XRP": {"action": "buy", "amount": 10000.0, "currency": "KRW"}})
+        self.assertEqual((record["status"], record["action"], record["estimated_prompt_tokens"]), ("ok", "buy", 1180))
+        self.assertAlmostEqual(record["cost"], estimate_cost("gpt-4o-mini", 1200, 1024, 30))
+        self.assertEqual(json.loads(record["decisions"])["KRW-XRP"]["currency"], "KRW")
+
+    def test_timeout_and_invalid_status(self):
+        """
+        마감 시간 초과와 유효하지 않은 판단이 상태로 구분되는지 테스트.
+        """
+        metrics = RequestMetrics(self.request, "single", ["KRW-XRP"])
+        client = make_client(1.0, {"action": "buy"})
+        asyncio.run(send_request_async(self.request, 0.1, client, LatencyTracker(), 0.02, metrics))
+        self.assertTrue(metrics.hedged)
+        self.assertEqual(metrics.to_record({})["status"], "timeout")
+
+        invalid = RequestMetrics(self.request, "single", ["KRW-XRP"])
+        record = invalid.to_record({"KRW-XRP": {"action": "hold", "amount": 0.0, "fallback": True}})
+        self.assertEqual(record["status"], "invalid")
+
+    def test_recorder_percentiles_and_sink_errors(self):
+        """
+        최근 기록의 백분위를 계산하고, sink 오류가 기록을 막지 않는지 테스트.
+        """
+        def failing_sink(record):
+            raise RuntimeError("db down")
+
+        recorder = LLMRecorder(window=50, sink=failing_sink)
+        for seconds in range(1, 101):
+            metrics = RequestMetrics(self.request, "single", ["KRW-XRP"])
+            metrics.latency = float(seconds)
+            recorder.record(metrics, {})
+        summary = recorder.summary()
+        self.assertEqual(summary["count"], 50)
+        self.assertEqual(summary["latency"]["p50"], 75.5)
+        self.assertEqual(summary["ttft"], {"count": 0})
+        self.assertEqual(summary["status"], {"ok": 50})
+
+    def test_records_persist_to_db(self):
+        """
+        기록이 llm_requests 테이블에 저장되고 다시 요약할 수 있는지 테스트.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            for latency in (1.0, 2.0, 3.0):
+                metrics = RequestMetrics(self.request, "batch", ["KRW-XRP", "KRW-BTC"])
+                metrics.latency = latency
+                create_llm_request(db, metrics.to_record({"KRW-XRP": {"action": "hold", "amount": 0.0}}))
+
+            rows = get_llm_requests(db, limit=10)
+            self.assertEqual(len(rows), 3)
+            self.assertIsNone(rows[0].action)
+            records = [{column.name: getattr(row, column.name) for column in row.__table__.columns} for row in rows]
+            self.assertEqual(summarize_records(records)["latency"]["p50"], 2.0)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+# tests/test_order_tracker.py
+
+import datetime
+import unittest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from db.base import Base
+from db.crud import create_trade, update_trade_fill
+from db.database import migrate_db
+from db.models import Trade
+from exchange.paper_exchange import OrderBook, PaperExchange, SimulatedClock
+from trade_manager.order_tracker import OrderTracker, compute_slippage_bps, summarize_fills
+
+
+class ScriptedClient:
+    """
+    미리 정한 주문 응답을 차례로 반환하는 클라이언트 (마지막 응답은 반복).
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get_order(self, order_uuid):
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class MutablePrice:
+    """
+    테스트 중에 바꿀 수 있는 가격을 반환하는 시세 소스.
+    """
+
+    def __init__(self, price):
+        self.price = price
+
+    def get_current_price(self, market):
+        return self.price
+
+
+def make_order(state, trades, paid_fee="0"):
+    return {
+        "uuid": "order-1", "state": state, "paid_fee": paid_fee,
+        "trades": [{"price": str(price), "volume": str(volume), "funds": str(price * volume)} for price, volume in trades],
+    }
+
+
+class TestOrderTracker(unittest.TestCase):
+
+    def test_summarize_fills_vwap_and_slippage(self):
+        """
+        부분 체결을 모아 VWAP 체결 가격과 수수료를 계산하고, 매수/매도 슬리피지 부호가 맞는지 테스트.
+        """
+        summary = summarize_fills(make_order("done", [(1000.0, 3.0), (1010.0, 1.0)], paid_fee="2.015"))
+        self.assertEqual(summary["filled_volume"], 4.0)
+        self.assertEqual(summary["filled_funds"], 4010.0)
+        self.assertAlmostEqual(summary["fill_price"], 1002.5)
+        self.assertAlmostEqual(summary["paid_fee"], 2.015)
+        self.assertIsNone(summarize_fills(make_order("cancel", []))["fill_price"])
+
+        self.assertAlmostEqual(compute_slippage_bps("buy", 1002.5, 1000.0), 25.0)
+        self.assertAlmostEqual(compute_slippage_bps("sell", 1002.5, 1000.0), -25.0)
+        self.assertIsNone(compute_slippage_bps("buy", None, 1000.0))
+
+    def test_polls_until_final_state(self):
+        """
+        조회 오류를 건너뛰고, 새 체결마다 on_update 를 호출하며, 주문이 끝나면 최종 요약으로 완료되는지 테스트.
+        """
+        client = ScriptedClient([
+            make_order("wait", []),
+            RuntimeError("temporary"),
+            make_order("wait", [(1000.0, 1.0)]),
+            make_order("done", [(1000.0, 1.0), (1001.0, 1.0)]),
+        ])
+        updates, completed = [], []
+        tracker = OrderTracker(lambda: client, sleep=lambda seconds: None)
+        future = tracker.track("order-1", on_update=updates.append, on_complete=completed.append)
+        summary = future.result(timeout=5)
+        tracker.shutdown()
+
+        self.assertEqual(client.calls, 4)
+        self.assertEqual([update["filled_volume"] for update in updates], [1.0, 2.0])
+        self.assertEqual(completed, [summary])
+        self.assertAlmostEqual(summary["fill_price"], 1000.5)
+        self.assertEqual(tracker.pending(), {})
+
+    def test_timeout_completes_with_partial_fills(self):
+        """
+        시간 안에 끝나지 않은 주문은 그때까지의 체결로 완료 처리되는지 테스트.
+        """
+        client = ScriptedClient([make_order("wait", [(1000.0, 1.0)])])
+        tracker = OrderTracker(lambda: client, timeout=0.0, sleep=lambda seconds: None)
+        summary = tracker.track("order-1").result(timeout=5)
+        tracker.shutdown()
+        self.assertTrue(summary["timed_out"])
+        self.assertEqual(summary["filled_volume"], 1.0)
+
+    def test_paper_fill_written_back_to_trade(self):
+        """
+        모의 거래소의 지정가 주문이 호가 갱신 후 체결되면 실제 체결 가격, 금액, 수수료가 거래 기록에 반영되는지 테스트.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        clock = SimulatedClock("2024-10-01 09:00:00", speed=0)
+        prices = MutablePrice(1000.0)
+        exchange = PaperExchange(
+            prices, cash=100_000.0, clock=clock,
+            orderbooks=lambda market, mid: OrderBook(market, [[mid + 1, 5.0], [mid + 2, 50.0]], [[mid - 1, 50.0]]),
+        )
+        order = exchange.buy_limit_order("KRW-XRP", 1001.5, 10.0)
+        trade = create_trade(db, {
+            "timestamp": datetime.datetime(2024, 10, 1, 9), "action": "buy", "currency": "XRP", "amount": 10.0,
+            "price": 1000.0, "total_value": 10_000.0, "reason": "test", "order_uuid": order["uuid"],
+            "order_state": order["state"], "expected_price": 1000.0,
+        })
+
+        def on_poll(seconds):
+            prices.price = 990.0  # 다음 조회에서 호가가 내려와 나머지 체결
+            clock.sleep(seconds)
+
+        tracker = OrderTracker(lambda: exchange, sleep=on_poll)
+        summary = tracker.track(order["uuid"]).result(timeout=5)
+        tracker.shutdown()
+        update_trade_fill(db, trade.id, {
+            "order_state": summary["order_state"], "filled_volume": summary["filled_volume"],
+            "paid_fee": summary["paid_fee"], "price": summary["fill_price"], "total_value": summary["filled_funds"],
+            "slippage_bps": compute_slippage_bps("buy", summary["fill_price"], 1000.0),
+        })
+
+        saved = db.query(Trade).one()
+        self.assertEqual(saved.order_state, "done")
+        self.assertAlmostEqual(saved.filled_volume, 10.0)
+        self.assertAlmostEqual(saved.total_value, 5 * 1001.0 + 5 * 991.0)
+        self.assertAlmostEqual(saved.price, 996.0)
+        self.assertAlmostEqual(saved.paid_fee, saved.total_value * 0.0005)
+        self.assertAlmostEqual(saved.slippage_bps, -40.0)
+        db.close()
+
+    def test_migrate_adds_fill_columns_to_existing_trades_table(self):
+        """
+        체결 열이 없는 기존 trades 테이블에 열을 추가하고, 다시 실행해도 안전한지 테스트.
+        """
+        engine = create_engine("sqlite:///:memory:")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE trades (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL, action VARCHAR(10) NOT NULL, "
+                "currency VARCHAR(10) NOT NULL, amount FLOAT NOT NULL, price FLOAT NOT NULL, "
+                "total_value FLOAT NOT NULL, reason VARCHAR)"
+            ))
+        self.assertEqual(len([s for s in migrate_db(engine) if s.startswith("ALTER")]), 6)
+        self.assertEqual([s for s in migrate_db(engine) if s.startswith("ALTER")], [])
+
+        columns = {column["name"] for column in inspect(engine).get_columns("trades")}
+        self.assertTrue({"order_uuid", "order_state", "expected_price", "filled_volume", "paid_fee",
+                         "slippage_bps"} <= columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
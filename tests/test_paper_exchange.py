@@ -0,0 +1,158 @@
+# tests/test_paper_exchange.py
+
+import tempfile
+import threading
+import unittest
+import pandas as pd
+from data_collection.candle_store import CandleStore
+from exchange.paper_exchange import OrderBook, PaperExchange, ReplayMarketData, SimulatedClock
+from exchange.upbit_client import UpbitAPIError, set_upbit_client
+from trade_manager.account_status import get_portfolio_snapshot
+from trade_manager.trade_handler import execute_trade
+from helpers import FixedPrice
+
+
+def make_book(market, mid_price):
+    # 최우선 호가 잔량 10, 단계마다 가격 1씩 멀어짐
+    asks = [[mid_price + 1 + i, 10.0] for i in range(3)]
+    bids = [[mid_price - 1 - i, 10.0] for i in range(3)]
+    return OrderBook(market, asks, bids)
+
+
+class TestPaperExchange(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = SimulatedClock("2024-10-01 09:00:00", speed=0)
+        self.market_data = FixedPrice(1000.0)
+        self.exchange = PaperExchange(self.market_data, cash=100_000.0, clock=self.clock, orderbooks=make_book)
+
+    def tearDown(self):
+        set_upbit_client(None)
+
+    def test_market_buy_walks_book_with_fees(self):
+        """
+        시장가 매수가 호가를 차례로 소비하고 수수료를 더해 현금을 차감하는지 테스트.
+        """
+        order = self.exchange.buy_market_order("KRW-XRP", 15_000.0)
+        detail = self.exchange.get_order(order["uuid"])
+        prices = [float(trade["price"]) for trade in detail["trades"]]
+        self.assertEqual(prices, [1001.0, 1002.0])
+        self.assertEqual(detail["state"], "done")
+
+        coin = self.exchange.accounts["XRP"]
+        self.assertAlmostEqual(coin["balance"], 10.0 + (15_000.0 - 10_010.0) / 1002.0)
+        self.assertAlmostEqual(coin["avg_buy_price"], 15_000.0 / coin["balance"])
+        self.assertAlmostEqual(self.exchange.accounts["KRW"]["balance"], 100_000.0 - 15_000.0 * 1.0005)
+        self.assertAlmostEqual(float(detail["paid_fee"]), 15_000.0 * 0.0005)
+
+    def test_market_sell_partial_fill_cancels_rest(self):
+        """
+        호가 잔량보다 큰 시장가 매도는 가능한 만큼만 체결되고 나머지는 취소되어 잔고로 돌아오는지 테스트.
+        """
+        self.exchange.buy_market_order("KRW-XRP", 25_000.0)
+        self.exchange.accounts["XRP"]["balance"] += 10.0  # 매수 호가 전체(30개)보다 많이 보유
+        balance = self.exchange.accounts["XRP"]["balance"]
+
+        order = self.exchange.sell_market_order("KRW-XRP", balance)
+        detail = self.exchange.get_order(order["uuid"])
+        self.assertEqual(detail["state"], "cancel")
+        self.assertAlmostEqual(float(detail["executed_volume"]), 30.0)
+        self.assertAlmostEqual(self.exchange.accounts["XRP"]["balance"], balance - 30.0)
+        self.assertEqual(self.exchange.accounts["XRP"]["locked"], 0.0)
+
+    def test_limit_order_rests_and_fills_on_book_refresh(self):
+        """
+        지정가 주문이 체결 가능한 부분만 즉시 체결되고, 호가가 갱신되면 나머지가 체결되거나 취소 시 잔고가 풀리는지 테스트.
+        """
+        order = self.exchange.buy_limit_order("KRW-XRP", 995.0, 10.0)
+        self.assertEqual(order["state"], "wait")
+        self.assertAlmostEqual(self.exchange.accounts["KRW"]["locked"], 995.0 * 10.0 * 1.0005)
+
+        self.market_data.price = 990.0
+        self.clock.sleep(5)
+        detail = self.exchange.get_order(order["uuid"])
+        self.assertEqual(detail["state"], "done")
+        self.assertEqual([float(trade["price"]) for trade in detail["trades"]], [991.0])
+        self.assertAlmostEqual(self.exchange.accounts["KRW"]["locked"], 0.0)
+        self.assertAlmostEqual(self.exchange.accounts["KRW"]["balance"], 100_000.0 - 9910.0 * 1.0005)
+
+        resting = self.exchange.sell_limit_order("KRW-XRP", 2000.0, 10.0)
+        self.assertAlmostEqual(self.exchange.accounts["XRP"]["locked"], 10.0)
+        self.exchange.cancel_order(resting["uuid"])
+        self.assertEqual(self.exchange.get_order(resting["uuid"])["state"], "cancel")
+        self.assertAlmostEqual(self.exchange.accounts["XRP"]["balance"], 10.0)
+        with self.assertRaises(UpbitAPIError):
+            self.exchange.cancel_order(resting["uuid"])
+
+    def test_clock_wait_does_not_advance_time(self):
+        """
+        배속 0 시계의 wait 는 시계를 움직이지 않고, 다른 스레드가 sleep 으로 시계를 움직이면 깨어나는지 테스트.
+        """
+        start = self.clock.now()
+        self.clock.wait(60, timeout=0.01)
+        self.assertEqual(self.clock.now(), start)
+
+        timer = threading.Timer(0.05, self.clock.sleep, args=(60,))
+        timer.start()
+        self.clock.wait(60, timeout=5)
+        timer.join()
+        self.assertEqual((self.clock.now() - start).total_seconds(), 60)
+
+    def test_marketable_limit_bid_releases_unused_reserve(self):
+        """
+        지정가보다 싸게 즉시 모두 체결된 지정가 매수가 남은 예약 금액을 돌려주는지 테스트.
+        """
+        order = self.exchange.buy_limit_order("KRW-XRP", 1100.0, 10.0)
+        self.assertEqual(order["state"], "done")
+        self.assertEqual(self.exchange.accounts["KRW"]["locked"], 0.0)
+        self.assertAlmostEqual(self.exchange.accounts["KRW"]["balance"], 100_000.0 - 10_010.0 * 1.0005)
+
+    def test_rejections_match_upbit_errors(self):
+        """
+        최소 주문 금액 미만과 잔고 부족 주문이 업비트와 같은 오류 이름으로 거부되는지 테스트.
+        """
+        with self.assertRaises(UpbitAPIError) as ctx:
+            self.exchange.buy_market_order("KRW-XRP", 4000.0)
+        self.assertEqual(ctx.exception.payload["error"]["name"], "under_min_total_bid")
+        with self.assertRaises(UpbitAPIError) as ctx:
+            self.exchange.buy_market_order("KRW-XRP", 100_000.0)  # 수수료 포함 시 잔고 초과
+        self.assertEqual(ctx.exception.payload["error"]["name"], "insufficient_funds_bid")
+        self.assertEqual(self.exchange.accounts["KRW"], {"balance": 100_000.0, "locked": 0.0, "avg_buy_price": 0.0})
+
+    def test_installed_exchange_serves_trade_and_portfolio_paths(self):
+        """
+        set_upbit_client 로 설치하면 execute_trade 와 get_portfolio_snapshot 이 모의 계좌를 사용하는지 테스트.
+        """
+        set_upbit_client(self.exchange)
+        result = execute_trade("buy", 20_000.0, "KRW-XRP")
+        self.assertEqual(result["state"], "done")
+        self.assertIn("error", execute_trade("buy", 1000.0, "KRW-XRP"))
+
+        snapshot = get_portfolio_snapshot("KRW-XRP")
+        self.assertIsNone(snapshot.error)
+        self.assertAlmostEqual(snapshot.cash_balance, 100_000.0 - 20_000.0 * 1.0005)
+        self.assertAlmostEqual(snapshot.balance, self.exchange.accounts["XRP"]["balance"])
+
+    def test_replay_market_data_follows_clock(self):
+        """
+        재생 시세가 모의 시계까지 완성된 캔들만 보여주는지 테스트.
+        """
+        candles = pd.DataFrame(
+            {"open": range(10), "high": range(10), "low": range(10), "close": [float(i) for i in range(10)],
+             "volume": 1.0, "value": 0.0},
+            index=pd.date_range("2024-10-01 09:00:00", periods=10, freq="5min"),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CandleStore(tmp)
+            store.write("KRW-XRP", "minute5", candles)
+            replay = ReplayMarketData(store, self.clock)
+            self.assertIsNone(replay.get_current_price("KRW-XRP"))
+
+            self.clock.sleep(16 * 60)
+            self.assertEqual(replay.get_current_price("KRW-XRP"), 2.0)
+            self.assertEqual(replay.get_ohlcv("KRW-XRP", "minute5", count=2)["close"].tolist(), [1.0, 2.0])
+            self.assertEqual(replay.get_current_price(["KRW-XRP", "KRW-BTC"]), {"KRW-XRP": 2.0, "KRW-BTC": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_parallel_fetch.py
+
+import time
+import unittest
+from data_collection.parallel_fetch import run_concurrently
+
+
+class TestParallelFetch(unittest.TestCase):
+
+    def test_run_concurrently_merges_results(self):
+        """
+        모든 호출 결과가 이름별로 병합되는지 테스트.
+        """
+        tasks = {
+            "double": (lambda x: x * 2, (2,)),
+            "concat": (lambda a, b: a + b, ("KRW-", "BTC")),
+        }
+        result = run_concurrently(tasks)
+        self.assertEqual(result, {"double": 4, "concat": "KRW-BTC"})
+
+    def test_run_concurrently_runs_in_parallel(self):
+        """
+        블로킹 호출들이 순차가 아닌 병렬로 실행되는지 테스트.
+        """
+        tasks = {f"sleep_{i}": (time.sleep, (0.2,)) for i in range(4)}
+        started = time.monotonic()
+        run_concurrently(tasks)
+        self.assertLess(time.monotonic() - started, 0.6)
+
+    def test_run_concurrently_timeout_and_error(self):
+        """
+        타임아웃되거나 실패한 호출은 None 으로 처리되는지 테스트.
+        """
+        def fail():
+            raise RuntimeError("API 오류")
+
+        tasks = {
+            "slow": (time.sleep, (1.0,)),
+            "fail": (fail, ()),
+            "ok": (lambda: 1, ()),
+        }
+        result = run_concurrently(tasks, timeout=0.1)
+        self.assertIsNone(result["slow"])
+        self.assertIsNone(result["fail"])
+        self.assertEqual(result["ok"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
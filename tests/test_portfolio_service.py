@@ -0,0 +1,126 @@
+# tests/test_portfolio_service.py
+
+import threading
+import time
+import unittest
+from exchange.paper_exchange import OrderBook, PaperExchange, SimulatedClock
+from exchange.upbit_client import set_upbit_client
+from trade_manager.portfolio_service import PORTFOLIO_SERVICE, PortfolioService, fetch_account_portfolio
+from trade_manager.trade_handler import execute_trade
+from helpers import FixedPrice
+
+
+def make_portfolio(cash=100_000.0, balance=10.0):
+    return {
+        "cash_balance": cash,
+        "invested_assets": [{"currency": "XRP", "balance": balance, "avg_buy_price": 1000.0,
+                             "total_investment": balance * 1000.0}],
+        "total_investment": balance * 1000.0,
+    }
+
+
+class CountingFetcher:
+    """
+    호출 횟수를 세고 정해진 결과를 반환하는 조회 함수.
+    """
+
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+class TestPortfolioService(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.fetcher = CountingFetcher(make_portfolio())
+        self.service = PortfolioService(self.fetcher, ttl=10.0, clock=lambda: self.now)
+
+    def test_ttl_and_invalidation(self):
+        """
+        TTL 동안은 한 번 조회한 결과를 모든 시장이 공유하고, 만료되거나 무효화되면 다시 조회하는지 테스트.
+        """
+        snapshot = self.service.snapshot("KRW-XRP")
+        self.assertEqual((snapshot.cash_balance, snapshot.balance), (100_000.0, 10.0))
+        self.assertEqual(self.service.snapshot("KRW-BTC").balance, 0.0)
+        self.assertEqual(self.fetcher.calls, 1)
+
+        self.now = 11.0
+        self.service.status("KRW-XRP")
+        self.assertEqual(self.fetcher.calls, 2)
+
+        self.service.invalidate()
+        self.service.snapshot("KRW-XRP")
+        self.assertEqual(self.fetcher.calls, 3)
+        self.assertEqual(self.service.stats(), {"hits": 1, "fetches": 3})
+
+    def test_errors_are_not_cached(self):
+        """
+        오류 결과는 스냅샷 오류로 전달되고 캐시되지 않는지 테스트.
+        """
+        self.fetcher.result = {"error": "Failed to fetch portfolio status. Status code: 500"}
+        self.assertIsNotNone(self.service.snapshot("KRW-XRP").error)
+        self.fetcher.result = make_portfolio()
+        self.assertIsNone(self.service.snapshot("KRW-XRP").error)
+        self.assertEqual(self.fetcher.calls, 2)
+
+    def test_concurrent_readers_share_one_fetch(self):
+        """
+        동시에 들어온 조회가 진행 중인 한 번의 요청 결과를 함께 사용하는지 테스트.
+        """
+        self.fetcher.delay = 0.05
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.service.get())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.fetcher.calls, 1)
+
+    def test_invalidate_during_fetch_discards_result(self):
+        """
+        조회 중에 무효화되면 그 조회 결과는 캐시하지 않는지 테스트 (주문 전 잔고가 주문 후에 남지 않도록).
+        """
+        service = self.service
+
+        def fetch_then_trade():
+            portfolio = make_portfolio()
+            service.invalidate()  # 조회 응답을 받는 사이에 주문 체결
+            return portfolio
+
+        service.fetcher = fetch_then_trade
+        service.get()
+        service.fetcher = self.fetcher
+        service.get()
+        self.assertEqual(self.fetcher.calls, 1)
+
+    def test_execute_trade_invalidates_cache(self):
+        """
+        execute_trade 가 주문 후 공유 포트폴리오 캐시를 비워 다음 조회가 새 잔고를 읽는지 테스트.
+        """
+        clock = SimulatedClock("2024-10-01 09:00:00", speed=0)
+        exchange = PaperExchange(
+            FixedPrice(), cash=100_000.0, clock=clock,
+            orderbooks=lambda market, mid: OrderBook(market, [[mid + 1, 1000.0]], [[mid - 1, 1000.0]]),
+        )
+        set_upbit_client(exchange)
+        try:
+            PORTFOLIO_SERVICE.invalidate()
+            self.assertEqual(PORTFOLIO_SERVICE.snapshot("KRW-XRP").balance, 0.0)
+            execute_trade("buy", 10_010.0, "KRW-XRP")
+            self.assertAlmostEqual(PORTFOLIO_SERVICE.snapshot("KRW-XRP").balance, 10.0)
+            self.assertEqual(fetch_account_portfolio()["invested_assets"][0]["balance"], 10.0)
+        finally:
+            set_upbit_client(None)
+            PORTFOLIO_SERVICE.invalidate()
+
+
+if __name__ == "__main__":
+    unittest.main()
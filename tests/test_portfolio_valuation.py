@@ -0,0 +1,154 @@
+# tests/test_portfolio_valuation.py
+
+import unittest
+import numpy as np
+from exchange.upbit_client import set_upbit_client
+from trade_manager.account_status import fetch_portfolio_status
+from trade_manager.portfolio_valuation import PortfolioValuation, value_portfolio
+from trade_manager.position_ledger import PositionLedger
+
+
+PORTFOLIO = {
+    "cash_balance": 50_000.0,
+    "invested_assets": [
+        {"currency": "BTC", "balance": 0.001, "avg_buy_price": 90_000_000.0, "total_investment": 90_000.0},
+        {"currency": "XRP", "balance": 100.0, "avg_buy_price": 1000.0, "total_investment": 100_000.0},
+        {"currency": "DOGE", "balance": 0.0, "avg_buy_price": 200.0, "total_investment": 0.0},
+        {"currency": "OLD", "balance": 5.0, "avg_buy_price": 10.0, "total_investment": 50.0},
+    ],
+    "total_investment": 190_050.0,
+}
+
+
+class BatchPrices:
+    """
+    호출 횟수와 요청한 시장 목록을 기록하는 묶음 시세 소스.
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    def __call__(self, markets):
+        self.calls.append(list(markets))
+        return {market: self.prices.get(market) for market in markets}
+
+
+class ListedPrices(BatchPrices):
+    """
+    업비트 시세 API 처럼 목록에 상장되지 않은 시장이 하나라도 있으면 요청 전체가 실패하는 시세 소스.
+    """
+
+    def __call__(self, markets):
+        self.calls.append(list(markets))
+        if any(market not in self.prices for market in markets):
+            return None
+        return {market: self.prices[market] for market in markets}
+
+
+class LockedAccounts:
+    """
+    대기 주문에 묶인 현금/수량이 있는 잔고를 돌려주는 클라이언트.
+    """
+
+    ACCOUNTS = [
+        {"currency": "KRW", "balance": "40000.0", "locked": "10000.0", "avg_buy_price": "0"},
+        {"currency": "XRP", "balance": "60.0", "locked": "40.0", "avg_buy_price": "1000.0"},
+    ]
+
+    def get_accounts(self):
+        return [dict(account) for account in self.ACCOUNTS]
+
+
+class TestPortfolioValuation(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = BatchPrices({"KRW-BTC": 100_000_000.0, "KRW-XRP": 900.0})
+
+    def test_values_all_assets_with_one_request(self):
+        """
+        보유 코인 전체를 한 번의 시세 요청으로 평가하고 합계, 미실현 손익, 비중을 계산하는지 테스트.
+        """
+        valuation = value_portfolio(PORTFOLIO, self.prices)
+
+        self.assertEqual(self.prices.calls, [["KRW-BTC", "KRW-XRP", "KRW-OLD"]])
+        self.assertAlmostEqual(valuation["total_market_value"], 100_000.0 + 90_000.0)
+        self.assertAlmostEqual(valuation["total_cost"], 190_000.0)
+        self.assertAlmostEqual(valuation["unrealized_pnl"], 0.0)
+        self.assertAlmostEqual(valuation["total_equity"], 240_000.0)
+        self.assertAlmostEqual(valuation["exposure"], round(190_000.0 / 240_000.0, 4))
+        self.assertEqual(valuation["missing_prices"], ["KRW-OLD"])
+
+        btc, xrp, old = valuation["assets"]
+        self.assertAlmostEqual(btc["unrealized_pnl"], 10_000.0)
+        self.assertAlmostEqual(btc["unrealized_rate"], 11.11)
+        self.assertAlmostEqual(xrp["unrealized_pnl"], -10_000.0)
+        self.assertAlmostEqual(xrp["exposure"], round(90_000.0 / 240_000.0, 4))
+        self.assertIsNone(old["market_value"])
+
+    def test_vector_results_match_per_asset_math(self):
+        """
+        벡터 연산 결과가 코인별 개별 계산과 같은지 테스트.
+        """
+        valuation = PortfolioValuation(1000.0, ["A", "B", "C"], [1.0, 2.0, 3.0], [10.0, 20.0, 0.0])
+        result = valuation.set_prices({"KRW-A": 12.0, "KRW-B": 15.0, "KRW-C": 1.0}).compute()
+        np.testing.assert_allclose(result["market_values"], [12.0, 30.0, 3.0])
+        np.testing.assert_allclose(result["unrealized"], [2.0, -10.0, 3.0])
+        np.testing.assert_allclose(result["unrealized_rates"], [20.0, -25.0, 0.0])
+        np.testing.assert_allclose(result["exposures"], np.array([12.0, 30.0, 3.0]) / 1045.0)
+
+    def test_empty_and_failed_requests(self):
+        """
+        보유 코인이 없으면 시세를 요청하지 않고, 시세 요청이 실패하면 현금만 평가하며, 포트폴리오 오류는 그대로 전달하는지 테스트.
+        """
+        empty = value_portfolio({"cash_balance": 1000.0, "invested_assets": [], "total_investment": 0.0}, self.prices)
+        self.assertEqual(self.prices.calls, [])
+        self.assertEqual((empty["total_equity"], empty["exposure"]), (1000.0, 0.0))
+
+        failed = value_portfolio(PORTFOLIO, lambda markets: None)
+        self.assertEqual(failed["total_equity"], 50_000.0)
+        self.assertEqual(len(failed["missing_prices"]), 3)
+
+        self.assertIn("error", value_portfolio({"error": "Failed to fetch portfolio status."}, self.prices))
+
+    def test_falls_back_to_per_market_requests(self):
+        """
+        상장되지 않은 시장 때문에 묶음 요청이 실패하면 시장별로 다시 요청해 나머지 코인은 평가하는지 테스트.
+        """
+        prices = ListedPrices({"KRW-BTC": 100_000_000.0, "KRW-XRP": 900.0})
+        valuation = value_portfolio(PORTFOLIO, prices)
+        self.assertEqual(prices.calls[0], ["KRW-BTC", "KRW-XRP", "KRW-OLD"])
+        self.assertEqual(prices.calls[1:], [["KRW-BTC"], ["KRW-XRP"], ["KRW-OLD"]])
+        self.assertAlmostEqual(valuation["total_market_value"], 190_000.0)
+        self.assertEqual(valuation["missing_prices"], ["KRW-OLD"])
+
+    def test_locked_balances_valued_same_in_both_sources(self):
+        """
+        대기 주문에 묶인 현금/수량을 거래소 조회와 원장 모두 평가에 포함해 같은 결과를 내는지 테스트.
+        """
+        set_upbit_client(LockedAccounts())
+        try:
+            exchange = value_portfolio(fetch_portfolio_status("access", "secret"), self.prices)
+        finally:
+            set_upbit_client(None)
+        ledger = PositionLedger()
+        ledger.load(LockedAccounts().get_accounts())
+        self.assertEqual(ledger.status("KRW-XRP")["cash_balance"], 40_000.0)
+
+        self.assertEqual(value_portfolio(ledger.portfolio(), self.prices), exchange)
+        self.assertAlmostEqual(exchange["total_equity"], 50_000.0 + 100 * 900.0)
+        self.assertAlmostEqual(exchange["cash_balance"], 50_000.0)
+
+    def test_values_ledger_portfolio(self):
+        """
+        로컬 원장의 포트폴리오도 같은 형식으로 평가되는지 테스트.
+        """
+        ledger = PositionLedger(cash=100_000.0)
+        ledger.apply_fill("KRW-XRP", "buy", 1000.0, 10.0)
+        valuation = value_portfolio(ledger.portfolio(), self.prices)
+        self.assertAlmostEqual(valuation["total_equity"], 90_000.0 + 9000.0)
+        self.assertAlmostEqual(valuation["unrealized_pnl"], -1000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# tests/test_position_ledger.py
+
+import unittest
+from exchange.paper_exchange import OrderBook, PaperExchange, SimulatedClock
+from trade_manager.order_tracker import summarize_fills
+from trade_manager.position_ledger import LedgerReconciler, PositionLedger
+from helpers import FixedPrice
+
+
+def make_exchange():
+    clock = SimulatedClock("2024-10-01 09:00:00", speed=0)
+    return PaperExchange(
+        FixedPrice(), cash=1_000_000.0, clock=clock,
+        orderbooks=lambda market, mid: OrderBook(market, [[mid, 1000.0]], [[mid, 1000.0]]),
+    )
+
+
+class TestPositionLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = PositionLedger()
+        self.ledger.load([
+            {"currency": "KRW", "balance": "100000.0", "locked": "0.0", "avg_buy_price": "0"},
+            {"currency": "XRP", "balance": "10.0", "locked": "0.0", "avg_buy_price": "1000.0"},
+        ])
+
+    def test_fills_update_position_and_realized_pnl(self):
+        """
+        매수 체결은 평균 매수가와 원가를, 매도 체결은 실현 손익과 현금을 갱신하는지 테스트.
+        """
+        self.ledger.apply_fill("KRW-XRP", "buy", 1200.0, 10.0, fee=6.0)
+        snapshot = self.ledger.snapshot("KRW-XRP")
+        self.assertAlmostEqual(snapshot.balance, 20.0)
+        self.assertAlmostEqual(snapshot.avg_buy_price, 1100.0)
+        self.assertAlmostEqual(snapshot.cash_balance, 100_000.0 - 12_006.0)
+
+        position = self.ledger.apply_fill("KRW-XRP", "sell", 1300.0, 5.0, fee=3.25)
+        self.assertAlmostEqual(position.realized_pnl, 5 * 200.0 - 3.25)
+        self.assertAlmostEqual(position.avg_buy_price, 1100.0)
+        self.assertAlmostEqual(self.ledger.status("KRW-XRP")["total_investment"], 15 * 1100.0)
+
+        self.ledger.apply_fill("KRW-XRP", "sell", 1000.0, 15.0)
+        self.assertEqual(self.ledger.snapshot("KRW-XRP").balance, 0.0)
+        self.assertAlmostEqual(self.ledger.realized_pnl(), 5 * 200.0 - 3.25 - 15 * 100.0)
+
+    def test_cumulative_updates_are_applied_once(self):
+        """
+        같은 주문의 누적 체결 요약을 여러 번 받아도 새로 체결된 부분만 한 번씩 반영되는지 테스트.
+        """
+        partial = {"filled_volume": 4.0, "filled_funds": 4000.0, "paid_fee": 2.0, "order_state": "wait"}
+        final = {"filled_volume": 10.0, "filled_funds": 10_500.0, "paid_fee": 5.25, "order_state": "done"}
+        for summary in (partial, partial, final, final):
+            self.ledger.apply_order_update("order-1", "KRW-XRP", "buy", summary)
+
+        snapshot = self.ledger.snapshot("KRW-XRP")
+        self.assertAlmostEqual(snapshot.balance, 20.0)
+        self.assertAlmostEqual(snapshot.avg_buy_price, (10_000.0 + 10_500.0) / 20)
+        self.assertAlmostEqual(snapshot.cash_balance, 100_000.0 - 10_505.25)
+
+    def test_reconcile_reports_drift_and_resets(self):
+        """
+        거래소 잔고와 다르면 차이를 보고하고 거래소 값으로 맞추며, 실현 손익 누계는 유지하는지 테스트.
+        """
+        self.ledger.apply_fill("KRW-XRP", "sell", 1100.0, 5.0)
+        accounts = [
+            {"currency": "KRW", "balance": "105500.0", "locked": "0.0", "avg_buy_price": "0"},
+            {"currency": "XRP", "balance": "5.0", "locked": "0.0", "avg_buy_price": "1000.0"},
+        ]
+        self.assertEqual(self.ledger.reconcile(accounts), [])
+
+        accounts[1]["balance"] = "4.0"
+        drifts = self.ledger.reconcile(accounts)
+        self.assertEqual(drifts, [{"currency": "XRP", "field": "balance", "local": 5.0, "exchange": 4.0}])
+        self.assertEqual(self.ledger.snapshot("KRW-XRP").balance, 4.0)
+        self.assertAlmostEqual(self.ledger.realized_pnl(), 500.0)
+
+    def test_status_excludes_locked_balances(self):
+        """
+        판단에 쓰는 상태는 대기 주문에 묶인 현금/수량을 빼고, 대사 때 locked 만 바뀌면 차이 없이 갱신하는지 테스트.
+        """
+        ledger = PositionLedger()
+        accounts = [
+            {"currency": "KRW", "balance": "70000.0", "locked": "30000.0", "avg_buy_price": "0"},
+            {"currency": "XRP", "balance": "6.0", "locked": "4.0", "avg_buy_price": "1000.0"},
+        ]
+        ledger.load(accounts)
+        snapshot = ledger.snapshot("KRW-XRP")
+        self.assertEqual((snapshot.cash_balance, snapshot.balance), (70_000.0, 6.0))
+        self.assertAlmostEqual(snapshot.asset_investment, 10_000.0)
+
+        accounts[0].update(balance="100000.0", locked="0.0")
+        accounts[1].update(balance="10.0", locked="0.0")
+        self.assertEqual(ledger.reconcile(accounts), [])
+        snapshot = ledger.snapshot("KRW-XRP")
+        self.assertEqual((snapshot.cash_balance, snapshot.balance), (100_000.0, 10.0))
+
+    def test_fills_release_locked_orders(self):
+        """
+        대기 주문에 묶인 현금/수량은 그 주문이 체결된 만큼 풀리고, 주문이 끝나면 남은 양도 풀리는지 테스트.
+        """
+        # 원장을 불러올 때 이미 거래소에서 locked 로 잡혀 있던 지정가 매수 주문
+        ledger = PositionLedger()
+        ledger.load([{"currency": "KRW", "balance": "50000.0", "locked": "50000.0", "avg_buy_price": "0"}])
+        resting = {"filled_volume": 49.975, "filled_funds": 49_975.0, "paid_fee": 25.0, "order_state": "done"}
+        ledger.apply_order_update("resting", "KRW-XRP", "buy", resting, locked=True)
+        self.assertAlmostEqual(ledger.status("KRW-XRP")["cash_balance"], 50_000.0)
+
+        # 이 프로세스가 접수한 매수/매도 주문
+        self.ledger.reserve("bid", "KRW-XRP", "buy", 40_000.0)
+        self.ledger.reserve("ask", "KRW-XRP", "sell", 4.0)
+        snapshot = self.ledger.snapshot("KRW-XRP")
+        self.assertEqual((snapshot.cash_balance, snapshot.balance), (60_000.0, 6.0))
+
+        partial = {"filled_volume": 10.0, "filled_funds": 9995.0, "paid_fee": 5.0, "order_state": "wait"}
+        self.ledger.apply_order_update("bid", "KRW-XRP", "buy", partial)
+        self.assertAlmostEqual(self.ledger.snapshot("KRW-XRP").cash_balance, 60_000.0)
+        self.ledger.apply_order_update("bid", "KRW-XRP", "buy", dict(partial, order_state="cancel"))
+        self.assertAlmostEqual(self.ledger.snapshot("KRW-XRP").cash_balance, 90_000.0)
+
+        sold = {"filled_volume": 4.0, "filled_funds": 4000.0, "paid_fee": 2.0, "order_state": "done"}
+        self.ledger.apply_order_update("ask", "KRW-XRP", "sell", sold)
+        snapshot = self.ledger.snapshot("KRW-XRP")
+        self.assertEqual(snapshot.balance, 16.0)
+        self.assertAlmostEqual(snapshot.cash_balance, 93_998.0)
+        self.assertEqual(self.ledger.reserved, {})
+
+        # 체결이 reserve 보다 먼저 반영된 주문은 남은 양만 잡고, 이미 끝난 주문은 잡지 않음
+        self.ledger.apply_order_update("late", "KRW-XRP", "sell", dict(sold, order_state="wait"))
+        self.ledger.reserve("late", "KRW-XRP", "sell", 10.0)
+        self.assertEqual(self.ledger.reserved["late"][2], 6.0)
+        self.ledger.apply_order_update("late", "KRW-XRP", "sell", sold)
+        self.ledger.reserve("late", "KRW-XRP", "sell", 10.0)
+        self.assertNotIn("late", self.ledger.reserved)
+
+    def test_reconcile_skips_in_flight_orders(self):
+        """
+        체결 추적 중인 주문이 있거나 잔고 조회 중에 체결이 반영되면 대사를 건너뛰어 같은 체결을 두 번 반영하지 않는지 테스트.
+        """
+        busy = [True]
+        accounts = [
+            {"currency": "KRW", "balance": "89995.0", "locked": "0.0", "avg_buy_price": "0"},
+            {"currency": "XRP", "balance": "20.0", "locked": "0.0", "avg_buy_price": "1000.0"},
+        ]
+        reconciler = LedgerReconciler(self.ledger, lambda: accounts, busy=lambda: busy[0])
+        # 거래소에는 이미 체결됐지만 추적기가 아직 원장에 반영하지 않은 주문
+        self.assertEqual(reconciler.run_once(), [])
+        self.assertEqual(self.ledger.snapshot("KRW-XRP").balance, 10.0)
+
+        # 잔고 조회와 원장 반영이 겹친 경우
+        busy[0] = False
+        fill = {"filled_volume": 10.0, "filled_funds": 10_000.0, "paid_fee": 5.0, "order_state": "done"}
+
+        def fetch_during_fill():
+            self.ledger.apply_order_update("order-1", "KRW-XRP", "buy", fill)
+            return accounts
+
+        reconciler.fetch_accounts = fetch_during_fill
+        self.assertEqual(reconciler.run_once(), [])
+        self.ledger.apply_order_update("order-1", "KRW-XRP", "buy", fill)
+        self.assertEqual(self.ledger.snapshot("KRW-XRP").balance, 20.0)
+
+        reconciler.fetch_accounts = lambda: accounts
+        self.assertEqual(reconciler.run_once(), [])
+        self.assertAlmostEqual(self.ledger.snapshot("KRW-XRP").cash_balance, 89_995.0)
+
+    def test_ledger_tracks_paper_exchange_fills(self):
+        """
+        모의 거래소 주문의 체결 요약으로 갱신한 원장이 대사 시 거래소 잔고와 일치하는지 테스트.
+        """
+        exchange = make_exchange()
+        ledger = PositionLedger()
+        drifts = []
+        reconciler = LedgerReconciler(ledger, exchange.get_accounts, on_drift=drifts.extend)
+        reconciler.run_once()
+        self.assertTrue(ledger.loaded)
+
+        for side, order in (("buy", exchange.buy_market_order("KRW-XRP", 50_000.0)),
+                            ("sell", exchange.sell_market_order("KRW-XRP", 20.0))):
+            ledger.apply_order_update(order["uuid"], "KRW-XRP", side, summarize_fills(exchange.get_order(order["uuid"])))
+
+        self.assertEqual(reconciler.run_once(), [])
+        self.assertEqual(drifts, [])
+        self.assertAlmostEqual(ledger.snapshot("KRW-XRP").balance, 30.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
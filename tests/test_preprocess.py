@@ -0,0 +1,126 @@
+# tests/test_preprocess.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from data_collection.preprocess import preprocess_15min_data, extract_relevant_data, compute_segment_stats
+
+
+def reference_15min_summary(data: pd.DataFrame) -> dict:
+    # 기존 groupby 기반 구현 (결과 비교용)
+    data = data.copy()
+    data["time_index"] = (data.index - data.index[0]).total_seconds() // 900
+    summary = {
+        f"segment_15m_{int(idx) + 1}": {
+            "avg_price": grp["close"].mean(),
+            "high_price": grp["high"].max(),
+            "low_price": grp["low"].min(),
+            "volatility": grp["close"].std(),
+            "vwap": (grp["close"] * grp["volume"]).sum() / grp["volume"].sum() if grp["volume"].sum() > 0 else 0,
+            "total_vol": grp["volume"].sum(),
+        }
+        for idx, grp in data.groupby("time_index")
+    }
+    summary["overall"] = {
+        "trend": "up" if data["close"].iloc[-1] > data["close"].iloc[0] else "down",
+        "max_volatility": round(data["close"].std(), 2),
+        "outlier_count": len(
+            data[
+                (data["close"] > data["close"].mean() + 2 * data["close"].std()) |
+                (data["close"] < data["close"].mean() - 2 * data["close"].std())
+            ]
+        ),
+    }
+    return summary
+
+
+def make_5min_data(periods=36, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 3000 + rng.normal(0, 15, periods).cumsum()
+    data = pd.DataFrame({
+        "open": close + rng.normal(0, 2, periods),
+        "high": close + rng.uniform(0, 5, periods),
+        "low": close - rng.uniform(0, 5, periods),
+        "close": close,
+        "volume": rng.uniform(0, 1000, periods),
+    }, index=pd.date_range(start="2024-12-13 00:00:00", periods=periods, freq="5min"))
+    data.iloc[4, data.columns.get_loc("volume")] = 0.0
+    return data
+
+
+class TestPreprocess(unittest.TestCase):
+
+    def assertSummaryEqual(self, result, expected):
+        self.assertEqual(result.keys(), expected.keys())
+        for key, values in expected.items():
+            for field, value in values.items():
+                if isinstance(value, str):
+                    self.assertEqual(result[key][field], value)
+                elif np.isnan(value):
+                    self.assertTrue(np.isnan(result[key][field]))
+                else:
+                    self.assertAlmostEqual(result[key][field], value, places=6)
+
+    def test_preprocess_15min_matches_groupby(self):
+        """
+        벡터화된 preprocess_15min_data 가 기존 groupby 구현과 같은 값을 반환하는지 테스트.
+        """
+        data = make_5min_data()
+        self.assertSummaryEqual(preprocess_15min_data(data), reference_15min_summary(data))
+
+    def test_preprocess_15min_with_gaps_and_single_rows(self):
+        """
+        빈 구간과 봉이 하나뿐인 구간도 기존 구현과 같게 처리되는지 테스트.
+        """
+        data = make_5min_data(periods=40, seed=1).iloc[[0, 1, 2, 7, 9, 10, 11, 12, 30, 39]]
+        self.assertSummaryEqual(preprocess_15min_data(data), reference_15min_summary(data))
+
+    def test_preprocess_custom_bucket_and_window(self):
+        """
+        구간 폭과 기간을 바꿔 사용할 수 있는지 테스트.
+        """
+        data = make_5min_data(periods=288)
+        result = preprocess_15min_data(data, bucket_seconds=3600, window_seconds=6 * 3600)
+        self.assertEqual(len(result) - 1, 6)
+        self.assertIn("segment_60m_1", result)
+        self.assertAlmostEqual(result["segment_60m_6"]["avg_price"], data["close"].iloc[-12:].mean())
+
+    def test_extract_relevant_data_matches_iloc_loop(self):
+        """
+        재구성 기반 extract_relevant_data 가 기존 구간별 계산과 같은 값을 반환하는지 테스트.
+        """
+        data = make_5min_data(periods=30)[["close", "volume"]]
+        result = extract_relevant_data(data, interval=7)
+        self.assertEqual(len(result), 4)
+        for i in range(4):
+            segment = data.iloc[i * 7:(i + 1) * 7]
+            expected = result[f"segment_{i + 1}"]
+            self.assertEqual(expected["date_range"], f"{segment.index.min()} to {segment.index.max()}")
+            self.assertAlmostEqual(expected["average_price"], segment["close"].mean())
+            self.assertAlmostEqual(expected["high_price"], segment["close"].max())
+            self.assertAlmostEqual(expected["low_price"], segment["close"].min())
+            self.assertAlmostEqual(expected["volatility"], segment["close"].std())
+
+    def test_extract_relevant_data_keeps_partial_segment(self):
+        """
+        partial='keep' 이면 남는 행이 짧은 마지막 구간으로 요약되는지 테스트.
+        """
+        data = make_5min_data(periods=30)[["close", "volume"]]
+        result = extract_relevant_data(data, interval=7, partial="keep")
+        self.assertEqual(len(result), 5)
+        self.assertAlmostEqual(result["segment_5"]["average_price"], data["close"].iloc[28:].mean())
+        with self.assertRaises(ValueError):
+            extract_relevant_data(data, interval=7, partial="pad")
+
+    def test_compute_segment_stats_multiple_markets(self):
+        """
+        (시장 수, 시간) 배열을 한 번에 요약할 수 있는지 테스트.
+        """
+        values = np.arange(2 * 10, dtype=float).reshape(2, 10)
+        stats = compute_segment_stats(values, interval=5)
+        self.assertEqual(stats["average_price"].shape, (2, 2))
+        np.testing.assert_allclose(stats["average_price"], [[2, 7], [12, 17]])
+        np.testing.assert_allclose(stats["high_price"], [[4, 9], [14, 19]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# tests/test_prompt_encoder.py
+
+import unittest
+from data_collection.snapshot import PortfolioSnapshot, build_market_snapshot
+from gpt_interface.prompt_encoder import count_tokens, encode_prompt, format_balance, format_number
+from gpt_interface.request_handler import prepare_request
+from helpers import make_candles
+
+
+class TestPromptEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.market = build_market_snapshot(
+            "KRW-XRP",
+            {
+                "current_price": 3123.456789123,
+                "candlestick_30d": make_candles(30, "D", offset=0.123456789),
+                "raw_5min_data": make_candles(288, "5min", seed=1, offset=0.123456789),
+            },
+            indicators={"rsi_14": 55.123456, "ema_12": 3101.987654},
+        )
+        self.portfolio = PortfolioSnapshot(
+            cash_balance=50000.123, currency="XRP", balance=10.123456789, avg_buy_price=3000.0
+        )
+
+    def test_format_number(self):
+        """
+        유효 숫자 반올림과 표시 형식을 테스트.
+        """
+        self.assertEqual(format_number(3123.456789123), "3123.46")
+        self.assertEqual(format_number(0.000123456, 4), "0.0001235")
+        self.assertEqual(format_number(123456789.0), "123456789")
+        self.assertEqual(format_number(3050.0), "3050")
+        self.assertEqual(format_number(None), "-")
+        self.assertEqual(format_balance(10.123456789), "10.12345679")
+
+    def test_compact_layout(self):
+        """
+        구간 요약이 표 형식 한 줄씩으로 인코딩되는지 테스트.
+        """
+        encoded = encode_prompt(self.market, self.portfolio)
+        lines = encoded.text.splitlines()
+        self.assertIn("PORTFOLIO cash=50000.1KRW XRP=10.12345679 avg_buy=3000KRW", lines)
+        self.assertIn("MARKET KRW-XRP price=3123.46KRW", encoded.text)
+        self.assertIn("DAILY range|avg|high|low|std", lines)
+        self.assertIn("15M #|avg|high|low|std|vwap|vol", lines)
+        self.assertEqual(sum("~" in line for line in lines), len(self.market.segments))
+        self.assertNotIn("3123.456789", encoded.text)
+        self.assertEqual(encoded.dropped, 0)
+        self.assertEqual(encoded.tokens, count_tokens(encoded.text)["tokens"])
+
+    def test_token_budget_drops_oldest_buckets(self):
+        """
+        토큰 예산을 넘으면 가장 오래된 15분 구간부터 생략되는지 테스트.
+        """
+        full = encode_prompt(self.market, self.portfolio)
+        budget = full.tokens // 2
+        encoded = encode_prompt(self.market, self.portfolio, max_tokens=budget)
+        self.assertLessEqual(encoded.tokens, budget)
+        self.assertGreater(encoded.dropped, 0)
+        last_bucket = f"{int(self.market.bucket_ids[-1]) + 1}|"
+        self.assertTrue(any(line.startswith(last_bucket) for line in encoded.text.splitlines()))
+        self.assertNotIn("\n1|", encoded.text)
+
+    def test_prepare_request_reports_tokens(self):
+        """
+        포맷팅된 텍스트가 JSON 으로 다시 감싸지지 않고 입력 토큰 수가 기록되는지 테스트.
+        """
+        text = encode_prompt(self.market, self.portfolio).text
+        request = prepare_request(text)
+        self.assertIn(text, request["messages"][1]["content"])
+        self.assertGreater(request["prompt_tokens"], count_tokens(text)["tokens"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# tests/test_prompt_templates.py
+
+import unittest
+from types import SimpleNamespace
+from gpt_interface.batch_request import prepare_batch_request
+from gpt_interface.prompt_templates import BATCH_DECISION_TEMPLATE, SINGLE_DECISION_TEMPLATE, PrefixCacheMeter
+from gpt_interface.request_handler import prepare_request
+
+
+class TestPromptTemplates(unittest.TestCase):
+
+    def test_static_prefix_is_identical(self):
+        """
+        데이터가 달라도 시스템 메시지와 사용자 메시지 앞부분이 같고, 데이터가 맨 뒤에 오는지 테스트.
+        """
+        first = prepare_request("MARKET KRW-XRP price=3000KRW")
+        second = prepare_request("MARKET KRW-XRP price=3100KRW")
+        self.assertIs(first["messages"][0], second["messages"][0])
+        self.assertIn("Output Format", first["messages"][0]["content"])
+
+        prefix = SINGLE_DECISION_TEMPLATE.user_prefix
+        self.assertTrue(first["messages"][1]["content"].startswith(prefix))
+        self.assertTrue(first["messages"][1]["content"].endswith("price=3000KRW"))
+
+    def test_batch_request_keeps_prefix(self):
+        """
+        묶음 요청도 데이터 설명은 시스템 메시지에, 시장 목록과 데이터는 고정 앞부분 뒤에 붙는지 테스트.
+        """
+        request = prepare_batch_request({"KRW-XRP": "MARKET KRW-XRP"})
+        self.assertIn("Tables are", request["messages"][0]["content"])
+        content = request["messages"][1]["content"]
+        self.assertTrue(content.startswith(BATCH_DECISION_TEMPLATE.user_prefix + "Markets: KRW-XRP"))
+        self.assertTrue(content.endswith("### KRW-XRP\nMARKET KRW-XRP"))
+
+    def test_static_prefix_is_cacheable(self):
+        """
+        고정 앞부분이 프롬프트 캐싱이 적용되는 1024 토큰 이상인지 테스트.
+        """
+        for template in (SINGLE_DECISION_TEMPLATE, BATCH_DECISION_TEMPLATE):
+            template.build_request("MARKET KRW-XRP price=3000KRW")
+            self.assertGreaterEqual(template.prefix_tokens, 1024, template.name)
+
+    def test_prefix_cache_meter(self):
+        """
+        응답 usage 의 캐시 토큰이 누적되어 적중률로 계산되는지 테스트.
+        """
+        meter = PrefixCacheMeter()
+        usage = SimpleNamespace(
+            prompt_tokens=2000, completion_tokens=30,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        )
+        self.assertEqual(meter.record("test-model", usage)["cached_tokens"], 1536)
+        meter.record("test-model", SimpleNamespace(prompt_tokens=2000, completion_tokens=30))
+        self.assertAlmostEqual(meter.hit_rate("test-model"), 1536 / 4000)
+        self.assertEqual(meter.hit_rate("other-model"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
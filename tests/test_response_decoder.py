@@ -0,0 +1,90 @@
+# tests/test_response_decoder.py
+
+import unittest
+from data_collection.snapshot import PortfolioSnapshot
+from gpt_interface.data_formatter import parse_response
+from gpt_interface.decision_logic import make_decision
+from gpt_interface.response_decoder import decode_decision, decode_payload, parse_amount
+
+
+class TestResponseDecoder(unittest.TestCase):
+
+    def test_parse_amount_units(self):
+        """
+        여러 금액 표기가 (수량, 통화) 로 정규화되는지 테스트.
+        """
+        self.assertEqual(parse_amount("10,000 KRW"), (10000.0, "KRW"))
+        self.assertEqual(parse_amount("₩5000"), (5000.0, "KRW"))
+        self.assertEqual(parse_amount("5000원"), (5000.0, "KRW"))
+        self.assertEqual(parse_amount("1.5 xrp"), (1.5, "XRP"))
+        self.assertEqual(parse_amount(3, "XRP"), (3.0, "XRP"))
+        for invalid in ("all", "", "10 KRW 20", None, True, float("nan")):
+            with self.assertRaises(ValueError):
+                parse_amount(invalid)
+
+    def test_decode_decision(self):
+        """
+        판단 필드를 한 번에 검증하고 기본 통화를 채우는지 테스트.
+        """
+        buy = decode_decision('{"action": "BUY", "amount": "10000", "reason": "up"}', "KRW-XRP")
+        self.assertEqual((buy["action"], buy["amount"], buy["currency"]), ("buy", 10000.0, "KRW"))
+        sell = decode_decision({"action": "sell", "amount": 2, "reason": "down"}, "KRW-XRP")
+        self.assertEqual(sell["currency"], "XRP")
+        hold = decode_decision({"action": "hold", "amount": "none", "reason": "flat", "cached": True}, "KRW-XRP")
+        self.assertEqual((hold["amount"], hold["cached"]), (0.0, True))
+        self.assertEqual(decode_decision(buy, "KRW-XRP"), buy)
+
+    def test_invalid_decisions_raise(self):
+        """
+        잘못된 금액/통화/행동은 0.0 거래가 아니라 예외가 되는지 테스트.
+        """
+        invalid = [
+            {"action": "buy", "amount": "a lot", "reason": "x"},
+            {"action": "buy", "amount": "0 KRW", "reason": "x"},
+            {"action": "sell", "amount": "1 BTC", "reason": "x"},
+            {"action": "short", "amount": "1", "reason": "x"},
+            {"action": "buy", "reason": "x"},
+            {"action": "buy", "amount": "1"},
+        ]
+        for response in invalid:
+            with self.assertRaises(ValueError):
+                decode_decision(response, "KRW-XRP")
+
+    def test_decode_payload_fenced(self):
+        """
+        코드 블록이나 설명이 섞인 응답에서도 JSON 객체를 꺼내는지 테스트.
+        """
+        text = 'Here you go:\n```json\n{"action": "hold", "amount": 0, "reason": "flat"}\n```'
+        self.assertEqual(decode_payload(text)["action"], "hold")
+        with self.assertRaises(ValueError):
+            decode_payload("[1, 2]")
+
+    def test_parse_response_rejects_code(self):
+        """
+        parse_response 가 eval 없이 파싱하고 파이썬 코드는 거부하는지 테스트.
+        """
+        self.assertEqual(parse_response('{"action": "hold", "amount": 0, "reason": "x"}')["action"], "hold")
+        with self.assertRaises(ValueError):
+            parse_response("__import__('os').getcwd()")
+
+    def test_make_decision_converts_units(self):
+        """
+        코인 단위 매수와 KRW 단위 매도가 주문 단위로 변환되는지 테스트.
+        """
+        portfolio = PortfolioSnapshot(cash_balance=100000.0, currency="XRP", balance=10.0)
+        self.assertEqual(
+            make_decision({"action": "buy", "amount": "5 XRP", "reason": "x"}, portfolio, 3000.0, "KRW-XRP"),
+            ("buy", 15000.0),
+        )
+        self.assertEqual(
+            make_decision({"action": "sell", "amount": "6000 KRW", "reason": "x"}, portfolio, 3000.0, "KRW-XRP"),
+            ("sell", 2.0),
+        )
+        self.assertEqual(
+            make_decision({"action": "buy", "amount": "bad", "reason": "x"}, portfolio, 3000.0, "KRW-XRP"),
+            ("hold", 0),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_snapshot.py
+
+import unittest
+from data_collection.preprocess import (
+    handle_missing_values,
+    normalize_data,
+    extract_relevant_data,
+    preprocess_15min_data,
+)
+from data_collection.snapshot import MarketSnapshot, PortfolioSnapshot, build_market_snapshot
+from gpt_interface.data_formatter import format_input
+from helpers import make_candles
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.raw_data = {
+            "current_price": 3050.0,
+            "candlestick_30d": make_candles(30, "D"),
+            "raw_5min_data": make_candles(36, "5min", seed=1),
+        }
+        self.portfolio = {
+            "cash_balance": 50000.0,
+            "total_investment": 30000.0,
+            "target_asset": {"currency": "XRP", "balance": 10.0, "avg_buy_price": 3000.0, "total_investment": 30000.0},
+        }
+
+    def test_snapshot_matches_legacy_dicts(self):
+        """
+        스냅샷의 dict 변환 결과가 기존 전처리 함수 결과와 같은지 테스트.
+        """
+        snapshot = build_market_snapshot("KRW-XRP", self.raw_data)
+        legacy_30d = extract_relevant_data(normalize_data(handle_missing_values(self.raw_data["candlestick_30d"])))
+        legacy_5min = preprocess_15min_data(handle_missing_values(self.raw_data["raw_5min_data"]))
+        self.assertEqual(snapshot.summary_30d(), legacy_30d)
+        self.assertEqual(snapshot.processed_5min(), legacy_5min)
+        self.assertEqual(snapshot.volume_24h, self.raw_data["candlestick_30d"]["volume"].iloc[-1])
+
+    def test_format_input_accepts_snapshots_and_dicts(self):
+        """
+        스냅샷과 기존 dict 형식 입력이 같은 프롬프트 텍스트를 만드는지 테스트.
+        """
+        market = build_market_snapshot("KRW-XRP", self.raw_data, indicators={"rsi_14": 55.0, "obv": None})
+        from_snapshots = format_input({"portfolio": PortfolioSnapshot.from_dict(self.portfolio), "market_data": market})
+        from_dicts = format_input({"portfolio": self.portfolio, "market_data": market.to_dict()})
+        self.assertEqual(from_snapshots, from_dicts)
+        self.assertIn("rsi_14=55", from_snapshots)
+        self.assertNotIn("obv", from_snapshots)
+
+    def test_missing_candles_are_reported(self):
+        """
+        캔들 수집 실패가 오류로 기록되고 포맷팅은 계속되는지 테스트.
+        """
+        market = build_market_snapshot("KRW-XRP", {"current_price": 3050.0})
+        self.assertIn("error", market.to_dict()["summary_30d"])
+        text = format_input({"portfolio": PortfolioSnapshot.from_dict(self.portfolio), "market_data": market})
+        self.assertIn("price=3050KRW", text)
+
+    def test_portfolio_record(self):
+        """
+        포트폴리오 스냅샷이 Portfolio 테이블 행 데이터로 변환되는지 테스트.
+        """
+        snapshot = PortfolioSnapshot.from_dict(self.portfolio)
+        record = snapshot.to_record("2024-12-13T09:00:00+09:00")
+        self.assertEqual(record["currency"], "XRP")
+        self.assertEqual(record["target_asset_balance"], 10.0)
+        self.assertEqual(snapshot.to_dict(), self.portfolio)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# tests/test_sweep.py
+
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from backtest import (
+    RuleBasedProvider, SharedCandles, SimulatedExchange, expand_grid, precompute_features, run_backtest,
+    run_sweep, summarize_sweep,
+)
+from backtest.sweep import _slice, job_lookback_ns
+from data_collection.candle_store import CandleStore
+from helpers import make_candles
+
+
+def make_market(days=35, seed=0):
+    # 5분 봉과, 같은 5분 봉을 09:00 기준으로 묶은 일봉
+    minute = make_candles(288 * days, seed=seed, start="2024-09-01 09:00:00", step=5.0, spread=2.0)
+    daily = minute.resample("24h", offset="9h").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "value": "sum"}
+    )
+    return minute, daily
+
+
+class TestSweep(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.minute, cls.daily = make_market()
+
+    def test_expand_grid(self):
+        """
+        파라미터, 시장, 기간의 모든 조합으로 작업이 만들어지는지 테스트.
+        """
+        jobs = expand_grid({"fee_rate": [0.0005, 0.001], "buy_below": [30, 35, 40]}, ["KRW-XRP", "KRW-BTC"],
+                           [(None, None), ("2024-09-10", "2024-09-20")])
+        self.assertEqual(len(jobs), 2 * 3 * 2 * 2)
+        self.assertEqual(jobs[0], {"params": {"fee_rate": 0.0005, "buy_below": 30}, "market": "KRW-XRP",
+                                   "start": None, "end": None})
+
+    def test_shared_memory_sweep_matches_sequential_run(self):
+        """
+        공유 메모리로 워커에서 실행한 결과가 같은 설정의 순차 실행 결과와 같은지 테스트.
+        """
+        grid = {"fee_rate": [0.0005, 0.002], "buy_below": [35, 45], "interval": [5, 10]}
+        with SharedCandles() as shared:
+            shared.add("KRW-XRP", "minute5", CandleStore.to_records(self.minute))
+            shared.add("KRW-XRP", "day", CandleStore.to_records(self.daily))
+            results = run_sweep(expand_grid(grid, ["KRW-XRP"]), shared, max_workers=2)
+
+        self.assertEqual(len(results), 8)
+        self.assertNotIn("error", results)
+        row = results[(results.fee_rate == 0.002) & (results.buy_below == 45) & (results.interval == 5)].iloc[0]
+
+        features = precompute_features(
+            "KRW-XRP", CandleStore.to_records(self.minute), CandleStore.to_records(self.daily), interval=5
+        )
+        expected = run_backtest(features, RuleBasedProvider(buy_below=45), SimulatedExchange(currency="XRP", fee_rate=0.002))
+        self.assertAlmostEqual(row["pnl"], expected.metrics["pnl"])
+        self.assertEqual(row["trades"], expected.metrics["trades"])
+
+        summary = summarize_sweep(results, ["fee_rate"])
+        self.assertEqual(summary["runs"].tolist(), [4, 4])
+
+    def test_all_in_buys_use_swept_fee_rate(self):
+        """
+        전액 매수 판단의 매수 금액 상한을 스윕한 수수료율로 계산해, 수수료율이 높아도 매수가 거부되지 않는지 테스트.
+        """
+        grid = {"fee_rate": [0.0005, 0.002], "buy_below": [45], "buy_fraction": [1.0]}
+        with SharedCandles() as shared:
+            shared.add("KRW-XRP", "minute5", CandleStore.to_records(self.minute))
+            results = run_sweep(expand_grid(grid, ["KRW-XRP"]), shared, max_workers=1)
+
+        trades = results.set_index("fee_rate")["trades"]
+        self.assertGreater(trades[0.0005], 0)
+        self.assertGreater(trades[0.002], 0)
+
+        features = precompute_features("KRW-XRP", CandleStore.to_records(self.minute))
+        exchange = SimulatedExchange(currency="XRP", fee_rate=0.002)
+        with self.assertNoLogs(level="ERROR"):
+            result = run_backtest(features, RuleBasedProvider(buy_below=45, buy_fraction=1.0), exchange, quiet=False)
+        self.assertIn("buy", result.actions)
+        self.assertGreaterEqual(exchange.cash, 0.0)
+
+    def test_date_range_features_match_full_history(self):
+        """
+        기간별 작업의 첫 판단 시점부터 24시간 거래량과 지표가 전체 기간 실행과 같은지 테스트 (누적값인 OBV 제외).
+        """
+        records = CandleStore.to_records(self.minute)
+        full = precompute_features("KRW-XRP", records)
+        sliced = _slice(records, "2024-09-20", "2024-09-25", job_lookback_ns({}))
+        ranged = precompute_features("KRW-XRP", sliced, start="2024-09-20")
+
+        self.assertEqual(ranged.timestamps[0], pd.Timestamp("2024-09-20"))
+        offset = int(np.searchsorted(full.timestamps, ranged.timestamps[0]))
+        np.testing.assert_array_equal(full.timestamps[offset:offset + len(ranged)], ranged.timestamps)
+        np.testing.assert_allclose(ranged.volume_24h, full.volume_24h[offset:offset + len(ranged)])
+        columns = [i for i, name in enumerate(full.indicator_names) if name != "obv"]
+        np.testing.assert_allclose(
+            ranged.indicators[:, columns], full.indicators[offset:offset + len(ranged), columns], rtol=1e-6
+        )
+
+    def test_store_files_and_date_ranges(self):
+        """
+        캔들 저장소 파일을 memmap 으로 공유하고, 기간별 작업과 누락된 시장 오류를 결과 표에 남기는지 테스트.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CandleStore(tmp)
+            store.write("KRW-XRP", "minute5", self.minute)
+            store.write("KRW-XRP", "day", self.daily)
+            shared = SharedCandles.from_store(store, ["KRW-XRP", "KRW-BTC"])
+            self.assertEqual(set(shared.descriptors), {("KRW-XRP", "minute5"), ("KRW-XRP", "day")})
+
+            jobs = expand_grid({"buy_below": [40]}, ["KRW-XRP", "KRW-BTC"], [("2024-09-20", "2024-09-25")])
+            results = run_sweep(jobs, shared, max_workers=1)
+
+        by_market = results.set_index("market")
+        self.assertEqual(by_market.loc["KRW-XRP", "steps"], 5 * 96 + 1)
+        self.assertIn("KRW-BTC", by_market.loc["KRW-BTC", "error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
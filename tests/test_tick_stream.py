@@ -0,0 +1,84 @@
+# tests/test_tick_stream.py
+
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from data_collection.tick_stream import TickIngestor, TickRingBuffer, ReplayFileSource
+
+
+def trade(timestamp: str, price: float, volume: float, market: str = "KRW-BTC") -> dict:
+    # KST 시각 문자열을 Upbit 체결 메시지의 UTC epoch ms 로 변환
+    ts = pd.Timestamp(timestamp, tz="Asia/Seoul")
+    return {"code": market, "trade_timestamp": ts.value // 1_000_000, "trade_price": price, "trade_volume": volume}
+
+
+class TestTickStream(unittest.TestCase):
+
+    def test_ring_buffer_overwrites_oldest(self):
+        """
+        가득 찬 링 버퍼가 가장 오래된 체결을 덮어쓰는지 테스트.
+        """
+        buffer = TickRingBuffer(capacity=3)
+        for i in range(5):
+            buffer.append(i, 100.0 + i, 1.0)
+        self.assertListEqual(list(buffer.latest()["timestamp"]), [2, 3, 4])
+
+    def test_ticks_are_aggregated_into_candles(self):
+        """
+        체결이 KST 기준 5분 캔들로 집계되는지 테스트.
+        """
+        ingestor = TickIngestor(source=[], intervals=(300,))
+        for message in [
+            trade("2024-12-13 09:00:10", 100.0, 1.0),
+            trade("2024-12-13 09:02:00", 105.0, 2.0),
+            trade("2024-12-13 09:04:59", 98.0, 1.0),
+            trade("2024-12-13 09:05:01", 101.0, 3.0),
+            trade("2024-12-13 09:03:00", 999.0, 1.0),  # 마감된 구간의 늦은 체결
+        ]:
+            ingestor.ingest(message)
+
+        candles = ingestor.snapshot("KRW-BTC", 300, 10)
+        self.assertListEqual(list(candles.index), [pd.Timestamp("2024-12-13 09:00:00"), pd.Timestamp("2024-12-13 09:05:00")])
+        first = candles.iloc[0]
+        self.assertEqual((first["open"], first["high"], first["low"], first["close"]), (100.0, 105.0, 98.0, 98.0))
+        self.assertEqual(first["volume"], 4.0)
+        self.assertEqual(ingestor.last_price("KRW-BTC"), 999.0)
+        self.assertTrue(ingestor.is_ready("KRW-BTC", 300, 2))
+        self.assertFalse(ingestor.is_ready("KRW-BTC", 300, 3))
+
+    def test_stale_stream_is_not_ready(self):
+        """
+        마지막 체결을 받은 지 max_age 초가 지나면 준비되지 않은 것으로 보고, 새 체결이 오면 다시 준비되는지 테스트.
+        """
+        now = [0.0]
+        ingestor = TickIngestor(source=[], intervals=(300,), max_age=60.0, clock=lambda: now[0])
+        self.assertIsNone(ingestor.age("KRW-BTC"))
+        ingestor.ingest(trade("2024-12-13 09:00:10", 100.0, 1.0))
+        self.assertTrue(ingestor.is_ready("KRW-BTC", 300, 1))
+
+        now[0] = 61.0
+        self.assertEqual(ingestor.age("KRW-BTC"), 61.0)
+        self.assertFalse(ingestor.is_ready("KRW-BTC", 300, 1))
+
+        ingestor.ingest(trade("2024-12-13 09:01:10", 101.0, 1.0))
+        self.assertTrue(ingestor.is_ready("KRW-BTC", 300, 1))
+
+    def test_replay_file_source(self):
+        """
+        재생 파일의 체결을 끝까지 소비하는지 테스트.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "trades.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for minute in range(15):
+                    f.write(json.dumps(trade(f"2024-12-13 09:{minute:02d}:00", 100.0 + minute, 1.0)) + "\n")
+            ingestor = TickIngestor(ReplayFileSource(path))
+            ingestor.run()
+        self.assertEqual(len(ingestor.snapshot("KRW-BTC", 60, 100)), 15)
+        self.assertEqual(len(ingestor.snapshot("KRW-BTC", 300, 100)), 3)
+        self.assertEqual(ingestor.snapshot("KRW-BTC", 900, 1)["close"].iloc[0], 114.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# tests/test_translator.py
+
+import os
+import tempfile
+import threading
+import unittest
+from gpt_interface.translator import ReasonTranslator, StubTranslateBackend, TranslationCache
+
+
+class BlockingBackend(StubTranslateBackend):
+    """
+    release 될 때까지 번역을 멈추는 백엔드 (느린 번역 서비스 흉내).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def translate(self, text):
+        self.release.wait(5)
+        return super().translate(text)
+
+
+class TestTranslator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "translations.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_repeated_reasons_are_translated_once(self):
+        """
+        공백/대소문자만 다른 같은 사유는 한 번만 번역되고 파일에 저장되는지 테스트.
+        """
+        backend = StubTranslateBackend({"Price is rising.": "가격이 오르고 있습니다."})
+        translator = ReasonTranslator(backend, TranslationCache(self.path))
+        self.assertEqual(translator.translate("Price is rising."), "가격이 오르고 있습니다.")
+        self.assertEqual(translator.translate("  price is   RISING. "), "가격이 오르고 있습니다.")
+        self.assertEqual(backend.calls, 1)
+
+        reloaded = TranslationCache(self.path)
+        self.assertEqual(reloaded.get("Price is rising."), "가격이 오르고 있습니다.")
+
+    def test_cache_is_size_bounded(self):
+        """
+        최대 크기를 넘으면 가장 오래 사용하지 않은 번역이 제거되는지 테스트.
+        """
+        cache = TranslationCache(max_entries=2)
+        cache.put("a", "가")
+        cache.put("b", "나")
+        cache.get("a")
+        cache.put("c", "다")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "가")
+        self.assertEqual(len(cache), 2)
+
+    def test_submit_does_not_block(self):
+        """
+        번역이 느려도 submit 은 바로 반환하고, 대기 시간이 지나면 원문을 사용하는지 테스트.
+        """
+        backend = BlockingBackend()
+        translator = ReasonTranslator(backend)
+        future = translator.submit("Slow reason")
+        self.assertFalse(future.done())
+        self.assertEqual(ReasonTranslator.resolve(future, "Slow reason", timeout=0.05), "Slow reason")
+        backend.release.set()
+        self.assertEqual(future.result(timeout=5), "[ko] Slow reason")
+        self.assertTrue(translator.submit("Slow reason").done())
+        translator.shutdown()
+
+    def test_when_done_runs_after_slow_translation(self):
+        """
+        번역이 대기 시간보다 오래 걸려도 끝난 뒤 번역 결과로 후속 처리를 호출하는지 테스트.
+        """
+        backend = BlockingBackend()
+        translator = ReasonTranslator(backend)
+        received, finished = [], threading.Event()
+        future = translator.submit("Slow reason")
+        ReasonTranslator.when_done(future, "Slow reason", lambda reason: (received.append(reason), finished.set()))
+        self.assertEqual(received, [])
+        backend.release.set()
+        self.assertTrue(finished.wait(5))
+        translator.shutdown()
+        self.assertEqual(received, ["[ko] Slow reason"])
+
+        ReasonTranslator.when_done(translator.submit("Slow reason"), "Slow reason", received.append)
+        self.assertEqual(received[-1], "[ko] Slow reason")
+
+    def test_backend_failure_returns_original(self):
+        """
+        번역 백엔드 오류 시 원문을 반환하고 캐시에 저장하지 않는지 테스트.
+        """
+        class FailingBackend:
+            def translate(self, text):
+                raise ConnectionError("offline")
+
+        translator = ReasonTranslator(FailingBackend())
+        self.assertEqual(translator.translate("Hold."), "Hold.")
+        self.assertEqual(len(translator.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
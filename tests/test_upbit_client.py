@@ -0,0 +1,69 @@
+# tests/test_upbit_client.py
+
+import time
+import unittest
+from unittest.mock import MagicMock
+from exchange.upbit_client import TokenBucket, UpbitClient, UpbitAPIError
+
+
+def make_response(status_code, payload, remaining="group=default; min=1800; sec=29"):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    response.headers = {"Remaining-Req": remaining}
+    return response
+
+
+class TestUpbitClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = UpbitClient("access", "secret" * 8, backoff_base=0.0)
+        self.client.session = MagicMock()
+
+    def test_retries_on_429_and_5xx(self):
+        """
+        429/5xx 응답은 재시도 후 성공 응답을 반환하는지 테스트.
+        """
+        self.client.session.request.side_effect = [
+            make_response(429, {"error": "too many"}),
+            make_response(503, {"error": "unavailable"}),
+            make_response(200, [{"currency": "KRW", "balance": "1000"}]),
+        ]
+        result = self.client.get_accounts()
+        self.assertEqual(result[0]["currency"], "KRW")
+        self.assertEqual(self.client.session.request.call_count, 3)
+        headers = self.client.session.request.call_args.kwargs["headers"]
+        self.assertTrue(headers["Authorization"].startswith("Bearer "))
+
+    def test_client_error_is_not_retried(self):
+        """
+        재시도 대상이 아닌 오류 응답은 바로 UpbitAPIError 로 전달되는지 테스트.
+        """
+        self.client.session.request.return_value = make_response(401, {"error": "invalid key"})
+        with self.assertRaises(UpbitAPIError) as context:
+            self.client.get_accounts()
+        self.assertEqual(context.exception.status_code, 401)
+        self.assertEqual(self.client.session.request.call_count, 1)
+
+    def test_order_is_not_retried_on_server_error(self):
+        """
+        주문 전송은 5xx 응답에서 재시도하지 않는지 테스트 (중복 주문 방지).
+        """
+        self.client.session.post.return_value = make_response(500, {"error": "internal"})
+        with self.assertRaises(UpbitAPIError):
+            self.client.buy_market_order("KRW-BTC", 10000)
+        self.assertEqual(self.client.session.post.call_count, 1)
+        self.assertEqual(self.client.session.post.call_args.kwargs["json"]["price"], "10000")
+
+    def test_token_bucket_limits_rate(self):
+        """
+        토큰 버킷이 초당 요청 수를 제한하는지 테스트.
+        """
+        bucket = TokenBucket(rate=20)
+        started = time.monotonic()
+        for _ in range(30):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.45)
+
+if __name__ == "__main__":
+    unittest.main()
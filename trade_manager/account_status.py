@@ -1,10 +1,8 @@
 import logging
 import os
 from dotenv import load_dotenv
-import requests
-import jwt
-import uuid
-import hashlib
+from exchange.upbit_client import get_upbit_client, UpbitAPIError
+from data_collection.snapshot import PortfolioSnapshot
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 dotenv_path = os.path.join(BASE_DIR, ".env")
@@ -58,27 +56,17 @@ def fetch_portfolio_status(access_key: str, secret_key: str) -> dict:
     :return: dict - 보유 자산 및 투자 상태 정보.
     """
     try:
-        # JWT 토큰 생성
-        payload = {
-            "access_key": access_key,
-            "nonce": str(uuid.uuid4())
-        }
-        jwt_token = jwt.encode(payload, secret_key)
-        authorization_token = f"Bearer {jwt_token}"
-
-        headers = {"Authorization": authorization_token}
-
-        # API 요청
-        response = requests.get("https://api.upbit.com/v1/accounts", headers=headers)
-
-        if response.status_code != 200:
-            print(f"Error: {response.status_code} - {response.json()}")
-            return {"error": f"Failed to fetch portfolio status. Status code: {response.status_code}"}
+        # 공유 클라이언트로 API 요청 (JWT 서명, 요청 수 제한, 재시도, 타임아웃 포함)
+        try:
+            assets = get_upbit_client(access_key, secret_key).get_accounts()
+        except UpbitAPIError as e:
+            print(f"Error: {e.status_code} - {e.payload}")
+            return {"error": f"Failed to fetch portfolio status. Status code: {e.status_code}"}
 
         # 응답 데이터를 파싱하여 포트폴리오 상태 구성
-        assets = response.json()
         portfolio = {
             "cash_balance": 0.0,
+            "locked_cash": 0.0,  # 대기 주문에 묶인 현금
             "invested_assets": [],
             "total_investment": 0.0  # 누적 투자 금액
         }
@@ -87,6 +75,7 @@ def fetch_portfolio_status(access_key: str, secret_key: str) -> dict:
             if asset["currency"] == "KRW":
                 # 현금 잔고
                 portfolio["cash_balance"] = float(asset["balance"])
+                portfolio["locked_cash"] = float(asset.get("locked") or 0.0)
             else:
                 # 투자 자산
                 balance = float(asset["balance"])
@@ -96,6 +85,7 @@ def fetch_portfolio_status(access_key: str, secret_key: str) -> dict:
                 invested_asset = {
                     "currency": asset["currency"],
                     "balance": balance,
+                    "locked": float(asset.get("locked") or 0.0),  # 대기 주문에 묶인 수량
                     "avg_buy_price": avg_buy_price,
                     "total_investment": round(total_asset_investment, 2)  # 개별 자산 누적 투자 금액
                 }
@@ -140,4 +130,10 @@ def get_portfolio_status(market_name="KRW-BTC"):
     
     ##market 이름 포멧팅
     target_market = market_name.split("-")[1]
-    return filter_bitcoin_portfolio(portfolio_status,target_currency=target_market)
\ No newline at end of file
+    return filter_bitcoin_portfolio(portfolio_status,target_currency=target_market)
+
+
+# 포트폴리오 스냅샷 조회
+def get_portfolio_snapshot(market_name="KRW-BTC") -> PortfolioSnapshot:
+    target_market = market_name.split("-")[1]
+    return PortfolioSnapshot.from_dict(get_portfolio_status(market_name), currency=target_market)
@@ -0,0 +1,393 @@
+# trade_manager/execution_scheduler.py
+import logging
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List
+from gpt_interface.feasibility import MIN_ORDER_AMOUNT
+from trade_manager.order_tracker import FINAL_STATES, summarize_fills
+from trade_manager.portfolio_service import PORTFOLIO_SERVICE
+from trade_manager.trade_handler import get_trade_client
+
+# 큰 주문(부모 주문)을 여러 자식 주문으로 나눠 시간(TWAP) 또는 호가 잔량(iceberg)에 맞춰 실행하는 모듈
+# 부모 주문마다 별도 스레드에서 자식 주문 접수 -> 체결 조회 -> 오래된 지정가 취소/재주문을 반복하므로
+# 판단 사이클은 자식 주문이 끝나기를 기다리지 않습니다.
+
+STRATEGIES = ("twap", "iceberg")
+CHILD_TYPES = ("limit", "market")
+KEEP_FINISHED = 100  # 진행 상황 조회를 위해 보관하는 끝난 부모 주문 수
+
+
+def floor_volume(volume: float) -> float:
+    # 업비트 주문 수량은 소수점 8자리까지
+    return math.floor(volume * 1e8) / 1e8
+
+
+class ParentOrder:
+    """
+    분할 실행 중인 부모 주문.
+    - 매수는 KRW 금액, 매도는 코인 수량 기준으로 목표(target)와 체결량을 계산
+    - future 는 실행이 끝나면 summary() 결과로 완료됨
+    - 최종 상태: done, partial (기간이 끝났지만 최소 주문 금액 이상이 체결되지 않음), cancel, error
+    """
+
+    def __init__(self, action: str, amount: float, market: str, strategy: str = "twap", slices: int = 5,
+                 duration: float = 300.0, child_type: str = "limit", replace_after: float = 30.0,
+                 display_fraction: float = 0.5, final_market: bool = True):
+        if action not in ("buy", "sell"):
+            raise ValueError(f"Invalid action: {action}")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"지원하지 않는 분할 방식입니다: {strategy}")
+        if child_type not in CHILD_TYPES:
+            raise ValueError(f"지원하지 않는 자식 주문 유형입니다: {child_type}")
+        self.id = f"parent-{uuid.uuid4()}"
+        self.action = action
+        self.target = amount
+        self.market = market
+        self.strategy = strategy
+        self.slices = max(int(slices), 1)
+        self.duration = duration
+        self.child_type = child_type
+        self.replace_after = replace_after
+        self.display_fraction = display_fraction
+        self.final_market = final_market
+        self.state = "pending"
+        self.error = None
+        self.children: List[Dict] = []
+        self.future = Future()
+        self.cancel_requested = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_buy(self) -> bool:
+        return self.action == "buy"
+
+    def open_children(self) -> List[Dict]:
+        with self._lock:
+            return [child for child in self.children if child["state"] == "wait"]
+
+    def filled(self) -> float:
+        """
+        체결된 양 (매수는 체결 금액, 매도는 체결 수량).
+        """
+        key = "filled_funds" if self.is_buy else "filled_volume"
+        with self._lock:
+            return sum(child["summary"][key] for child in self.children)
+
+    def committed(self) -> float:
+        """
+        아직 체결되지 않은 채 대기 중인 자식 주문의 양.
+        """
+        key = "filled_funds" if self.is_buy else "filled_volume"
+        with self._lock:
+            return sum(
+                max(child["size"] - child["summary"][key], 0.0) for child in self.children if child["state"] == "wait"
+            )
+
+    def summary(self) -> Dict:
+        """
+        자식 주문 체결을 합친 요약 (summarize_fills 와 같은 키).
+        """
+        with self._lock:
+            filled_volume = sum(child["summary"]["filled_volume"] for child in self.children)
+            filled_funds = sum(child["summary"]["filled_funds"] for child in self.children)
+            paid_fee = sum(child["summary"]["paid_fee"] for child in self.children)
+            children = len(self.children)
+        return {
+            "order_uuid": self.id,
+            "order_state": self.state,
+            "filled_volume": filled_volume,
+            "filled_funds": filled_funds,
+            "fill_price": filled_funds / filled_volume if filled_volume > 0 else None,
+            "paid_fee": paid_fee,
+            "children": children,
+        }
+
+    def progress(self) -> Dict:
+        """
+        진행 상황 (체결 비율, 대기 중인 자식 주문 수, 재주문 수 등).
+        """
+        summary = self.summary()
+        filled = summary["filled_funds"] if self.is_buy else summary["filled_volume"]
+        with self._lock:
+            open_children = sum(1 for child in self.children if child["state"] == "wait")
+            replaced = sum(1 for child in self.children if child["replaced"])
+        return {
+            "parent_id": self.id,
+            "market": self.market,
+            "action": self.action,
+            "strategy": self.strategy,
+            "state": self.state,
+            "target": self.target,
+            "filled_ratio": filled / self.target if self.target else 0.0,
+            "filled_volume": summary["filled_volume"],
+            "filled_funds": summary["filled_funds"],
+            "fill_price": summary["fill_price"],
+            "paid_fee": summary["paid_fee"],
+            "children": summary["children"],
+            "open_children": open_children,
+            "replaced": replaced,
+            "error": self.error,
+        }
+
+
+class ExecutionScheduler:
+    """
+    부모 주문 분할 실행기.
+    - twap: duration 동안 slices 번에 걸쳐 목표량을 균등하게 풀어 주문
+    - iceberg: 최우선 호가 잔량의 display_fraction 만큼씩만 주문
+    - 지정가 자식 주문이 replace_after 초 안에 체결되지 않으면 취소하고 새 최우선 호가로 다시 주문
+    - 모든 부모 주문을 합쳐 대기 중인 자식 주문은 max_open_children 개를 넘지 않음
+    - duration 이 지나면 (final_market 이면) 남은 양을 시장가로 정리
+    """
+
+    def __init__(self, client_getter: Callable = get_trade_client, max_open_children: int = 2,
+                 poll_interval: float = 1.0, max_workers: int = 2, min_order_amount: float = MIN_ORDER_AMOUNT,
+                 max_failures: int = 3, sleep: Callable = time.sleep, clock: Callable = time.monotonic):
+        """
+        :param client_getter: Callable - 주문 클라이언트를 반환하는 함수.
+        :param max_open_children: int - 동시에 대기할 수 있는 자식 주문 수.
+        :param poll_interval: float - 자식 주문 조회/접수 주기 (초).
+        :param max_workers: int - 동시에 실행하는 부모 주문 수.
+        :param min_order_amount: float - 최소 주문 금액 (KRW).
+        :param max_failures: int - 연속 주문 실패가 이 횟수에 이르면 부모 주문 중단.
+        :param sleep: Callable - 대기 함수.
+        :param clock: Callable - 경과 시간(초)을 반환하는 함수.
+        """
+        self.client_getter = client_getter
+        self.max_open_children = max_open_children
+        self.poll_interval = poll_interval
+        self.min_order_amount = min_order_amount
+        self.max_failures = max_failures
+        self.sleep = sleep
+        self.clock = clock
+        self.parents: Dict[str, ParentOrder] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="execution")
+
+    def submit(self, action: str, amount: float, market: str, on_progress: Callable = None, **options) -> ParentOrder:
+        """
+        부모 주문 실행을 백그라운드에서 시작합니다.
+        :param action: str - 'buy'(amount 는 KRW) 또는 'sell'(amount 는 코인 수량).
+        :param amount: float - 목표 금액 또는 수량.
+        :param market: str - 거래 시장.
+        :param on_progress: Callable - 체결이 진행될 때마다 progress() 결과로 호출.
+        :param options: ParentOrder 설정 (strategy, slices, duration, child_type, replace_after, display_fraction, final_market).
+        :return: ParentOrder - 부모 주문 (future 로 최종 요약 대기 가능).
+        """
+        parent = ParentOrder(action, amount, market, **options)
+        with self._lock:
+            # 끝난 부모 주문은 최근 KEEP_FINISHED 개만 보관
+            finished = [key for key, item in self.parents.items() if item.future.done()]
+            for key in finished[:max(len(finished) - KEEP_FINISHED, 0)]:
+                del self.parents[key]
+            self.parents[parent.id] = parent
+        logging.info(
+            f"분할 주문 시작 ({parent.id}): {action} {amount} {market}, {parent.strategy} "
+            f"{parent.slices}회/{parent.duration}초, 자식 주문 {parent.child_type}"
+        )
+        self._executor.submit(self._run, parent, on_progress)
+        return parent
+
+    def get(self, parent_id: str) -> ParentOrder:
+        with self._lock:
+            return self.parents.get(parent_id)
+
+    def cancel(self, parent_id: str) -> bool:
+        """
+        부모 주문을 중단합니다 (대기 중인 자식 주문은 취소, 이미 체결된 부분은 유지).
+        """
+        parent = self.get(parent_id)
+        if parent is None:
+            return False
+        parent.cancel_requested.set()
+        return True
+
+    def status(self) -> List[Dict]:
+        """
+        실행 중인 부모 주문의 진행 상황 목록.
+        """
+        with self._lock:
+            parents = [parent for parent in self.parents.values() if not parent.future.done()]
+        return [parent.progress() for parent in parents]
+
+    def open_children(self) -> int:
+        with self._lock:
+            parents = list(self.parents.values())
+        return sum(len(parent.open_children()) for parent in parents)
+
+    # ===========================
+    # 실행 루프
+    # ===========================
+
+    def _run(self, parent: ParentOrder, on_progress: Callable) -> None:
+        parent.state = "running"
+        started = self.clock()
+        failures = 0
+        swept = False
+        try:
+            while True:
+                client = self.client_getter()
+                now = self.clock() - started
+                if self._refresh(parent, client, now) and on_progress is not None:
+                    self._callback(on_progress, parent.progress())
+
+                expired = now >= parent.duration
+                stopping = parent.cancel_requested.is_set() or failures >= self.max_failures
+                if stopping or (expired and not swept):
+                    self._cancel_open(parent, client)
+
+                open_children = parent.open_children()
+                remaining = parent.target - parent.filled() - parent.committed()
+                if stopping or (expired and (swept or not parent.final_market)):
+                    if not open_children:
+                        break
+                elif self._value(parent, remaining, client) < self.min_order_amount:
+                    if not open_children:
+                        break
+                elif expired and parent.final_market:
+                    if not open_children:
+                        failures = self._try_place(parent, client, remaining, "market", failures)
+                        swept = failures == 0  # 실패하면 다음 주기에 다시 시도 (연속 실패 시 error)
+                else:
+                    available = self._released(parent, now) - parent.filled() - parent.committed()
+                    if self.open_children() < self.max_open_children and available > 0:
+                        failures = self._try_place(parent, client, available, parent.child_type, failures)
+
+                self.sleep(self.poll_interval)
+
+            if failures >= self.max_failures:
+                parent.state = "error"
+            elif parent.cancel_requested.is_set():
+                parent.state = "cancel"
+            elif self._value(parent, parent.target - parent.filled(), self.client_getter()) >= self.min_order_amount:
+                # 기간이 끝났는데 최소 주문 금액 이상이 체결되지 않고 남음 (시장가 정리 안 함, 호가 부족 등)
+                parent.state = "partial"
+            else:
+                parent.state = "done"
+        except Exception as e:
+            logging.error(f"분할 주문 실행 중 오류 발생 ({parent.id}): {e}")
+            parent.state, parent.error = "error", str(e)
+
+        summary = parent.summary()
+        logging.info(f"분할 주문 종료 ({parent.id}): {parent.progress()}")
+        if on_progress is not None:
+            self._callback(on_progress, parent.progress())
+        parent.future.set_result(summary)
+
+    def _released(self, parent: ParentOrder, now: float) -> float:
+        # 지금까지 주문해도 되는 누적 목표량
+        if parent.strategy == "twap":
+            interval = parent.duration / parent.slices
+            due = parent.slices if interval <= 0 else min(int(now // interval) + 1, parent.slices)
+            return parent.target * due / parent.slices
+        return parent.target
+
+    def _top(self, parent: ParentOrder, client) -> Dict:
+        return client.get_orderbook(parent.market)[0]["orderbook_units"][0]
+
+    def _value(self, parent: ParentOrder, amount: float, client) -> float:
+        # 매수는 KRW 그대로, 매도는 최우선 매수 호가로 환산
+        if parent.is_buy or amount <= 0:
+            return amount
+        return amount * self._top(parent, client)["bid_price"]
+
+    def _try_place(self, parent: ParentOrder, client, amount: float, ord_type: str, failures: int) -> int:
+        # 자식 주문 접수 (실패 시 연속 실패 횟수 증가)
+        try:
+            self._place(parent, client, amount, ord_type)
+            return 0
+        except Exception as e:
+            logging.warning(f"자식 주문 실패 ({parent.id}, {failures + 1}/{self.max_failures}): {e}")
+            parent.error = str(e)
+            return failures + 1
+
+    def _place(self, parent: ParentOrder, client, amount: float, ord_type: str) -> None:
+        top = self._top(parent, client)
+        if parent.strategy == "iceberg" and ord_type == "limit":
+            # 최우선 호가 잔량의 일부만 노출
+            size = top["ask_size"] if parent.is_buy else top["bid_size"]
+            display = size * parent.display_fraction * (top["ask_price"] if parent.is_buy else 1.0)
+            amount = min(amount, max(display, self._min_size(parent, top)))
+
+        if ord_type == "limit":
+            price = top["ask_price"] if parent.is_buy else top["bid_price"]
+            volume = floor_volume(amount / price if parent.is_buy else amount)
+            if price * volume < self.min_order_amount:
+                return
+            if parent.is_buy:
+                response = client.buy_limit_order(parent.market, price, volume)
+            else:
+                response = client.sell_limit_order(parent.market, price, volume)
+            size = price * volume if parent.is_buy else volume
+        else:
+            price = None
+            if parent.is_buy:
+                response = client.buy_market_order(parent.market, amount)
+                size = amount
+            else:
+                size = floor_volume(amount)
+                response = client.sell_market_order(parent.market, size)
+
+        child = {
+            "uuid": response["uuid"], "ord_type": ord_type, "price": price, "size": size,
+            "placed_at": self.clock(), "state": "wait", "cancel_sent": False, "replaced": False,
+            "summary": summarize_fills(response),
+        }
+        with parent._lock:
+            parent.children.append(child)
+        PORTFOLIO_SERVICE.invalidate()
+        logging.info(f"자식 주문 접수 ({parent.id}): {ord_type} {price or ''} {size}")
+
+    def _min_size(self, parent: ParentOrder, top: Dict) -> float:
+        # 최소 주문 금액을 조금 넘는 크기 (매수는 KRW, 매도는 수량)
+        amount = self.min_order_amount * 1.01
+        return amount if parent.is_buy else amount / top["bid_price"]
+
+    def _refresh(self, parent: ParentOrder, client, now: float) -> bool:
+        # 대기 중인 자식 주문의 체결을 갱신하고, 오래된 지정가 주문은 취소 (다음 접수 때 새 호가로 재주문)
+        changed = False
+        for child in parent.open_children():
+            try:
+                order = client.get_order(child["uuid"])
+            except Exception as e:
+                logging.warning(f"자식 주문 조회 실패 ({child['uuid']}): {e}")
+                continue
+            summary = summarize_fills(order)
+            with parent._lock:
+                changed = changed or summary["filled_volume"] != child["summary"]["filled_volume"]
+                child["summary"] = summary
+                if order.get("state") in FINAL_STATES:
+                    child["state"] = order["state"]
+                    changed = True
+            if (child["state"] == "wait" and child["ord_type"] == "limit" and not child["cancel_sent"]
+                    and self.clock() - child["placed_at"] >= parent.replace_after):
+                self._cancel_child(child, client)
+                child["replaced"] = True
+        if changed:
+            PORTFOLIO_SERVICE.invalidate()
+        return changed
+
+    def _cancel_child(self, child: Dict, client) -> None:
+        try:
+            client.cancel_order(child["uuid"])
+            child["cancel_sent"] = True
+        except Exception as e:
+            logging.warning(f"자식 주문 취소 실패 ({child['uuid']}): {e}")
+
+    def _cancel_open(self, parent: ParentOrder, client) -> None:
+        for child in parent.open_children():
+            if not child["cancel_sent"]:
+                self._cancel_child(child, client)
+
+    @staticmethod
+    def _callback(callback: Callable, progress: Dict) -> None:
+        try:
+            callback(progress)
+        except Exception as e:
+            logging.error(f"분할 주문 진행 보고 중 오류 발생: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,146 @@
+# trade_manager/order_tracker.py
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+from trade_manager.trade_handler import get_trade_client
+
+# 접수된 주문의 체결 상태를 백그라운드에서 추적하고, 부분 체결을 모아 실제 체결 가격(VWAP)과 수수료를 계산하는 모듈
+# 주문 직후 응답에는 체결 정보가 없으므로 GET /v1/order 를 주문이 끝날 때까지 간격을 늘려가며 조회합니다.
+
+FINAL_STATES = ("done", "cancel")
+
+
+def summarize_fills(order: dict) -> Dict:
+    """
+    주문 상세 응답의 체결 목록(trades)을 모아 체결 요약을 만듭니다.
+    :param order: dict - GET /v1/order 응답.
+    :return: Dict - order_uuid, order_state, filled_volume, filled_funds, fill_price(VWAP, 체결 없으면 None), paid_fee.
+    """
+    filled_volume, filled_funds = 0.0, 0.0
+    for trade in order.get("trades") or []:
+        volume = float(trade["volume"])
+        filled_volume += volume
+        filled_funds += float(trade["funds"]) if trade.get("funds") is not None else float(trade["price"]) * volume
+    if not order.get("trades") and order.get("executed_volume"):
+        filled_volume = float(order["executed_volume"])  # 체결 목록이 없는 응답
+
+    return {
+        "order_uuid": order.get("uuid"),
+        "order_state": order.get("state"),
+        "filled_volume": filled_volume,
+        "filled_funds": filled_funds,
+        "fill_price": filled_funds / filled_volume if filled_volume > 0 and filled_funds > 0 else None,
+        "paid_fee": float(order.get("paid_fee") or 0.0),
+    }
+
+
+def compute_slippage_bps(action: str, fill_price: float, expected_price: float) -> float:
+    """
+    판단 시점 가격 대비 체결 가격의 슬리피지를 계산합니다 (양수면 불리하게 체결).
+    :param action: str - 'buy' 또는 'sell'.
+    :param fill_price: float - 실제 체결 가격 (VWAP).
+    :param expected_price: float - 판단 시점 가격.
+    :return: float - 슬리피지 (bp), 계산할 수 없으면 None.
+    """
+    if not fill_price or not expected_price:
+        return None
+    slippage = (fill_price - expected_price) / expected_price * 10_000
+    return slippage if action == "buy" else -slippage
+
+
+class OrderTracker:
+    """
+    주문 체결 추적기. track 은 즉시 Future 를 반환하고, 조회는 별도 스레드에서 진행됩니다.
+    - 새 체결이 들어올 때마다 on_update(요약), 주문이 끝나거나 시간이 초과되면 on_complete(요약) 호출
+    - 조회 간격은 poll_interval 에서 시작해 max_interval 까지 두 배씩 늘어남
+    """
+
+    def __init__(self, client_getter: Callable = get_trade_client, poll_interval: float = 0.5,
+                 max_interval: float = 5.0, timeout: float = 120.0, max_workers: int = 4, sleep: Callable = time.sleep):
+        """
+        :param client_getter: Callable - 주문 조회에 사용할 클라이언트를 반환하는 함수 (get_order 필요).
+        :param poll_interval: float - 첫 조회 간격 (초).
+        :param max_interval: float - 최대 조회 간격 (초).
+        :param timeout: float - 추적을 포기하는 시간 (초), 초과 시 그때까지의 체결로 완료 처리.
+        :param max_workers: int - 동시에 추적하는 주문 수.
+        :param sleep: Callable - 대기 함수 (테스트/모의 시계용).
+        """
+        self.client_getter = client_getter
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.sleep = sleep
+        self.active: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="order-tracker")
+
+    def track(self, order_uuid: str, on_update: Callable = None, on_complete: Callable = None) -> Future:
+        """
+        주문 추적을 시작합니다.
+        :param order_uuid: str - 주문 UUID.
+        :param on_update: Callable - 새 체결이 생길 때마다 체결 요약으로 호출.
+        :param on_complete: Callable - 추적이 끝나면 최종 체결 요약으로 호출.
+        :return: Future - 최종 체결 요약 Future.
+        """
+        with self._lock:
+            self.active[order_uuid] = {"order_uuid": order_uuid, "order_state": "wait", "filled_volume": 0.0}
+        return self._executor.submit(self._poll, order_uuid, on_update, on_complete)
+
+    def _poll(self, order_uuid: str, on_update: Callable, on_complete: Callable) -> Dict:
+        started = time.monotonic()
+        interval = self.poll_interval
+        summary = self.active[order_uuid]
+        seen_trades = 0
+        try:
+            while True:
+                try:
+                    order = self.client_getter().get_order(order_uuid)
+                except Exception as e:
+                    logging.warning(f"주문 조회 실패 ({order_uuid}): {e}")
+                    order = None
+
+                if order is not None:
+                    summary = summarize_fills(order)
+                    with self._lock:
+                        self.active[order_uuid] = summary
+                    trades = len(order.get("trades") or [])
+                    if trades > seen_trades and on_update is not None:
+                        seen_trades = trades
+                        self._callback(on_update, summary)
+                    if order.get("state") in FINAL_STATES:
+                        break
+
+                if time.monotonic() - started >= self.timeout:
+                    logging.warning(f"주문 추적 시간 초과 ({order_uuid}), 현재까지 체결: {summary}")
+                    summary = dict(summary, timed_out=True)
+                    break
+                self.sleep(interval)
+                interval = min(interval * 2, self.max_interval)
+
+            logging.info(f"주문 체결 완료: {summary}")
+            if on_complete is not None:
+                self._callback(on_complete, summary)
+            return summary
+        finally:
+            with self._lock:
+                self.active.pop(order_uuid, None)
+
+    @staticmethod
+    def _callback(callback: Callable, summary: Dict) -> None:
+        # 콜백 오류가 추적 스레드를 멈추지 않도록 로깅만 함
+        try:
+            callback(summary)
+        except Exception as e:
+            logging.error(f"주문 체결 처리 중 오류 발생: {e}")
+
+    def pending(self) -> Dict[str, Dict]:
+        """
+        추적 중인 주문별 현재 체결 요약을 반환합니다.
+        """
+        with self._lock:
+            return dict(self.active)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,110 @@
+# trade_manager/portfolio_service.py
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict
+from data_collection.snapshot import PortfolioSnapshot
+from trade_manager.account_status import fetch_portfolio_status, filter_bitcoin_portfolio
+
+# 계좌 잔고(/v1/accounts)를 짧은 시간 동안 메모리에 캐시해 한 사이클의 모든 조회가 같은 결과를 공유하게 하는 모듈
+# 주문이 접수되거나 체결되면 invalidate 로 캐시를 비워 다음 조회가 새 잔고를 가져옵니다.
+
+
+def fetch_account_portfolio() -> dict:
+    """
+    .env 의 API 키로 전체 포트폴리오 상태를 조회합니다 (fetch_portfolio_status 형식).
+    """
+    return fetch_portfolio_status(os.getenv("UPBIT_API_KEY"), os.getenv("UPBIT_API_SECRET"))
+
+
+class PortfolioService:
+    """
+    포트폴리오 상태 캐시.
+    - ttl 초 동안은 저장된 결과를 반환하고, 동시에 들어온 조회는 진행 중인 한 번의 요청을 함께 기다림
+    - 오류 결과는 캐시하지 않음
+    - invalidate 이후에는 그 전에 시작된 요청의 결과도 캐시하지 않음
+    """
+
+    def __init__(self, fetcher: Callable = fetch_account_portfolio, ttl: float = 10.0, clock: Callable = time.monotonic):
+        """
+        :param fetcher: Callable - 전체 포트폴리오 상태를 반환하는 함수.
+        :param ttl: float - 캐시 유지 시간 (초), 0 이면 캐시하지 않음.
+        :param clock: Callable - 경과 시간(초)을 반환하는 함수.
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.fetches = 0
+        self._portfolio = None
+        self._fetched_at = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def _cached(self, max_age: float):
+        if self._portfolio is None or self.clock() - self._fetched_at > max_age:
+            return None
+        return self._portfolio
+
+    def get(self, max_age: float = None) -> Dict:
+        """
+        전체 포트폴리오 상태를 반환합니다.
+        :param max_age: float - 허용할 캐시 나이 (초), 기본값은 ttl.
+        :return: Dict - fetch_portfolio_status 형식의 포트폴리오 (실패 시 error 키).
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            portfolio = self._cached(max_age)
+            if portfolio is not None:
+                self.hits += 1
+                return portfolio
+
+        with self._fetch_lock:
+            # 기다리는 동안 다른 스레드가 가져왔으면 그 결과를 사용
+            with self._lock:
+                portfolio = self._cached(max_age)
+                if portfolio is not None:
+                    self.hits += 1
+                    return portfolio
+                generation = self._generation
+
+            portfolio = self.fetcher()
+            with self._lock:
+                self.fetches += 1
+                if "error" not in portfolio and generation == self._generation:
+                    self._portfolio, self._fetched_at = portfolio, self.clock()
+            return portfolio
+
+    def status(self, market_name: str = "KRW-BTC", max_age: float = None) -> Dict:
+        """
+        현금 잔고와 대상 코인 정보만 포함한 포트폴리오 (get_portfolio_status 와 같은 형식).
+        """
+        portfolio = self.get(max_age)
+        if "error" in portfolio:
+            return portfolio
+        return filter_bitcoin_portfolio(portfolio, target_currency=market_name.split("-")[1])
+
+    def snapshot(self, market_name: str = "KRW-BTC", max_age: float = None) -> PortfolioSnapshot:
+        """
+        대상 시장의 포트폴리오 스냅샷 (get_portfolio_snapshot 과 같은 형식).
+        """
+        return PortfolioSnapshot.from_dict(self.status(market_name, max_age), currency=market_name.split("-")[1])
+
+    def invalidate(self) -> None:
+        """
+        캐시를 비웁니다 (주문 접수/체결 후 호출).
+        """
+        with self._lock:
+            self._portfolio = None
+            self._generation += 1
+        logging.debug("포트폴리오 캐시 무효화")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "fetches": self.fetches}
+
+
+# 공유 포트폴리오 서비스
+PORTFOLIO_SERVICE = PortfolioService(ttl=float(os.getenv("PORTFOLIO_CACHE_TTL", "10")))
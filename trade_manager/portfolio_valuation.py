@@ -0,0 +1,156 @@
+# trade_manager/portfolio_valuation.py
+import logging
+from typing import Callable, Dict, List
+import numpy as np
+from exchange.upbit_client import get_current_price
+
+# 보유 중인 모든 코인을 배열로 두고, 한 번의 묶음 시세 요청으로 계좌 전체를 평가하는 모듈
+# 코인별/전체 평가 금액, 미실현 손익, 비중(노출도)을 한 번의 벡터 연산으로 계산합니다.
+# 평가는 대기 주문에 묶인 현금/수량(locked)을 포함한 전체 잔고 기준입니다 (거래소 조회와 원장 모두 같은 기준).
+
+
+class PortfolioValuation:
+    """
+    보유 코인 배열과 시세 배열로 계산한 계좌 평가.
+    시세를 받지 못한 코인은 평가 금액이 NaN 이며 합계에서 제외되고 missing_prices 에 표시됩니다.
+    """
+
+    def __init__(self, cash_balance: float, currencies: List[str], balances, avg_buy_prices, unit: str = "KRW"):
+        """
+        :param cash_balance: float - 현금 잔고.
+        :param currencies: List[str] - 보유 코인 목록.
+        :param balances: array - 코인별 보유 수량.
+        :param avg_buy_prices: array - 코인별 평균 매수가.
+        :param unit: str - 기준 통화 (시장 이름 앞부분).
+        """
+        self.cash_balance = float(cash_balance)
+        self.currencies = list(currencies)
+        self.markets = [f"{unit}-{currency}" for currency in self.currencies]
+        self.balances = np.asarray(balances, dtype=float).reshape(-1)
+        self.avg_buy_prices = np.asarray(avg_buy_prices, dtype=float).reshape(-1)
+        self.prices = np.full(len(self.currencies), np.nan)
+
+    @classmethod
+    def from_portfolio(cls, portfolio: Dict, unit: str = "KRW"):
+        """
+        fetch_portfolio_status 형식의 포트폴리오로 생성합니다 (locked 포함 보유 수량이 0 인 코인은 제외).
+        """
+        assets = [
+            asset for asset in portfolio.get("invested_assets", [])
+            if float(asset["balance"]) + float(asset.get("locked") or 0.0) > 0
+        ]
+        return cls(
+            portfolio.get("cash_balance", 0.0) + portfolio.get("locked_cash", 0.0),
+            [asset["currency"] for asset in assets],
+            [float(asset["balance"]) + float(asset.get("locked") or 0.0) for asset in assets],
+            [asset.get("avg_buy_price", 0.0) for asset in assets],
+            unit,
+        )
+
+    def fetch_prices(self, price_fetcher: Callable = get_current_price) -> "PortfolioValuation":
+        """
+        모든 보유 시장의 현재가를 한 번의 묶음 요청으로 가져옵니다.
+        상장 폐지 등으로 시세가 없는 시장이 하나라도 있으면 묶음 요청 전체가 실패하므로, 그때는 시장별로 다시 요청합니다.
+        :param price_fetcher: Callable - 시장 목록을 받아 {시장: 가격} 을 반환하는 함수 (실패 시 None).
+        :return: PortfolioValuation - 자기 자신.
+        """
+        if not self.markets:
+            return self
+        prices = price_fetcher(self.markets)
+        if prices is None and len(self.markets) > 1:
+            logging.warning(f"묶음 시세 요청 실패, 시장별로 다시 요청합니다: {self.markets}")
+            prices = {}
+            for market in self.markets:
+                prices.update(price_fetcher([market]) or {})
+        prices = prices or {}
+        self.prices = np.array(
+            [np.nan if prices.get(market) is None else float(prices[market]) for market in self.markets]
+        )
+        return self
+
+    def set_prices(self, prices: Dict[str, float]) -> "PortfolioValuation":
+        """
+        이미 알고 있는 시세로 평가합니다 (시세 요청 없음).
+        """
+        return self.fetch_prices(lambda markets: prices)
+
+    def compute(self) -> Dict:
+        """
+        코인별/전체 평가 금액, 원가, 미실현 손익, 수익률, 비중을 계산합니다.
+        :return: Dict - 계좌 전체 요약과 코인별 배열.
+        """
+        market_values = self.balances * self.prices
+        costs = self.balances * self.avg_buy_prices
+        unrealized = market_values - costs
+        priced = ~np.isnan(market_values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            unrealized_rates = np.where(costs > 0, unrealized / costs * 100, 0.0)
+
+        total_market_value = float(market_values[priced].sum())
+        total_cost = float(costs[priced].sum())
+        total_unrealized = total_market_value - total_cost
+        total_equity = self.cash_balance + total_market_value
+        exposures = market_values / total_equity if total_equity > 0 else np.zeros_like(market_values)
+
+        return {
+            "cash_balance": self.cash_balance,
+            "total_market_value": total_market_value,
+            "total_cost": total_cost,
+            "unrealized_pnl": total_unrealized,
+            "unrealized_rate": total_unrealized / total_cost * 100 if total_cost > 0 else 0.0,
+            "total_equity": total_equity,
+            "exposure": total_market_value / total_equity if total_equity > 0 else 0.0,
+            "missing_prices": [market for market, ok in zip(self.markets, priced) if not ok],
+            "currencies": self.currencies,
+            "market_values": market_values,
+            "costs": costs,
+            "unrealized": unrealized,
+            "unrealized_rates": unrealized_rates,
+            "exposures": exposures,
+        }
+
+    def to_dict(self) -> Dict:
+        """
+        계산 결과를 코인별 dict 목록을 포함한 dict 로 변환합니다 (로그/JSON 출력용).
+        """
+        result = self.compute()
+        assets = []
+        for index, currency in enumerate(self.currencies):
+            price = self.prices[index]
+            assets.append({
+                "currency": currency,
+                "balance": float(self.balances[index]),
+                "avg_buy_price": float(self.avg_buy_prices[index]),
+                "price": None if np.isnan(price) else float(price),
+                "market_value": None if np.isnan(price) else round(float(result["market_values"][index]), 2),
+                "unrealized_pnl": None if np.isnan(price) else round(float(result["unrealized"][index]), 2),
+                "unrealized_rate": None if np.isnan(price) else round(float(result["unrealized_rates"][index]), 2),
+                "exposure": None if np.isnan(price) else round(float(result["exposures"][index]), 4),
+            })
+        return {
+            "cash_balance": round(result["cash_balance"], 2),
+            "total_market_value": round(result["total_market_value"], 2),
+            "total_cost": round(result["total_cost"], 2),
+            "unrealized_pnl": round(result["unrealized_pnl"], 2),
+            "unrealized_rate": round(result["unrealized_rate"], 2),
+            "total_equity": round(result["total_equity"], 2),
+            "exposure": round(result["exposure"], 4),
+            "missing_prices": result["missing_prices"],
+            "assets": assets,
+        }
+
+
+def value_portfolio(portfolio: Dict, price_fetcher: Callable = get_current_price) -> Dict:
+    """
+    포트폴리오 전체를 한 번의 묶음 시세 요청으로 평가합니다.
+    :param portfolio: Dict - fetch_portfolio_status 형식의 포트폴리오.
+    :param price_fetcher: Callable - 시장 목록을 받아 {시장: 가격} 을 반환하는 함수.
+    :return: Dict - PortfolioValuation.to_dict 결과 (실패 시 error 키).
+    """
+    if "error" in portfolio:
+        return {"error": portfolio["error"]}
+    try:
+        return PortfolioValuation.from_portfolio(portfolio).fetch_prices(price_fetcher).to_dict()
+    except Exception as e:
+        logging.error(f"계좌 평가 중 오류 발생: {e}")
+        return {"error": str(e)}
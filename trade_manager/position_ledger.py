@@ -0,0 +1,389 @@
+# trade_manager/position_ledger.py
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List
+from data_collection.snapshot import PortfolioSnapshot
+from exchange.upbit_client import get_upbit_client
+
+# 체결마다 보유 수량, 평균 매수가, 실현 손익을 O(1)로 갱신하는 로컬 포지션 원장 모듈
+# 판단 시점의 잔고 조회는 원장의 메모리 값을 읽고, 거래소 잔고와는 느린 주기로 대사(reconcile)해 차이가 나면 알립니다.
+# 체결은 거래소의 balance + locked (대기 주문에 묶인 양 포함) 합계 기준으로 반영하고,
+# 판단에 쓰는 status/snapshot 은 대사 때 받은 locked 와 이 프로세스가 낸 대기 주문(reserve)에 묶인 양을 뺀
+# 주문 가능 수량/현금만 보여줍니다. 묶인 양은 그 주문이 체결될 때마다 풀리고, 주문이 끝나면 남은 양도 풀립니다.
+
+ORDER_END_STATES = ("done", "cancel", "partial", "error")  # 더 이상 체결되지 않는 주문/부모 주문 상태
+
+
+class Position:
+    """
+    코인 하나의 보유 상태. cost 는 수수료를 제외한 매수 원가 합계입니다 (업비트 평균 매수가와 같은 기준).
+    balance 는 locked 를 포함한 전체 보유 수량입니다.
+    """
+
+    __slots__ = ("currency", "balance", "locked", "cost", "realized_pnl", "fees")
+
+    def __init__(self, currency: str, balance: float = 0.0, avg_buy_price: float = 0.0, locked: float = 0.0):
+        self.currency = currency
+        self.balance = balance
+        self.locked = locked
+        self.cost = balance * avg_buy_price
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+
+    @property
+    def avg_buy_price(self) -> float:
+        return self.cost / self.balance if self.balance > 0 else 0.0
+
+    @property
+    def free(self) -> float:
+        return max(self.balance - self.locked, 0.0)
+
+
+class PositionLedger:
+    """
+    로컬 포지션 원장.
+    - apply_fill: 체결 한 건으로 현금, 보유 수량, 원가, 실현 손익을 갱신
+    - apply_order_update: 주문별 누적 체결 요약에서 이전에 반영한 부분을 뺀 차이만 반영 (같은 요약을 여러 번 받아도 안전)
+    - reserve: 주문 접수 시 그 주문에 묶이는 현금(매수) 또는 수량(매도)을 잡아 둠
+    - reconcile: 거래소 잔고와 비교해 차이를 반환하고 거래소 값으로 맞춤 (대기 주문에 묶인 양도 갱신)
+    """
+
+    def __init__(self, cash: float = 0.0, max_orders: int = 1000):
+        """
+        :param cash: float - 초기 현금 (KRW).
+        :param max_orders: int - 누적 체결 요약을 기억할 최근 주문 수.
+        """
+        self.cash = cash  # locked 를 포함한 전체 현금
+        self.locked_cash = 0.0
+        self.positions: Dict[str, Position] = {}
+        self.total_investment = 0.0  # 모든 포지션의 원가 합계
+        self.max_orders = max_orders
+        self.applied = OrderedDict()  # 주문 ID -> 마지막으로 반영한 누적 체결 요약
+        self.reserved: Dict[str, List] = {}  # 주문 ID -> [코인, side, 아직 묶여 있는 양]
+        self.loaded = False
+        self.version = 0  # 체결을 반영할 때마다 증가 (대사 중에 들어온 체결 감지용)
+        self._lock = threading.RLock()
+
+    def _position(self, currency: str) -> Position:
+        position = self.positions.get(currency)
+        if position is None:
+            position = self.positions[currency] = Position(currency)
+        return position
+
+    def load(self, accounts: List[Dict]) -> None:
+        """
+        거래소 잔고 목록(/v1/accounts 형식)으로 원장을 초기화합니다.
+        :param accounts: List[Dict] - currency, balance, locked, avg_buy_price 를 가진 잔고 목록.
+        """
+        with self._lock:
+            self.positions = {}
+            self.total_investment = 0.0
+            self.locked_cash = 0.0
+            for account in accounts:
+                locked = float(account.get("locked") or 0.0)
+                amount = float(account.get("balance") or 0.0) + locked
+                if account["currency"] == "KRW":
+                    self.cash, self.locked_cash = amount, locked
+                    continue
+                position = Position(account["currency"], amount, float(account.get("avg_buy_price") or 0.0), locked)
+                self.positions[position.currency] = position
+                self.total_investment += position.cost
+            self.loaded = True
+
+    def _refresh_locked(self, accounts: List[Dict]) -> None:
+        # 대기 주문에 묶인 양만 거래소 값으로 갱신
+        locked = {account["currency"]: float(account.get("locked") or 0.0) for account in accounts}
+        self.locked_cash = min(locked.get("KRW", 0.0), self.cash)
+        for currency, position in self.positions.items():
+            position.locked = min(locked.get(currency, 0.0), position.balance)
+
+    def apply_fill(self, market: str, side: str, price: float, volume: float, fee: float = 0.0) -> Position:
+        """
+        체결 한 건을 반영합니다.
+        :param market: str - 시장 (예: 'KRW-XRP').
+        :param side: str - 'buy' 또는 'sell'.
+        :param price: float - 체결 가격.
+        :param volume: float - 체결 수량.
+        :param fee: float - 수수료 (KRW).
+        :return: Position - 갱신된 포지션.
+        """
+        funds = price * volume
+        with self._lock:
+            position = self._position(market.split("-")[1])
+            if side == "buy":
+                self.cash -= funds + fee
+                position.balance += volume
+                position.cost += funds
+                self.total_investment += funds
+            elif side == "sell":
+                sold_cost = position.avg_buy_price * min(volume, position.balance)
+                self.cash += funds - fee
+                position.realized_pnl += funds - sold_cost - fee
+                position.balance -= volume
+                position.cost -= sold_cost
+                self.total_investment -= sold_cost
+                if position.balance <= 1e-12:
+                    position.balance, position.cost = 0.0, 0.0
+            else:
+                raise ValueError(f"Invalid side: {side}")
+            position.fees += fee
+            # 묶여 있던 양에서 체결됐을 수 있으므로 locked 가 전체 잔고를 넘지 않게 맞춤
+            position.locked = min(position.locked, position.balance)
+            self.locked_cash = min(self.locked_cash, max(self.cash, 0.0))
+            self.version += 1
+            return position
+
+    def reserve(self, order_id: str, market: str, side: str, amount: float) -> None:
+        """
+        접수한 주문에 묶이는 양을 잡아 둡니다 (거래소가 주문 접수 시 locked 로 옮기는 것과 같음).
+        reserve 전에 이미 반영된 체결이 있으면 그만큼 빼고, 이미 끝난 주문이면 잡지 않습니다.
+        :param order_id: str - 주문 UUID 또는 부모 주문 ID.
+        :param market: str - 시장.
+        :param side: str - 'buy' 또는 'sell'.
+        :param amount: float - 매수는 수수료를 포함한 KRW 금액, 매도는 코인 수량.
+        """
+        with self._lock:
+            previous = self.applied.get(order_id)
+            if previous is not None:
+                if previous.get("ended"):
+                    return
+                amount -= previous["filled_funds"] + previous["paid_fee"] if side == "buy" else previous["filled_volume"]
+            if amount <= 0:
+                return
+            currency = market.split("-")[1]
+            if side == "buy":
+                self.locked_cash += amount
+            else:
+                self._position(currency).locked += amount
+            self.reserved[order_id] = [currency, side, amount]
+
+    def _release(self, order_id: str, amount: float = None) -> None:
+        # 주문에 묶어 둔 양을 amount 만큼 (None 이면 남은 양 전부) 풉니다
+        entry = self.reserved.get(order_id)
+        if entry is None:
+            return
+        currency, side, remaining = entry
+        amount = remaining if amount is None else min(amount, remaining)
+        self._unlock(currency, side, amount)
+        entry[2] -= amount
+        if entry[2] <= 1e-12:
+            del self.reserved[order_id]
+
+    def _unlock(self, currency: str, side: str, amount: float) -> None:
+        if side == "buy":
+            self.locked_cash = max(self.locked_cash - amount, 0.0)
+        elif currency in self.positions:
+            position = self.positions[currency]
+            position.locked = max(position.locked - amount, 0.0)
+
+    def apply_order_update(self, order_id: str, market: str, side: str, summary: Dict, locked: bool = False) -> None:
+        """
+        주문(또는 분할 부모 주문)의 누적 체결 요약에서 새로 체결된 부분만 반영합니다.
+        reserve 로 잡아 둔 주문은 체결된 만큼 묶인 양을 풀고, 주문이 끝나면 남은 양도 풉니다.
+        :param order_id: str - 주문 UUID 또는 부모 주문 ID.
+        :param market: str - 시장.
+        :param side: str - 'buy' 또는 'sell'.
+        :param summary: Dict - filled_volume, filled_funds, paid_fee 를 가진 누적 체결 요약 (summarize_fills 또는 분할 주문 진행 상황).
+        :param locked: bool - 원장을 불러올 때 이미 locked 로 잡힌 대기 주문이면 True (체결된 만큼 locked 를 풂).
+        """
+        with self._lock:
+            previous = self.applied.get(order_id, {"filled_volume": 0.0, "filled_funds": 0.0, "paid_fee": 0.0})
+            volume = summary["filled_volume"] - previous["filled_volume"]
+            funds = summary["filled_funds"] - previous["filled_funds"]
+            fee = summary["paid_fee"] - previous["paid_fee"]
+            if volume > 1e-12:
+                self.apply_fill(market, side, funds / volume, volume, fee)
+                consumed = funds + fee if side == "buy" else volume
+                if order_id in self.reserved:
+                    self._release(order_id, consumed)
+                elif locked:
+                    self._unlock(market.split("-")[1], side, consumed)
+            ended = summary.get("order_state") in ORDER_END_STATES or bool(summary.get("timed_out"))
+            if ended:
+                self._release(order_id)
+            # 끝난 주문도 완료 알림이 여러 번 올 수 있으므로 바로 지우지 않고 오래된 주문부터 정리
+            self.applied[order_id] = {key: summary[key] for key in ("filled_volume", "filled_funds", "paid_fee")}
+            self.applied[order_id]["ended"] = ended or previous.get("ended", False)
+            self.applied.move_to_end(order_id)
+            while len(self.applied) > self.max_orders:
+                self.applied.popitem(last=False)
+
+    def status(self, market_name: str = "KRW-BTC") -> Dict:
+        """
+        주문 가능한 현금 잔고와 대상 코인 정보 (get_portfolio_status 와 같은 형식, 메모리 조회만 수행).
+        거래소 조회와 같이 대기 주문에 묶인 현금/수량은 제외합니다.
+        """
+        currency = market_name.split("-")[1]
+        with self._lock:
+            position = self.positions.get(currency)
+            target = {"currency": currency, "balance": 0.0, "avg_buy_price": 0.0}
+            if position is not None and position.balance > 0:
+                target = {
+                    "currency": currency,
+                    "balance": position.free,
+                    "avg_buy_price": position.avg_buy_price,
+                    "total_investment": round(position.cost, 2),
+                }
+            return {
+                "cash_balance": max(self.cash - self.locked_cash, 0.0),
+                "total_investment": round(self.total_investment, 2),
+                "target_asset": target,
+            }
+
+    def portfolio(self) -> Dict:
+        """
+        전체 포트폴리오 상태 (fetch_portfolio_status 와 같은 형식, 메모리 조회만 수행).
+        balance/cash_balance 는 주문 가능한 양이고, 대기 주문에 묶인 양은 locked/locked_cash 에 따로 둡니다.
+        """
+        with self._lock:
+            assets = [
+                {
+                    "currency": position.currency,
+                    "balance": position.free,
+                    "locked": position.balance - position.free,
+                    "avg_buy_price": position.avg_buy_price,
+                    "total_investment": round(position.cost, 2),
+                }
+                for position in self.positions.values()
+                if position.balance > 0
+            ]
+            return {
+                "cash_balance": max(self.cash - self.locked_cash, 0.0),
+                "locked_cash": min(self.locked_cash, self.cash),
+                "invested_assets": assets,
+                "total_investment": round(self.total_investment, 2),
+            }
+
+    def snapshot(self, market_name: str = "KRW-BTC") -> PortfolioSnapshot:
+        return PortfolioSnapshot.from_dict(self.status(market_name), currency=market_name.split("-")[1])
+
+    def realized_pnl(self) -> float:
+        with self._lock:
+            return sum(position.realized_pnl for position in self.positions.values())
+
+    def reconcile(self, accounts: List[Dict], tolerance: float = 1e-6, version: int = None) -> List[Dict]:
+        """
+        거래소 잔고와 원장을 비교하고, 차이가 있으면 거래소 값으로 맞춥니다 (실현 손익과 수수료 누계는 유지).
+        아직 초기화되지 않은 원장은 거래소 잔고로 초기화만 합니다.
+        :param accounts: List[Dict] - /v1/accounts 형식의 잔고 목록.
+        :param tolerance: float - 허용 상대 오차.
+        :param version: int - 잔고를 조회하기 전의 self.version. 그 사이 체결이 반영됐으면 비교하지 않습니다.
+        :return: List[Dict] - {currency, field, local, exchange} 차이 목록.
+        """
+        drifts = []
+        with self._lock:
+            if not self.loaded:
+                # 첫 대사는 원장 초기화
+                self.load(accounts)
+                return drifts
+            if version is not None and version != self.version:
+                # 조회한 잔고에 이미 반영된 체결인지 알 수 없으므로 다음 대사로 미룸
+                logging.info("잔고 조회 중 체결이 반영되어 이번 원장 대사를 건너뜁니다.")
+                return drifts
+            exchange = {
+                account["currency"]: (
+                    float(account.get("balance") or 0.0) + float(account.get("locked") or 0.0),
+                    float(account.get("avg_buy_price") or 0.0),
+                )
+                for account in accounts
+            }
+            local = {currency: (position.balance, position.avg_buy_price) for currency, position in self.positions.items()}
+            local["KRW"] = (self.cash, 0.0)
+            exchange.setdefault("KRW", (0.0, 0.0))
+
+            for currency in set(exchange) | set(local):
+                local_balance, local_avg = local.get(currency, (0.0, 0.0))
+                remote_balance, remote_avg = exchange.get(currency, (0.0, 0.0))
+                if abs(local_balance - remote_balance) > tolerance * max(abs(remote_balance), 1.0):
+                    drifts.append({"currency": currency, "field": "balance", "local": local_balance, "exchange": remote_balance})
+                if remote_balance > 0 and abs(local_avg - remote_avg) > tolerance * max(remote_avg, 1.0) * 100:
+                    drifts.append({"currency": currency, "field": "avg_buy_price", "local": local_avg, "exchange": remote_avg})
+
+            if drifts:
+                history = {currency: (position.realized_pnl, position.fees) for currency, position in self.positions.items()}
+                self.load(accounts)
+                for currency, (realized_pnl, fees) in history.items():
+                    position = self._position(currency)
+                    position.realized_pnl, position.fees = realized_pnl, fees
+            else:
+                self._refresh_locked(accounts)
+        return drifts
+
+
+class LedgerReconciler:
+    """
+    백그라운드 데몬 스레드에서 interval 초마다 원장을 거래소 잔고와 대사합니다.
+    차이가 있으면 on_drift(차이 목록)를 호출합니다 (예: Slack 알림).
+    체결 추적 중인 주문이 있으면 (busy() 가 True) 거래소 잔고와 원장의 반영 시점이 다를 수 있으므로 대사를 건너뜁니다.
+    """
+
+    def __init__(self, ledger: PositionLedger, fetch_accounts: Callable = None, interval: float = 600.0,
+                 on_drift: Callable = None, tolerance: float = 1e-6, busy: Callable = None):
+        self.ledger = ledger
+        self.fetch_accounts = fetch_accounts or (lambda: get_upbit_client().get_accounts())
+        self.interval = interval
+        self.on_drift = on_drift
+        self.tolerance = tolerance
+        self.busy = busy
+        self.runs = 0
+        self.last_drifts: List[Dict] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> List[Dict]:
+        """
+        한 번 대사합니다. 잔고 조회에 실패하거나 체결 추적 중인 주문이 있으면 원장을 그대로 두고 빈 목록을 반환합니다.
+        """
+        if self._is_busy():
+            return []
+        version = self.ledger.version
+        try:
+            accounts = self.fetch_accounts()
+        except Exception as e:
+            logging.error(f"원장 대사를 위한 잔고 조회 실패: {e}")
+            return []
+        if self._is_busy():
+            return []
+        drifts = self.ledger.reconcile(accounts, self.tolerance, version)
+        self.runs += 1
+        self.last_drifts = drifts
+        if drifts:
+            logging.warning(f"원장과 거래소 잔고가 다릅니다 (거래소 값으로 맞춤): {drifts}")
+            if self.on_drift is not None:
+                try:
+                    self.on_drift(drifts)
+                except Exception as e:
+                    logging.error(f"원장 차이 알림 중 오류 발생: {e}")
+        return drifts
+
+    def _is_busy(self) -> bool:
+        # 초기화 전에는 항상 대사 (원장을 처음 채움)
+        if self.busy is None or not self.ledger.loaded:
+            return False
+        try:
+            busy = self.busy()
+        except Exception as e:
+            logging.error(f"진행 중인 주문 확인 실패: {e}")
+            return True
+        if busy:
+            logging.info("체결 추적 중인 주문이 있어 이번 원장 대사를 건너뜁니다.")
+        return bool(busy)
+
+    def run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self) -> None:
+        """
+        첫 대사로 원장을 초기화한 뒤 백그라운드 데몬 스레드에서 주기적인 대사를 시작합니다.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.run_once()
+            self._thread = threading.Thread(target=self.run, name="ledger-reconciler", daemon=True)
+            self._thread.start()
+            logging.info(f"원장 대사 시작 ({self.interval}초 주기)")
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -1,7 +1,8 @@
-import pyupbit
 import logging
 import os
 from dotenv import load_dotenv
+from exchange.upbit_client import get_upbit_client
+from trade_manager.portfolio_service import PORTFOLIO_SERVICE
 
 # 현재 파일의 디렉토리를 기준으로 .env 파일 경로 설정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -14,8 +15,13 @@ load_dotenv()
 UPBIT_ACCESS_KEY = os.getenv("UPBIT_API_KEY")
 UBPIT_SECRET_KEY = os.getenv("UPBIT_API_SECRET")
 
-# Upbit 객체 초기화
-upbit = pyupbit.Upbit(UPBIT_ACCESS_KEY, UBPIT_SECRET_KEY)
+
+def get_trade_client():
+    """
+    주문에 사용할 공유 Upbit 클라이언트 (커넥션 풀, 요청 수 제한, 재시도 포함)를 반환합니다.
+    모의 거래 모드에서는 set_upbit_client 로 설치된 모의 거래소가 반환됩니다.
+    """
+    return get_upbit_client(UPBIT_ACCESS_KEY, UBPIT_SECRET_KEY)
 
 
 def execute_trade(action: str, amount: float, market: str) -> dict:
@@ -30,6 +36,7 @@ def execute_trade(action: str, amount: float, market: str) -> dict:
         if action not in ["buy", "sell"]:
             raise ValueError(f"Invalid action: {action}")
 
+        upbit = get_trade_client()
         if action == "buy":
             # 매수 요청 (시장가 매수)
             result = upbit.buy_market_order(market, amount)
@@ -43,6 +50,9 @@ def execute_trade(action: str, amount: float, market: str) -> dict:
     except Exception as e:
         logging.error(f"Trade execution failed: {e}")
         return {"error": str(e)}
+    finally:
+        # 주문 결과와 관계없이 잔고가 바뀌었을 수 있으므로 캐시된 포트폴리오를 비움
+        PORTFOLIO_SERVICE.invalidate()
 
 
 def log_transaction(action: str, result: dict) -> None:
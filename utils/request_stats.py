@@ -0,0 +1,32 @@
+# utils/request_stats.py
+from collections import Counter
+from typing import Dict, List
+import numpy as np
+
+# GPT 요청 기록의 상태별 건수와 항목별 백분위를 계산하는 모듈
+# OpenAI 설정 없이도 불러올 수 있도록 gpt_interface 패키지 밖에 둡니다 (웹 대시보드에서 사용).
+
+PERCENTILES = (50, 95, 99)
+SUMMARY_FIELDS = ("latency", "ttft", "prompt_tokens", "cached_tokens", "completion_tokens", "cost")
+
+
+def summarize_records(records: List[Dict]) -> Dict:
+    """
+    요청 기록 목록의 상태별 건수, 항목별 백분위(p50/p95/p99), 총 비용을 계산합니다.
+    :param records: List[Dict] - to_record 형식의 기록 (DB 행을 dict 로 바꾼 것도 가능).
+    :return: Dict - {"count", "status", "latency": {...}, "ttft": {...}, ..., "total_cost"}.
+    """
+    summary = {"count": len(records), "status": dict(Counter(record["status"] for record in records))}
+    for field in SUMMARY_FIELDS:
+        values = np.array([record[field] for record in records if record.get(field) is not None], dtype=float)
+        if values.size == 0:
+            summary[field] = {"count": 0}
+            continue
+        stats = {"count": int(values.size)}
+        for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            stats[f"p{q}"] = round(float(value), 6)
+        stats["max"] = round(float(values.max()), 6)
+        summary[field] = stats
+    costs = [record["cost"] for record in records if record.get("cost") is not None]
+    summary["total_cost"] = round(float(sum(costs)), 6)
+    return summary
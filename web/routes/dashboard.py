@@ -3,7 +3,9 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from db.database import SessionLocal
-from db.models import Trade, Performance, Portfolio
+from db.models import Trade, Performance, Portfolio, LLMRequest
+from db.crud import get_llm_requests
+from utils.request_stats import summarize_records
 from datetime import datetime, timedelta
 from fastapi.staticfiles import StaticFiles
 
@@ -137,3 +139,16 @@ async def get_trade_logs(page: int = 1, per_page: int = 5, db: Session = Depends
         }
     except Exception as e:
         return {"error": f"Failed to fetch trade logs: {e}"}
+
+
+@router.get("/llm-stats")
+async def get_llm_stats(window: int = 500, model: str = None, db: Session = Depends(get_db)):
+    """
+    최근 GPT 요청의 지연/토큰/비용 백분위 반환
+    """
+    try:
+        rows = get_llm_requests(db, limit=window, model=model)
+        records = [{column.name: getattr(row, column.name) for column in LLMRequest.__table__.columns} for row in rows]
+        return summarize_records(records)
+    except Exception as e:
+        return {"error": f"Failed to fetch llm stats: {e}"}